@@ -0,0 +1,44 @@
+"""Add per-hour execution-time quantile sketches
+
+Revision ID: 008_workflow_latency_sketches
+Revises: 007_business_context_integration
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_workflow_latency_sketches'
+down_revision = '007_business_context_integration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create workflow_latency_sketches table."""
+    op.create_table(
+        'workflow_latency_sketches',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('workflow_id', sa.String(255), sa.ForeignKey('workflows.id'), nullable=False, index=True),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sample_count', sa.Integer, default=0, nullable=False),
+        sa.Column('total_ms', sa.Float, default=0.0, nullable=False),
+        sa.Column('min_ms', sa.Float, nullable=True),
+        sa.Column('max_ms', sa.Float, nullable=True),
+        sa.Column('sketch', sa.JSON(), nullable=False),
+        sa.UniqueConstraint('workflow_id', 'bucket_start', name='uq_workflow_latency_sketch_bucket')
+    )
+    op.create_index(
+        'idx_workflow_latency_sketch_workflow_bucket',
+        'workflow_latency_sketches',
+        ['workflow_id', 'bucket_start']
+    )
+
+
+def downgrade() -> None:
+    """Drop workflow_latency_sketches table."""
+    op.drop_index('idx_workflow_latency_sketch_workflow_bucket', 'workflow_latency_sketches')
+    op.drop_table('workflow_latency_sketches')
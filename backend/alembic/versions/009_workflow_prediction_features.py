@@ -0,0 +1,43 @@
+"""Add rolling per-workflow SLA prediction features
+
+Revision ID: 009_workflow_prediction_features
+Revises: 008_workflow_latency_sketches
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_workflow_prediction_features'
+down_revision = '008_workflow_latency_sketches'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create workflow_prediction_features table."""
+    op.create_table(
+        'workflow_prediction_features',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('workflow_id', sa.String(255), sa.ForeignKey('workflows.id'), nullable=False),
+        sa.Column('last_event_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('sample_count', sa.Integer, default=0, nullable=False),
+        sa.Column('total_ms', sa.Float, default=0.0, nullable=False),
+        sa.Column('ewma_ms', sa.Float, nullable=True),
+        sa.Column('weight_sum', sa.Float, default=0.0, nullable=False),
+        sa.Column('sum_x', sa.Float, default=0.0, nullable=False),
+        sa.Column('sum_xx', sa.Float, default=0.0, nullable=False),
+        sa.Column('sum_y', sa.Float, default=0.0, nullable=False),
+        sa.Column('sum_yy', sa.Float, default=0.0, nullable=False),
+        sa.Column('sum_xy', sa.Float, default=0.0, nullable=False),
+        sa.Column('daily_counts', sa.JSON(), nullable=False),
+        sa.UniqueConstraint('workflow_id', name='uq_workflow_prediction_features_workflow')
+    )
+
+
+def downgrade() -> None:
+    """Drop workflow_prediction_features table."""
+    op.drop_table('workflow_prediction_features')
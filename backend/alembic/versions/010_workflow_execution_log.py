@@ -0,0 +1,145 @@
+"""Add append-only workflow execution log and backfill it from execution_data
+
+Revision ID: 010_workflow_execution_log
+Revises: 009_workflow_prediction_features
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_workflow_execution_log'
+down_revision = '009_workflow_prediction_features'
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 500
+
+executions = sa.table(
+    'workflow_executions',
+    sa.column('id', sa.Integer()),
+    sa.column('created_at', sa.DateTime()),
+    sa.column('updated_at', sa.DateTime()),
+    sa.column('execution_data', sa.JSON()),
+)
+
+execution_log = sa.table(
+    'workflow_execution_log',
+    sa.column('execution_id', sa.Integer()),
+    sa.column('node_id', sa.String(100)),
+    sa.column('entry_type', sa.String(20)),
+    sa.column('created_at', sa.DateTime()),
+    sa.column('status', sa.String(50)),
+    sa.column('execution_time_ms', sa.Integer()),
+    sa.column('error_details', sa.Text()),
+    sa.column('level', sa.String(20)),
+    sa.column('message', sa.Text()),
+    sa.column('context', sa.JSON()),
+)
+
+
+def upgrade() -> None:
+    """Create workflow_execution_log table and copy existing node statuses and logs into it."""
+    op.create_table(
+        'workflow_execution_log',
+        sa.Column('sequence', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), primary_key=True, autoincrement=True),
+        sa.Column('execution_id', sa.Integer(), sa.ForeignKey('workflow_executions.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('node_id', sa.String(100), nullable=False),
+        sa.Column('entry_type', sa.String(20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(50), nullable=True),
+        sa.Column('execution_time_ms', sa.Integer(), nullable=True),
+        sa.Column('error_details', sa.Text(), nullable=True),
+        sa.Column('level', sa.String(20), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('context', sa.JSON(), nullable=True),
+        sqlite_autoincrement=True
+    )
+    op.create_index('idx_workflow_execution_log_execution_seq', 'workflow_execution_log', ['execution_id', 'sequence'])
+    op.create_index('idx_workflow_execution_log_node_seq', 'workflow_execution_log', ['execution_id', 'node_id', 'sequence'])
+
+    backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    """Drop workflow_execution_log table."""
+    op.drop_index('idx_workflow_execution_log_node_seq', table_name='workflow_execution_log')
+    op.drop_index('idx_workflow_execution_log_execution_seq', table_name='workflow_execution_log')
+    op.drop_table('workflow_execution_log')
+
+
+def _timestamp(value, default):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return default
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def execution_entries(execution_id, execution_data, default_time):
+    """Log rows for one execution's ``node_statuses`` and ``node_logs``, oldest first."""
+    entries = []
+    for node_id, info in (execution_data.get('node_statuses') or {}).items():
+        entries.append({
+            'execution_id': execution_id,
+            'node_id': node_id,
+            'entry_type': 'status',
+            'created_at': _timestamp(info.get('timestamp'), default_time),
+            'status': info.get('status'),
+            'execution_time_ms': info.get('execution_time_ms'),
+            'error_details': info.get('error_details'),
+            'level': None,
+            'message': None,
+            'context': None,
+        })
+    for node_id, logs in (execution_data.get('node_logs') or {}).items():
+        for log in logs:
+            entries.append({
+                'execution_id': execution_id,
+                'node_id': node_id,
+                'entry_type': 'log',
+                'created_at': _timestamp(log.get('timestamp'), default_time),
+                'status': None,
+                'execution_time_ms': None,
+                'error_details': None,
+                'level': log.get('level'),
+                'message': log.get('message'),
+                'context': log.get('context') or {},
+            })
+
+    # A node's final status follows its log lines when timestamps tie
+    entries.sort(key=lambda entry: (entry['created_at'], entry['entry_type'] == 'status'))
+    return entries
+
+
+def backfill(bind) -> int:
+    """Copy node statuses and logs from every execution's JSON; return rows written."""
+    written = 0
+    last_id = None
+    while True:
+        query = (
+            sa.select(executions.c.id, executions.c.created_at, executions.c.updated_at, executions.c.execution_data)
+            .where(executions.c.execution_data.isnot(None))
+            .order_by(executions.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(executions.c.id > last_id)
+        rows = bind.execute(query).fetchall()
+        if not rows:
+            return written
+
+        entries = []
+        for row in rows:
+            if isinstance(row.execution_data, dict):
+                default_time = row.updated_at or row.created_at or datetime.utcnow()
+                entries.extend(execution_entries(row.id, row.execution_data, default_time))
+        if entries:
+            bind.execute(execution_log.insert(), entries)
+            written += len(entries)
+        last_id = rows[-1].id
@@ -0,0 +1,65 @@
+"""Add hourly and daily analytics rollups and their compaction watermarks
+
+Revision ID: 011_analytics_rollups
+Revises: 010_workflow_execution_log
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_analytics_rollups'
+down_revision = '010_workflow_execution_log'
+branch_labels = None
+depends_on = None
+
+ROLLUP_TABLES = (
+    ('workflow_analytics_hourly_rollups', 'hourly'),
+    ('workflow_analytics_daily_rollups', 'daily'),
+)
+
+
+def upgrade() -> None:
+    """
+    Create the rollup tables and watermarks. Existing events are rolled up
+    by the compaction task, which starts from the oldest event.
+    """
+    for table_name, granularity in ROLLUP_TABLES:
+        op.create_table(
+            table_name,
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('workflow_id', sa.String(36), sa.ForeignKey('workflows.id'), nullable=False),
+            sa.Column('event_type', sa.String(50), nullable=False),
+            sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('event_count', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('execution_time_count', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('execution_time_sum', sa.Float, nullable=False, server_default='0'),
+            sa.Column('execution_time_min', sa.Float, nullable=True),
+            sa.Column('execution_time_max', sa.Float, nullable=True),
+            sa.Column('conversion_value_sum', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+            sa.Column('revenue_sum', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+            sa.Column('sketch', sa.JSON(), nullable=True),
+            sa.UniqueConstraint(
+                'workflow_id', 'event_type', 'bucket_start', name=f'uq_workflow_analytics_{granularity}_rollup'
+            )
+        )
+        op.create_index(f'idx_workflow_analytics_{granularity}_rollup_bucket', table_name, ['bucket_start'])
+
+    op.create_table(
+        'analytics_rollup_watermarks',
+        sa.Column('rollup', sa.String(20), primary_key=True),
+        sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Drop the rollup tables and watermarks."""
+    op.drop_table('analytics_rollup_watermarks')
+    for table_name, granularity in reversed(ROLLUP_TABLES):
+        op.drop_index(f'idx_workflow_analytics_{granularity}_rollup_bucket', table_name)
+        op.drop_table(table_name)
@@ -0,0 +1,130 @@
+"""Range-partition workflow_analytics_events by month on PostgreSQL
+
+Revision ID: 012_partition_analytics_events
+Revises: 011_analytics_rollups
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_partition_analytics_events'
+down_revision = '011_analytics_rollups'
+branch_labels = None
+depends_on = None
+
+PARTITION_MONTHS_AHEAD = 3
+
+TABLE = 'workflow_analytics_events'
+LEGACY = 'workflow_analytics_events_legacy'
+
+# Indexes of the original table, recreated on the partitioned parent
+INDEXES = {
+    'ix_workflow_analytics_events_workflow_id': '(workflow_id)',
+    'ix_workflow_analytics_events_execution_id': '(execution_id)',
+    'ix_workflow_analytics_events_user_id': '(user_id)',
+    'ix_workflow_analytics_events_event_type': '(event_type)',
+    'ix_workflow_analytics_events_component_id': '(component_id)',
+    'idx_workflow_analytics_time_type': '(created_at, event_type)',
+    'idx_workflow_analytics_workflow_time': '(workflow_id, created_at)',
+    'idx_workflow_analytics_user_time': '(user_id, created_at)',
+}
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _bound(timestamp):
+    return f"'{timestamp:%Y-%m-%d %H:%M:%S}+00'"
+
+
+def _month_start(timestamp):
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def legacy_upper_bound(max_created_at, now):
+    """
+    Exclusive upper bound of the legacy partition: the month after its
+    newest event, and never before the current month. ATTACH rejects the
+    table if any existing row falls outside this bound.
+    """
+    current_month = _month_start(now)
+    if max_created_at is None:
+        return current_month
+    return max(current_month, _add_months(_month_start(max_created_at), 1))
+
+
+def legacy_max_created_at(bind):
+    created_at = sa.column('created_at', sa.DateTime())
+    return bind.execute(sa.select(sa.func.max(created_at)).select_from(sa.table(LEGACY, created_at))).scalar()
+
+
+def partition_statements(legacy_bound):
+    """DDL that builds the partitioned parent around the renamed legacy table."""
+    # Unique constraints on a partitioned table must include the partition key
+    statements = [
+        f'CREATE TABLE {TABLE} (LIKE {LEGACY} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE (created_at)',
+        f'ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)',
+        f'ALTER TABLE {TABLE} ADD FOREIGN KEY (workflow_id) REFERENCES workflows (id)',
+        f'ALTER TABLE {TABLE} ADD FOREIGN KEY (user_id) REFERENCES users (id)',
+    ]
+    statements += [f'CREATE INDEX {name} ON {TABLE} {columns}' for name, columns in INDEXES.items()]
+    statements.append(
+        f'ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY} '
+        f'FOR VALUES FROM (MINVALUE) TO ({_bound(legacy_bound)})'
+    )
+    for offset in range(PARTITION_MONTHS_AHEAD + 1):
+        month = _add_months(legacy_bound, offset)
+        statements.append(
+            f'CREATE TABLE {TABLE}_y{month.year}m{month.month:02d} PARTITION OF {TABLE} '
+            f'FOR VALUES FROM ({_bound(month)}) TO ({_bound(_add_months(month, 1))})'
+        )
+    return statements
+
+
+def upgrade() -> None:
+    """
+    Move the existing table aside, create a partitioned parent with the same
+    columns, attach the old table as the partition for everything up to the
+    end of its newest event's month and create monthly partitions from there
+    on. Only PostgreSQL supports declarative partitioning; elsewhere this is
+    a no-op and retention deletes rows in batches instead.
+    """
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # The rename takes an exclusive lock, so no event can land after the
+    # bound is read
+    op.execute(f'ALTER TABLE {TABLE} RENAME TO {LEGACY}')
+    op.execute(f'ALTER TABLE {LEGACY} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY}_pkey')
+    for name in INDEXES:
+        op.execute(f'ALTER INDEX IF EXISTS {name} RENAME TO {name}_legacy')
+
+    legacy_bound = legacy_upper_bound(legacy_max_created_at(bind), datetime.utcnow())
+    for statement in partition_statements(legacy_bound):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Copy partitioned rows back into a plain table."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(f'CREATE TABLE {TABLE}_plain (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    op.execute(f'INSERT INTO {TABLE}_plain SELECT * FROM {TABLE}')
+    op.execute(f'DROP TABLE {TABLE} CASCADE')
+    op.execute(f'ALTER TABLE {TABLE}_plain RENAME TO {TABLE}')
+    op.execute(f'ALTER TABLE {TABLE} ADD PRIMARY KEY (id)')
+    op.execute(f'ALTER TABLE {TABLE} ADD FOREIGN KEY (workflow_id) REFERENCES workflows (id)')
+    op.execute(f'ALTER TABLE {TABLE} ADD FOREIGN KEY (user_id) REFERENCES users (id)')
+    for name, columns in INDEXES.items():
+        op.execute(f'CREATE INDEX {name} ON {TABLE} {columns}')
@@ -0,0 +1,28 @@
+"""Store incremental window counters with the aggregated workflow metrics
+
+Revision ID: 013_metrics_window_stats
+Revises: 012_partition_analytics_events
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_metrics_window_stats'
+down_revision = '012_partition_analytics_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add the per event type counters and their watermark. Rows without them
+    are rebuilt from the rollups on their next refresh.
+    """
+    op.add_column('workflow_analytics_metrics', sa.Column('window_stats', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the window counters."""
+    op.drop_column('workflow_analytics_metrics', 'window_stats')
@@ -4,13 +4,9 @@ Comprehensive workflow performance analytics dashboard API.
 """
 
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-import io
-import csv
-import json
 import logging
 
 from app.api.deps import get_db, get_current_active_user
@@ -26,9 +22,12 @@ from app.schemas.analytics import (
 )
 from app.services.workflow_analytics_service import WorkflowAnalyticsService
 from app.services.ab_testing_service import ABTestingService
+from app.services.analytics_export import export_analytics_events
+from app.services.analytics_ingestion import get_ingestion_stats
 from app.services.report_generation_service import ReportGenerationService
 from app.services.anomaly_detection_service import AnomalyDetectionService
 from app.services.external_integration_service import ExternalIntegrationService
+from app.services.streaming_export import accepts_gzip, streaming_export_response
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -41,12 +40,16 @@ async def get_workflows_performance_overview(
     workflow_ids: Optional[List[str]] = Query(None),
     start_date: datetime = Query(..., description="Start date for analytics"),
     end_date: datetime = Query(..., description="End date for analytics"),
+    bucket: str = Query("day", regex="^(hour|day|week)$", description="Trend bucket size"),
+    after_workflow_id: Optional[str] = Query(None, description="Last workflow_id of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Workflows per page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get performance overview for multiple workflows.
-    Provides high-level metrics for dashboard display.
+    Provides high-level metrics for dashboard display. Results are ordered
+    by workflow_id; pass the last one as after_workflow_id for the next page.
     """
     try:
         analytics_service = WorkflowAnalyticsService(db)
@@ -64,7 +67,7 @@ async def get_workflows_performance_overview(
             workflow_ids = await analytics_service.get_user_workflow_ids(current_user.id)
         
         overview = await analytics_service.get_workflow_performance_overview(
-            workflow_ids, filters
+            workflow_ids, filters, bucket=bucket, after_workflow_id=after_workflow_id, limit=limit
         )
         
         return overview
@@ -124,6 +127,7 @@ async def analyze_conversion_funnel(
     workflow_id: str,
     start_date: datetime = Query(...),
     end_date: datetime = Query(...),
+    conversion_window_hours: int = Query(168, ge=1, le=24 * 90, description="Time allowed from the first step to each later step"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -143,7 +147,7 @@ async def analyze_conversion_funnel(
         )
         
         funnel_analysis = await analytics_service.analyze_conversion_funnel(
-            workflow_id, filters
+            workflow_id, filters, timedelta(hours=conversion_window_hours)
         )
         
         return funnel_analysis
@@ -294,36 +298,30 @@ async def stop_ab_test(
 @router.post("/reports/export")
 async def export_analytics_report(
     export_request: ReportExportRequest,
+    request: Request,
     background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Export analytics report in PDF or CSV format.
+    Export analytics report in PDF, CSV or NDJSON format.
+    CSV and NDJSON stream the matching events from a server-side cursor,
+    gzip-encoded when the client accepts it.
     """
     try:
         report_service = ReportGenerationService(db)
         
-        if export_request.format == "csv":
-            # Generate CSV immediately for smaller files
-            csv_data = await report_service.generate_csv_report(
-                export_request, current_user.id
+        if export_request.format in ("csv", "ndjson"):
+            chunks = export_analytics_events(
+                export_request.filters, export_request.format, user_id=current_user.id
             )
+            filename = f"analytics_report_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{export_request.format}"
             
-            output = io.StringIO()
-            writer = csv.writer(output)
-            for row in csv_data:
-                writer.writerow(row)
-            
-            csv_content = output.getvalue()
-            output.close()
-            
-            return StreamingResponse(
-                io.BytesIO(csv_content.encode()),
-                media_type="text/csv",
-                headers={
-                    "Content-Disposition": f"attachment; filename=analytics_report_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-                }
+            return streaming_export_response(
+                chunks,
+                export_request.format,
+                filename,
+                gzip=accepts_gzip(request.headers.get("accept-encoding"))
             )
             
         else:
@@ -475,6 +473,17 @@ async def get_performance_alerts(
         )
 
 
+@router.get("/real-time/ingestion", response_model=AnalyticsResponse)
+async def get_ingestion_status(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get event buffer and metrics refresh counters of this process,
+    including refreshes coalesced by the debouncer versus executed.
+    """
+    return AnalyticsResponse(data=get_ingestion_stats())
+
+
 @router.post("/real-time/alerts/{alert_id}/acknowledge")
 async def acknowledge_alert(
     alert_id: str,
@@ -3,14 +3,10 @@ REST API endpoints for workflow debugging functionality.
 Story 3.1: Visual Workflow Debugging UI Backend Support
 """
 
-import json
-from typing import Any, List, Optional, Dict
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
-from fastapi.responses import StreamingResponse
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-import io
-import csv
 
 from app.api.deps import get_db, get_current_active_user
 from app.models.user import User
@@ -21,6 +17,7 @@ from app.schemas.workflow_debug import (
     ExecutionExportResponse, DebugSessionConfig
 )
 from app.services.workflow_debug_service import WorkflowDebugService, WorkflowExecutionDebugService
+from app.services.streaming_export import accepts_gzip, streaming_export_response
 from app.services.workflow_service import WorkflowService
 
 router = APIRouter()
@@ -238,13 +235,17 @@ async def get_workflow_performance_metrics(
 @router.get("/{workflow_id}/export/logs")
 async def export_execution_logs(
     workflow_id: int,
-    format_type: str = Query("json", regex="^(json|csv)$"),
+    request: Request,
+    format_type: str = Query("json", regex="^(json|ndjson|csv)$"),
     execution_ids: Optional[str] = Query(None, description="Comma-separated execution IDs"),
     timeframe_hours: int = Query(24, ge=1, le=168),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
-    """Export execution logs and performance data."""
+    """
+    Export execution logs and performance data.
+    Streamed from a server-side cursor, gzip-encoded when the client accepts it.
+    """
     
     # Verify workflow access
     workflow_service = WorkflowService(db)
@@ -274,7 +275,7 @@ async def export_execution_logs(
             )
     
     debug_service = WorkflowDebugService(db)
-    export_data = await debug_service.export_execution_logs(
+    chunks = debug_service.export_execution_logs(
         workflow_id, format_type, execution_id_list
     )
     
@@ -282,17 +283,11 @@ async def export_execution_logs(
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     filename = f"workflow_{workflow_id}_logs_{timestamp}.{format_type}"
     
-    if format_type == "json":
-        content = json.dumps(export_data, indent=2)
-        media_type = "application/json"
-    else:  # CSV format
-        content = _convert_to_csv(export_data)
-        media_type = "text/csv"
-    
-    return StreamingResponse(
-        io.StringIO(content),
-        media_type=media_type,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    return streaming_export_response(
+        chunks,
+        format_type,
+        filename,
+        gzip=accepts_gzip(request.headers.get("accept-encoding"))
     )
 
 
@@ -349,50 +344,6 @@ async def retry_failed_execution(
     }
 
 
-def _convert_to_csv(export_data: Dict[str, Any]) -> str:
-    """Convert export data to CSV format."""
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        'Execution ID', 'Status', 'Started At', 'Finished At', 'Duration (ms)',
-        'Node ID', 'Node Name', 'Node Type', 'Node Status', 'Node Duration (ms)',
-        'Error Message', 'Memory Usage (MB)', 'CPU Usage (%)'
-    ])
-    
-    # Write data rows
-    for execution in export_data['executions']:
-        base_row = [
-            execution['execution_id'],
-            execution['status'],
-            execution['started_at'],
-            execution['finished_at'],
-            execution['execution_time']
-        ]
-        
-        if execution['steps']:
-            for step in execution['steps']:
-                row = base_row + [
-                    step['node_id'],
-                    step['node_name'],
-                    step['node_type'],
-                    step['status'],
-                    step['execution_time_ms'],
-                    step['error_message'] or '',
-                    step['performance_metrics']['memory_usage_mb'] or '',
-                    step['performance_metrics']['cpu_usage_percent'] or ''
-                ]
-                writer.writerow(row)
-        else:
-            # Write execution without steps
-            row = base_row + ['', '', '', '', '', '', '', '']
-            writer.writerow(row)
-    
-    return output.getvalue()
-
-
 @router.get("/{workflow_id}/debug/health")
 async def get_debug_health_status(
     workflow_id: int,
@@ -17,6 +17,7 @@ from app.models.workflow import WorkflowExecution, WorkflowExecutionStatus, Work
 from app.models.user import User
 from app.api.deps import get_current_user_from_token
 from app.services.workflow_service import WorkflowService, WorkflowExecutionService
+from app.services.websocket_fanout import WebSocketSender, dumps
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -32,6 +33,8 @@ class WorkflowConnectionManager:
         self.websocket_workflows: Dict[WebSocket, int] = {}
         # Map of websocket -> user_id for authorization
         self.websocket_users: Dict[WebSocket, int] = {}
+        # Map of websocket -> bounded send queue
+        self.senders: Dict[WebSocket, WebSocketSender] = {}
 
     async def connect(self, websocket: WebSocket, workflow_id: int, user_id: int):
         """Connect a WebSocket to a workflow's debugging channel."""
@@ -43,7 +46,8 @@ class WorkflowConnectionManager:
         self.active_connections[workflow_id].add(websocket)
         self.websocket_workflows[websocket] = workflow_id
         self.websocket_users[websocket] = user_id
-        
+        self.senders[websocket] = WebSocketSender(websocket, on_close=lambda: self.disconnect(websocket))
+
         logger.info(f"WebSocket connected to workflow {workflow_id} for user {user_id}")
 
     async def disconnect(self, websocket: WebSocket):
@@ -62,27 +66,30 @@ class WorkflowConnectionManager:
             
         if websocket in self.websocket_users:
             del self.websocket_users[websocket]
+
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.close()
         
         logger.info("WebSocket disconnected from workflow debugging")
 
     async def send_workflow_status(self, workflow_id: int, message: Dict[str, Any]):
-        """Send status update to all connected clients for a workflow."""
+        """
+        Send status update to all connected clients for a workflow.
+
+        The message is serialized once and queued on each client's sender, so
+        a slow client never delays the others; clients whose queue overflows
+        or whose send times out are disconnected.
+        """
         if workflow_id in self.active_connections:
             message["timestamp"] = datetime.utcnow().isoformat()
-            message_str = json.dumps(message)
-            
-            # Send to all connected clients for this workflow
-            disconnected_websockets = []
+            message_str = dumps(message)
+
+            # Queue for all connected clients for this workflow
             for websocket in self.active_connections[workflow_id].copy():
-                try:
-                    await websocket.send_text(message_str)
-                except Exception as e:
-                    logger.error(f"Error sending message to WebSocket: {e}")
-                    disconnected_websockets.append(websocket)
-            
-            # Clean up disconnected websockets
-            for websocket in disconnected_websockets:
-                await self.disconnect(websocket)
+                sender = self.senders.get(websocket)
+                if sender is not None:
+                    sender.send(message_str)
 
     async def send_execution_update(self, workflow_id: int, execution_id: int, 
                                   node_id: str, status: str, 
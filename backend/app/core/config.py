@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from typing import List, Optional
 import secrets
+import tempfile
 import os
 
 
@@ -41,7 +42,32 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 20
     DB_POOL_TIMEOUT: int = 30
-    
+
+    # Site publishing
+    aws_access_key_id: Optional[str] = None
+    aws_secret_access_key: Optional[str] = None
+    aws_region: str = "us-east-1"
+    s3_bucket_name: str = ""
+    cloudfront_distribution_id: Optional[str] = None
+    css_minification: bool = True
+    js_bundling: bool = True
+    image_optimization: bool = True
+    site_build_dir: str = os.path.join(tempfile.gettempdir(), "site-builds")
+    build_cache_dir: str = os.path.join(tempfile.gettempdir(), "site-build-cache")
+
+    # Background tasks (see app.services.tasks)
+    celery_broker_url: str = "redis://localhost:6379/0"
+    celery_result_backend: str = "redis://localhost:6379/0"
+    build_timeout: int = 30 * 60
+
+    # Trained ML model artifacts (see app.services.model_registry)
+    model_registry_dir: str = "ml_models/registry"
+
+    # Analytics event retention (see app.services.analytics_retention)
+    analytics_event_retention_days: int = 395
+    analytics_archive_before_delete: bool = True
+    analytics_archive_dir: str = "archives/analytics_events"
+
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:3000", 
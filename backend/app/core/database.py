@@ -3,9 +3,10 @@ Database configuration and session management for AI Web Builder Platform.
 """
 
 import os
-from typing import AsyncGenerator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy import create_engine
 
 from app.core.config import settings
@@ -35,6 +36,18 @@ def get_db():
     finally:
         db.close()
 
+@contextmanager
+def get_sync_session() -> Iterator[Session]:
+    """Synchronous session for Celery tasks; callers commit explicitly."""
+    session = SessionLocal()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Get asynchronous database session.""" 
     async with AsyncSessionLocal() as session:
@@ -13,6 +13,8 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.core.config import settings
 from app.db.session import init_db, close_db
+from app.services.analytics_ingestion import shutdown_analytics_ingestion
+from app.services.collaboration_manager import connection_manager as collaboration_manager
 from app.api.v1.api import api_router
 
 # Configure logging
@@ -39,6 +41,8 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown
         logger.info("Shutting down AI Marketing Web Builder API...")
+        await shutdown_analytics_ingestion()
+        await collaboration_manager.close()
         await close_db()
         logger.info("Database connections closed")
 
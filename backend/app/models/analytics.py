@@ -4,7 +4,7 @@ Comprehensive workflow analytics, performance tracking, and ROI analysis.
 """
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy import String, Text, Boolean, JSON, Enum, ForeignKey, Integer, Float, DateTime, Index
+from sqlalchemy import String, Text, Boolean, JSON, Enum, ForeignKey, Integer, Float, Numeric, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 import enum
@@ -26,6 +26,7 @@ class AnalyticsEventType(str, enum.Enum):
     CONTACT_CREATED = "contact_created"
     CONVERSION = "conversion"
     REVENUE_GENERATED = "revenue_generated"
+    SLA_VIOLATION = "sla_violation"
 
 
 class MetricAggregationType(str, enum.Enum):
@@ -60,8 +61,8 @@ class WorkflowAnalyticsEvent(Base, UUIDMixin, TimestampMixin):
     resource_usage: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
     
     # Business metrics
-    conversion_value: Mapped[Optional[Decimal]] = mapped_column(Float(precision=10, scale=2))
-    revenue_impact: Mapped[Optional[Decimal]] = mapped_column(Float(precision=10, scale=2))
+    conversion_value: Mapped[Optional[Decimal]] = mapped_column(Numeric(precision=10, scale=2))
+    revenue_impact: Mapped[Optional[Decimal]] = mapped_column(Numeric(precision=10, scale=2))
     
     # Context
     component_id: Mapped[Optional[str]] = mapped_column(String(255), index=True)
@@ -84,7 +85,7 @@ class WorkflowPerformanceMetrics(Base, UUIDMixin, TimestampMixin):
     Aggregated performance metrics for workflows.
     Updated periodically for dashboard performance.
     """
-    __tablename__ = "workflow_performance_metrics"
+    __tablename__ = "workflow_analytics_metrics"
 
     # Identifiers
     workflow_id: Mapped[str] = mapped_column(ForeignKey("workflows.id"), index=True, unique=True)
@@ -108,23 +109,138 @@ class WorkflowPerformanceMetrics(Base, UUIDMixin, TimestampMixin):
     # Business metrics
     total_conversions: Mapped[int] = mapped_column(Integer, default=0)
     conversion_rate: Mapped[float] = mapped_column(Float, default=0.0)
-    total_revenue: Mapped[Decimal] = mapped_column(Float(precision=12, scale=2), default=0.0)
-    avg_revenue_per_execution: Mapped[Decimal] = mapped_column(Float(precision=10, scale=2), default=0.0)
+    total_revenue: Mapped[Decimal] = mapped_column(Numeric(precision=12, scale=2), default=0.0)
+    avg_revenue_per_execution: Mapped[Decimal] = mapped_column(Numeric(precision=10, scale=2), default=0.0)
     
     # Cost analysis
-    total_execution_cost: Mapped[Decimal] = mapped_column(Float(precision=10, scale=4), default=0.0)
-    cost_per_execution: Mapped[Decimal] = mapped_column(Float(precision=8, scale=4), default=0.0)
+    total_execution_cost: Mapped[Decimal] = mapped_column(Numeric(precision=10, scale=4), default=0.0)
+    cost_per_execution: Mapped[Decimal] = mapped_column(Numeric(precision=8, scale=4), default=0.0)
     roi_percentage: Mapped[float] = mapped_column(Float, default=0.0)
     
     # Engagement metrics
     unique_users_engaged: Mapped[int] = mapped_column(Integer, default=0)
     total_interactions: Mapped[int] = mapped_column(Integer, default=0)
     engagement_score: Mapped[float] = mapped_column(Float, default=0.0)
-    
+
+    # Per event type counters over the window ending at the refresh watermark
+    # (see app.services.workflow_metrics_refresh)
+    window_stats: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON(none_as_null=True))
+
     # Relationship
     workflow = relationship("Workflow", back_populates="performance_metrics")
 
 
+class WorkflowLatencySketch(Base, UUIDMixin, TimestampMixin):
+    """
+    Mergeable execution-time quantile sketch per workflow per hour.
+    Updated on event ingestion and merged across buckets at query time.
+    """
+    __tablename__ = "workflow_latency_sketches"
+
+    workflow_id: Mapped[str] = mapped_column(ForeignKey("workflows.id"), index=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    # Exact summary statistics for the bucket
+    sample_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_ms: Mapped[float] = mapped_column(Float, default=0.0)
+    min_ms: Mapped[Optional[float]] = mapped_column(Float)
+    max_ms: Mapped[Optional[float]] = mapped_column(Float)
+
+    # Serialized DDSketch (see app.services.quantile_sketch)
+    sketch: Mapped[Dict[str, Any]] = mapped_column(JSON)
+
+    __table_args__ = (
+        UniqueConstraint('workflow_id', 'bucket_start', name='uq_workflow_latency_sketch_bucket'),
+        Index('idx_workflow_latency_sketch_workflow_bucket', 'workflow_id', 'bucket_start'),
+    )
+
+
+class WorkflowPredictionFeatures(Base, UUIDMixin, TimestampMixin):
+    """
+    Rolling per-workflow aggregates for SLA violation prediction.
+    Updated on event ingestion so predictions read one row per workflow.
+    """
+    __tablename__ = "workflow_prediction_features"
+
+    workflow_id: Mapped[str] = mapped_column(ForeignKey("workflows.id"), unique=True)
+    last_event_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    # Lifetime execution-time counters
+    sample_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_ms: Mapped[float] = mapped_column(Float, default=0.0)
+
+    # Exponentially weighted sums over sample index (newest sample at x = 0)
+    # for the windowed mean, deviation and least-squares trend
+    ewma_ms: Mapped[Optional[float]] = mapped_column(Float)
+    weight_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    sum_x: Mapped[float] = mapped_column(Float, default=0.0)
+    sum_xx: Mapped[float] = mapped_column(Float, default=0.0)
+    sum_y: Mapped[float] = mapped_column(Float, default=0.0)
+    sum_yy: Mapped[float] = mapped_column(Float, default=0.0)
+    sum_xy: Mapped[float] = mapped_column(Float, default=0.0)
+
+    # Event and SLA violation counts per day, pruned to the rolling window
+    daily_counts: Mapped[Dict[str, Any]] = mapped_column(JSON)
+
+
+class AnalyticsRollupMixin:
+    """Aggregates of one workflow's events of one type over a time bucket."""
+
+    workflow_id: Mapped[str] = mapped_column(ForeignKey("workflows.id"))
+    event_type: Mapped[AnalyticsEventType] = mapped_column(Enum(AnalyticsEventType))
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    event_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Exact execution-time statistics over events that reported one
+    execution_time_count: Mapped[int] = mapped_column(Integer, default=0)
+    execution_time_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    execution_time_min: Mapped[Optional[float]] = mapped_column(Float)
+    execution_time_max: Mapped[Optional[float]] = mapped_column(Float)
+
+    conversion_value_sum: Mapped[Decimal] = mapped_column(Numeric(precision=14, scale=2), default=0)
+    revenue_sum: Mapped[Decimal] = mapped_column(Numeric(precision=14, scale=2), default=0)
+
+    # Serialized DDSketch of execution times (see app.services.quantile_sketch)
+    sketch: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON(none_as_null=True))
+
+
+class WorkflowAnalyticsHourlyRollup(Base, UUIDMixin, TimestampMixin, AnalyticsRollupMixin):
+    """
+    Hourly aggregates of raw analytics events.
+    Written by the rollup compaction job for hours below its watermark.
+    """
+    __tablename__ = "workflow_analytics_hourly_rollups"
+
+    __table_args__ = (
+        UniqueConstraint('workflow_id', 'event_type', 'bucket_start', name='uq_workflow_analytics_hourly_rollup'),
+        Index('idx_workflow_analytics_hourly_rollup_bucket', 'bucket_start'),
+    )
+
+
+class WorkflowAnalyticsDailyRollup(Base, UUIDMixin, TimestampMixin, AnalyticsRollupMixin):
+    """
+    Daily aggregates compacted from complete days of hourly rollups.
+    """
+    __tablename__ = "workflow_analytics_daily_rollups"
+
+    __table_args__ = (
+        UniqueConstraint('workflow_id', 'event_type', 'bucket_start', name='uq_workflow_analytics_daily_rollup'),
+        Index('idx_workflow_analytics_daily_rollup_bucket', 'bucket_start'),
+    )
+
+
+class AnalyticsRollupWatermark(Base, TimestampMixin):
+    """
+    Compaction progress per rollup granularity: every bucket starting
+    before ``watermark`` has been compacted.
+    """
+    __tablename__ = "analytics_rollup_watermarks"
+
+    rollup: Mapped[str] = mapped_column(String(20), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
 class WorkflowABTest(Base, UUIDMixin, TimestampMixin):
     """
     A/B testing configuration and results for workflow variations.
@@ -177,15 +293,15 @@ class WorkflowCostAnalysis(Base, UUIDMixin, TimestampMixin):
     execution_id: Mapped[Optional[str]] = mapped_column(String(255), index=True)
     
     # Resource costs
-    compute_cost: Mapped[Decimal] = mapped_column(Float(precision=8, scale=4), default=0.0)
-    storage_cost: Mapped[Decimal] = mapped_column(Float(precision=8, scale=4), default=0.0)
-    network_cost: Mapped[Decimal] = mapped_column(Float(precision=8, scale=4), default=0.0)
-    email_cost: Mapped[Decimal] = mapped_column(Float(precision=8, scale=4), default=0.0)
-    external_api_cost: Mapped[Decimal] = mapped_column(Float(precision=8, scale=4), default=0.0)
+    compute_cost: Mapped[Decimal] = mapped_column(Numeric(precision=8, scale=4), default=0.0)
+    storage_cost: Mapped[Decimal] = mapped_column(Numeric(precision=8, scale=4), default=0.0)
+    network_cost: Mapped[Decimal] = mapped_column(Numeric(precision=8, scale=4), default=0.0)
+    email_cost: Mapped[Decimal] = mapped_column(Numeric(precision=8, scale=4), default=0.0)
+    external_api_cost: Mapped[Decimal] = mapped_column(Numeric(precision=8, scale=4), default=0.0)
     
     # Time savings
     manual_time_saved_minutes: Mapped[Optional[int]] = mapped_column(Integer)
-    automation_value: Mapped[Optional[Decimal]] = mapped_column(Float(precision=10, scale=2))
+    automation_value: Mapped[Optional[Decimal]] = mapped_column(Numeric(precision=10, scale=2))
     
     # Resource usage details
     cpu_seconds: Mapped[Optional[float]] = mapped_column(Float)
@@ -3,7 +3,7 @@ Workflow models for n8n-style automation engine.
 """
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy import String, Text, Boolean, JSON, Enum, ForeignKey, Integer
+from sqlalchemy import String, Text, Boolean, JSON, Enum, ForeignKey, Integer, BigInteger, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 from datetime import datetime
@@ -347,6 +347,44 @@ class WorkflowExecutionStep(Base, TimestampMixin, UUIDMixin):
         return f"<WorkflowExecutionStep(id={self.id}, node_id='{self.node_id}', status='{self.status}')>"
 
 
+class WorkflowExecutionLog(Base):
+    """
+    Append-only node status changes and log lines for an execution.
+    Rows are never updated; ``sequence`` increases with insertion order and
+    is the keyset for paging through an execution's entries.
+    """
+
+    __tablename__ = "workflow_execution_log"
+    __table_args__ = (
+        Index('idx_workflow_execution_log_execution_seq', 'execution_id', 'sequence'),
+        Index('idx_workflow_execution_log_node_seq', 'execution_id', 'node_id', 'sequence'),
+        {'sqlite_autoincrement': True},
+    )
+
+    sequence: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    execution_id: Mapped[int] = mapped_column(
+        ForeignKey("workflow_executions.id", ondelete="CASCADE"), nullable=False
+    )
+    node_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    entry_type: Mapped[str] = mapped_column(String(20), nullable=False)  # status, log
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Status entries
+    status: Mapped[Optional[str]] = mapped_column(String(50))
+    execution_time_ms: Mapped[Optional[int]] = mapped_column(Integer)
+    error_details: Mapped[Optional[str]] = mapped_column(Text)
+
+    # Log entries
+    level: Mapped[Optional[str]] = mapped_column(String(20))
+    message: Mapped[Optional[str]] = mapped_column(Text)
+    context: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
+
+    def __repr__(self) -> str:
+        return f"<WorkflowExecutionLog(sequence={self.sequence}, node_id='{self.node_id}', entry_type='{self.entry_type}')>"
+
+
 class WorkflowDebugSession(Base, TimestampMixin, UUIDMixin):
     """Debug session for tracking workflow debugging activities."""
     
@@ -180,7 +180,7 @@ class ReportTemplate(str, Enum):
 class ReportExportRequest(BaseModel):
     """Request to export analytics report."""
     report_type: ReportTemplate
-    format: str = Field(regex="^(pdf|csv|excel)$")
+    format: str = Field(regex="^(pdf|csv|ndjson|excel)$")
     filters: AnalyticsFilter
     include_charts: bool = True
     custom_branding: Optional[Dict[str, str]] = None
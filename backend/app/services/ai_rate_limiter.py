@@ -0,0 +1,192 @@
+"""
+Rate limiting for upstream AI provider calls.
+GCRA (generic cell rate algorithm) token buckets with O(1) acquire, keyed per
+provider and per model, with an optional Redis backend that keeps the bucket
+state atomic across worker processes.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (max_calls, time_window_seconds); max_calls is also the burst size
+PROVIDER_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    'gemini': (60, 60),
+    'openai': (60, 60),
+    'anthropic': (50, 60)
+}
+MODEL_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    'gemini-1.5-flash': (60, 60),
+    'gpt-4-turbo': (30, 60),
+    'claude-3.5-sonnet': (30, 60)
+}
+DEFAULT_RATE_LIMIT = (60, 60)
+
+REDIS_KEY_PREFIX = "ai-rate:"
+
+# Absorbs float rounding when comparing accumulated arrival times
+CLOCK_EPSILON = 1e-9
+
+# Reserves the next slot and returns how long the caller must wait, in
+# microseconds. The theoretical arrival time (TAT) is the only state per key.
+GCRA_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local delay = tat - tolerance - now
+if delay < 0 then
+    delay = 0
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], string.format('%.0f', new_tat), 'PX', math.ceil((new_tat - now) / 1000) + 1)
+return delay
+"""
+
+
+class RedisRateLimitBackend:
+    """Shared GCRA state in Redis, updated atomically by a Lua script."""
+
+    def __init__(self, client: Any, prefix: str = REDIS_KEY_PREFIX):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(GCRA_RESERVE_SCRIPT)
+
+    async def reserve(self, key: str, interval: float, tolerance: float) -> float:
+        """Reserve a slot for ``key`` and return the wait in seconds."""
+        delay_us = await self._script(
+            keys=[self.prefix + key],
+            args=[int(interval * 1_000_000), int(tolerance * 1_000_000)]
+        )
+        return int(delay_us) / 1_000_000
+
+
+class RateLimiter:
+    """
+    GCRA token bucket allowing ``max_calls`` per ``time_window`` seconds.
+
+    Up to ``burst`` calls (default ``max_calls``) pass immediately; after that
+    calls are spaced one emission interval apart. ``acquire`` reserves the next
+    slot before sleeping, so waiting callers are served in FIFO order without
+    a separate queue.
+    """
+
+    def __init__(
+        self,
+        max_calls: int = 60,
+        time_window: int = 60,
+        burst: Optional[int] = None,
+        key: Optional[str] = None,
+        backend: Optional[RedisRateLimitBackend] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if max_calls <= 0 or time_window <= 0:
+            raise ValueError("max_calls and time_window must be positive")
+        self.max_calls = max_calls
+        self.time_window = time_window
+        self.burst = burst or max_calls
+        self.key = key
+        self.backend = backend
+        self.clock = clock
+        self.interval = time_window / max_calls
+        self.tolerance = (self.burst - 1) * self.interval
+        self._tat = 0.0
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+
+    def reserve(self) -> float:
+        """Reserve the next slot locally and return the wait in seconds."""
+        now = self.clock()
+        tat = self._tat if self._tat > now else now
+        self._tat = tat + self.interval
+        delay = tat - self.tolerance - now
+        return delay if delay > CLOCK_EPSILON else 0.0
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is available now (local state only)."""
+        now = self.clock()
+        tat = self._tat if self._tat > now else now
+        if tat - self.tolerance - now > CLOCK_EPSILON:
+            return False
+        self._tat = tat + self.interval
+        self.acquired += 1
+        return True
+
+    async def _reserve(self) -> float:
+        if self.backend is not None and self.key is not None:
+            try:
+                return await self.backend.reserve(self.key, self.interval, self.tolerance)
+            except Exception as e:
+                logger.warning(f"Shared rate limiter unavailable for {self.key}, using local bucket: {e}")
+        return self.reserve()
+
+    async def acquire(self):
+        """Acquire permission to make an API call, waiting for a slot if needed."""
+        delay = await self._reserve()
+        self.acquired += 1
+        if delay > 0:
+            self.delayed += 1
+            self.total_wait += delay
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_calls": self.max_calls,
+            "time_window": self.time_window,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "total_wait_seconds": self.total_wait
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_backend: Optional[RedisRateLimitBackend] = None
+_backend_checked = False
+
+
+def _get_backend() -> Optional[RedisRateLimitBackend]:
+    """Shared backend from ``AI_RATE_LIMIT_REDIS_URL``, if configured."""
+    global _backend, _backend_checked
+    if not _backend_checked:
+        _backend_checked = True
+        redis_url = os.getenv("AI_RATE_LIMIT_REDIS_URL")
+        if redis_url:
+            try:
+                import redis.asyncio as redis_asyncio
+                _backend = RedisRateLimitBackend(redis_asyncio.from_url(redis_url))
+            except ImportError:
+                logger.warning("AI_RATE_LIMIT_REDIS_URL is set but redis is not installed; using local buckets")
+    return _backend
+
+
+def get_rate_limiter(key: str, max_calls: int, time_window: int) -> RateLimiter:
+    """Return the process-wide limiter for ``key``, creating it on first use."""
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = RateLimiter(max_calls, time_window, key=key, backend=_get_backend())
+        _limiters[key] = limiter
+    return limiter
+
+
+async def acquire_model_slot(provider: str, model: str) -> None:
+    """Wait for both the provider-wide and the model-specific bucket."""
+    await get_rate_limiter(
+        f"provider:{provider}", *PROVIDER_RATE_LIMITS.get(provider, DEFAULT_RATE_LIMIT)
+    ).acquire()
+    await get_rate_limiter(
+        f"model:{model}", *MODEL_RATE_LIMITS.get(model, DEFAULT_RATE_LIMIT)
+    ).acquire()
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {key: limiter.get_stats() for key, limiter in _limiters.items()}
@@ -0,0 +1,233 @@
+"""
+Process-wide response cache for AI features.
+Bounded LRU with per-entry TTL, single-flight de-duplication of concurrent
+identical requests and an optional Redis-compatible shared backend.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 2048
+REDIS_KEY_PREFIX = "ai-cache:"
+
+
+class RedisCacheBackend:
+    """
+    Shared cache tier backed by a ``redis.asyncio`` compatible client.
+
+    Values are stored as JSON with a server-side expiry, so every worker
+    process sees responses computed by the others.
+    """
+
+    def __init__(self, client: Any, prefix: str = REDIS_KEY_PREFIX):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            return False, None
+        return True, json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        await self.client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl_seconds * 1000)))
+
+    async def clear(self, namespace: Optional[str] = None) -> None:
+        pattern = f"{self.prefix}{namespace + ':' if namespace else ''}*"
+        keys = [key async for key in self.client.scan_iter(match=pattern)]
+        if keys:
+            await self.client.delete(*keys)
+
+
+class AIResponseCache:
+    """
+    LRU + TTL cache for AI responses.
+
+    Keys are namespaced (``"<feature>:<hash>"``). Expired entries are dropped
+    lazily on access and the least recently used entry is evicted once
+    ``max_entries`` is reached. ``get_or_compute`` makes concurrent callers for
+    the same key share a single upstream call.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        backend: Optional[RedisCacheBackend] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.backend = backend
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.backend_hits = 0
+        self.backend_errors = 0
+
+    def get_local(self, key: str) -> Tuple[bool, Any]:
+        """Look up ``key`` in the in-process tier only; does not touch counters."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set_local(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._entries[key] = (self.clock() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        """Return ``(found, value)`` from the local tier, then the shared backend."""
+        found, value = self.get_local(key)
+        if not found and self.backend is not None:
+            try:
+                found, value = await self.backend.get(key)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.warning(f"AI cache backend read failed for {key}: {e}")
+                found = False
+            if found:
+                self.backend_hits += 1
+                # Keep a short local copy; the backend owns the real expiry
+                self.set_local(key, value, 60)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found, value
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self.set_local(key, value, ttl_seconds)
+        if self.backend is not None:
+            try:
+                await self.backend.set(key, value, ttl_seconds)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.warning(f"AI cache backend write failed for {key}: {e}")
+
+    async def get_or_compute(self, key: str, ttl_seconds: float, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for ``key`` or compute and cache it.
+
+        While a computation for ``key`` is running, further callers await the
+        same result instead of starting their own. Failures are not cached and
+        are propagated to every waiting caller.
+        """
+        found, value = await self.get(key)
+        if found:
+            return value
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+            await self.set(key, value, ttl_seconds)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def values(self, namespace: str) -> List[Any]:
+        """Unexpired local values in ``namespace``, most recently used first."""
+        now = self.clock()
+        prefix = f"{namespace}:"
+        return [
+            value for key, (expires_at, value) in reversed(self._entries.items())
+            if key.startswith(prefix) and expires_at > now
+        ]
+
+    def size(self, namespace: Optional[str] = None) -> int:
+        if namespace is None:
+            return len(self._entries)
+        prefix = f"{namespace}:"
+        return sum(1 for key in self._entries if key.startswith(prefix))
+
+    async def clear(self, namespace: Optional[str] = None) -> None:
+        if namespace is None:
+            self._entries.clear()
+        else:
+            prefix = f"{namespace}:"
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+        if self.backend is not None:
+            try:
+                await self.backend.clear(namespace)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.warning(f"AI cache backend clear failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced_requests": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "backend": "redis" if self.backend is not None else None,
+            "backend_hits": self.backend_hits,
+            "backend_errors": self.backend_errors
+        }
+
+
+_cache: Optional[AIResponseCache] = None
+
+
+def get_ai_response_cache() -> AIResponseCache:
+    """
+    Return the process-wide AI response cache.
+
+    ``AI_CACHE_REDIS_URL`` enables the shared Redis tier; ``AI_CACHE_MAX_ENTRIES``
+    bounds the in-process tier.
+    """
+    global _cache
+    if _cache is None:
+        backend = None
+        redis_url = os.getenv("AI_CACHE_REDIS_URL")
+        if redis_url:
+            try:
+                import redis.asyncio as redis_asyncio
+                backend = RedisCacheBackend(redis_asyncio.from_url(redis_url))
+            except ImportError:
+                logger.warning("AI_CACHE_REDIS_URL is set but redis is not installed; using local cache only")
+        _cache = AIResponseCache(
+            max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            backend=backend
+        )
+    return _cache
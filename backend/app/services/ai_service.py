@@ -8,40 +8,15 @@ import logging
 import json
 import asyncio
 from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
 import aiohttp
 import os
 from functools import wraps
-from asyncio import Semaphore
 import hashlib
 
-logger = logging.getLogger(__name__)
-
+from app.services.ai_response_cache import get_ai_response_cache
+from app.services.ai_rate_limiter import RateLimiter, acquire_model_slot, get_rate_limiter_stats
 
-class RateLimiter:
-    """Rate limiter for API calls."""
-    
-    def __init__(self, max_calls: int = 60, time_window: int = 60):
-        self.max_calls = max_calls
-        self.time_window = time_window
-        self.calls = []
-        self.semaphore = Semaphore(max_calls)
-    
-    async def acquire(self):
-        """Acquire permission to make an API call."""
-        await self.semaphore.acquire()
-        
-        now = datetime.utcnow()
-        # Remove old calls outside the time window
-        self.calls = [call for call in self.calls if now - call < timedelta(seconds=self.time_window)]
-        
-        if len(self.calls) >= self.max_calls:
-            sleep_time = self.time_window - (now - self.calls[0]).total_seconds()
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
-        
-        self.calls.append(now)
-        self.semaphore.release()
+logger = logging.getLogger(__name__)
 
 
 def rate_limit(max_calls: int = 60, time_window: int = 60):
@@ -130,10 +105,8 @@ class AIService:
         self.request_count = 0
         self.total_latency = 0
         
-        # Epic 4: AI feature caches
-        self.component_suggestion_cache = {}
-        self.template_generation_cache = {}
-        self.workflow_creation_cache = {}
+        # Epic 4: AI feature caches, shared by every AIService in the process
+        self.response_cache = get_ai_response_cache()
         
     async def __aenter__(self):
         """Async context manager entry."""
@@ -145,13 +118,14 @@ class AIService:
         if self.session:
             await self.session.close()
     
-    @rate_limit(max_calls=60, time_window=60)
     async def generate_response(self, prompt: str, max_tokens: int = 2000) -> str:
         """Generate text response using Gemini API."""
         if not self.api_key:
             logger.error("Google API key not found")
             raise ValueError("Google API key not configured")
         
+        await acquire_model_slot('gemini', 'gemini-1.5-flash')
+        
         if not self.session:
             self.session = aiohttp.ClientSession()
         
@@ -339,8 +313,6 @@ class AIService:
         """Generate intelligent component suggestions based on context."""
         
         cache_key = self._generate_cache_key('component_suggestions', context)
-        if cache_key in self.component_suggestion_cache:
-            return self.component_suggestion_cache[cache_key]
         
         prompt = f"""
         Analyze the current website building context and suggest 5 highly relevant components:
@@ -366,18 +338,16 @@ class AIService:
         Return as JSON array of component suggestions.
         """
         
-        try:
+        async def generate() -> List[Dict[str, Any]]:
             # Add timeout to prevent hanging requests
             optimal_model = await self.model_router.select_model('component_suggestions', context)
             
             async with asyncio.timeout(10):  # 10-second timeout
-                suggestions = await self.generate_json_response_with_model(prompt, optimal_model)
-            
+                return await self.generate_json_response_with_model(prompt, optimal_model)
+        
+        try:
             # Cache for 1 hour
-            self.component_suggestion_cache[cache_key] = suggestions
-            asyncio.create_task(self._expire_cache_key('component_suggestions', cache_key, 3600))
-            
-            return suggestions
+            return await self.response_cache.get_or_compute(cache_key, 3600, generate)
             
         except asyncio.TimeoutError:
             logger.warning(f"Component suggestions timed out for context: {context.get('business_type', 'unknown')}")
@@ -397,9 +367,6 @@ class AIService:
             'context': business_context
         })
         
-        if cache_key in self.template_generation_cache:
-            return self.template_generation_cache[cache_key]
-        
         prompt = f"""
         Generate a complete website template based on this description:
         
@@ -456,18 +423,16 @@ class AIService:
         Return as structured JSON.
         """
         
-        try:
+        async def generate() -> Dict[str, Any]:
             # Add timeout to prevent hanging requests
             optimal_model = await self.model_router.select_model('template_generation')
             
             async with asyncio.timeout(15):  # 15-second timeout for complex template generation
-                template = await self.generate_json_response_with_model(prompt, optimal_model, max_tokens=6000)
-            
+                return await self.generate_json_response_with_model(prompt, optimal_model, max_tokens=6000)
+        
+        try:
             # Cache for 2 hours
-            self.template_generation_cache[cache_key] = template
-            asyncio.create_task(self._expire_cache_key('template_generation', cache_key, 7200))
-            
-            return template
+            return await self.response_cache.get_or_compute(cache_key, 7200, generate)
             
         except asyncio.TimeoutError:
             logger.warning(f"Template generation timed out for description: {description[:50]}...")
@@ -487,9 +452,6 @@ class AIService:
             'context': context
         })
         
-        if cache_key in self.workflow_creation_cache:
-            return self.workflow_creation_cache[cache_key]
-        
         prompt = f"""
         Create a complete workflow configuration from this natural language request:
         
@@ -545,18 +507,16 @@ class AIService:
         Return as structured JSON.
         """
         
-        try:
+        async def generate() -> Dict[str, Any]:
             # Add timeout to prevent hanging requests
             optimal_model = await self.model_router.select_model('workflow_creation')
             
             async with asyncio.timeout(12):  # 12-second timeout for workflow creation
-                workflow = await self.generate_json_response_with_model(prompt, optimal_model, max_tokens=4000)
-            
+                return await self.generate_json_response_with_model(prompt, optimal_model, max_tokens=4000)
+        
+        try:
             # Cache for 30 minutes
-            self.workflow_creation_cache[cache_key] = workflow
-            asyncio.create_task(self._expire_cache_key('workflow_creation', cache_key, 1800))
-            
-            return workflow
+            return await self.response_cache.get_or_compute(cache_key, 1800, generate)
             
         except asyncio.TimeoutError:
             logger.warning(f"Workflow creation timed out for input: {user_input[:50]}...")
@@ -677,6 +637,8 @@ class AIService:
             "response_format": {"type": "json_object"}
         }
         
+        await acquire_model_slot('openai', 'gpt-4-turbo')
+        
         try:
             async with self.session.post(model_config['base_url'], json=payload, headers=headers) as response:
                 if response.status == 200:
@@ -728,6 +690,8 @@ class AIService:
             ]
         }
         
+        await acquire_model_slot('anthropic', 'claude-3.5-sonnet')
+        
         try:
             async with self.session.post(model_config['base_url'], json=payload, headers=headers) as response:
                 if response.status == 200:
@@ -763,20 +727,6 @@ class AIService:
         hash_key = hashlib.md5(f"{feature}:{data_str}".encode()).hexdigest()
         return f"{feature}:{hash_key}"
     
-    async def _expire_cache_key(self, cache_type: str, cache_key: str, delay: int):
-        """Expire cache key after delay."""
-        await asyncio.sleep(delay)
-        
-        cache_map = {
-            'component_suggestions': self.component_suggestion_cache,
-            'template_generation': self.template_generation_cache,
-            'workflow_creation': self.workflow_creation_cache
-        }
-        
-        cache = cache_map.get(cache_type)
-        if cache and cache_key in cache:
-            del cache[cache_key]
-    
     # Performance tracking methods
     
     def get_performance_metrics(self) -> Dict[str, Any]:
@@ -787,10 +737,12 @@ class AIService:
             "total_requests": self.request_count,
             "average_latency_ms": avg_latency,
             "cache_stats": {
-                "component_suggestions_cached": len(self.component_suggestion_cache),
-                "template_generation_cached": len(self.template_generation_cache),
-                "workflow_creation_cached": len(self.workflow_creation_cache)
+                "component_suggestions_cached": self.response_cache.size('component_suggestions'),
+                "template_generation_cached": self.response_cache.size('template_generation'),
+                "workflow_creation_cached": self.response_cache.size('workflow_creation'),
+                **self.response_cache.get_stats()
             },
+            "rate_limits": get_rate_limiter_stats(),
             "model_availability": {
                 "gemini": bool(self.api_key),
                 "openai": bool(self.openai_api_key),
@@ -800,9 +752,7 @@ class AIService:
     
     async def clear_caches(self):
         """Clear all AI response caches."""
-        self.component_suggestion_cache.clear()
-        self.template_generation_cache.clear()
-        self.workflow_creation_cache.clear()
+        await self.response_cache.clear()
         
         logger.info("All AI service caches cleared")
     
@@ -812,10 +762,9 @@ class AIService:
         """Fallback method for component suggestions when timeout occurs."""
         
         # Try to find similar cached suggestions first
-        for cached_key, cached_suggestions in self.component_suggestion_cache.items():
-            if 'component_suggestions' in cached_key:
-                logger.info("Using cached component suggestions as fallback")
-                return cached_suggestions
+        for cached_suggestions in self.response_cache.values('component_suggestions'):
+            logger.info("Using cached component suggestions as fallback")
+            return cached_suggestions
         
         # Generate basic fallback suggestions based on context
         business_type = context.get('business_type', 'general')
@@ -881,10 +830,9 @@ class AIService:
         """Fallback method for template generation when timeout occurs."""
         
         # Try to find similar cached templates first
-        for cached_key, cached_template in self.template_generation_cache.items():
-            if 'template_generation' in cached_key:
-                logger.info("Using cached template as fallback")
-                return cached_template
+        for cached_template in self.response_cache.values('template_generation'):
+            logger.info("Using cached template as fallback")
+            return cached_template
         
         # Generate basic fallback template
         industry = business_context.get('industry_classification', {}).get('primary', 'general')
@@ -947,10 +895,9 @@ class AIService:
         """Fallback method for workflow creation when timeout occurs."""
         
         # Try to find similar cached workflows first
-        for cached_key, cached_workflow in self.workflow_creation_cache.items():
-            if 'workflow_creation' in cached_key:
-                logger.info("Using cached workflow as fallback")
-                return cached_workflow
+        for cached_workflow in self.response_cache.values('workflow_creation'):
+            logger.info("Using cached workflow as fallback")
+            return cached_workflow
         
         # Generate basic fallback workflow based on input keywords
         workflow_type = "general"
@@ -0,0 +1,349 @@
+"""
+Buffered ingestion for workflow analytics events.
+Events are queued in-process and written with one multi-row INSERT per batch,
+alongside incremental updates to the hourly latency sketches and the
+rolling prediction features; metrics refreshes for the affected workflows
+are debounced. A batch that keeps failing is split until the offending rows
+are isolated and dead-lettered, so one bad row cannot stall ingestion.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.analytics import WorkflowAnalyticsEvent
+from app.services.latency_sketches import merge_bucket_sketches
+from app.services.prediction_features import merge_prediction_features
+from app.services.workflow_metrics_refresh import refresh_workflow_metrics
+
+logger = logging.getLogger(__name__)
+
+# Flush policy
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 0.25
+MAX_PENDING_EVENTS = 50_000
+
+# Failed flushes of the same batch before it is split to isolate bad rows
+MAX_FLUSH_ATTEMPTS = 3
+
+# Errors that say nothing about the rows themselves (database unreachable,
+# connection dropped); batches hitting them stay queued and are retried whole
+TRANSIENT_FLUSH_ERRORS = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+
+# Backoff between retries of a failed background flush; capped well inside the
+# rollup and metrics lateness horizons so requeued rows still land in time
+MAX_FLUSH_RETRY_SECONDS = 30.0
+
+# Debounce window for per-workflow metrics refreshes
+METRICS_REFRESH_INTERVAL_SECONDS = 5.0
+
+RefreshCallback = Callable[[str], Awaitable[None]]
+DeadLetterCallback = Callable[[Dict[str, Any], Exception], None]
+
+
+class MetricsRefreshDebouncer:
+    """
+    Coalesces metrics refresh requests per workflow.
+
+    Workflows are marked dirty as their events land; a single scheduler task
+    refreshes each dirty workflow at most once per interval. Every event is
+    counted as one refresh request, and each request beyond the first for a
+    dirty workflow is counted as coalesced, so ``requested - coalesced``
+    equals the refreshes that get scheduled.
+    """
+
+    def __init__(self, refresh: RefreshCallback, interval_seconds: float = METRICS_REFRESH_INTERVAL_SECONDS):
+        self.refresh = refresh
+        self.interval_seconds = interval_seconds
+        self.dirty: Set[str] = set()
+        self.requested = 0
+        self.coalesced = 0
+        self.executed = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def mark_dirty(self, workflow_id: str, events: int = 1) -> None:
+        """Request a refresh of ``workflow_id`` on behalf of ``events`` events."""
+        self.requested += events
+        self.coalesced += events if workflow_id in self.dirty else events - 1
+        self.dirty.add(workflow_id)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self.dirty:
+            await asyncio.sleep(self.interval_seconds)
+            await self.refresh_dirty()
+
+    async def refresh_dirty(self) -> None:
+        """Refresh every workflow currently marked dirty."""
+        workflow_ids, self.dirty = self.dirty, set()
+        for workflow_id in workflow_ids:
+            self.executed += 1
+            try:
+                await self.refresh(workflow_id)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Metrics refresh failed for workflow {workflow_id}: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Refresh counters since startup."""
+        return {
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "executed": self.executed,
+            "failed": self.failed,
+            "pending": len(self.dirty),
+        }
+
+    async def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+class AnalyticsEventBuffer:
+    """
+    In-process ring buffer of analytics event rows.
+
+    Rows are flushed when ``batch_size`` are pending or ``flush_interval`` has
+    elapsed since the first pending row, whichever comes first. When the
+    buffer reaches ``max_pending`` the producer awaits a flush (backpressure)
+    rather than growing without bound; that is the only case in which ``add``
+    raises a flush error.
+
+    A failed batch goes back to the front of the queue and flushing is retried
+    in the background with exponential backoff. Once the same batch
+    has failed ``max_attempts`` times for a reason other than a transient
+    connection error, it is written in halves; rows that still fail on their
+    own are logged and handed to ``on_dead_letter`` instead of re-queued.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: int = FLUSH_BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        max_pending: int = MAX_PENDING_EVENTS,
+        on_flush: Optional[Callable[[Dict[str, int]], None]] = None,
+        max_attempts: int = MAX_FLUSH_ATTEMPTS,
+        on_dead_letter: Optional[DeadLetterCallback] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.on_flush = on_flush
+        self.max_attempts = max_attempts
+        self.on_dead_letter = on_dead_letter
+        self.pending: Deque[Dict[str, Any]] = deque()
+        self.flushed_events = 0
+        self.flush_count = 0
+        self.dead_lettered = 0
+        self.failed_flushes = 0
+        # Consecutive failed flushes of the batch at the head of the queue
+        self._head_failures = 0
+        # Current background retry delay; 0 while flushes succeed
+        self._retry_delay = 0.0
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    async def add(self, row: Dict[str, Any]) -> None:
+        """Queue one event row."""
+        row.setdefault("id", uuid.uuid4())
+        now = datetime.utcnow()
+        row.setdefault("created_at", now)
+        row.setdefault("updated_at", now)
+
+        if len(self.pending) >= self.max_pending:
+            try:
+                await self.flush()
+            except Exception:
+                if len(self.pending) >= self.max_pending:
+                    raise
+
+        self.pending.append(row)
+
+        # While flushes are failing the backoff timer owns retries
+        if len(self.pending) >= self.batch_size and not self._retry_delay:
+            await self._flush_in_background()
+        else:
+            self._schedule_flush(self.flush_interval)
+
+    def _schedule_flush(self, delay: float) -> None:
+        timer = self._timer
+        if timer is not None and not timer.done() and timer is not asyncio.current_task():
+            return
+        self._timer = asyncio.create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._flush_in_background()
+
+    async def _flush_in_background(self) -> None:
+        """Flush on behalf of the buffer: failures are logged and retried with backoff, never raised."""
+        try:
+            await self.flush()
+        except Exception:
+            self.failed_flushes += 1
+            self._retry_delay = min(MAX_FLUSH_RETRY_SECONDS, max(self.flush_interval, self._retry_delay * 2))
+            logger.warning(f"Retrying analytics flush in {self._retry_delay:.2f}s; {len(self.pending)} events pending")
+            self._schedule_flush(self._retry_delay)
+            return
+        if self.pending:
+            self._schedule_flush(self.flush_interval)
+
+    async def flush(self) -> int:
+        """Write all pending rows in batches of ``batch_size``; return rows written."""
+        written = 0
+        async with self._flush_lock:
+            while self.pending:
+                batch: List[Dict[str, Any]] = [
+                    self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))
+                ]
+                try:
+                    await self._write(batch)
+                except (Exception, asyncio.CancelledError) as e:
+                    logger.error(f"Failed to flush {len(batch)} analytics events: {e!r}")
+                    if isinstance(e, (asyncio.CancelledError, *TRANSIENT_FLUSH_ERRORS)):
+                        self.pending.extendleft(reversed(batch))
+                        raise
+                    self._head_failures += 1
+                    if self._head_failures < self.max_attempts:
+                        self.pending.extendleft(reversed(batch))
+                        raise
+                    self._head_failures = 0
+                    written += await self._write_isolating(batch)
+                    continue
+
+                self._head_failures = 0
+                written += len(batch)
+            self._retry_delay = 0.0
+        return written
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        async with self.session_factory() as session:
+            await session.execute(insert(WorkflowAnalyticsEvent.__table__), batch)
+            await merge_bucket_sketches(session, batch)
+            await merge_prediction_features(session, batch)
+            await session.commit()
+
+        self.flushed_events += len(batch)
+        self.flush_count += 1
+        if self.on_flush:
+            self.on_flush(Counter(row["workflow_id"] for row in batch))
+
+    async def _write_isolating(self, batch: List[Dict[str, Any]]) -> int:
+        """
+        Write ``batch`` by repeated halving so good rows land and only rows
+        that fail on their own are dead-lettered; returns rows written.
+        """
+        written = 0
+        parts = [batch]
+        while parts:
+            part = parts.pop()
+            try:
+                await self._write(part)
+            except (Exception, asyncio.CancelledError) as e:
+                if isinstance(e, (asyncio.CancelledError, *TRANSIENT_FLUSH_ERRORS)):
+                    # Not the rows' fault: requeue everything not yet written
+                    remaining = part + [row for rest in reversed(parts) for row in rest]
+                    self.pending.extendleft(reversed(remaining))
+                    raise
+                if len(part) == 1:
+                    self._dead_letter(part[0], e)
+                else:
+                    middle = len(part) // 2
+                    parts += [part[middle:], part[:middle]]
+                continue
+            written += len(part)
+        return written
+
+    def _dead_letter(self, row: Dict[str, Any], error: Exception) -> None:
+        self.dead_lettered += 1
+        logger.error(f"Dropping analytics event {row.get('id')} after repeated flush failures: {error!r}; row: {row!r}")
+        if self.on_dead_letter:
+            self.on_dead_letter(row, error)
+
+    async def close(self) -> None:
+        """Flush pending events; called on application shutdown."""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+        self._timer = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "flushed_events": self.flushed_events,
+            "flush_count": self.flush_count,
+            "dead_lettered": self.dead_lettered,
+            "failed_flushes": self.failed_flushes,
+            "pending": len(self.pending),
+        }
+
+
+_event_buffer: Optional[AnalyticsEventBuffer] = None
+_metrics_debouncer: Optional[MetricsRefreshDebouncer] = None
+
+
+async def _refresh_workflow_metrics(workflow_id: str) -> None:
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        await refresh_workflow_metrics(session, workflow_id)
+        await session.commit()
+
+
+def get_metrics_debouncer() -> MetricsRefreshDebouncer:
+    """Return the process-wide metrics refresh debouncer."""
+    global _metrics_debouncer
+    if _metrics_debouncer is None:
+        _metrics_debouncer = MetricsRefreshDebouncer(_refresh_workflow_metrics)
+    return _metrics_debouncer
+
+
+def _mark_workflows_dirty(event_counts: Dict[str, int]) -> None:
+    debouncer = get_metrics_debouncer()
+    for workflow_id, events in event_counts.items():
+        debouncer.mark_dirty(workflow_id, events)
+
+
+def get_analytics_event_buffer() -> AnalyticsEventBuffer:
+    """Return the process-wide analytics event buffer."""
+    global _event_buffer
+    if _event_buffer is None:
+        from app.db.session import AsyncSessionLocal
+
+        _event_buffer = AnalyticsEventBuffer(AsyncSessionLocal, on_flush=_mark_workflows_dirty)
+    return _event_buffer
+
+
+def get_ingestion_stats() -> Dict[str, Dict[str, int]]:
+    """Counters of the event buffer and the metrics refresh debouncer."""
+    return {
+        "events": get_analytics_event_buffer().get_stats(),
+        "metrics_refresh": get_metrics_debouncer().get_stats(),
+    }
+
+
+async def shutdown_analytics_ingestion() -> None:
+    """Flush buffered events and stop the refresh scheduler."""
+    if _event_buffer is not None:
+        await _event_buffer.close()
+    if _metrics_debouncer is not None:
+        await _metrics_debouncer.close()
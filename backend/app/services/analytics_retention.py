@@ -0,0 +1,354 @@
+"""
+Partitioning and retention for workflow analytics events.
+On PostgreSQL ``workflow_analytics_events`` is range-partitioned by month on
+``created_at``; a periodic task creates partitions ahead of time, and
+retention archives whole expired partitions before detaching and dropping
+them. Other databases (SQLite) fall back to archiving and deleting expired
+rows month by month in bounded batches. Archives are zstd-compressed Parquet
+files when pyarrow is installed, gzip NDJSON otherwise.
+"""
+
+import enum
+import gzip
+import logging
+import os
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column, DateTime, Float, Integer, MetaData, Numeric, Table, and_, delete, func, select, text
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.analytics import WorkflowAnalyticsEvent
+from app.services.streaming_export import dumps, stream_rows
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = WorkflowAnalyticsEvent.__tablename__
+PARTITION_MONTHS_AHEAD = 3
+RETENTION_DELETE_BATCH = 5000
+ARCHIVE_CHUNK_ROWS = 10_000  # Rows per Parquet row group
+
+_events = WorkflowAnalyticsEvent.__table__
+
+LIST_PARTITIONS_SQL = f"""
+SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bound
+FROM pg_inherits
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE parent.relname = '{PARENT_TABLE}'
+ORDER BY child.relname
+"""
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+# === Months ===
+
+def month_start(timestamp: datetime) -> datetime:
+    """First instant of the timestamp's month (naive UTC)."""
+    return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def retention_cutoff(now: datetime, retention_days: int) -> datetime:
+    """Events before this month boundary are expired; whole months expire together."""
+    return month_start(now - timedelta(days=retention_days))
+
+
+# === PostgreSQL partition DDL ===
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def _bound(timestamp: datetime) -> str:
+    return f"'{timestamp:%Y-%m-%d %H:%M:%S}+00'"
+
+
+def create_partition_ddl(month: datetime) -> str:
+    """``CREATE TABLE`` for the partition holding ``month``'s events."""
+    month = month_start(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(add_months(month, 1))})"
+    )
+
+
+def detach_partition_ddl(name: str) -> str:
+    return f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"
+
+
+def drop_partition_ddl(name: str) -> str:
+    return f"DROP TABLE IF EXISTS {name}"
+
+
+def partition_ddl_ahead(
+    now: datetime, months_ahead: int = PARTITION_MONTHS_AHEAD, covered_until: Optional[datetime] = None
+) -> List[str]:
+    """
+    DDL for the current month's partition and the next ``months_ahead``,
+    skipping months before ``covered_until`` (the highest existing upper
+    bound), which would overlap an existing partition.
+    """
+    current = month_start(now)
+    months = (add_months(current, offset) for offset in range(months_ahead + 1))
+    return [
+        create_partition_ddl(month) for month in months
+        if covered_until is None or month >= covered_until
+    ]
+
+
+def partition_upper_bound(bound: str) -> Optional[datetime]:
+    """Exclusive upper bound of a range partition from ``pg_get_expr(relpartbound)``, as naive UTC."""
+    match = _UPPER_BOUND.search(bound or "")
+    if match is None:
+        return None
+    upper = datetime.fromisoformat(match.group(1))
+    if upper.tzinfo is not None:
+        upper = upper.astimezone(timezone.utc).replace(tzinfo=None)
+    return upper
+
+
+async def _is_partitioned(session: AsyncSession) -> bool:
+    if session.bind.dialect.name != "postgresql":
+        return False
+    result = await session.execute(text(
+        "SELECT 1 FROM pg_partitioned_table JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid "
+        "WHERE pg_class.relname = :name"
+    ), {"name": PARENT_TABLE})
+    return result.scalar() is not None
+
+
+async def list_partitions(session: AsyncSession) -> List[Tuple[str, Optional[datetime]]]:
+    """``(name, exclusive upper bound)`` of each partition."""
+    result = await session.execute(text(LIST_PARTITIONS_SQL))
+    return [(row.name, partition_upper_bound(row.bound)) for row in result.all()]
+
+
+async def ensure_partitions(
+    session: AsyncSession, now: Optional[datetime] = None, months_ahead: int = PARTITION_MONTHS_AHEAD
+) -> List[str]:
+    """
+    Create missing monthly partitions up to ``months_ahead`` months out;
+    returns the DDL executed. A no-op unless the table is partitioned.
+    """
+    if not await _is_partitioned(session):
+        return []
+    # The migrated legacy partition can extend past the current month
+    covered_until = max((upper for _, upper in await list_partitions(session) if upper is not None), default=None)
+    statements = partition_ddl_ahead(now or datetime.utcnow(), months_ahead, covered_until)
+    for statement in statements:
+        await session.execute(text(statement))
+    await session.commit()
+    return statements
+
+
+# === Archives ===
+
+def _archive_value(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    return value
+
+
+def _parquet_schema() -> Any:
+    """Arrow schema for event rows, from the table's column types."""
+    fields = []
+    for column in _events.columns:
+        column_type = column.type
+        if isinstance(column_type, Integer):
+            arrow_type = pyarrow.int64()
+        elif isinstance(column_type, Float):
+            arrow_type = pyarrow.float64()
+        elif isinstance(column_type, Numeric):
+            arrow_type = pyarrow.decimal128(column_type.precision, column_type.scale)
+        elif isinstance(column_type, DateTime):
+            arrow_type = pyarrow.timestamp("us", tz="UTC")
+        else:
+            arrow_type = pyarrow.string()
+        fields.append(pyarrow.field(column.name, arrow_type))
+    return pyarrow.schema(fields)
+
+
+class EventArchiveWriter:
+    """
+    Writes event rows to one archive file in chunks. The file is written
+    under a temporary name and renamed into place on ``close``.
+    """
+
+    def __init__(self, path_without_suffix: str):
+        self.parquet = pyarrow is not None
+        self.path = path_without_suffix + (".parquet" if self.parquet else ".ndjson.gz")
+        self.rows_written = 0
+        self._temp_path = self.path + ".tmp"
+        self._pending: List[Dict[str, Any]] = []
+        self._writer: Any = None
+        self._file: Any = None
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._pending.append({key: _archive_value(value) for key, value in row.items()})
+        if len(self._pending) >= ARCHIVE_CHUNK_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        if self.parquet:
+            if self._writer is None:
+                self._writer = pyarrow.parquet.ParquetWriter(self._temp_path, _parquet_schema(), compression="zstd")
+            self._writer.write_table(pyarrow.Table.from_pylist(self._pending, schema=self._writer.schema))
+        else:
+            if self._file is None:
+                self._file = gzip.open(self._temp_path, "wb")
+            self._file.write(b"".join(dumps(row) + b"\n" for row in self._pending))
+        self.rows_written += len(self._pending)
+        self._pending = []
+
+    def close(self) -> Optional[str]:
+        """Finish the file; returns its path, or None if no rows were written."""
+        self._flush()
+        handle = self._writer if self.parquet else self._file
+        if handle is None:
+            return None
+        handle.close()
+        os.replace(self._temp_path, self.path)
+        return self.path
+
+
+async def archive_rows(rows: AsyncIterator[Dict[str, Any]], path_without_suffix: str) -> Tuple[Optional[str], int]:
+    """Write ``rows`` to a new archive; returns its path and row count."""
+    writer = EventArchiveWriter(path_without_suffix)
+    async for row in rows:
+        writer.write(dict(row))
+    return writer.close(), writer.rows_written
+
+
+def _archive_base(archive_dir: str, name: str) -> str:
+    # Timestamped so a rerun after a partial purge never overwrites an earlier archive
+    return os.path.join(archive_dir, f"{name}_{datetime.utcnow():%Y%m%dT%H%M%S%f}")
+
+
+# === Retention ===
+
+async def _expire_partitions(
+    session: AsyncSession,
+    session_factory: async_sessionmaker,
+    cutoff: datetime,
+    archive_dir: Optional[str]
+) -> Dict[str, Any]:
+    dropped, archives = [], []
+    for name, upper in await list_partitions(session):
+        if upper is None or upper > cutoff:
+            continue
+        if archive_dir is not None:
+            partition = Table(name, MetaData(), *(Column(column.name, column.type) for column in _events.columns))
+            path, count = await archive_rows(
+                stream_rows(select(partition), session_factory), _archive_base(archive_dir, name)
+            )
+            if path is not None:
+                archives.append(path)
+                logger.info(f"Archived {count} analytics events from {name} to {path}")
+        await session.execute(text(detach_partition_ddl(name)))
+        await session.execute(text(drop_partition_ddl(name)))
+        await session.commit()
+        dropped.append(name)
+    return {"partitions_dropped": dropped, "archives": archives}
+
+
+async def _expire_rows(
+    session: AsyncSession,
+    session_factory: async_sessionmaker,
+    cutoff: datetime,
+    archive_dir: Optional[str],
+    batch_size: int
+) -> Dict[str, Any]:
+    oldest = (await session.execute(
+        select(func.min(_events.c.created_at)).where(_events.c.created_at < cutoff)
+    )).scalar()
+    deleted = batches = 0
+    archives = []
+    month = month_start(oldest) if oldest is not None else cutoff
+    while month < cutoff:
+        month_end = min(add_months(month, 1), cutoff)
+        in_month = and_(_events.c.created_at >= month, _events.c.created_at < month_end)
+
+        if archive_dir is not None:
+            rows = stream_rows(select(_events).where(in_month).order_by(_events.c.created_at), session_factory)
+            path, count = await archive_rows(rows, _archive_base(archive_dir, partition_name(month)))
+            if path is not None:
+                archives.append(path)
+                logger.info(f"Archived {count} analytics events from {month:%Y-%m} to {path}")
+
+        # Bounded deletes keep each transaction and its lock footprint small
+        while True:
+            batch = select(_events.c.id).where(in_month).limit(batch_size)
+            result = await session.execute(delete(_events).where(_events.c.id.in_(batch)))
+            await session.commit()
+            if not result.rowcount:
+                break
+            deleted += result.rowcount
+            batches += 1
+        month = month_end
+    return {"rows_deleted": deleted, "delete_batches": batches, "archives": archives}
+
+
+async def apply_retention(
+    session_factory: Optional[async_sessionmaker] = None,
+    now: Optional[datetime] = None,
+    retention_days: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    archive: Optional[bool] = None,
+    batch_size: int = RETENTION_DELETE_BATCH
+) -> Dict[str, Any]:
+    """
+    Remove events older than the retention period, archiving them first
+    unless ``archive`` is False. Whole partitions are dropped on a
+    partitioned PostgreSQL table; elsewhere rows are deleted in batches.
+    """
+    if session_factory is None:
+        from app.db.session import AsyncSessionLocal
+        session_factory = AsyncSessionLocal
+    retention_days = retention_days if retention_days is not None else settings.analytics_event_retention_days
+    archive = archive if archive is not None else settings.analytics_archive_before_delete
+    archive_dir = (archive_dir or settings.analytics_archive_dir) if archive else None
+
+    cutoff = retention_cutoff(now or datetime.utcnow(), retention_days)
+    async with session_factory() as session:
+        if await _is_partitioned(session):
+            summary = await _expire_partitions(session, session_factory, cutoff, archive_dir)
+        else:
+            summary = await _expire_rows(session, session_factory, cutoff, archive_dir, batch_size)
+    summary["cutoff"] = cutoff.isoformat()
+    logger.info(f"Analytics event retention before {summary['cutoff']}: {summary}")
+    return summary
+
+
+async def maintain_partitions(
+    session_factory: Optional[async_sessionmaker] = None, now: Optional[datetime] = None
+) -> List[str]:
+    """Entry point of the periodic partition task."""
+    if session_factory is None:
+        from app.db.session import AsyncSessionLocal
+        session_factory = AsyncSessionLocal
+    async with session_factory() as session:
+        return await ensure_partitions(session, now)
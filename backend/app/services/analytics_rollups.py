@@ -0,0 +1,442 @@
+"""
+Hourly and daily rollups of workflow analytics events.
+A periodic compaction job aggregates complete hours of raw events into
+``workflow_analytics_hourly_rollups`` and complete days of those into
+``workflow_analytics_daily_rollups``, advancing a watermark per granularity.
+Each bucket is replaced wholesale in the same transaction that advances the
+watermark, so compaction is idempotent and safe to rerun. Reads go through
+``aggregate_event_stats``, which takes complete days and hours from the
+rollups and only the open edges of the range from raw events.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.analytics import (
+    AnalyticsEventType, AnalyticsRollupWatermark, WorkflowAnalyticsDailyRollup,
+    WorkflowAnalyticsEvent, WorkflowAnalyticsHourlyRollup
+)
+from app.services.latency_sketches import hour_bucket, naive_utc
+from app.services.quantile_sketch import DDSketch
+
+logger = logging.getLogger(__name__)
+
+HOURLY = "hourly"
+DAILY = "daily"
+RAW = "raw"
+
+# Hours are compacted only once this long has passed since they closed, so
+# events still in the ingestion buffer land before their bucket is rolled up
+ROLLUP_LATENESS = timedelta(minutes=5)
+MAX_BUCKETS_PER_RUN = 48
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+CENTS = Decimal("0.01")
+
+_events = WorkflowAnalyticsEvent.__table__
+_hourly = WorkflowAnalyticsHourlyRollup.__table__
+_daily = WorkflowAnalyticsDailyRollup.__table__
+_watermarks = AnalyticsRollupWatermark.__table__
+
+_ROLLUP_TABLES = {HOURLY: _hourly, DAILY: _daily}
+
+
+def day_bucket(timestamp: datetime) -> datetime:
+    """Truncate a timestamp to the start of its day."""
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil(timestamp: datetime, floor: Any, step: timedelta) -> datetime:
+    start = floor(timestamp)
+    return start if start == timestamp else start + step
+
+
+def _cents(value: Any) -> Decimal:
+    return Decimal(str(value or 0)).quantize(CENTS)
+
+
+@dataclass
+class EventStats:
+    """Aggregates over the events of one type; sums are exact, ``sketch`` approximates percentiles."""
+
+    event_count: int = 0
+    execution_time_count: int = 0
+    execution_time_sum: float = 0.0
+    execution_time_min: Optional[float] = None
+    execution_time_max: Optional[float] = None
+    conversion_value_sum: Decimal = Decimal("0.00")
+    revenue_sum: Decimal = Decimal("0.00")
+    sketch: DDSketch = field(default_factory=DDSketch)
+
+    @property
+    def avg_execution_time_ms(self) -> float:
+        if not self.execution_time_count:
+            return 0.0
+        return self.execution_time_sum / self.execution_time_count
+
+    def add_row(self, row: Any) -> None:
+        """Fold in one aggregate row (raw or rollup query, same labels)."""
+        self.event_count += row.event_count or 0
+        self.execution_time_count += row.execution_time_count or 0
+        self.execution_time_sum += float(row.execution_time_sum or 0.0)
+        for name, pick in (("execution_time_min", min), ("execution_time_max", max)):
+            value = getattr(row, name)
+            if value is not None:
+                current = getattr(self, name)
+                setattr(self, name, float(value) if current is None else pick(current, float(value)))
+        self.conversion_value_sum += _cents(row.conversion_value_sum)
+        self.revenue_sum += _cents(row.revenue_sum)
+
+
+@dataclass
+class RollupSegment:
+    """A half-open time range and the table it is read from."""
+
+    source: str
+    start: datetime
+    end: datetime
+
+
+def plan_segments(
+    start_date: datetime,
+    end_date: datetime,
+    hourly_watermark: Optional[datetime],
+    daily_watermark: Optional[datetime]
+) -> List[RollupSegment]:
+    """
+    Split ``[start_date, end_date)`` into daily, hourly and raw segments.
+
+    Whole days below the daily watermark come from daily rollups, whole
+    hours below the hourly watermark from hourly rollups, and the partial
+    hours at either edge plus anything past the watermark from raw events.
+    """
+    if end_date <= start_date:
+        return []
+
+    rolled_end = min(end_date, hourly_watermark) if hourly_watermark is not None else start_date
+    rolled_end = hour_bucket(rolled_end) if rolled_end > start_date else start_date
+    rolled_start = _ceil(start_date, hour_bucket, HOUR)
+    if rolled_start >= rolled_end:
+        return [RollupSegment(RAW, start_date, end_date)]
+
+    segments = [RollupSegment(RAW, start_date, rolled_start)]
+    day_start = _ceil(rolled_start, day_bucket, DAY)
+    day_end = day_bucket(min(rolled_end, daily_watermark)) if daily_watermark is not None else day_start
+    if day_start < day_end:
+        segments += [
+            RollupSegment(HOURLY, rolled_start, day_start),
+            RollupSegment(DAILY, day_start, day_end),
+            RollupSegment(HOURLY, day_end, rolled_end),
+        ]
+    else:
+        segments.append(RollupSegment(HOURLY, rolled_start, rolled_end))
+    segments.append(RollupSegment(RAW, rolled_end, end_date))
+    return [segment for segment in segments if segment.start < segment.end]
+
+
+def _raw_aggregates(start: datetime, end: datetime, conditions: Sequence[Any] = ()) -> Any:
+    return select(
+        _events.c.workflow_id,
+        _events.c.event_type,
+        func.count(_events.c.id).label("event_count"),
+        func.count(_events.c.execution_time_ms).label("execution_time_count"),
+        func.sum(_events.c.execution_time_ms).label("execution_time_sum"),
+        func.min(_events.c.execution_time_ms).label("execution_time_min"),
+        func.max(_events.c.execution_time_ms).label("execution_time_max"),
+        func.sum(_events.c.conversion_value).label("conversion_value_sum"),
+        func.sum(_events.c.revenue_impact).label("revenue_sum"),
+    ).where(and_(
+        _events.c.created_at >= start,
+        _events.c.created_at < end,
+        *conditions
+    )).group_by(_events.c.workflow_id, _events.c.event_type)
+
+
+def _rollup_aggregates(table: Any, start: datetime, end: datetime, conditions: Sequence[Any] = ()) -> Any:
+    return select(
+        table.c.workflow_id,
+        table.c.event_type,
+        func.sum(table.c.event_count).label("event_count"),
+        func.sum(table.c.execution_time_count).label("execution_time_count"),
+        func.sum(table.c.execution_time_sum).label("execution_time_sum"),
+        func.min(table.c.execution_time_min).label("execution_time_min"),
+        func.max(table.c.execution_time_max).label("execution_time_max"),
+        func.sum(table.c.conversion_value_sum).label("conversion_value_sum"),
+        func.sum(table.c.revenue_sum).label("revenue_sum"),
+    ).where(and_(
+        table.c.bucket_start >= start,
+        table.c.bucket_start < end,
+        *conditions
+    )).group_by(table.c.workflow_id, table.c.event_type)
+
+
+def _raw_sketches(start: datetime, end: datetime, conditions: Sequence[Any] = ()) -> Any:
+    return select(
+        _events.c.workflow_id, _events.c.event_type, _events.c.execution_time_ms
+    ).where(and_(
+        _events.c.created_at >= start,
+        _events.c.created_at < end,
+        _events.c.execution_time_ms.isnot(None),
+        *conditions
+    ))
+
+
+def _rollup_sketches(table: Any, start: datetime, end: datetime, conditions: Sequence[Any] = ()) -> Any:
+    return select(table.c.workflow_id, table.c.event_type, table.c.sketch).where(and_(
+        table.c.bucket_start >= start,
+        table.c.bucket_start < end,
+        table.c.sketch.isnot(None),
+        *conditions
+    ))
+
+
+def _group_samples(rows: Iterable[Any]) -> Dict[Tuple[str, AnalyticsEventType], DDSketch]:
+    samples: Dict[Tuple[str, AnalyticsEventType], List[float]] = defaultdict(list)
+    for row in rows:
+        samples[(str(row.workflow_id), row.event_type)].append(row.execution_time_ms)
+
+    sketches = {}
+    for key, values in samples.items():
+        sketch = DDSketch()
+        sketch.add_many(values)
+        sketches[key] = sketch
+    return sketches
+
+
+# === Watermarks ===
+
+async def get_watermarks(session: AsyncSession) -> Dict[str, datetime]:
+    """Current watermark per rollup granularity, as naive UTC like event times."""
+    result = await session.execute(select(_watermarks.c.rollup, _watermarks.c.watermark))
+    return {row.rollup: naive_utc(row.watermark) for row in result.all()}
+
+
+async def _lock_watermark(session: AsyncSession, rollup: str) -> Optional[datetime]:
+    result = await session.execute(
+        select(_watermarks.c.watermark).where(_watermarks.c.rollup == rollup).with_for_update()
+    )
+    watermark = result.scalar_one_or_none()
+    return naive_utc(watermark) if watermark is not None else None
+
+
+async def _set_watermark(session: AsyncSession, rollup: str, watermark: datetime, exists: bool) -> None:
+    now = datetime.utcnow()
+    if exists:
+        await session.execute(
+            update(_watermarks).where(_watermarks.c.rollup == rollup).values(watermark=watermark, updated_at=now)
+        )
+    else:
+        await session.execute(
+            insert(_watermarks).values(rollup=rollup, watermark=watermark, created_at=now, updated_at=now)
+        )
+
+
+async def rewind_rollup_watermarks(session: AsyncSession, since: datetime) -> None:
+    """
+    Discard rollups from ``since`` on and move the watermarks back, so the
+    next compaction recomputes them (e.g. after backfilling events).
+    """
+    watermarks = await get_watermarks(session)
+    for rollup, floor in ((HOURLY, hour_bucket), (DAILY, day_bucket)):
+        watermark = watermarks.get(rollup)
+        if watermark is None or watermark <= floor(since):
+            continue
+        table = _ROLLUP_TABLES[rollup]
+        await session.execute(delete(table).where(table.c.bucket_start >= floor(since)))
+        await _set_watermark(session, rollup, floor(since), exists=True)
+    await session.commit()
+
+
+# === Compaction ===
+
+def _rollup_rows(
+    bucket_start: datetime,
+    aggregate_rows: Iterable[Any],
+    sketches: Dict[Tuple[str, AnalyticsEventType], DDSketch]
+) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    rows = []
+    for row in aggregate_rows:
+        sketch = sketches.get((str(row.workflow_id), row.event_type))
+        rows.append({
+            "workflow_id": row.workflow_id,
+            "event_type": row.event_type,
+            "bucket_start": bucket_start,
+            "event_count": row.event_count,
+            "execution_time_count": row.execution_time_count or 0,
+            "execution_time_sum": float(row.execution_time_sum or 0.0),
+            "execution_time_min": row.execution_time_min,
+            "execution_time_max": row.execution_time_max,
+            "conversion_value_sum": _cents(row.conversion_value_sum),
+            "revenue_sum": _cents(row.revenue_sum),
+            "sketch": sketch.to_dict() if sketch is not None else None,
+            "created_at": now,
+            "updated_at": now,
+        })
+    return rows
+
+
+async def _replace_hour(session: AsyncSession, bucket_start: datetime) -> None:
+    end = bucket_start + HOUR
+    aggregates = (await session.execute(_raw_aggregates(bucket_start, end))).all()
+    sketches = _group_samples((await session.execute(_raw_sketches(bucket_start, end))).all())
+
+    await session.execute(delete(_hourly).where(_hourly.c.bucket_start == bucket_start))
+    rows = _rollup_rows(bucket_start, aggregates, sketches)
+    if rows:
+        await session.execute(insert(_hourly), rows)
+
+
+async def _replace_day(session: AsyncSession, bucket_start: datetime) -> None:
+    end = bucket_start + DAY
+    aggregates = (await session.execute(_rollup_aggregates(_hourly, bucket_start, end))).all()
+    sketches: Dict[Tuple[str, AnalyticsEventType], DDSketch] = {}
+    for row in (await session.execute(_rollup_sketches(_hourly, bucket_start, end))).all():
+        sketches.setdefault((str(row.workflow_id), row.event_type), DDSketch()).merge(DDSketch.from_dict(row.sketch))
+
+    await session.execute(delete(_daily).where(_daily.c.bucket_start == bucket_start))
+    rows = _rollup_rows(bucket_start, aggregates, sketches)
+    if rows:
+        await session.execute(insert(_daily), rows)
+
+
+async def _compact(
+    session: AsyncSession,
+    rollup: str,
+    horizon: datetime,
+    source_time: Any,
+    floor: Any,
+    step: timedelta,
+    replace: Any,
+    max_buckets: int
+) -> int:
+    """
+    Replace buckets of ``rollup`` from its watermark up to ``horizon``,
+    skipping buckets with no source rows, one transaction per bucket.
+    """
+    compacted = 0
+    while compacted < max_buckets:
+        watermark = await _lock_watermark(session, rollup)
+        exists = watermark is not None
+        conditions = [source_time < horizon]
+        if exists:
+            conditions.append(source_time >= watermark)
+        next_time = (await session.execute(select(func.min(source_time)).where(and_(*conditions)))).scalar()
+
+        if next_time is None:
+            if exists and watermark < horizon:
+                await _set_watermark(session, rollup, horizon, exists)
+            await session.commit()
+            break
+
+        bucket_start = floor(naive_utc(next_time))
+        await replace(session, bucket_start)
+        await _set_watermark(session, rollup, bucket_start + step, exists)
+        await session.commit()
+        compacted += 1
+    return compacted
+
+
+async def compact_hourly_rollups(
+    session: AsyncSession, now: Optional[datetime] = None, max_buckets: int = MAX_BUCKETS_PER_RUN
+) -> int:
+    """Roll up complete hours of raw events; returns the number of hours compacted."""
+    horizon = hour_bucket((now or datetime.utcnow()) - ROLLUP_LATENESS)
+    return await _compact(
+        session, HOURLY, horizon, _events.c.created_at, hour_bucket, HOUR, _replace_hour, max_buckets
+    )
+
+
+async def compact_daily_rollups(session: AsyncSession, max_buckets: int = MAX_BUCKETS_PER_RUN) -> int:
+    """Roll up days whose hours are all compacted; returns the number of days compacted."""
+    hourly_watermark = (await get_watermarks(session)).get(HOURLY)
+    if hourly_watermark is None:
+        return 0
+    return await _compact(
+        session, DAILY, day_bucket(hourly_watermark), _hourly.c.bucket_start, day_bucket, DAY, _replace_day,
+        max_buckets
+    )
+
+
+async def compact_rollups(
+    session_factory: Optional[async_sessionmaker] = None, now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """Run hourly then daily compaction; entry point of the periodic task."""
+    if session_factory is None:
+        from app.db.session import AsyncSessionLocal
+        session_factory = AsyncSessionLocal
+
+    async with session_factory() as session:
+        hours = await compact_hourly_rollups(session, now)
+        days = await compact_daily_rollups(session)
+    logger.info(f"Compacted {hours} hourly and {days} daily analytics rollups")
+    return {HOURLY: hours, DAILY: days}
+
+
+# === Reads ===
+
+async def aggregate_event_stats(
+    session: AsyncSession,
+    workflow_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    event_types: Optional[Sequence[AnalyticsEventType]] = None,
+    include_sketch: bool = False
+) -> Dict[AnalyticsEventType, EventStats]:
+    """
+    Per event type aggregates of ``workflow_id``'s events in
+    ``[start_date, end_date)``, read from rollups wherever they cover the
+    range. ``include_sketch`` also merges execution-time sketches.
+    """
+    watermarks = await get_watermarks(session)
+    segments = plan_segments(
+        naive_utc(start_date), naive_utc(end_date), watermarks.get(HOURLY), watermarks.get(DAILY)
+    )
+
+    stats: Dict[AnalyticsEventType, EventStats] = defaultdict(EventStats)
+    for segment in segments:
+        if segment.source == RAW:
+            conditions = [_events.c.workflow_id == workflow_id]
+            if event_types:
+                conditions.append(_events.c.event_type.in_(list(event_types)))
+            aggregates = _raw_aggregates(segment.start, segment.end, conditions)
+            sketches = _raw_sketches(segment.start, segment.end, conditions) if include_sketch else None
+        else:
+            table = _ROLLUP_TABLES[segment.source]
+            conditions = [table.c.workflow_id == workflow_id]
+            if event_types:
+                conditions.append(table.c.event_type.in_(list(event_types)))
+            aggregates = _rollup_aggregates(table, segment.start, segment.end, conditions)
+            sketches = _rollup_sketches(table, segment.start, segment.end, conditions) if include_sketch else None
+
+        for row in (await session.execute(aggregates)).all():
+            stats[row.event_type].add_row(row)
+        if sketches is None:
+            continue
+        if segment.source == RAW:
+            for (_, event_type), sketch in _group_samples((await session.execute(sketches)).all()).items():
+                stats[event_type].sketch.merge(sketch)
+        else:
+            for row in (await session.execute(sketches)).all():
+                stats[row.event_type].sketch.merge(DDSketch.from_dict(row.sketch))
+    return dict(stats)
+
+
+def combine_stats(stats: Dict[AnalyticsEventType, EventStats], event_types: Iterable[AnalyticsEventType]) -> EventStats:
+    """Merge the stats of several event types."""
+    combined = EventStats()
+    for event_type in event_types:
+        part = stats.get(event_type)
+        if part is None:
+            continue
+        combined.add_row(part)
+        combined.sketch.merge(part.sketch)
+    return combined
@@ -0,0 +1,133 @@
+"""
+Content-addressed cache for static site builds.
+Rendered HTML fragments and minified assets are stored under the hash of
+their inputs, and each site's build directory keeps a per-file hash manifest
+so unchanged outputs are not rewritten.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+MANIFEST_FILENAME = ".build-manifest.json"
+
+
+def content_hash(data: Any) -> str:
+    """SHA256 of a string, bytes or JSON-serializable value."""
+    if isinstance(data, bytes):
+        raw = data
+    elif isinstance(data, str):
+        raw = data.encode("utf-8")
+    else:
+        raw = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class BuildCache:
+    """
+    Filesystem store of build artifacts keyed by input hash.
+
+    Shared by every build on the host; entries are immutable, so concurrent
+    builds can read and write them without coordination.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.root / kind / key[:2] / key
+
+    def get(self, kind: str, key: str) -> Optional[str]:
+        path = self._path(kind, key)
+        try:
+            content = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return content
+
+    def put(self, kind: str, key: str, content: str) -> None:
+        path = self._path(kind, key)
+        if not path.exists():
+            _atomic_write(path, content.encode("utf-8"))
+
+
+class BuildDirectory:
+    """
+    Persistent output directory for one site with its file hash manifest.
+
+    ``write`` only touches files whose content hash differs from the
+    manifest; ``finalize`` removes outputs that are no longer produced and
+    saves the new manifest.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.previous = self._load_manifest()
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self.written = []
+        self.unchanged = []
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads((self.path / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def write(self, relative_path: str, content: Any) -> bool:
+        """Write ``content`` if it changed since the last build; return True if written."""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        self.manifest[relative_path] = {"sha256": digest, "size": len(data)}
+
+        target = self.path / relative_path
+        previous = self.previous.get(relative_path)
+        if previous and previous["sha256"] == digest and target.exists():
+            self.unchanged.append(relative_path)
+            return False
+
+        _atomic_write(target, data)
+        self.written.append(relative_path)
+        return True
+
+    def finalize(self) -> Dict[str, Dict[str, Any]]:
+        """Delete stale outputs, persist the manifest and return it."""
+        for relative_path in set(self.previous) - set(self.manifest):
+            stale = self.path / relative_path
+            if stale.exists():
+                stale.unlink()
+        _atomic_write(
+            self.path / MANIFEST_FILENAME,
+            json.dumps(self.manifest, sort_keys=True, indent=2).encode("utf-8")
+        )
+        return self.manifest
+
+    @property
+    def removed(self):
+        return sorted(set(self.previous) - set(self.manifest))
+
+    def build_hash(self) -> str:
+        """Hash of the whole build, derived from the manifest instead of re-reading files."""
+        return content_hash({path: entry["sha256"] for path, entry in self.manifest.items()})
+
+    def build_size(self) -> int:
+        return sum(entry["size"] for entry in self.manifest.values())
@@ -3,17 +3,18 @@ Real-time Collaboration Manager
 Handles WebSocket connections and real-time synchronization
 """
 
-import json
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Any
+from typing import Dict, List, Optional, Set, Any, Tuple
 from uuid import uuid4
 from fastapi import WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, bindparam, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from ..core.database import get_db_session
+from .collaboration_ot import RoomDocument, operation_from_message
+from .websocket_fanout import WebSocketSender, dumps
 from ..models.collaboration import (
     CollaborationRoom,
     UserSession,
@@ -22,6 +23,7 @@ from ..models.collaboration import (
     CollaborationEvent,
     CollaborationUserModel,
     CollaborationEventModel,
+    ComponentLockModel,
     WebSocketMessage,
     UserStatus,
     LockType,
@@ -30,23 +32,192 @@ from ..models.collaboration import (
 
 logger = logging.getLogger(__name__)
 
+CURSOR_FLUSH_INTERVAL_SECONDS = 0.5
+LOCK_TTL_SECONDS = 30
+
+rooms_table = CollaborationRoom.__table__
+sessions_table = UserSession.__table__
+locks_table = ComponentLock.__table__
+
+# Executemany statement for cursor flushes; SET columns come from each row's keys
+_cursor_update = update(sessions_table).where(
+    and_(
+        sessions_table.c.room_id == bindparam("b_room_id"),
+        sessions_table.c.user_id == bindparam("b_user_id"),
+    )
+)
+
+
+def _lock_id(room_id: str, component_id: str) -> str:
+    """Deterministic lock row id, so one component has at most one lock row per room."""
+    return f"{room_id}:{component_id}"
+
+
+def _lock_is_expired(lock: ComponentLockModel) -> bool:
+    return datetime.utcnow() > lock.expires_at
+
+
+def _lock_upsert(dialect_name: str, values: Dict[str, Any], now: datetime):
+    """
+    INSERT ... ON CONFLICT DO UPDATE that only takes over an existing lock
+    held by the same user or already expired. A rowcount of 0 means the
+    component is locked by someone else.
+    """
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(locks_table).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[locks_table.c.id],
+        set_={
+            "user_id": stmt.excluded.user_id,
+            "lock_type": stmt.excluded.lock_type,
+            "created_at": stmt.excluded.created_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=or_(
+            locks_table.c.user_id == stmt.excluded.user_id,
+            locks_table.c.expires_at < now,
+        ),
+    )
+
+
+def _default_session_factory() -> async_sessionmaker:
+    from ..db.session import AsyncSessionLocal
+
+    return AsyncSessionLocal
+
+
+class CursorWriteBehind:
+    """
+    Write-behind buffer for cursor positions.
+
+    Cursor moves only replace the pending value for their (room, user); a
+    timer writes the latest value of every dirty cursor once per
+    ``flush_interval`` as a single batched UPDATE, so database writes scale
+    with the number of users rather than the cursor event rate.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        flush_interval: float = CURSOR_FLUSH_INTERVAL_SECONDS
+    ):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.updates_received = 0
+        self.rows_written = 0
+        self.flush_count = 0
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    @property
+    def session_factory(self) -> async_sessionmaker:
+        if self._session_factory is None:
+            self._session_factory = _default_session_factory()
+        return self._session_factory
+
+    def update(self, room_id: str, user_id: str, position: Optional[Dict[str, float]], visible: bool) -> None:
+        """Record the latest cursor for a user; persisted on the next flush."""
+        self.updates_received += 1
+        self.pending[(room_id, user_id)] = {
+            "b_room_id": room_id,
+            "b_user_id": user_id,
+            "cursor_position": position,
+            "cursor_visible": visible,
+            "last_seen": datetime.utcnow(),
+        }
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_after_interval())
+
+    async def _flush_after_interval(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                pass  # Already logged; the batch was re-queued for the next interval
+            if not self.pending:
+                return
+
+    async def flush(self) -> int:
+        """Write every pending cursor in one statement; return rows written."""
+        async with self._flush_lock:
+            if not self.pending:
+                return 0
+            batch = list(self.pending.values())
+            self.pending = {}
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(_cursor_update, batch)
+                    await session.commit()
+            except (Exception, asyncio.CancelledError) as e:
+                logger.error(f"Failed to flush {len(batch)} cursor positions: {e!r}")
+                # Re-queue, keeping any newer position that arrived meanwhile
+                for row in batch:
+                    self.pending.setdefault((row["b_room_id"], row["b_user_id"]), row)
+                raise
+
+            self.rows_written += len(batch)
+            self.flush_count += 1
+            return len(batch)
+
+    async def close(self) -> None:
+        """Stop the timer and persist pending cursors."""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+        self._timer = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "updates_received": self.updates_received,
+            "rows_written": self.rows_written,
+            "flush_count": self.flush_count,
+            "pending": len(self.pending),
+        }
+
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time collaboration"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        cursor_flush_interval: float = CURSOR_FLUSH_INTERVAL_SECONDS
+    ):
+        self._session_factory = session_factory
+
         # Active connections: room_id -> {user_id -> WebSocket}
         self.active_connections: Dict[str, Dict[str, WebSocket]] = {}
-        
+
         # User sessions: connection_id -> session_info
         self.user_sessions: Dict[str, Dict[str, Any]] = {}
-        
-        # Room locks: room_id -> {component_id -> lock_info}
-        self.room_locks: Dict[str, Dict[str, ComponentLock]] = {}
-        
-        # Cleanup task
+
+        # Send queues: websocket -> sender
+        self.senders: Dict[WebSocket, WebSocketSender] = {}
+
+        # Room locks: room_id -> {component_id -> lock_info}, mirrors component_locks
+        self.room_locks: Dict[str, Dict[str, ComponentLockModel]] = {}
+
+        # Component trees: room_id -> document with revision log and snapshots
+        self.documents: Dict[str, RoomDocument] = {}
+
+        # Live cursors: room_id -> {user_id -> cursor}; persisted write-behind
+        self.room_cursors: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.cursor_writer = CursorWriteBehind(session_factory, cursor_flush_interval)
+
+        # Cleanup task, started with the first connection (needs a running loop)
         self._cleanup_task: Optional[asyncio.Task] = None
-        self._start_cleanup_task()
+
+    @property
+    def session_factory(self) -> async_sessionmaker:
+        if self._session_factory is None:
+            self._session_factory = _default_session_factory()
+        return self._session_factory
 
     def _start_cleanup_task(self):
         """Start background task for cleaning up expired locks and inactive sessions"""
@@ -62,10 +233,10 @@ class ConnectionManager:
                 current_time = datetime.utcnow()
                 
                 # Clean up expired locks
-                for room_id, locks in self.room_locks.items():
+                for room_id, locks in list(self.room_locks.items()):
                     expired_locks = [
                         component_id for component_id, lock in locks.items()
-                        if lock.is_expired()
+                        if _lock_is_expired(lock)
                     ]
                     
                     for component_id in expired_locks:
@@ -85,16 +256,12 @@ class ConnectionManager:
                         logger.info(f"Cleaned up expired lock for component {component_id} in room {room_id}")
 
                 # Update database with expired locks
-                with get_db_session() as db:
-                    expired_db_locks = db.query(ComponentLock).filter(
-                        ComponentLock.expires_at < current_time
-                    ).all()
-                    
-                    for lock in expired_db_locks:
-                        db.delete(lock)
-                    
-                    db.commit()
+                async with self.session_factory() as db:
+                    await db.execute(delete(locks_table).where(locks_table.c.expires_at < current_time))
+                    await db.commit()
 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in cleanup task: {e}")
 
@@ -111,6 +278,7 @@ class ConnectionManager:
         
         await websocket.accept()
         connection_id = str(uuid4())
+        self._start_cleanup_task()
         
         # Initialize room if not exists
         if room_id not in self.active_connections:
@@ -119,7 +287,10 @@ class ConnectionManager:
 
         # Store connection
         self.active_connections[room_id][user_id] = websocket
-        
+        self.senders[websocket] = WebSocketSender(
+            websocket, on_close=lambda: self.disconnect(connection_id)
+        )
+
         # Store session info
         self.user_sessions[connection_id] = {
             "room_id": room_id,
@@ -133,37 +304,34 @@ class ConnectionManager:
         }
 
         # Create database session
-        with get_db_session() as db:
+        async with self.session_factory() as db:
             # Ensure room exists
-            room = db.query(CollaborationRoom).filter(CollaborationRoom.id == room_id).first()
-            if not room:
-                room = CollaborationRoom(
+            room_exists = await db.scalar(select(rooms_table.c.id).where(rooms_table.c.id == room_id))
+            if room_exists is None:
+                await db.execute(insert(rooms_table).values(
                     id=room_id,
                     project_id=room_id,  # Assuming room_id is project_id for now
                     name=f"Project {room_id}",
-                )
-                db.add(room)
+                ))
 
             # Create or update user session
-            session = db.query(UserSession).filter(
-                and_(UserSession.room_id == room_id, UserSession.user_id == user_id)
-            ).first()
-            
-            if session:
-                session.last_seen = datetime.utcnow()
-                session.status = UserStatus.ACTIVE
-            else:
-                session = UserSession(
+            result = await db.execute(
+                update(sessions_table)
+                .where(and_(sessions_table.c.room_id == room_id, sessions_table.c.user_id == user_id))
+                .values(last_seen=datetime.utcnow(), status=UserStatus.ACTIVE.value)
+            )
+            if result.rowcount == 0:
+                await db.execute(insert(sessions_table).values(
                     id=connection_id,
                     room_id=room_id,
                     user_id=user_id,
                     user_name=user_name,
                     user_email=user_email,
                     user_color=user_color,
-                )
-                db.add(session)
+                    status=UserStatus.ACTIVE.value,
+                ))
 
-            db.commit()
+            await db.commit()
 
         # Notify room about new user
         user_model = CollaborationUserModel(
@@ -190,6 +358,7 @@ class ConnectionManager:
 
         # Send current room state to new user
         await self._send_room_state(websocket, room_id)
+        await self._send_document_state(websocket, room_id)
 
         logger.info(f"User {user_id} connected to room {room_id}")
         return connection_id
@@ -208,6 +377,10 @@ class ConnectionManager:
         if room_id in self.active_connections and user_id in self.active_connections[room_id]:
             del self.active_connections[room_id][user_id]
 
+        sender = self.senders.pop(session_info["websocket"], None)
+        if sender is not None:
+            sender.close()
+
         # Remove user's locks
         if room_id in self.room_locks:
             user_locks = [
@@ -231,17 +404,25 @@ class ConnectionManager:
                     ).dict()
                 })
 
+        if room_id in self.room_cursors:
+            self.room_cursors[room_id].pop(user_id, None)
+
         # Update database
-        with get_db_session() as db:
+        async with self.session_factory() as db:
             # Update session
-            session = db.query(UserSession).filter(UserSession.id == connection_id).first()
-            if session:
-                session.status = UserStatus.AWAY
-                session.last_seen = datetime.utcnow()
+            await db.execute(
+                update(sessions_table)
+                .where(and_(sessions_table.c.room_id == room_id, sessions_table.c.user_id == user_id))
+                .values(status=UserStatus.AWAY.value, last_seen=datetime.utcnow())
+            )
 
             # Remove user's locks
-            db.query(ComponentLock).filter(ComponentLock.user_id == user_id).delete()
-            db.commit()
+            await db.execute(
+                delete(locks_table).where(
+                    and_(locks_table.c.room_id == room_id, locks_table.c.user_id == user_id)
+                )
+            )
+            await db.commit()
 
         # Notify room about user leaving
         await self._broadcast_to_room(room_id, {
@@ -260,6 +441,8 @@ class ConnectionManager:
             del self.active_connections[room_id]
             if room_id in self.room_locks:
                 del self.room_locks[room_id]
+            self.room_cursors.pop(room_id, None)
+            self.documents.pop(room_id, None)
 
         logger.info(f"User {user_id} disconnected from room {room_id}")
 
@@ -325,24 +508,22 @@ class ConnectionManager:
         """Handle cursor position updates"""
         
         cursor_data = event_data.get("cursor", {})
-        
-        # Update user session with cursor position
-        with get_db_session() as db:
-            session = db.query(UserSession).filter(
-                and_(UserSession.room_id == room_id, UserSession.user_id == user_id)
-            ).first()
-            
-            if session:
-                session.cursor_position = cursor_data.get("position")
-                session.cursor_visible = cursor_data.get("visible", True)
-                session.last_seen = datetime.utcnow()
-                db.commit()
+        position = cursor_data.get("position")
+        visible = cursor_data.get("visible", True)
+
+        # Keep the live cursor in memory; the database copy is written behind
+        self.room_cursors.setdefault(room_id, {})[user_id] = {
+            "position": position,
+            "visible": visible,
+            "timestamp": datetime.utcnow(),
+        }
+        self.cursor_writer.update(room_id, user_id, position, visible)
 
-        # Broadcast cursor update to other users
+        # Broadcast cursor update to other users; queued older moves are superseded
         await self._broadcast_to_room(room_id, {
             "type": "collaboration_event",
             "payload": event_data
-        }, exclude_user=user_id)
+        }, exclude_user=user_id, coalesce_key=f"cursor:{user_id}")
 
     async def _handle_component_lock(self, room_id: str, user_id: str, event_data: dict):
         """Handle component locking"""
@@ -354,37 +535,10 @@ class ConnectionManager:
         if not component_id:
             return
 
-        # Check if component is already locked by another user
-        if room_id in self.room_locks and component_id in self.room_locks[room_id]:
-            existing_lock = self.room_locks[room_id][component_id]
-            if existing_lock.user_id != user_id and not existing_lock.is_expired():
-                # Component is locked by another user
-                return
-
-        # Create lock
-        expires_at = datetime.utcnow() + timedelta(seconds=30)
-        lock = ComponentLock(
-            id=str(uuid4()),
-            room_id=room_id,
-            component_id=component_id,
-            user_id=user_id,
-            lock_type=lock_type,
-            expires_at=expires_at,
-        )
-
-        # Store in memory
-        if room_id not in self.room_locks:
-            self.room_locks[room_id] = {}
-        self.room_locks[room_id][component_id] = lock
-
-        # Store in database
-        with get_db_session() as db:
-            # Remove any existing locks for this component
-            db.query(ComponentLock).filter(ComponentLock.component_id == component_id).delete()
-            
-            # Add new lock
-            db.add(lock)
-            db.commit()
+        lock = await self.acquire_lock(room_id, component_id, user_id, LockType(lock_type))
+        if lock is None:
+            # Component is locked by another user
+            return
 
         # Broadcast lock event
         await self._broadcast_to_room(room_id, {
@@ -399,22 +553,8 @@ class ConnectionManager:
         if not component_id:
             return
 
-        # Remove lock from memory
-        if (room_id in self.room_locks and 
-            component_id in self.room_locks[room_id] and
-            self.room_locks[room_id][component_id].user_id == user_id):
-            
-            del self.room_locks[room_id][component_id]
-
-        # Remove from database
-        with get_db_session() as db:
-            db.query(ComponentLock).filter(
-                and_(
-                    ComponentLock.component_id == component_id,
-                    ComponentLock.user_id == user_id
-                )
-            ).delete()
-            db.commit()
+        if not await self.release_lock(room_id, component_id, user_id):
+            return
 
         # Broadcast unlock event
         await self._broadcast_to_room(room_id, {
@@ -422,6 +562,67 @@ class ConnectionManager:
             "payload": event_data
         }, exclude_user=user_id)
 
+    async def acquire_lock(
+        self,
+        room_id: str,
+        component_id: str,
+        user_id: str,
+        lock_type: LockType = LockType.EDITING
+    ) -> Optional[ComponentLockModel]:
+        """
+        Lock a component with a single conditional upsert.
+
+        Succeeds when the component is unlocked, already held by ``user_id``
+        (the lock is renewed) or held by an expired lock. Returns None when
+        another user holds it.
+        """
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=LOCK_TTL_SECONDS)
+        values = {
+            "id": _lock_id(room_id, component_id),
+            "room_id": room_id,
+            "component_id": component_id,
+            "user_id": user_id,
+            "lock_type": lock_type.value,
+            "created_at": now,
+            "expires_at": expires_at,
+        }
+
+        async with self.session_factory() as db:
+            result = await db.execute(_lock_upsert(db.bind.dialect.name, values, now))
+            await db.commit()
+
+        if result.rowcount == 0:
+            return None
+
+        lock = ComponentLockModel(
+            component_id=component_id,
+            user_id=user_id,
+            lock_type=lock_type,
+            timestamp=now,
+            expires_at=expires_at,
+        )
+        self.room_locks.setdefault(room_id, {})[component_id] = lock
+        return lock
+
+    async def release_lock(self, room_id: str, component_id: str, user_id: str) -> bool:
+        """Release a lock held by ``user_id`` with a single delete; return True if released."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                delete(locks_table).where(
+                    and_(
+                        locks_table.c.id == _lock_id(room_id, component_id),
+                        locks_table.c.user_id == user_id,
+                    )
+                )
+            )
+            await db.commit()
+
+        locks = self.room_locks.get(room_id, {})
+        if component_id in locks and locks[component_id].user_id == user_id:
+            del locks[component_id]
+        return result.rowcount > 0
+
     async def _handle_chat_message(self, room_id: str, user_id: str, event_data: dict):
         """Handle chat messages"""
         
@@ -432,16 +633,15 @@ class ConnectionManager:
             return
 
         # Store message in database
-        with get_db_session() as db:
-            message = ChatMessage(
+        async with self.session_factory() as db:
+            await db.execute(insert(ChatMessage.__table__).values(
                 id=str(uuid4()),
                 room_id=room_id,
                 user_id=user_id,
                 message=message_text,
                 component_id=component_id,
-            )
-            db.add(message)
-            db.commit()
+            ))
+            await db.commit()
 
         # Broadcast to room
         await self._broadcast_to_room(room_id, {
@@ -450,18 +650,56 @@ class ConnectionManager:
         })
 
     async def _handle_operation(self, room_id: str, user_id: str, operation_data: dict):
-        """Handle operational transform operations"""
-        
-        # TODO: Implement operational transform logic
-        # For now, just broadcast the operation
-        await self._broadcast_to_room(room_id, {
-            "type": "operation_result",
-            "payload": {
-                "applied": True,
-                "transformed_ops": [operation_data],
-                "conflicts": []
-            }
-        }, exclude_user=user_id)
+        """
+        Handle operational transform operations.
+
+        The operation is transformed against everything applied since its
+        ``base_version`` and applied to the room document. The sender gets an
+        acknowledgement with the new version; everyone else gets the
+        transformed operation as a compact delta.
+        """
+        document = self.documents.setdefault(room_id, RoomDocument())
+        op = operation_from_message(user_id, operation_data)
+        result = document.submit(op, operation_data.get("base_version"), operation_data.get("client_seq"))
+        websocket = self.active_connections.get(room_id, {}).get(user_id)
+        transformed_ops = [result["op"].to_dict()] if result["applied"] else []
+
+        if websocket is not None:
+            await self._send_to(websocket, {
+                "type": "operation_result",
+                "payload": {
+                    "applied": result["applied"],
+                    "transformed_ops": transformed_ops,
+                    "conflicts": result["conflicts"],
+                    "version": result["version"],
+                    "client_seq": operation_data.get("client_seq"),
+                },
+                "timestamp": datetime.utcnow().isoformat(),
+                "message_id": str(uuid4()),
+            })
+            if result.get("resync"):
+                await self._send_document_state(websocket, room_id)
+
+        if result["applied"]:
+            await self._broadcast_to_room(room_id, {
+                "type": "operation_result",
+                "payload": {
+                    "applied": True,
+                    "transformed_ops": transformed_ops,
+                    "conflicts": [],
+                    "version": result["version"],
+                }
+            }, exclude_user=user_id)
+
+    async def _send_document_state(self, websocket: WebSocket, room_id: str):
+        """Send the room's latest snapshot plus the operations after it"""
+        document = self.documents.setdefault(room_id, RoomDocument())
+        await self._send_to(websocket, {
+            "type": "document_state",
+            "payload": document.sync_payload(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "message_id": str(uuid4()),
+        })
 
     async def _handle_heartbeat(self, connection_id: str, websocket: WebSocket):
         """Handle heartbeat messages"""
@@ -469,24 +707,26 @@ class ConnectionManager:
         if connection_id in self.user_sessions:
             self.user_sessions[connection_id]["last_seen"] = datetime.utcnow()
         
-        await websocket.send_text(json.dumps({
+        await self._send_to(websocket, {
             "type": "heartbeat",
             "payload": {"timestamp": datetime.utcnow().isoformat()},
             "timestamp": datetime.utcnow().isoformat(),
             "message_id": str(uuid4()),
-        }))
+        })
 
     async def _send_room_state(self, websocket: WebSocket, room_id: str):
         """Send current room state to user"""
         
-        with get_db_session() as db:
+        async with self.session_factory() as db:
             # Get active users
-            sessions = db.query(UserSession).filter(
-                and_(
-                    UserSession.room_id == room_id,
-                    UserSession.status == UserStatus.ACTIVE
+            sessions = (await db.execute(
+                select(sessions_table).where(
+                    and_(
+                        sessions_table.c.room_id == room_id,
+                        sessions_table.c.status == UserStatus.ACTIVE.value
+                    )
                 )
-            ).all()
+            )).all()
 
             users = [
                 CollaborationUserModel(
@@ -496,16 +736,16 @@ class ConnectionManager:
                     color=session.user_color,
                     status=UserStatus(session.status),
                     last_seen=session.last_seen,
-                    permissions=session.permissions,
+                    permissions=session.permissions or "editor",
                 ).dict() for session in sessions
             ]
 
-        await websocket.send_text(json.dumps({
+        await self._send_to(websocket, {
             "type": "user_list",
             "payload": users,
             "timestamp": datetime.utcnow().isoformat(),
             "message_id": str(uuid4()),
-        }))
+        })
 
     async def _send_user_list(self, websocket: WebSocket, room_id: str):
         """Send user list to requesting user"""
@@ -514,7 +754,7 @@ class ConnectionManager:
     async def _send_error(self, websocket: WebSocket, error_code: str, error_message: str):
         """Send error message to user"""
         
-        await websocket.send_text(json.dumps({
+        await self._send_to(websocket, {
             "type": "error",
             "payload": {
                 "type": "connection",
@@ -525,35 +765,47 @@ class ConnectionManager:
             },
             "timestamp": datetime.utcnow().isoformat(),
             "message_id": str(uuid4()),
-        }))
+        })
 
-    async def _broadcast_to_room(self, room_id: str, message: dict, exclude_user: Optional[str] = None):
-        """Broadcast message to all users in room"""
+    async def _send_to(self, websocket: WebSocket, message: dict):
+        """Send a message to one user through its send queue"""
+        frame = dumps(message)
+        sender = self.senders.get(websocket)
+        if sender is not None:
+            sender.send(frame)
+        else:
+            await websocket.send_text(frame)
+
+    async def _broadcast_to_room(
+        self,
+        room_id: str,
+        message: dict,
+        exclude_user: Optional[str] = None,
+        coalesce_key: Optional[str] = None
+    ):
+        """
+        Broadcast message to all users in room.
+
+        The frame is serialized once and queued on every recipient's sender;
+        frames sharing ``coalesce_key`` replace each other while queued.
+        """
         
         if room_id not in self.active_connections:
             return
 
-        message_json = json.dumps({
+        message_json = dumps({
             **message,
             "timestamp": datetime.utcnow().isoformat(),
             "message_id": str(uuid4()),
         })
 
-        disconnected_users = []
-        for user_id, websocket in self.active_connections[room_id].items():
+        for user_id, websocket in list(self.active_connections[room_id].items()):
             if exclude_user and user_id == exclude_user:
                 continue
-                
-            try:
-                await websocket.send_text(message_json)
-            except Exception as e:
-                logger.error(f"Failed to send message to user {user_id}: {e}")
-                disconnected_users.append(user_id)
 
-        # Clean up disconnected users
-        for user_id in disconnected_users:
-            if user_id in self.active_connections[room_id]:
-                del self.active_connections[room_id][user_id]
+            sender = self.senders.get(websocket)
+            if sender is not None:
+                sender.send(message_json, coalesce_key)
 
     def get_room_users(self, room_id: str) -> List[str]:
         """Get list of active users in room"""
@@ -571,7 +823,21 @@ class ConnectionManager:
             return False
             
         lock = self.room_locks[room_id][component_id]
-        return lock.user_id != user_id and not lock.is_expired()
+        return lock.user_id != user_id and not _lock_is_expired(lock)
+
+
+    async def close(self):
+        """Stop background work and persist buffered cursors; called on shutdown."""
+        if self._cleanup_task is not None and not self._cleanup_task.done():
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+        self._cleanup_task = None
+        for sender in self.senders.values():
+            sender.close()
+        await self.cursor_writer.close()
 
 
 # Global connection manager instance
@@ -0,0 +1,303 @@
+"""
+Operational transform engine for the collaborative component tree.
+The server holds one RoomDocument per room: the ordered component list with
+each component's properties, a revision log, a per-user version vector and
+periodic snapshots. Incoming operations are transformed against everything
+applied since the client's base revision, applied, and rebroadcast as
+compact deltas.
+"""
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_INTERVAL = 100
+MAX_LOG_OPERATIONS = 1000
+
+INSERT = "insert"
+DELETE = "delete"
+MODIFY = "modify"
+RETAIN = "retain"  # No-op; what an operation becomes when a concurrent one supersedes it
+
+
+@dataclass
+class Operation:
+    """One edit of the component tree, in the wire format of ``OperationModel``."""
+    type: str
+    component_id: Optional[str] = None
+    position: Optional[int] = None
+    property: Optional[str] = None
+    data: Any = None
+    user_id: str = ""
+    id: str = ""
+    timestamp: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Operation":
+        timestamp = data.get("timestamp") or 0.0
+        if not isinstance(timestamp, (int, float)):
+            timestamp = 0.0  # ISO strings from older clients carry no usable ordering
+        return cls(
+            type=data.get("type", RETAIN),
+            component_id=data.get("component_id"),
+            position=data.get("position"),
+            property=data.get("property"),
+            data=data.get("data"),
+            user_id=data.get("user_id", ""),
+            id=data.get("id", ""),
+            timestamp=float(timestamp),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact delta: only the fields this operation type uses."""
+        delta = {"id": self.id, "type": self.type, "user_id": self.user_id, "timestamp": self.timestamp}
+        if self.component_id is not None:
+            delta["component_id"] = self.component_id
+        if self.position is not None:
+            delta["position"] = self.position
+        if self.property is not None:
+            delta["property"] = self.property
+        if self.type in (INSERT, MODIFY):
+            delta["data"] = self.data
+        return delta
+
+    def priority(self) -> Tuple[float, str, str]:
+        """Total order for concurrent ties: the later write wins."""
+        return (self.timestamp, self.user_id, self.id)
+
+
+def _noop(op: Operation) -> Operation:
+    return replace(op, type=RETAIN, position=None, property=None, data=None)
+
+
+def transform(op: Operation, against: Operation) -> Operation:
+    """
+    Rewrite ``op`` to apply after the concurrent operation ``against``.
+
+    Satisfies TP1: for concurrent ``a`` and ``b`` on the same state,
+    applying ``b`` then ``transform(a, b)`` converges with applying ``a``
+    then ``transform(b, a)``.
+    """
+    if op.type == RETAIN or against.type == RETAIN:
+        return op
+
+    if against.type == DELETE:
+        if op.component_id == against.component_id and op.type != INSERT:
+            return _noop(op)  # Modifying or deleting a component that is gone
+        if op.type != MODIFY and op.position is not None and against.position < op.position:
+            return replace(op, position=op.position - 1)
+        return op
+
+    if against.type == INSERT:
+        if op.type == MODIFY or op.position is None:
+            return op  # Unpositioned inserts append; deletes are resolved by id
+        if op.type == INSERT:
+            if against.position < op.position or (
+                against.position == op.position and against.priority() < op.priority()
+            ):
+                return replace(op, position=op.position + 1)
+            return op
+        if op.type == DELETE and against.position <= op.position:
+            return replace(op, position=op.position + 1)
+        return op
+
+    # against is a MODIFY: only a concurrent write of the same property is affected
+    if (
+        op.type == MODIFY
+        and op.component_id == against.component_id
+        and op.property == against.property
+        and op.priority() < against.priority()
+    ):
+        return _noop(op)
+    return op
+
+
+@dataclass
+class DocumentState:
+    """Ordered component ids plus each component's properties."""
+    order: List[str] = field(default_factory=list)
+    components: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def copy(self) -> "DocumentState":
+        # Modifications replace property values rather than mutating them, so
+        # copying each component's property dict is enough.
+        return DocumentState(list(self.order), {cid: dict(props) for cid, props in self.components.items()})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "order": list(self.order),
+            "components": {cid: dict(props) for cid, props in self.components.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DocumentState":
+        return cls(list(data.get("order", [])), {cid: dict(props) for cid, props in data.get("components", {}).items()})
+
+    def normalize(self, op: Operation) -> Optional[Operation]:
+        """
+        Bind ``op`` to this state: clamp insert positions and record the
+        index a delete removes (later transforms need it). Returns None for
+        operations that cannot apply.
+        """
+        if op.type == INSERT:
+            if not op.component_id or op.component_id in self.components:
+                return None
+            position = len(self.order) if op.position is None else max(0, min(op.position, len(self.order)))
+            return replace(op, position=position, data=dict(op.data or {}))
+        if op.type == DELETE:
+            if op.component_id not in self.components:
+                return _noop(op)
+            return replace(op, position=self.order.index(op.component_id))
+        if op.type == MODIFY:
+            if op.component_id not in self.components or not op.property:
+                return _noop(op)
+            return replace(op, position=None)
+        return _noop(op)
+
+    def apply(self, op: Operation) -> None:
+        """Apply a normalized (or transformed) operation."""
+        if op.type == INSERT:
+            self.order.insert(op.position, op.component_id)
+            self.components[op.component_id] = dict(op.data or {})
+        elif op.type == DELETE:
+            del self.order[op.position]
+            del self.components[op.component_id]
+        elif op.type == MODIFY:
+            self.components[op.component_id][op.property] = op.data
+
+
+class RoomDocument:
+    """
+    Authoritative component tree for one collaboration room.
+
+    ``revision`` counts applied operations; the log keeps the last
+    ``max_log`` of them so clients up to that far behind can still submit,
+    and a snapshot is taken every ``snapshot_interval`` revisions so a late
+    joiner receives the snapshot plus the log tail after it instead of a
+    full replay.
+    """
+
+    def __init__(
+        self,
+        state: Optional[DocumentState] = None,
+        snapshot_interval: int = SNAPSHOT_INTERVAL,
+        max_log: int = MAX_LOG_OPERATIONS
+    ):
+        self.state = state or DocumentState()
+        self.revision = 0
+        self.snapshot_interval = snapshot_interval
+        self.max_log = max(max_log, snapshot_interval)
+        self.log: Deque[Operation] = deque()
+        self.version_vector: Dict[str, int] = {}
+        self.snapshot_revision = 0
+        self.snapshot = self.state.to_dict()
+        self.transforms = 0
+
+    @property
+    def log_start(self) -> int:
+        """Oldest base revision a submitted operation may have."""
+        return self.revision - len(self.log)
+
+    def submit(
+        self,
+        op: Operation,
+        base_version: Optional[int] = None,
+        client_seq: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Transform ``op`` against operations applied since ``base_version``
+        and apply it. Returns ``applied``, the transformed operation as
+        ``op``, the resulting ``version`` and any ``conflicts``.
+        """
+        if client_seq is not None and client_seq <= self.version_vector.get(op.user_id, 0):
+            return {"applied": False, "duplicate": True, "op": None, "version": self.revision, "conflicts": []}
+
+        base = self.revision if base_version is None else base_version
+        if base < self.log_start or base > self.revision:
+            return {
+                "applied": False,
+                "resync": True,
+                "op": None,
+                "version": self.revision,
+                "conflicts": [{
+                    "type": "manual_required",
+                    "description": f"Base version {base} is outside the retained log "
+                                   f"({self.log_start}-{self.revision}); resync from snapshot",
+                    "operations": [op.to_dict()],
+                }],
+            }
+
+        conflicts = []
+        transformed = op
+        for index in range(base - self.log_start, len(self.log)):
+            concurrent = self.log[index]
+            before = transformed
+            transformed = transform(transformed, concurrent)
+            self.transforms += 1
+            if transformed.type == RETAIN and before.type != RETAIN:
+                conflicts.append({
+                    "type": "auto_resolved",
+                    "description": f"{before.type} of {before.component_id} superseded by concurrent "
+                                   f"{concurrent.type} from {concurrent.user_id}",
+                    "operations": [before.to_dict(), concurrent.to_dict()],
+                })
+                break
+
+        normalized = self.state.normalize(transformed)
+        if normalized is None:
+            return {
+                "applied": False,
+                "op": None,
+                "version": self.revision,
+                "conflicts": conflicts + [{
+                    "type": "manual_required",
+                    "description": f"Component {transformed.component_id} already exists",
+                    "operations": [transformed.to_dict()],
+                }],
+            }
+
+        self.state.apply(normalized)
+        self.revision += 1
+        self.log.append(normalized)
+        if len(self.log) > self.max_log:
+            self.log.popleft()
+        if client_seq is not None:
+            self.version_vector[op.user_id] = client_seq
+        if self.revision % self.snapshot_interval == 0:
+            self.snapshot = self.state.to_dict()
+            self.snapshot_revision = self.revision
+
+        return {"applied": True, "op": normalized, "version": self.revision, "conflicts": conflicts}
+
+    def sync_payload(self) -> Dict[str, Any]:
+        """Snapshot plus the operations applied after it, for joining clients."""
+        tail_start = self.snapshot_revision - self.log_start
+        return {
+            "snapshot": self.snapshot,
+            "snapshot_version": self.snapshot_revision,
+            "ops": [op.to_dict() for op in list(self.log)[tail_start:]],
+            "version": self.revision,
+            "version_vector": dict(self.version_vector),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "revision": self.revision,
+            "components": len(self.state.order),
+            "log_size": len(self.log),
+            "snapshot_version": self.snapshot_revision,
+            "transforms": self.transforms,
+        }
+
+
+def operation_from_message(user_id: str, payload: Dict[str, Any]) -> Operation:
+    """Build an Operation from a client payload, stamping the sender and arrival time."""
+    op = Operation.from_dict(payload)
+    op.user_id = user_id
+    if not op.timestamp:
+        op.timestamp = time.time()
+    return op
@@ -0,0 +1,118 @@
+"""
+Ordered conversion funnels over workflow analytics events.
+The whole funnel is computed in one query: an inner aggregation takes, per
+user, the first time each step's event occurred, and the outer query counts
+the users who reached each step in order and within the conversion window
+of their first step.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import and_, case, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.analytics import AnalyticsEventType, WorkflowAnalyticsEvent
+
+DEFAULT_FUNNEL_STEPS = [
+    {"step": "workflow_triggered", "event_type": AnalyticsEventType.WORKFLOW_EXECUTION},
+    {"step": "workflow_completed", "event_type": AnalyticsEventType.WORKFLOW_SUCCESS},
+    {"step": "email_sent", "event_type": AnalyticsEventType.EMAIL_SENT},
+    {"step": "email_opened", "event_type": AnalyticsEventType.EMAIL_OPENED},
+    {"step": "email_clicked", "event_type": AnalyticsEventType.EMAIL_CLICKED},
+    {"step": "conversion", "event_type": AnalyticsEventType.CONVERSION},
+]
+DEFAULT_CONVERSION_WINDOW = timedelta(days=7)
+
+_events = WorkflowAnalyticsEvent.__table__
+
+
+def funnel_statement(
+    workflow_id: str,
+    event_types: Sequence[AnalyticsEventType],
+    start_date: datetime,
+    end_date: datetime,
+    conversion_window: timedelta = DEFAULT_CONVERSION_WINDOW,
+    dialect_name: str = "postgresql"
+) -> Select:
+    """
+    One row of per-step user counts (``step_0`` ... ``step_n``).
+
+    A user reaches step k if they reached step k-1 and the first occurrence
+    of step k's event is no earlier than that of step k-1 and within
+    ``conversion_window`` of the first step. PostgreSQL aggregates with
+    ``FILTER`` and compares timestamps with interval arithmetic; other
+    dialects (SQLite) use ``CASE`` aggregation and Julian day numbers.
+    """
+    postgres = dialect_name == "postgresql"
+
+    first_seen = []
+    for index, event_type in enumerate(event_types):
+        if postgres:
+            first = func.min(_events.c.created_at).filter(_events.c.event_type == event_type)
+        else:
+            first = func.min(case((_events.c.event_type == event_type, _events.c.created_at)))
+        first_seen.append(first.label(f"first_{index}"))
+
+    per_user = (
+        select(*first_seen)
+        .where(and_(
+            _events.c.workflow_id == workflow_id,
+            _events.c.event_type.in_(list(event_types)),
+            _events.c.created_at >= start_date,
+            _events.c.created_at <= end_date,
+        ))
+        .group_by(_events.c.user_id)
+        .subquery()
+    )
+
+    times = [per_user.c[f"first_{index}"] for index in range(len(event_types))]
+    if postgres:
+        deadline = times[0] + literal(conversion_window)
+    else:
+        times = [func.julianday(time) for time in times]
+        deadline = times[0] + conversion_window.total_seconds() / 86400
+
+    reached = times[0].isnot(None)
+    counts = [func.count(case((reached, 1))).label("step_0")]
+    for index in range(1, len(times)):
+        reached = and_(reached, times[index] >= times[index - 1], times[index] <= deadline)
+        counts.append(func.count(case((reached, 1))).label(f"step_{index}"))
+
+    return select(*counts)
+
+
+async def compute_funnel_counts(
+    session: AsyncSession,
+    workflow_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    steps: Sequence[Dict[str, Any]] = DEFAULT_FUNNEL_STEPS,
+    conversion_window: timedelta = DEFAULT_CONVERSION_WINDOW
+) -> List[int]:
+    """Users reaching each of ``steps`` in order, from a single query."""
+    statement = funnel_statement(
+        workflow_id,
+        [step["event_type"] for step in steps],
+        start_date,
+        end_date,
+        conversion_window,
+        session.bind.dialect.name,
+    )
+    row = (await session.execute(statement)).one()
+    return [count or 0 for count in row]
+
+
+def funnel_step_rates(steps: Sequence[Dict[str, Any]], counts: Sequence[int]) -> List[Dict[str, Any]]:
+    """Per-step counts with the conversion rate from the previous step."""
+    funnel_data = []
+    previous_count = None
+    for step, count in zip(steps, counts):
+        if previous_count is not None and previous_count > 0:
+            conversion_rate = (count / previous_count) * 100
+        else:
+            conversion_rate = 100.0 if count > 0 else 0.0
+        funnel_data.append({"step": step["step"], "count": count, "conversion_rate": conversion_rate})
+        previous_count = count
+    return funnel_data
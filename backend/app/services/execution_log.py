@@ -0,0 +1,210 @@
+"""
+Append-only execution log for workflow node statuses and log lines.
+Entries are buffered per session and inserted in batches; the table's
+``sequence`` column orders them, so a node's current status is its latest
+status entry and readers page through an execution with ``sequence > cursor``
+instead of loading the execution's ``execution_data`` blob.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.workflow import WorkflowExecutionLog
+
+logger = logging.getLogger(__name__)
+
+ENTRY_STATUS = "status"
+ENTRY_LOG = "log"
+
+LOG_BATCH_SIZE = 100
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+_log = WorkflowExecutionLog.__table__
+
+
+def status_entry(
+    execution_id: Any,
+    node_id: str,
+    status: str,
+    execution_time_ms: Optional[int] = None,
+    error_details: Optional[str] = None,
+    created_at: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Row for a node status change."""
+    return {
+        "execution_id": execution_id,
+        "node_id": node_id,
+        "entry_type": ENTRY_STATUS,
+        "created_at": created_at or datetime.utcnow(),
+        "status": status,
+        "execution_time_ms": execution_time_ms,
+        "error_details": error_details,
+        "level": None,
+        "message": None,
+        "context": None,
+    }
+
+
+def log_entry(
+    execution_id: Any,
+    node_id: str,
+    level: str,
+    message: str,
+    context: Optional[Dict[str, Any]] = None,
+    created_at: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Row for a node log line."""
+    return {
+        "execution_id": execution_id,
+        "node_id": node_id,
+        "entry_type": ENTRY_LOG,
+        "created_at": created_at or datetime.utcnow(),
+        "status": None,
+        "execution_time_ms": None,
+        "error_details": None,
+        "level": level,
+        "message": message,
+        "context": context or {},
+    }
+
+
+def entry_to_dict(row: Any) -> Dict[str, Any]:
+    """API representation of a log table row."""
+    entry = {
+        "sequence": row.sequence,
+        "node_id": row.node_id,
+        "type": row.entry_type,
+        "timestamp": row.created_at.isoformat() if row.created_at else None,
+    }
+    if row.entry_type == ENTRY_STATUS:
+        entry.update(
+            status=row.status,
+            execution_time_ms=row.execution_time_ms,
+            error_details=row.error_details,
+        )
+    else:
+        entry.update(level=row.level, message=row.message, context=row.context or {})
+    return entry
+
+
+class ExecutionLogWriter:
+    """
+    Buffers log entries for one session and inserts them in batches.
+
+    Entries reach the table in the order they were appended, so their
+    sequence numbers follow that order. ``flush`` commits the session.
+    """
+
+    def __init__(self, session: AsyncSession, batch_size: int = LOG_BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+        self.pending: List[Dict[str, Any]] = []
+        self.flushed_entries = 0
+        self.flush_count = 0
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        """Queue one entry, flushing once ``batch_size`` are pending."""
+        self.pending.append(entry)
+        if len(self.pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Insert all pending entries in one statement; return entries written."""
+        if not self.pending:
+            return 0
+
+        batch, self.pending = self.pending, []
+        try:
+            await self.session.execute(insert(_log), batch)
+            await self.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} execution log entries: {e!r}")
+            self.pending = batch + self.pending
+            raise
+
+        self.flushed_entries += len(batch)
+        self.flush_count += 1
+        return len(batch)
+
+
+async def read_entries(
+    session: AsyncSession,
+    execution_id: Any,
+    node_id: Optional[str] = None,
+    entry_type: Optional[str] = None,
+    after_sequence: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    One page of an execution's entries in sequence order.
+
+    Pass the last entry's ``sequence`` as ``after_sequence`` to get the next
+    page; the (execution_id, sequence) index serves each page directly.
+
+    Sequence numbers are assigned at insert, not at commit. If two sessions
+    write entries for the same execution concurrently, the later sequence
+    can commit first, and a reader that has already paged past it never
+    sees the earlier one. Executions normally have a single writer (the
+    worker running them), which makes this safe. A live reader that must
+    not miss entries under concurrent writers should re-read from a cursor
+    a few entries behind and de-duplicate by ``sequence``.
+    """
+    conditions = [_log.c.execution_id == execution_id]
+    if node_id is not None:
+        conditions.append(_log.c.node_id == node_id)
+    if entry_type is not None:
+        conditions.append(_log.c.entry_type == entry_type)
+    if after_sequence is not None:
+        conditions.append(_log.c.sequence > after_sequence)
+
+    result = await session.execute(
+        select(_log)
+        .where(and_(*conditions))
+        .order_by(_log.c.sequence)
+        .limit(min(limit, MAX_PAGE_SIZE))
+    )
+    return [entry_to_dict(row) for row in result]
+
+
+async def latest_node_statuses(session: AsyncSession, execution_id: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    Current status of each node that reported one, keyed by node id, with
+    ``started_at`` set to the time of the node's first status entry.
+    """
+    per_node = (
+        select(
+            _log.c.node_id,
+            func.max(_log.c.sequence).label("last_sequence"),
+            func.min(_log.c.created_at).label("first_at"),
+        )
+        .where(and_(_log.c.execution_id == execution_id, _log.c.entry_type == ENTRY_STATUS))
+        .group_by(_log.c.node_id)
+        .subquery()
+    )
+    result = await session.execute(
+        select(
+            _log.c.sequence,
+            _log.c.node_id,
+            _log.c.status,
+            _log.c.created_at,
+            _log.c.execution_time_ms,
+            _log.c.error_details,
+            per_node.c.first_at,
+        ).join(per_node, _log.c.sequence == per_node.c.last_sequence)
+    )
+    return {
+        row.node_id: {
+            "sequence": row.sequence,
+            "status": row.status,
+            "timestamp": row.created_at.isoformat(),
+            "started_at": row.first_at.isoformat() if row.first_at else None,
+            "execution_time_ms": row.execution_time_ms,
+            "error_details": row.error_details,
+        }
+        for row in result
+    }
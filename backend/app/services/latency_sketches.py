@@ -0,0 +1,128 @@
+"""
+Storage for per-workflow, per-hour execution-time sketches.
+Sketches are merged into ``workflow_latency_sketches`` as events are ingested
+and combined across buckets when percentiles are requested.
+"""
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import and_, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import WorkflowLatencySketch
+from app.services.quantile_sketch import DDSketch
+
+sketch_table = WorkflowLatencySketch.__table__
+
+
+def naive_utc(timestamp: datetime) -> datetime:
+    """
+    ``timestamp`` as naive UTC. Bucket columns are ``timestamptz`` and come
+    back timezone-aware on PostgreSQL, while events carry naive UTC times.
+    """
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    """Truncate a timestamp to the start of its hour."""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def build_bucket_sketches(rows: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, datetime], DDSketch]:
+    """Group event rows with an execution time into one sketch per (workflow, hour)."""
+    samples: Dict[Tuple[str, datetime], List[float]] = defaultdict(list)
+    for row in rows:
+        if row.get("execution_time_ms") is not None:
+            samples[(str(row["workflow_id"]), hour_bucket(naive_utc(row["created_at"])))].append(row["execution_time_ms"])
+
+    sketches = {}
+    for key, values in samples.items():
+        sketch = DDSketch()
+        sketch.add_many(values)
+        sketches[key] = sketch
+    return sketches
+
+
+async def merge_bucket_sketches(session: AsyncSession, rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Merge the execution times of ``rows`` into their hourly sketches.
+
+    Existing buckets are locked (``FOR UPDATE`` where supported) for the
+    read-merge-write; the caller commits. Returns the number of buckets touched.
+    """
+    sketches = build_bucket_sketches(rows)
+    if not sketches:
+        return 0
+
+    workflow_ids = {workflow_id for workflow_id, _ in sketches}
+    buckets = {bucket for _, bucket in sketches}
+    existing_query = select(
+        sketch_table.c.id, sketch_table.c.workflow_id, sketch_table.c.bucket_start, sketch_table.c.sketch
+    ).where(
+        and_(
+            sketch_table.c.workflow_id.in_(workflow_ids),
+            sketch_table.c.bucket_start.in_(buckets)
+        )
+    ).with_for_update()
+
+    existing = {
+        (str(row.workflow_id), naive_utc(row.bucket_start)): row
+        for row in (await session.execute(existing_query)).all()
+    }
+
+    now = datetime.utcnow()
+    new_rows = []
+    for key, sketch in sketches.items():
+        row = existing.get(key)
+        if row is not None:
+            merged = DDSketch.from_dict(row.sketch)
+            merged.merge(sketch)
+            await session.execute(
+                update(sketch_table).where(sketch_table.c.id == row.id).values(**_sketch_columns(merged), updated_at=now)
+            )
+        else:
+            new_rows.append({
+                "id": uuid.uuid4(),
+                "workflow_id": key[0],
+                "bucket_start": key[1],
+                "created_at": now,
+                "updated_at": now,
+                **_sketch_columns(sketch)
+            })
+
+    if new_rows:
+        await session.execute(insert(sketch_table), new_rows)
+    return len(sketches)
+
+
+def _sketch_columns(sketch: DDSketch) -> Dict[str, Any]:
+    return {
+        "sample_count": sketch.count,
+        "total_ms": sketch.sum,
+        "min_ms": sketch.min,
+        "max_ms": sketch.max,
+        "sketch": sketch.to_dict()
+    }
+
+
+async def load_window_sketch(
+    session: AsyncSession, workflow_id: str, start_date: datetime, end_date: datetime
+) -> DDSketch:
+    """Merge every hourly sketch overlapping ``[start_date, end_date]``."""
+    query = select(sketch_table.c.sketch).where(
+        and_(
+            sketch_table.c.workflow_id == workflow_id,
+            sketch_table.c.bucket_start >= hour_bucket(start_date),
+            sketch_table.c.bucket_start <= end_date
+        )
+    )
+
+    merged = DDSketch()
+    for (data,) in (await session.execute(query)).all():
+        merged.merge(DDSketch.from_dict(data))
+    return merged
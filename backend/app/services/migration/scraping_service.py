@@ -5,34 +5,358 @@ Provides robust scraping with error handling and content extraction
 
 import asyncio
 import aiohttp
-import re
 import json
 import logging
-from typing import Dict, List, Optional, Any
-from urllib.parse import urljoin, urlparse, parse_qs
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Set
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
 from bs4 import BeautifulSoup
 import cssutils
-from pathlib import Path
 import hashlib
 from datetime import datetime
 
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 logger = logging.getLogger(__name__)
 
+# Crawl limits
+MAX_PAGES = 500
+MAX_LINKS_PER_PAGE = 20
+PARSE_WORKERS = 2
+
+SKIPPED_LINK_PATTERNS = [
+    '.pdf', '.zip', '.exe', '.mp4', '.mp3',
+    'mailto:', 'tel:', 'javascript:'
+]
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
 class ScrapingError(Exception):
     """Custom exception for scraping errors"""
     pass
 
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form used to de-duplicate crawled pages.
+
+    Lowercases scheme and host, drops default ports, fragments and trailing
+    slashes, and sorts query parameters.
+    """
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    netloc = host if parts.port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{parts.port}"
+    path = parts.path.rstrip('/')
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def parse_page(url: str, html: str, parser: str = HTML_PARSER, max_links: int = MAX_LINKS_PER_PAGE) -> Dict[str, Any]:
+    """
+    Parse one page and extract everything the crawler needs.
+
+    Runs in a worker process, so it takes and returns plain picklable data:
+    the page record, the asset references found on it and its internal links.
+    """
+    return PageExtractor(url, BeautifulSoup(html, parser)).extract(max_links)
+
+
+class PageExtractor:
+    """
+    Extracts structured content, assets and links from a parsed page
+
+    Elements are indexed by tag name (and classes and ids collected) in one
+    pass over the tree, so each extractor filters a short list instead of
+    walking the whole document again.
+    """
+
+    def __init__(self, url: str, soup: BeautifulSoup):
+        self.url = url
+        self.soup = soup
+        self.elements: Dict[str, List[Any]] = defaultdict(list)
+        self.classes: Set[str] = set()
+        self.ids: Set[str] = set()
+        for element in soup.find_all(True):
+            self.elements[element.name].append(element)
+            self.classes.update(element.get('class', []))
+            if element.get('id'):
+                self.ids.add(element['id'])
+
+    def _first(self, tag_name: str, **attrs) -> Optional[Any]:
+        for element in self.elements[tag_name]:
+            if all(element.get(key) == value for key, value in attrs.items()):
+                return element
+        return None
+
+    def extract(self, max_links: int = MAX_LINKS_PER_PAGE) -> Dict[str, Any]:
+        # Assets, links and schema markup are read before script and style
+        # tags are stripped for the text content
+        assets = self._extract_asset_refs()
+        links = self._extract_internal_links(max_links)
+        schema_markup = self._extract_schema_markup()
+        return {
+            'page': self._extract_page_content(schema_markup),
+            'assets': assets,
+            'links': links
+        }
+
+    def _extract_page_content(self, schema_markup: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract structured content from HTML page"""
+        soup, url = self.soup, self.url
+
+        # Remove script and style tags for cleaner content
+        for script in self.elements['script'] + self.elements['style']:
+            script.decompose()
+
+        # Extract metadata
+        title = self._first('title')
+        meta_description = self._first('meta', name='description')
+        meta_keywords = self._first('meta', name='keywords')
+
+        # Extract structured content
+        content = {
+            'url': url,
+            'title': str(title.string) if title and title.string else '',
+            'meta': {
+                'description': meta_description.get('content', '') if meta_description else '',
+                'keywords': meta_keywords.get('content', '') if meta_keywords else '',
+                'canonical': self._extract_canonical_url()
+            },
+            'structure': {
+                'h1': [h.get_text(strip=True) for h in self.elements['h1']],
+                'h2': [h.get_text(strip=True) for h in self.elements['h2']],
+                'h3': [h.get_text(strip=True) for h in self.elements['h3']],
+                'images': self._extract_images(),
+                'links': self._extract_link_structure(),
+                'forms': self._extract_forms(),
+            },
+            'content': {
+                'text': soup.get_text(strip=True, separator='\n'),
+                'html': str(soup.body) if soup.body else str(soup),
+                'selectors': self._generate_selectors()
+            },
+            'seo': {
+                'og_tags': self._extract_og_tags(),
+                'twitter_tags': self._extract_twitter_tags(),
+                'schema_markup': schema_markup
+            }
+        }
+
+        return content
+
+    def _extract_asset_refs(self) -> Dict[str, Any]:
+        """Collect CSS, JS and image references; external files are fetched by the crawler"""
+        base_url = self.url
+        refs = {
+            'stylesheets': [],
+            'inline_styles': [],
+            'scripts': [],
+            'inline_scripts': [],
+            'images': []
+        }
+
+        for link in self.elements['link']:
+            if 'stylesheet' in link.get('rel', []):
+                refs['stylesheets'].append(urljoin(base_url, link.get('href', '')))
+
+        for style in self.elements['style']:
+            refs['inline_styles'].append(style.get_text())
+
+        for script in self.elements['script']:
+            if script.get('src'):
+                refs['scripts'].append(urljoin(base_url, script.get('src')))
+            elif script.get_text().strip():
+                refs['inline_scripts'].append(script.get_text())
+
+        for img in self.elements['img']:
+            refs['images'].append({
+                'url': urljoin(base_url, img.get('src', '')),
+                'alt': img.get('alt', '')
+            })
+
+        return refs
+
+    def _extract_internal_links(self, max_links: int) -> List[str]:
+        """Extract normalized internal links for crawling"""
+        base_domain = urlsplit(self.url).netloc
+        links = []
+        seen = set()
+
+        for link in self.elements['a']:
+            href = link.get('href')
+            if href is None or any(skip in href.lower() for skip in SKIPPED_LINK_PATTERNS) or href.startswith('#'):
+                continue
+
+            full_url = normalize_url(urljoin(self.url, href))
+            # Only include internal links
+            if urlsplit(full_url).netloc == base_domain and full_url not in seen:
+                seen.add(full_url)
+                links.append(full_url)
+                if len(links) >= max_links:  # Limit to prevent excessive crawling
+                    break
+
+        return links
+
+    def _extract_images(self) -> List[Dict[str, str]]:
+        """Extract image information"""
+        images = []
+        for img in self.elements['img']:
+            src = urljoin(self.url, img.get('src', ''))
+            images.append({
+                'src': src,
+                'alt': img.get('alt', ''),
+                'width': img.get('width', ''),
+                'height': img.get('height', ''),
+                'class': list(img.get('class', []))
+            })
+        return images
+
+    def _extract_link_structure(self) -> List[Dict[str, str]]:
+        """Extract link structure"""
+        links = []
+        for link in self.elements['a']:
+            if link.get('href') is None:
+                continue
+            links.append({
+                'text': link.get_text(strip=True),
+                'href': urljoin(self.url, link.get('href')),
+                'title': link.get('title', ''),
+                'rel': list(link.get('rel', []))
+            })
+        return links
+
+    def _extract_forms(self) -> List[Dict[str, Any]]:
+        """Extract form structure"""
+        forms = []
+        for form in self.elements['form']:
+            form_data = {
+                'action': form.get('action', ''),
+                'method': form.get('method', 'get'),
+                'inputs': []
+            }
+
+            for input_tag in form.find_all(['input', 'textarea', 'select']):
+                input_data = {
+                    'type': input_tag.get('type', input_tag.name),
+                    'name': input_tag.get('name', ''),
+                    'id': input_tag.get('id', ''),
+                    'placeholder': input_tag.get('placeholder', ''),
+                    'required': input_tag.get('required') is not None
+                }
+                form_data['inputs'].append(input_data)
+
+            forms.append(form_data)
+        return forms
+
+    def _extract_og_tags(self) -> Dict[str, str]:
+        """Extract Open Graph tags"""
+        og_tags = {}
+        for tag in self.elements['meta']:
+            if not tag.get('property', '').startswith('og:'):
+                continue
+            prop = tag.get('property', '').replace('og:', '')
+            content = tag.get('content', '')
+            og_tags[prop] = content
+        return og_tags
+
+    def _extract_twitter_tags(self) -> Dict[str, str]:
+        """Extract Twitter card tags"""
+        twitter_tags = {}
+        for tag in self.elements['meta']:
+            if not tag.get('name', '').startswith('twitter:'):
+                continue
+            name = tag.get('name', '').replace('twitter:', '')
+            content = tag.get('content', '')
+            twitter_tags[name] = content
+        return twitter_tags
+
+    def _extract_schema_markup(self) -> List[Dict[str, Any]]:
+        """Extract JSON-LD schema markup"""
+        schemas = []
+        for script in self.elements['script']:
+            if script.get('type') != 'application/ld+json':
+                continue
+            try:
+                schema_data = json.loads(script.string or '')
+                schemas.append(schema_data)
+            except json.JSONDecodeError:
+                logger.warning("Invalid JSON-LD schema found")
+        return schemas
+
+    def _extract_canonical_url(self) -> str:
+        """Extract canonical URL"""
+        canonical = next((link for link in self.elements['link'] if 'canonical' in link.get('rel', [])), None)
+        if canonical and canonical.get('href'):
+            return urljoin(self.url, canonical.get('href'))
+        return self.url
+
+    def _generate_selectors(self) -> Dict[str, List[str]]:
+        """Generate CSS selectors for common elements"""
+        selectors = {
+            'headers': [],
+            'navigation': [],
+            'content': [],
+            'sidebar': [],
+            'footer': []
+        }
+
+        # The selectors below are plain tag, .class or #id lookups, answered
+        # from the element index instead of a CSS match per selector
+        def present(selector: str) -> bool:
+            if selector.startswith('.'):
+                return selector[1:] in self.classes
+            if selector.startswith('#'):
+                return selector[1:] in self.ids
+            return bool(self.elements.get(selector))
+
+        # Common selectors for different sections
+        nav_selectors = ['nav', '.nav', '.navbar', '.navigation', '#nav', '#navigation']
+        selectors['navigation'] = [selector for selector in nav_selectors if present(selector)]
+
+        content_selectors = ['main', '.main', '.content', '#content', '.container', '#main']
+        selectors['content'] = [selector for selector in content_selectors if present(selector)]
+
+        return selectors
+
+
 class WebsiteScraper:
-    """Advanced website scraper for template migration"""
-    
-    def __init__(self, max_concurrent=10, timeout=30):
+    """
+    Advanced website scraper for template migration
+
+    Pages are crawled from a priority frontier (shallowest first) by
+    ``max_concurrent`` worker coroutines; HTML parsing and extraction run in a
+    process pool so the event loop keeps fetching while pages are parsed.
+    """
+
+    def __init__(
+        self,
+        max_concurrent=10,
+        timeout=30,
+        max_pages: int = MAX_PAGES,
+        max_links_per_page: int = MAX_LINKS_PER_PAGE,
+        parse_workers: int = PARSE_WORKERS
+    ):
         self.max_concurrent = max_concurrent
         self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_links_per_page = max_links_per_page
+        self.parse_workers = parse_workers
         self.session = None
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
         self.visited_urls = set()
         self.scraped_content = {}
         self.error_log = []
-        
+        self._requested_assets: Set[str] = set()
+
     async def __aenter__(self):
         """Async context manager entry"""
         connector = aiohttp.TCPConnector(limit=self.max_concurrent, limit_per_host=5)
@@ -44,33 +368,39 @@ class WebsiteScraper:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
         )
+        if self.parse_workers > 0:
+            self.parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
         if self.session:
             await self.session.close()
-    
+        if self.parse_pool:
+            self.parse_pool.shutdown(wait=False, cancel_futures=True)
+            self.parse_pool = None
+
     async def scrape_website(self, url: str, depth: int = 3) -> Dict[str, Any]:
         """
         Main scraping method - scrapes entire website structure
-        
+
         Args:
             url: Base URL to scrape
             depth: Maximum crawl depth
-            
+
         Returns:
             Dict containing scraped content and metadata
         """
         try:
             if not self.session:
                 raise ScrapingError("Scraper not initialized. Use async context manager.")
-            
+
             base_url = self._normalize_url(url)
             logger.info(f"Starting scrape of {base_url} with depth {depth}")
-            
+
             # Initialize scraping state
             self.visited_urls.clear()
+            self._requested_assets.clear()
             self.scraped_content = {
                 'base_url': base_url,
                 'pages': {},
@@ -84,62 +414,96 @@ class WebsiteScraper:
                     'errors': []
                 }
             }
-            
-            # Start recursive scraping
-            await self._crawl_page(base_url, depth)
-            
+
+            await self._crawl(base_url, depth)
+
             # Process and optimize content
             await self._process_content()
-            
+
             self.scraped_content['metadata'].update({
                 'end_time': datetime.utcnow().isoformat(),
                 'total_pages': len(self.scraped_content['pages']),
                 'total_assets': len(self.scraped_content['assets']),
                 'errors': self.error_log
             })
-            
+
             return self.scraped_content
-            
+
         except Exception as e:
             logger.error(f"Failed to scrape website: {str(e)}")
             raise ScrapingError(f"Website scraping failed: {str(e)}")
-    
-    async def _crawl_page(self, url: str, depth: int):
-        """Recursively crawl pages"""
-        if depth <= 0 or url in self.visited_urls:
+
+    async def _crawl(self, base_url: str, depth: int):
+        """Crawl from ``base_url`` with a bounded pool of workers over a priority frontier"""
+        if depth <= 0:
             return
-        
-        self.visited_urls.add(url)
-        
+
+        # Entries are (level, sequence, url): shallow pages first, FIFO within a level
+        frontier: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        sequence = 0
+
+        def enqueue(url: str, level: int):
+            nonlocal sequence
+            if url in self.visited_urls or len(self.visited_urls) >= self.max_pages:
+                return
+            self.visited_urls.add(url)
+            frontier.put_nowait((level, sequence, url))
+            sequence += 1
+
+        async def worker():
+            while True:
+                level, _, url = await frontier.get()
+                try:
+                    links = await self._crawl_page(url)
+                    if level + 1 < depth:
+                        for link in links:
+                            enqueue(link, level + 1)
+                finally:
+                    frontier.task_done()
+
+        enqueue(base_url, 0)
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrent)]
+        try:
+            await frontier.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _crawl_page(self, url: str) -> List[str]:
+        """Fetch, parse and store one page; return its internal links"""
         try:
             content = await self._fetch_page(url)
             if not content:
-                return
-            
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Extract page content
-            page_data = await self._extract_page_content(url, soup)
-            self.scraped_content['pages'][url] = page_data
-            
+                return []
+
+            parsed = await self._parse(url, content)
+            self.scraped_content['pages'][url] = parsed['page']
+
             # Extract assets
-            await self._extract_assets(url, soup)
-            
-            # Find and crawl internal links
-            if depth > 1:
-                links = self._extract_internal_links(url, soup)
-                tasks = [self._crawl_page(link, depth - 1) for link in links]
-                await asyncio.gather(*tasks, return_exceptions=True)
-                
+            await self._extract_assets(url, parsed['assets'])
+
+            return parsed['links']
+
         except Exception as e:
             error_msg = f"Error crawling {url}: {str(e)}"
             logger.error(error_msg)
             self.error_log.append(error_msg)
-    
+            return []
+
+    async def _parse(self, url: str, content: str) -> Dict[str, Any]:
+        """Parse a page in the process pool, or inline when no pool is configured"""
+        if self.parse_pool is None:
+            return parse_page(url, content, HTML_PARSER, self.max_links_per_page)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.parse_pool, parse_page, url, content, HTML_PARSER, self.max_links_per_page
+        )
+
     async def _fetch_page(self, url: str) -> Optional[str]:
         """Fetch page content with retries"""
         max_retries = 3
-        
+
         for attempt in range(max_retries):
             try:
                 async with self.session.get(url) as response:
@@ -152,258 +516,73 @@ class WebsiteScraper:
                             return None
                     else:
                         logger.warning(f"HTTP {response.status} for {url}")
-                        
+
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout fetching {url} (attempt {attempt + 1})")
             except Exception as e:
                 logger.error(f"Error fetching {url}: {str(e)}")
-                
+
         return None
-    
-    async def _extract_page_content(self, url: str, soup: BeautifulSoup) -> Dict[str, Any]:
-        """Extract structured content from HTML page"""
-        
-        # Remove script and style tags for cleaner content
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Extract metadata
-        title = soup.find('title')
-        meta_description = soup.find('meta', attrs={'name': 'description'})
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-        
-        # Extract structured content
-        content = {
-            'url': url,
-            'title': title.string if title else '',
-            'meta': {
-                'description': meta_description.get('content', '') if meta_description else '',
-                'keywords': meta_keywords.get('content', '') if meta_keywords else '',
-                'canonical': self._extract_canonical_url(soup, url)
-            },
-            'structure': {
-                'h1': [h.get_text(strip=True) for h in soup.find_all('h1')],
-                'h2': [h.get_text(strip=True) for h in soup.find_all('h2')],
-                'h3': [h.get_text(strip=True) for h in soup.find_all('h3')],
-                'images': self._extract_images(soup, url),
-                'links': self._extract_link_structure(soup, url),
-                'forms': self._extract_forms(soup),
-            },
-            'content': {
-                'text': soup.get_text(strip=True, separator='\n'),
-                'html': str(soup.body) if soup.body else str(soup),
-                'selectors': self._generate_selectors(soup)
-            },
-            'seo': {
-                'og_tags': self._extract_og_tags(soup),
-                'twitter_tags': self._extract_twitter_tags(soup),
-                'schema_markup': self._extract_schema_markup(soup)
-            }
-        }
-        
-        return content
-    
-    async def _extract_assets(self, base_url: str, soup: BeautifulSoup):
-        """Extract CSS, JS, and image assets"""
-        
+
+    async def _fetch_text_asset(self, asset_url: str, kind: str):
+        """Fetch an external stylesheet or script once per crawl"""
+        if asset_url in self._requested_assets:
+            return
+        self._requested_assets.add(asset_url)
+
+        try:
+            async with self.session.get(asset_url) as response:
+                if response.status == 200:
+                    self.scraped_content[kind][asset_url] = {
+                        'content': await response.text(),
+                        'url': asset_url,
+                        'type': 'external'
+                    }
+        except Exception as e:
+            logger.error(f"Failed to fetch {'CSS' if kind == 'styles' else 'JS'} {asset_url}: {e}")
+
+    async def _extract_assets(self, base_url: str, refs: Dict[str, Any]):
+        """Record CSS, JS, and image assets referenced by a page"""
+
         # Extract CSS
-        for link in soup.find_all('link', rel='stylesheet'):
-            css_url = urljoin(base_url, link.get('href', ''))
-            if css_url not in self.scraped_content['styles']:
-                try:
-                    async with self.session.get(css_url) as response:
-                        if response.status == 200:
-                            css_content = await response.text()
-                            self.scraped_content['styles'][css_url] = {
-                                'content': css_content,
-                                'url': css_url,
-                                'type': 'external'
-                            }
-                except Exception as e:
-                    logger.error(f"Failed to fetch CSS {css_url}: {e}")
-        
+        for css_url in refs['stylesheets']:
+            await self._fetch_text_asset(css_url, 'styles')
+
         # Extract inline CSS
-        for style in soup.find_all('style'):
-            style_hash = hashlib.md5(style.get_text().encode()).hexdigest()
+        for style in refs['inline_styles']:
+            style_hash = hashlib.md5(style.encode()).hexdigest()
             self.scraped_content['styles'][f'inline_{style_hash}'] = {
-                'content': style.get_text(),
+                'content': style,
                 'url': base_url,
                 'type': 'inline'
             }
-        
+
         # Extract JavaScript
-        for script in soup.find_all('script', src=True):
-            js_url = urljoin(base_url, script.get('src'))
-            if js_url not in self.scraped_content['scripts']:
-                try:
-                    async with self.session.get(js_url) as response:
-                        if response.status == 200:
-                            js_content = await response.text()
-                            self.scraped_content['scripts'][js_url] = {
-                                'content': js_content,
-                                'url': js_url,
-                                'type': 'external'
-                            }
-                except Exception as e:
-                    logger.error(f"Failed to fetch JS {js_url}: {e}")
-        
+        for js_url in refs['scripts']:
+            await self._fetch_text_asset(js_url, 'scripts')
+
         # Extract inline JavaScript
-        for script in soup.find_all('script', src=None):
-            if script.get_text().strip():
-                script_hash = hashlib.md5(script.get_text().encode()).hexdigest()
-                self.scraped_content['scripts'][f'inline_{script_hash}'] = {
-                    'content': script.get_text(),
-                    'url': base_url,
-                    'type': 'inline'
-                }
-        
+        for script in refs['inline_scripts']:
+            script_hash = hashlib.md5(script.encode()).hexdigest()
+            self.scraped_content['scripts'][f'inline_{script_hash}'] = {
+                'content': script,
+                'url': base_url,
+                'type': 'inline'
+            }
+
         # Extract images and other assets
-        for img in soup.find_all('img'):
-            img_url = urljoin(base_url, img.get('src', ''))
-            if img_url not in self.scraped_content['assets']:
-                self.scraped_content['assets'][img_url] = {
+        for img in refs['images']:
+            if img['url'] not in self.scraped_content['assets']:
+                self.scraped_content['assets'][img['url']] = {
                     'type': 'image',
-                    'alt': img.get('alt', ''),
-                    'url': img_url
-                }
-    
-    def _extract_internal_links(self, base_url: str, soup: BeautifulSoup) -> List[str]:
-        """Extract internal links for crawling"""
-        base_domain = urlparse(base_url).netloc
-        links = []
-        
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
-            full_url = urljoin(base_url, href)
-            parsed = urlparse(full_url)
-            
-            # Only include internal links
-            if parsed.netloc == base_domain and full_url not in self.visited_urls:
-                # Skip common non-content URLs
-                if not any(skip in full_url.lower() for skip in [
-                    '.pdf', '.zip', '.exe', '.mp4', '.mp3',
-                    'mailto:', 'tel:', 'javascript:', '#'
-                ]):
-                    links.append(full_url)
-        
-        return list(set(links))[:20]  # Limit to prevent excessive crawling
-    
-    def _extract_images(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
-        """Extract image information"""
-        images = []
-        for img in soup.find_all('img'):
-            src = urljoin(base_url, img.get('src', ''))
-            images.append({
-                'src': src,
-                'alt': img.get('alt', ''),
-                'width': img.get('width', ''),
-                'height': img.get('height', ''),
-                'class': img.get('class', [])
-            })
-        return images
-    
-    def _extract_link_structure(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
-        """Extract link structure"""
-        links = []
-        for link in soup.find_all('a', href=True):
-            links.append({
-                'text': link.get_text(strip=True),
-                'href': urljoin(base_url, link.get('href')),
-                'title': link.get('title', ''),
-                'rel': link.get('rel', [])
-            })
-        return links
-    
-    def _extract_forms(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        """Extract form structure"""
-        forms = []
-        for form in soup.find_all('form'):
-            form_data = {
-                'action': form.get('action', ''),
-                'method': form.get('method', 'get'),
-                'inputs': []
-            }
-            
-            for input_tag in form.find_all(['input', 'textarea', 'select']):
-                input_data = {
-                    'type': input_tag.get('type', input_tag.name),
-                    'name': input_tag.get('name', ''),
-                    'id': input_tag.get('id', ''),
-                    'placeholder': input_tag.get('placeholder', ''),
-                    'required': input_tag.get('required') is not None
+                    'alt': img['alt'],
+                    'url': img['url']
                 }
-                form_data['inputs'].append(input_data)
-            
-            forms.append(form_data)
-        return forms
-    
-    def _extract_og_tags(self, soup: BeautifulSoup) -> Dict[str, str]:
-        """Extract Open Graph tags"""
-        og_tags = {}
-        for tag in soup.find_all('meta', property=re.compile(r'^og:')):
-            prop = tag.get('property', '').replace('og:', '')
-            content = tag.get('content', '')
-            og_tags[prop] = content
-        return og_tags
-    
-    def _extract_twitter_tags(self, soup: BeautifulSoup) -> Dict[str, str]:
-        """Extract Twitter card tags"""
-        twitter_tags = {}
-        for tag in soup.find_all('meta', attrs={'name': re.compile(r'^twitter:')}):
-            name = tag.get('name', '').replace('twitter:', '')
-            content = tag.get('content', '')
-            twitter_tags[name] = content
-        return twitter_tags
-    
-    def _extract_schema_markup(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        """Extract JSON-LD schema markup"""
-        schemas = []
-        for script in soup.find_all('script', type='application/ld+json'):
-            try:
-                schema_data = json.loads(script.string)
-                schemas.append(schema_data)
-            except json.JSONDecodeError:
-                logger.warning("Invalid JSON-LD schema found")
-        return schemas
-    
-    def _extract_canonical_url(self, soup: BeautifulSoup, current_url: str) -> str:
-        """Extract canonical URL"""
-        canonical = soup.find('link', rel='canonical')
-        if canonical and canonical.get('href'):
-            return urljoin(current_url, canonical.get('href'))
-        return current_url
-    
-    def _generate_selectors(self, soup: BeautifulSoup) -> Dict[str, List[str]]:
-        """Generate CSS selectors for common elements"""
-        selectors = {
-            'headers': [],
-            'navigation': [],
-            'content': [],
-            'sidebar': [],
-            'footer': []
-        }
-        
-        # Common selectors for different sections
-        nav_selectors = ['nav', '.nav', '.navbar', '.navigation', '#nav', '#navigation']
-        for selector in nav_selectors:
-            elements = soup.select(selector)
-            if elements:
-                selectors['navigation'].append(selector)
-        
-        content_selectors = ['main', '.main', '.content', '#content', '.container', '#main']
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            if elements:
-                selectors['content'].append(selector)
-        
-        return selectors
-    
+
     def _normalize_url(self, url: str) -> str:
         """Normalize URL format"""
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        return url.rstrip('/')
-    
+        return normalize_url(url)
+
     async def _process_content(self):
         """Post-process scraped content for optimization"""
         # Analyze CSS for theme extraction
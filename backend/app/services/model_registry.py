@@ -0,0 +1,183 @@
+"""
+Versioned registry for trained ML models.
+Artifacts are stored as ``<root>/<name>/<version>.joblib`` next to a JSON
+metadata file (feature schema, metrics, SHA-256 of the artifact), and a
+``CURRENT`` file names the active version. Each process loads the active
+version lazily, once, and picks up a newly activated version on its next
+refresh check without a restart.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import joblib
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How often a process re-reads CURRENT to notice a newly activated version
+REFRESH_INTERVAL_SECONDS = 60.0
+
+
+@dataclass
+class ModelArtifact:
+    """A loaded model version and its metadata."""
+    name: str
+    version: str
+    model: Any
+    metadata: Dict[str, Any]
+
+
+class ModelRegistry:
+    """
+    File-backed model registry with per-process lazy loading.
+
+    ``get`` returns the in-memory artifact and only touches the disk once
+    per ``refresh_interval``; loads happen behind a lock so concurrent first
+    requests load the artifact once. Activating a version swaps the loaded
+    model in place for this process and, through ``CURRENT``, for every
+    other process at its next refresh.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        refresh_interval: float = REFRESH_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.root = Path(root)
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.loads = 0
+        self._loaded: Dict[str, ModelArtifact] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _model_dir(self, name: str) -> Path:
+        return self.root / name
+
+    def register(
+        self,
+        name: str,
+        model: Any,
+        feature_schema: List[str],
+        metrics: Optional[Dict[str, Any]] = None,
+        activate: bool = True
+    ) -> Dict[str, Any]:
+        """Store ``model`` as a new version and return its metadata."""
+        model_dir = self._model_dir(name)
+        model_dir.mkdir(parents=True, exist_ok=True)
+        version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer)
+        data = buffer.getvalue()
+        metadata = {
+            "name": name,
+            "version": version,
+            "created_at": datetime.utcnow().isoformat(),
+            "feature_schema": list(feature_schema),
+            "metrics": metrics or {},
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "size_bytes": len(data),
+        }
+        _write_atomic(model_dir / f"{version}.joblib", data)
+        _write_atomic(model_dir / f"{version}.json", json.dumps(metadata, indent=2).encode("utf-8"))
+        logger.info(f"Registered model {name} version {version}")
+
+        if activate:
+            self.activate(name, version)
+        return metadata
+
+    def activate(self, name: str, version: str) -> ModelArtifact:
+        """Make ``version`` the active one, loading it before the swap."""
+        artifact = self._load(name, version)
+        with self._lock:
+            _write_atomic(self._model_dir(name) / "CURRENT", version.encode("utf-8"))
+            self._loaded[name] = artifact
+            self._checked_at[name] = self.clock()
+        logger.info(f"Activated model {name} version {version}")
+        return artifact
+
+    def active_version(self, name: str) -> Optional[str]:
+        try:
+            return (self._model_dir(name) / "CURRENT").read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self, name: str) -> List[Dict[str, Any]]:
+        """Metadata of every stored version, oldest first."""
+        model_dir = self._model_dir(name)
+        if not model_dir.exists():
+            return []
+        return [json.loads(path.read_text()) for path in sorted(model_dir.glob("*.json"))]
+
+    def get(self, name: str) -> Optional[ModelArtifact]:
+        """The active version of ``name``, or None if none is registered."""
+        # Read the check time before the artifact: both are written under the
+        # lock, artifact first, so a fresh check time implies a loaded artifact
+        checked_at = self._checked_at.get(name, float("-inf"))
+        artifact = self._loaded.get(name)
+        if artifact is not None and self.clock() - checked_at < self.refresh_interval:
+            return artifact
+
+        with self._lock:
+            now = self.clock()
+            artifact = self._loaded.get(name)
+            if artifact is not None and now - self._checked_at.get(name, float("-inf")) < self.refresh_interval:
+                return artifact
+
+            version = self.active_version(name)
+            if version is None:
+                return artifact
+            if artifact is None or artifact.version != version:
+                try:
+                    artifact = self._load(name, version)
+                except Exception as e:
+                    logger.error(f"Failed to load model {name} version {version}: {e}")
+                    if artifact is None:
+                        return None
+                    # Keep serving the previous version until the next check
+                else:
+                    self._loaded[name] = artifact
+            self._checked_at[name] = now
+            return artifact
+
+    def _load(self, name: str, version: str) -> ModelArtifact:
+        model_dir = self._model_dir(name)
+        metadata = json.loads((model_dir / f"{version}.json").read_text())
+        data = (model_dir / f"{version}.joblib").read_bytes()
+        if hashlib.sha256(data).hexdigest() != metadata["sha256"]:
+            raise ValueError(f"Artifact hash mismatch for model {name} version {version}")
+
+        model = joblib.load(io.BytesIO(data))
+        self.loads += 1
+        logger.info(f"Loaded model {name} version {version}")
+        return ModelArtifact(name=name, version=version, model=model, metadata=metadata)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+
+_model_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry."""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry(settings.model_registry_dir)
+    return _model_registry
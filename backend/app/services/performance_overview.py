@@ -0,0 +1,185 @@
+"""
+Workflow performance overview for the analytics dashboard.
+Reads a keyset-paginated page of aggregated workflow metrics, then the
+execution and performance trends of every workflow on the page with one
+grouped query, so the number of queries does not grow with the number of
+workflows.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.analytics import AnalyticsEventType, WorkflowAnalyticsEvent, WorkflowPerformanceMetrics
+from app.models.workflow import Workflow
+
+TREND_BUCKETS = ("hour", "day", "week")
+DEFAULT_TREND_BUCKET = "day"
+
+_events = WorkflowAnalyticsEvent.__table__
+_metrics = WorkflowPerformanceMetrics.__table__
+_workflows = Workflow.__table__
+
+# SQLite equivalents of date_trunc; weeks start on Monday as in PostgreSQL
+_SQLITE_BUCKET_MODIFIERS = {
+    "hour": None,
+    "day": ("start of day",),
+    "week": ("start of day", "-6 days", "weekday 1"),
+}
+
+_EXECUTION_EVENT_TYPES = (
+    AnalyticsEventType.WORKFLOW_EXECUTION,
+    AnalyticsEventType.WORKFLOW_SUCCESS,
+    AnalyticsEventType.WORKFLOW_FAILURE,
+)
+
+
+def _bucket_expression(column: Any, bucket: str, dialect_name: str) -> Any:
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(f"Unsupported trend bucket: {bucket}")
+    if dialect_name == "postgresql":
+        return func.date_trunc(bucket, column)
+    modifiers = _SQLITE_BUCKET_MODIFIERS[bucket]
+    if modifiers is None:
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+    return func.datetime(column, *modifiers)
+
+
+def overview_statement(
+    workflow_ids: Sequence[str],
+    start_date: datetime,
+    end_date: datetime,
+    after_workflow_id: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Select:
+    """Metrics rows of ``workflow_ids`` with the workflow name, in ``workflow_id`` order."""
+    conditions = [
+        _metrics.c.workflow_id.in_(list(workflow_ids)),
+        _metrics.c.period_start >= start_date,
+        _metrics.c.period_end <= end_date,
+    ]
+    if after_workflow_id is not None:
+        conditions.append(_metrics.c.workflow_id > after_workflow_id)
+
+    statement = (
+        select(_metrics, func.coalesce(_workflows.c.name, "Unknown").label("workflow_name"))
+        .select_from(_metrics.outerjoin(_workflows, _workflows.c.id == _metrics.c.workflow_id))
+        .where(and_(*conditions))
+        .order_by(_metrics.c.workflow_id)
+    )
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def trend_statement(
+    workflow_ids: Sequence[str],
+    start_date: datetime,
+    end_date: datetime,
+    bucket: str = DEFAULT_TREND_BUCKET,
+    dialect_name: str = "postgresql"
+) -> Select:
+    """Execution counts and timings per workflow per ``bucket``, one row per non-empty bucket."""
+    period = _bucket_expression(_events.c.created_at, bucket, dialect_name).label("period")
+    event_type = _events.c.event_type
+    return (
+        select(
+            _events.c.workflow_id,
+            period,
+            func.count(case((event_type == AnalyticsEventType.WORKFLOW_EXECUTION, 1))).label("executions"),
+            func.count(case((event_type == AnalyticsEventType.WORKFLOW_SUCCESS, 1))).label("successful"),
+            func.count(case((event_type == AnalyticsEventType.WORKFLOW_FAILURE, 1))).label("failed"),
+            func.avg(_events.c.execution_time_ms).label("avg_execution_time_ms"),
+        )
+        .where(and_(
+            _events.c.workflow_id.in_(list(workflow_ids)),
+            event_type.in_(_EXECUTION_EVENT_TYPES),
+            _events.c.created_at >= start_date,
+            _events.c.created_at <= end_date,
+        ))
+        .group_by(_events.c.workflow_id, period)
+        .order_by(_events.c.workflow_id, period)
+    )
+
+
+def _period_label(period: Any) -> str:
+    if isinstance(period, str):
+        period = datetime.fromisoformat(period)
+    return period.isoformat()
+
+
+def pivot_trends(rows: Sequence[Any]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """Group trend rows into per-workflow ``execution_trend`` and ``performance_trend`` lists."""
+    trends: Dict[str, Dict[str, List[Dict[str, Any]]]] = defaultdict(
+        lambda: {"execution_trend": [], "performance_trend": []}
+    )
+    for row in rows:
+        date = _period_label(row.period)
+        completed = row.successful + row.failed
+        workflow_trends = trends[str(row.workflow_id)]
+        workflow_trends["execution_trend"].append({
+            "date": date,
+            "executions": row.executions,
+            "successful": row.successful,
+            "failed": row.failed,
+        })
+        workflow_trends["performance_trend"].append({
+            "date": date,
+            "avg_execution_time_ms": float(row.avg_execution_time_ms or 0.0),
+            "success_rate": row.successful / completed if completed else 0.0,
+        })
+    return trends
+
+
+async def get_performance_overview(
+    session: AsyncSession,
+    workflow_ids: Sequence[str],
+    start_date: datetime,
+    end_date: datetime,
+    bucket: str = DEFAULT_TREND_BUCKET,
+    after_workflow_id: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Overview rows for a page of workflows ordered by id; pass the last
+    ``workflow_id`` of a page as ``after_workflow_id`` to fetch the next.
+    Runs two queries whatever the page size.
+    """
+    if not workflow_ids:
+        return []
+
+    result = await session.execute(
+        overview_statement(workflow_ids, start_date, end_date, after_workflow_id, limit)
+    )
+    metrics = result.mappings().all()
+    if not metrics:
+        return []
+
+    page_ids = [metric["workflow_id"] for metric in metrics]
+    trend_rows = await session.execute(
+        trend_statement(page_ids, start_date, end_date, bucket, session.bind.dialect.name)
+    )
+    trends = pivot_trends(trend_rows.all())
+
+    overview = []
+    for metric in metrics:
+        workflow_id = str(metric["workflow_id"])
+        workflow_trends = trends.get(workflow_id, {"execution_trend": [], "performance_trend": []})
+        overview.append({
+            "workflow_id": workflow_id,
+            "workflow_name": metric["workflow_name"],
+            "total_executions": metric["total_executions"],
+            "success_rate": metric["success_rate"],
+            "avg_execution_time_ms": metric["avg_execution_time_ms"],
+            "conversion_rate": metric["conversion_rate"],
+            "total_revenue": float(metric["total_revenue"]),
+            "roi_percentage": metric["roi_percentage"],
+            "unique_users": metric["unique_users_engaged"],
+            "engagement_score": metric["engagement_score"],
+            **workflow_trends,
+        })
+    return overview
@@ -0,0 +1,195 @@
+"""
+Rolling per-workflow feature store for SLA violation prediction.
+Ingested events are folded into one ``workflow_prediction_features`` row per
+workflow: exponentially weighted sums give the windowed mean, deviation and
+least-squares trend of execution times, and per-day counters give the
+number of SLA violations in the rolling window. Predictions read that row
+instead of scanning 30 days of raw events.
+"""
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import AnalyticsEventType, WorkflowPredictionFeatures
+from app.services.latency_sketches import naive_utc
+
+features_table = WorkflowPredictionFeatures.__table__
+
+FEATURE_WINDOW_DAYS = 30
+FEATURE_WINDOW_SAMPLES = 30
+# Per-sample decay of the weighted sums; the usual span-to-alpha conversion,
+# so the trend tracks roughly the last FEATURE_WINDOW_SAMPLES measurements
+TREND_DECAY = 1 - 2 / (FEATURE_WINDOW_SAMPLES + 1)
+
+SUM_COLUMNS = ("weight_sum", "sum_x", "sum_xx", "sum_y", "sum_yy", "sum_xy")
+
+
+def empty_sums() -> Dict[str, float]:
+    return {column: 0.0 for column in SUM_COLUMNS}
+
+
+def add_sample(sums: Dict[str, float], value: float, decay: float = TREND_DECAY) -> None:
+    """
+    Fold one measurement into ``sums`` in place.
+
+    Sample indices are relative to the newest sample, so existing points
+    shift to ``x - 1`` before the new one lands at ``x = 0``; the sums stay
+    bounded however many samples a workflow accumulates.
+    """
+    weight, sum_x, sum_y = sums["weight_sum"], sums["sum_x"], sums["sum_y"]
+    sums["sum_xx"] = (sums["sum_xx"] - 2 * sum_x + weight) * decay
+    sums["sum_xy"] = (sums["sum_xy"] - sum_y) * decay
+    sums["sum_x"] = (sum_x - weight) * decay
+    sums["weight_sum"] = weight * decay + 1
+    sums["sum_y"] = sum_y * decay + value
+    sums["sum_yy"] = sums["sum_yy"] * decay + value * value
+
+
+def window_statistics(sums: Dict[str, float]) -> Tuple[float, float, float]:
+    """Weighted (mean, standard deviation, least-squares slope per sample)."""
+    weight = sums["weight_sum"]
+    if weight <= 0:
+        return 0.0, 0.0, 0.0
+
+    mean = sums["sum_y"] / weight
+    variance = max(sums["sum_yy"] / weight - mean * mean, 0.0)
+    denominator = weight * sums["sum_xx"] - sums["sum_x"] ** 2
+    if denominator <= 1e-9 * max(weight * sums["sum_xx"], 1.0):
+        slope = 0.0
+    else:
+        slope = (weight * sums["sum_xy"] - sums["sum_x"] * sums["sum_y"]) / denominator
+    return mean, variance ** 0.5, slope
+
+
+def _day_key(timestamp: datetime) -> str:
+    return timestamp.date().isoformat()
+
+
+def _prune_days(daily_counts: Dict[str, Dict[str, int]], newest: datetime) -> Dict[str, Dict[str, int]]:
+    oldest = _day_key(newest - timedelta(days=FEATURE_WINDOW_DAYS))
+    return {day: counts for day, counts in daily_counts.items() if day >= oldest}
+
+
+def group_feature_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group event rows per workflow in event-time order."""
+    grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        grouped[str(row["workflow_id"])].append(row)
+    for workflow_rows in grouped.values():
+        workflow_rows.sort(key=lambda row: row["created_at"])
+    return grouped
+
+
+def fold_rows(state: Dict[str, Any], rows: List[Dict[str, Any]], decay: float = TREND_DECAY) -> Dict[str, Any]:
+    """Return the stored feature columns of ``state`` updated with ``rows``."""
+    sums = {column: state.get(column) or 0.0 for column in SUM_COLUMNS}
+    sample_count = state.get("sample_count") or 0
+    total_ms = state.get("total_ms") or 0.0
+    daily_counts = {day: dict(counts) for day, counts in (state.get("daily_counts") or {}).items()}
+    last_event_at = state.get("last_event_at")
+    if last_event_at is not None:
+        last_event_at = naive_utc(last_event_at)
+
+    for row in rows:
+        created_at = naive_utc(row["created_at"])
+        day = daily_counts.setdefault(_day_key(created_at), {"events": 0, "violations": 0})
+        day["events"] += 1
+        if row.get("event_type") == AnalyticsEventType.SLA_VIOLATION:
+            day["violations"] += 1
+
+        if row.get("execution_time_ms") is not None:
+            add_sample(sums, float(row["execution_time_ms"]), decay)
+            sample_count += 1
+            total_ms += row["execution_time_ms"]
+
+        if last_event_at is None or created_at > last_event_at:
+            last_event_at = created_at
+
+    return {
+        **sums,
+        "sample_count": sample_count,
+        "total_ms": total_ms,
+        "ewma_ms": sums["sum_y"] / sums["weight_sum"] if sums["weight_sum"] else None,
+        "daily_counts": _prune_days(daily_counts, last_event_at) if last_event_at else daily_counts,
+        "last_event_at": last_event_at,
+    }
+
+
+async def merge_prediction_features(
+    session: AsyncSession, rows: Iterable[Dict[str, Any]], decay: float = TREND_DECAY
+) -> int:
+    """
+    Fold ingested event ``rows`` into their workflows' feature rows.
+
+    Existing rows are locked (``FOR UPDATE`` where supported) for the
+    read-merge-write; the caller commits. Returns the number of workflows
+    touched.
+    """
+    grouped = group_feature_rows(rows)
+    if not grouped:
+        return 0
+
+    existing_query = select(features_table).where(
+        features_table.c.workflow_id.in_(grouped.keys())
+    ).with_for_update()
+    existing = {
+        str(row.workflow_id): row._asdict()
+        for row in (await session.execute(existing_query)).all()
+    }
+
+    now = datetime.utcnow()
+    new_rows = []
+    for workflow_id, workflow_rows in grouped.items():
+        state = existing.get(workflow_id)
+        columns = fold_rows(state or {}, workflow_rows, decay)
+        if state is not None:
+            await session.execute(
+                update(features_table).where(features_table.c.id == state["id"]).values(**columns, updated_at=now)
+            )
+        else:
+            new_rows.append({
+                "id": uuid.uuid4(),
+                "workflow_id": workflow_id,
+                "created_at": now,
+                "updated_at": now,
+                **columns
+            })
+
+    if new_rows:
+        await session.execute(insert(features_table), new_rows)
+    return len(grouped)
+
+
+def prediction_features_from_row(row: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Model features derived from one stored row."""
+    mean, std, slope = window_statistics({column: row.get(column) or 0.0 for column in SUM_COLUMNS})
+    oldest = _day_key((now or datetime.utcnow()) - timedelta(days=FEATURE_WINDOW_DAYS))
+    daily_counts = row.get("daily_counts") or {}
+    return {
+        "perf_mean": mean,
+        "perf_std": std,
+        "perf_trend": slope,
+        "sample_count": row.get("sample_count") or 0,
+        "recent_events": sum(counts.get("events", 0) for day, counts in daily_counts.items() if day >= oldest),
+        "recent_violations": sum(counts.get("violations", 0) for day, counts in daily_counts.items() if day >= oldest),
+    }
+
+
+async def load_prediction_features(
+    session: AsyncSession, workflow_ids: Iterable[Any], now: Optional[datetime] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Stored features for ``workflow_ids`` in one query, keyed by workflow id."""
+    ids = {str(workflow_id) for workflow_id in workflow_ids}
+    if not ids:
+        return {}
+
+    query = select(features_table).where(features_table.c.workflow_id.in_(ids))
+    return {
+        str(row.workflow_id): prediction_features_from_row(row._asdict(), now)
+        for row in (await session.execute(query)).all()
+    }
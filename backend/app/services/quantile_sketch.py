@@ -0,0 +1,119 @@
+"""
+Mergeable quantile sketch for execution-time percentiles.
+DDSketch with logarithmic buckets: every quantile estimate is within
+``relative_accuracy`` of the exact value, and sketches built on disjoint data
+merge losslessly, so per-hour sketches can be combined at query time.
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.005
+
+# Values at or below this are counted in the zero bucket
+MIN_INDEXABLE_VALUE = 1e-9
+
+
+class DDSketch:
+    """Relative-error quantile sketch over non-negative values."""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float) -> None:
+        """Add one sample."""
+        self.add_many([value])
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """Add a batch of samples (vectorized)."""
+        array = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=float)
+        if array.size == 0:
+            return
+        array = np.maximum(array, 0.0)
+
+        positive = array[array > MIN_INDEXABLE_VALUE]
+        self.zero_count += int(array.size - positive.size)
+        if positive.size:
+            indexes, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+            for index, count in zip(indexes.tolist(), counts.tolist()):
+                self.bins[index] = self.bins.get(index, 0) + count
+
+        self.count += int(array.size)
+        self.sum += float(array.sum())
+        batch_min, batch_max = float(array.min()), float(array.max())
+        self.min = batch_min if self.min is None else min(self.min, batch_min)
+        self.max = batch_max if self.max is None else max(self.max, batch_max)
+
+    def merge(self, other: "DDSketch") -> None:
+        """Merge another sketch built with the same accuracy into this one."""
+        if not math.isclose(other.relative_accuracy, self.relative_accuracy):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if other.count == 0:
+            return
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q``-quantile (0 <= q <= 1); 0.0 for an empty sketch."""
+        if self.count == 0:
+            return 0.0
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        cumulative = self.zero_count
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable representation for storage."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(index): count for index, count in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        sketch = cls(data.get("relative_accuracy", DEFAULT_RELATIVE_ACCURACY))
+        sketch.bins = {int(index): count for index, count in data.get("bins", {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        return sketch
@@ -0,0 +1,146 @@
+"""
+Training and loading of the SLA root cause classifier.
+Training runs in a background job and publishes a version to the model
+registry; request-scoped services only load the active version.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.model_registry import ModelArtifact, ModelRegistry, get_model_registry
+
+logger = logging.getLogger(__name__)
+
+ROOT_CAUSE_MODEL = "sla_root_cause"
+MIN_TRAINING_SAMPLES = 50
+MOCK_TRAINING_SAMPLES = 100
+
+FEATURE_NAMES = [
+    'violation_duration', 'time_of_day', 'day_of_week',
+    'recent_deployments', 'system_load', 'error_rate',
+    'response_time_trend', 'concurrent_violations',
+    'external_service_status', 'resource_utilization'
+]
+
+ROOT_CAUSE_CATEGORIES = ['infrastructure', 'code', 'external_dependency', 'configuration']
+
+
+def build_classifier() -> RandomForestClassifier:
+    return RandomForestClassifier(
+        n_estimators=100,
+        max_depth=10,
+        random_state=42
+    )
+
+
+def training_matrix(training_data: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Feature matrix (in ``FEATURE_NAMES`` order) and labels for historical incidents."""
+    features = []
+    labels = []
+
+    for incident in training_data:
+        features.append([
+            incident.get('duration', 0),
+            incident.get('time_of_day', 12),
+            incident.get('day_of_week', 1),
+            incident.get('recent_deployments', 0),
+            incident.get('system_load', 50),
+            incident.get('error_rate', 1),
+            incident.get('response_time_trend', 0),
+            incident.get('concurrent_violations', 0),
+            incident.get('external_service_status', 100),
+            incident.get('resource_utilization', 70)
+        ])
+        labels.append(incident.get('root_cause_category', 'infrastructure'))
+
+    return np.array(features), np.array(labels)
+
+
+def generate_mock_training_data(num_samples: int) -> List[Dict[str, Any]]:
+    """Generate mock training data for ML model."""
+    training_data = []
+
+    for i in range(num_samples):
+        # Generate realistic training samples
+        category = np.random.choice(ROOT_CAUSE_CATEGORIES)
+
+        # Generate features based on category
+        if category == 'infrastructure':
+            system_load = np.random.beta(4, 2) * 100  # Higher load
+            error_rate = np.random.exponential(3)
+            recent_deployments = np.random.poisson(0.5)
+        elif category == 'code':
+            system_load = np.random.beta(2, 4) * 100  # Lower load
+            error_rate = np.random.exponential(8)  # Higher error rate
+            recent_deployments = np.random.poisson(2)  # More deployments
+        elif category == 'external_dependency':
+            system_load = np.random.beta(3, 3) * 100  # Normal load
+            error_rate = np.random.exponential(5)
+            recent_deployments = np.random.poisson(0.8)
+        else:  # configuration
+            system_load = np.random.beta(2, 3) * 100
+            error_rate = np.random.exponential(4)
+            recent_deployments = np.random.poisson(1.2)
+
+        training_data.append({
+            'duration': np.random.exponential(1800),  # Duration in seconds
+            'time_of_day': np.random.randint(0, 24),
+            'day_of_week': np.random.randint(0, 7),
+            'recent_deployments': recent_deployments,
+            'system_load': system_load,
+            'error_rate': error_rate,
+            'response_time_trend': np.random.normal(0, 15),
+            'concurrent_violations': np.random.poisson(1),
+            'external_service_status': np.random.beta(6, 2) * 100,
+            'resource_utilization': np.random.beta(3, 4) * 100,
+            'root_cause_category': category
+        })
+
+    return training_data
+
+
+def train_root_cause_model(
+    training_data: Optional[List[Dict[str, Any]]] = None,
+    registry: Optional[ModelRegistry] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Train the classifier and register it as the active version.
+
+    Falls back to mock incidents until real labelled history exists.
+    Returns the registered version's metadata, or None if there was too
+    little data to train on.
+    """
+    if training_data is None:
+        training_data = generate_mock_training_data(MOCK_TRAINING_SAMPLES)
+    if len(training_data) < MIN_TRAINING_SAMPLES:
+        logger.warning("Insufficient training data for ML model")
+        return None
+
+    X, y = training_matrix(training_data)
+    classifier = build_classifier()
+    classifier.fit(X, y)
+
+    metrics = {
+        "training_samples": len(training_data),
+        "train_accuracy": float(classifier.score(X, y)),
+        "classes": [str(label) for label in classifier.classes_],
+    }
+    metadata = (registry or get_model_registry()).register(
+        ROOT_CAUSE_MODEL, classifier, feature_schema=FEATURE_NAMES, metrics=metrics
+    )
+    logger.info(f"Root cause analyzer trained with {len(training_data)} incidents")
+    return metadata
+
+
+def load_root_cause_model(registry: Optional[ModelRegistry] = None) -> Optional[ModelArtifact]:
+    """The active root cause classifier, if one matching ``FEATURE_NAMES`` is registered."""
+    artifact = (registry or get_model_registry()).get(ROOT_CAUSE_MODEL)
+    if artifact is None:
+        return None
+    if artifact.metadata.get("feature_schema") != FEATURE_NAMES:
+        logger.warning(f"Ignoring {ROOT_CAUSE_MODEL} version {artifact.version}: feature schema mismatch")
+        return None
+    return artifact
@@ -1,28 +1,77 @@
 """Site generation service for converting components to static HTML."""
 
 import os
+import re
 import json
-import hashlib
-import tempfile
-import shutil
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, Template as Jinja2Template
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound, Template as Jinja2Template
 import cssmin
 import jsmin
 from PIL import Image
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 
 from ..core.config import settings
 from ..models.sites import Site, Component, PublishedSite, BuildStatus
+from .build_cache import BuildCache, BuildDirectory, MANIFEST_FILENAME, content_hash
+
+# Bump to invalidate every cached fragment and page after renderer changes
+TEMPLATE_VERSION = "1"
+
+DEFAULT_PAGE = "index"
+
+# CDN upload policy
+CDN_UPLOAD_CONCURRENCY = 16
+CDN_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+CDN_DELETE_BATCH_SIZE = 1000
+HASHED_FILENAME_PATTERN = re.compile(r'[.-][0-9a-f]{8,64}\.[A-Za-z0-9]+$')
+ASSET_HASH_LENGTH = 12
+HTML_MAX_AGE_SECONDS = 3600
+# Superseded hashed assets stay on the CDN well past the HTML/stub TTL so
+# cached pages never point at a deleted bundle; later deploys sweep them.
+RETIRED_ASSET_RETENTION_SECONDS = 24 * 3600
+
+# The stable main.css/main.js names are stubs that load the hashed bundle, so
+# a bundle change rewrites one stub instead of every page that links it.
+CSS_BUNDLE_STUB = '@import url({bundle});\n'
+JS_BUNDLE_STUB = (
+    "document.write('<script src=\"' + new URL({bundle}, document.currentScript.src) + '\"><\\/script>');\n"
+)
+
+# Shared by every SiteGenerator: generators are created per request, and a
+# pool per instance would leak threads that are never shut down. Workers are
+# started lazily on first submit.
+_UPLOAD_EXECUTOR = ThreadPoolExecutor(
+    max_workers=CDN_UPLOAD_CONCURRENCY, thread_name_prefix="cdn-upload"
+)
+
+
+def hashed_asset_path(relative_path: str, content: Any) -> str:
+    """Insert a content hash before the extension: ``main.css`` -> ``main.<hash>.css``."""
+    stem, extension = os.path.splitext(relative_path)
+    return f"{stem}.{content_hash(content)[:ASSET_HASH_LENGTH]}{extension}"
 
 
 class SiteGenerator:
-    """Handles static site generation from component data."""
+    """
+    Handles static site generation from component data.
+    
+    Builds are incremental: component fragments, pages and minified assets are
+    cached under the hash of their inputs (component JSON plus template
+    version), and each site keeps a persistent build directory whose manifest
+    decides which output files actually need writing.
+    """
     
-    def __init__(self):
+    def __init__(self, build_root: Optional[Path] = None, cache_dir: Optional[Path] = None):
+        self.build_root = Path(build_root or settings.site_build_dir)
+        self.build_cache = BuildCache(Path(cache_dir or settings.build_cache_dir))
         self.templates_dir = Path(__file__).parent.parent / "templates"
         self.static_dir = Path(__file__).parent.parent / "static"
         self.jinja_env = Environment(
@@ -31,7 +80,13 @@ class SiteGenerator:
             lstrip_blocks=True
         )
         
-        # AWS S3 client for file storage
+        # AWS S3 client for file storage; boto3 clients are thread-safe, so
+        # uploads share it across the pool
+        self._upload_executor = _UPLOAD_EXECUTOR
+        self._transfer_config = TransferConfig(
+            multipart_threshold=CDN_MULTIPART_THRESHOLD,
+            multipart_chunksize=CDN_MULTIPART_THRESHOLD
+        )
         self.s3_client = None
         if settings.aws_access_key_id and settings.aws_secret_access_key:
             self.s3_client = boto3.client(
@@ -49,61 +104,72 @@ class SiteGenerator:
             site: Site model instance
             
         Returns:
-            Dictionary with build results
+            Dictionary with build results, including the file manifest and
+            which files changed since the previous build
         """
         build_start = datetime.utcnow()
+        stats = {
+            "fragments_rendered": 0,
+            "fragments_reused": 0,
+            "pages_rendered": 0,
+            "pages_reused": 0
+        }
         
         try:
-            # Create temporary build directory
-            with tempfile.TemporaryDirectory() as temp_dir:
-                build_dir = Path(temp_dir) / "build"
-                build_dir.mkdir(exist_ok=True)
-                
-                # Generate site structure
-                await self._generate_site_structure(site, build_dir)
-                
-                # Generate HTML from components
-                html_content = await self._generate_html(site)
-                
-                # Generate CSS
-                css_content = await self._generate_css(site)
-                
-                # Generate JavaScript
-                js_content = await self._generate_javascript(site)
-                
-                # Optimize images
-                await self._optimize_images(site, build_dir)
-                
-                # Write main files
-                await self._write_site_files(
-                    build_dir, html_content, css_content, js_content, site
-                )
-                
-                # Generate SEO files
-                await self._generate_seo_files(site, build_dir)
-                
-                # Calculate build hash
-                build_hash = await self._calculate_build_hash(build_dir)
-                
-                # Calculate build size
-                build_size = await self._calculate_build_size(build_dir)
-                
-                # Upload to S3/CDN
-                cdn_url = await self._upload_to_cdn(build_dir, site)
-                
-                build_end = datetime.utcnow()
-                build_duration = int((build_end - build_start).total_seconds())
-                
-                return {
-                    "status": BuildStatus.SUCCESS,
-                    "build_hash": build_hash,
-                    "build_size": build_size,
-                    "build_duration": build_duration,
-                    "cdn_url": cdn_url,
-                    "build_started_at": build_start,
-                    "build_completed_at": build_end
+            build_dir = BuildDirectory(self.build_root / str(site.id))
+            template_versions: Dict[str, str] = {}
+            
+            # Generate site structure
+            await self._generate_site_structure(site, build_dir.path)
+            
+            # Generate HTML pages from components
+            pages = await self._generate_pages(site, template_versions, stats)
+            
+            # Generate CSS
+            css_content = await self._generate_css(site)
+            
+            # Generate JavaScript
+            js_content = await self._generate_javascript(site)
+            
+            # Optimize images
+            await self._optimize_images(site, build_dir.path)
+            
+            # Write main files
+            await self._write_site_files(
+                build_dir, pages, css_content, js_content, site
+            )
+            
+            # Generate SEO files
+            await self._generate_seo_files(site, build_dir, list(pages))
+            
+            manifest = build_dir.finalize()
+            
+            # Upload to S3/CDN
+            upload_result = await self._upload_to_cdn(build_dir.path, site, manifest)
+            cdn_url = upload_result["cdn_url"] if upload_result else None
+            
+            build_end = datetime.utcnow()
+            build_duration = int((build_end - build_start).total_seconds())
+            
+            return {
+                "status": BuildStatus.SUCCESS,
+                "build_hash": build_dir.build_hash(),
+                "build_size": build_dir.build_size(),
+                "build_duration": build_duration,
+                "cdn_url": cdn_url,
+                "build_started_at": build_start,
+                "build_completed_at": build_end,
+                "manifest": manifest,
+                "changed_files": build_dir.written,
+                "removed_files": build_dir.removed,
+                "upload_stats": upload_result,
+                "build_stats": {
+                    **stats,
+                    "files_written": len(build_dir.written),
+                    "files_unchanged": len(build_dir.unchanged)
                 }
-                
+            }
+            
         except Exception as e:
             build_end = datetime.utcnow()
             build_duration = int((build_end - build_start).total_seconds())
@@ -128,22 +194,83 @@ class SiteGenerator:
         for directory in directories:
             (build_dir / directory).mkdir(parents=True, exist_ok=True)
     
-    async def _generate_html(self, site: Site) -> str:
-        """Generate main HTML content from components."""
+    def _template_version(self, template_name: str, template_versions: Dict[str, str]) -> Optional[str]:
+        """Hash of a template's source, or None if it does not exist."""
+        if template_name not in template_versions:
+            try:
+                source, _, _ = self.jinja_env.loader.get_source(self.jinja_env, template_name)
+                template_versions[template_name] = content_hash(f"{TEMPLATE_VERSION}:{source}")
+            except TemplateNotFound:
+                template_versions[template_name] = None
+        return template_versions[template_name]
+    
+    def _page_name(self, component: Component) -> str:
+        """Page a component belongs to, from ``position['page']``."""
+        position = component.position if isinstance(component.position, dict) else {}
+        page = str(position.get('page') or DEFAULT_PAGE)
+        return re.sub(r'[^A-Za-z0-9_-]+', '-', page).strip('-') or DEFAULT_PAGE
+    
+    def _page_path(self, page: str) -> str:
+        return "index.html" if page == DEFAULT_PAGE else f"{page}.html"
+    
+    async def _generate_pages(
+        self,
+        site: Site,
+        template_versions: Dict[str, str],
+        stats: Dict[str, int]
+    ) -> Dict[str, str]:
+        """Generate HTML for every page, keyed by output path."""
+        pages: Dict[str, List[Component]] = {}
+        for component in sorted(site.components, key=lambda c: c.order_index):
+            pages.setdefault(self._page_name(component), []).append(component)
+        if not pages:
+            pages[DEFAULT_PAGE] = []
+        
+        site_inputs = {
+            "name": site.name,
+            "description": site.description,
+            "meta_title": site.meta_title,
+            "meta_description": site.meta_description,
+            "favicon_url": site.favicon_url,
+            "settings": site.settings,
+            "theme_config": site.theme_config,
+            "url": site.url
+        }
+        base_version = self._template_version("base.html", template_versions)
+        
+        rendered = {}
+        for page, components in pages.items():
+            fragments = [
+                await self._generate_component_html(component, template_versions, stats)
+                for component in components
+            ]
+            page_key = content_hash({
+                "site": site_inputs,
+                "page": page,
+                "base_template": base_version,
+                "fragments": [key for key, _ in fragments]
+            })
+            
+            html_content = self.build_cache.get("pages", page_key)
+            if html_content is None:
+                html_content = await self._generate_html(site, page, [html for _, html in fragments])
+                self.build_cache.put("pages", page_key, html_content)
+                stats["pages_rendered"] += 1
+            else:
+                stats["pages_reused"] += 1
+            rendered[self._page_path(page)] = html_content
+        
+        return rendered
+    
+    async def _generate_html(self, site: Site, page: str, components_html: List[str]) -> str:
+        """Render one page from its component fragments."""
         # Load base template
         base_template = self.jinja_env.get_template("base.html")
         
-        # Generate component HTML
-        components_html = []
-        sorted_components = sorted(site.components, key=lambda c: c.order_index)
-        
-        for component in sorted_components:
-            component_html = await self._generate_component_html(component)
-            components_html.append(component_html)
-        
         # Render final HTML
         html_content = base_template.render(
             site=site,
+            page=page,
             components_html="\n".join(components_html),
             meta_title=site.meta_title or site.name,
             meta_description=site.meta_description or site.description,
@@ -152,14 +279,36 @@ class SiteGenerator:
         
         return html_content
     
-    async def _generate_component_html(self, component: Component) -> str:
-        """Generate HTML for a single component."""
+    async def _generate_component_html(
+        self,
+        component: Component,
+        template_versions: Dict[str, str],
+        stats: Dict[str, int]
+    ) -> Tuple[str, str]:
+        """Return ``(cache_key, html)`` for a single component, rendering only on a cache miss."""
         component_type = component.type.value
         template_name = f"components/{component_type}.html"
+        version = self._template_version(template_name, template_versions)
+        if version is None:
+            version = self._template_version("components/generic.html", template_versions)
+        
+        key = content_hash({
+            "component_id": component.component_id,
+            "name": component.name,
+            "type": component_type,
+            "config": component.config,
+            "styles": component.styles,
+            "template": version
+        })
+        
+        cached = self.build_cache.get("fragments", key)
+        if cached is not None:
+            stats["fragments_reused"] += 1
+            return key, cached
         
         try:
             template = self.jinja_env.get_template(template_name)
-            return template.render(
+            html = template.render(
                 component=component,
                 config=component.config,
                 styles=component.styles
@@ -167,7 +316,11 @@ class SiteGenerator:
         except Exception:
             # Fallback to generic component template
             generic_template = self.jinja_env.get_template("components/generic.html")
-            return generic_template.render(component=component)
+            html = generic_template.render(component=component)
+        
+        self.build_cache.put("fragments", key, html)
+        stats["fragments_rendered"] += 1
+        return key, html
     
     async def _generate_css(self, site: Site) -> str:
         """Generate and optimize CSS."""
@@ -193,10 +346,19 @@ class SiteGenerator:
         
         # Minify if enabled
         if settings.css_minification:
-            combined_css = cssmin.cssmin(combined_css)
+            combined_css = self._minify("css", combined_css, cssmin.cssmin)
         
         return combined_css
     
+    def _minify(self, kind: str, content: str, minifier) -> str:
+        """Minify through the build cache so unchanged bundles are not minified again."""
+        key = content_hash(content)
+        minified = self.build_cache.get(kind, key)
+        if minified is None:
+            minified = minifier(content)
+            self.build_cache.put(kind, key, minified)
+        return minified
+    
     async def _compile_tailwind_css(self, site: Site) -> str:
         """Compile Tailwind CSS based on site configuration."""
         # This would integrate with Tailwind CLI or PostCSS
@@ -301,7 +463,7 @@ class SiteGenerator:
         
         # Minify if enabled
         if settings.js_bundling:
-            combined_js = jsmin.jsmin(combined_js)
+            combined_js = self._minify("js", combined_js, jsmin.jsmin)
         
         return combined_js
     
@@ -433,38 +595,51 @@ class SiteGenerator:
     
     async def _write_site_files(
         self, 
-        build_dir: Path, 
-        html_content: str, 
+        build_dir: BuildDirectory, 
+        pages: Dict[str, str], 
         css_content: str, 
         js_content: str, 
         site: Site
     ) -> None:
-        """Write generated files to build directory."""
-        # Write main HTML file
-        (build_dir / "index.html").write_text(html_content, encoding='utf-8')
+        """Write generated files to build directory (unchanged files are skipped)."""
+        # Write HTML pages
+        for relative_path, html_content in pages.items():
+            build_dir.write(relative_path, html_content)
         
         # Write CSS file
         if css_content:
-            (build_dir / "assets" / "css" / "main.css").write_text(css_content, encoding='utf-8')
+            self._write_bundle(build_dir, "assets/css/main.css", css_content, CSS_BUNDLE_STUB)
         
         # Write JavaScript file
         if js_content:
-            (build_dir / "assets" / "js" / "main.js").write_text(js_content, encoding='utf-8')
+            self._write_bundle(build_dir, "assets/js/main.js", js_content, JS_BUNDLE_STUB)
     
-    async def _generate_seo_files(self, site: Site, build_dir: Path) -> None:
+    def _write_bundle(self, build_dir: BuildDirectory, stub_path: str, content: str, stub_template: str) -> None:
+        """Write ``content`` under its content-hashed name and point the stub at ``stub_path`` to it."""
+        bundle_path = hashed_asset_path(stub_path, content)
+        build_dir.write(bundle_path, content)
+        build_dir.write(stub_path, stub_template.format(bundle=json.dumps(os.path.basename(bundle_path))))
+    
+    async def _generate_seo_files(self, site: Site, build_dir: BuildDirectory, page_paths: List[str]) -> None:
         """Generate SEO-related files."""
         # Generate sitemap.xml
+        lastmod = datetime.utcnow().strftime('%Y-%m-%d')
+        urls = []
+        for page_path in sorted(page_paths):
+            loc = site.url if page_path == "index.html" else f"{site.url}/{page_path}"
+            priority = "1.0" if page_path == "index.html" else "0.8"
+            urls.append(f"""    <url>
+        <loc>{loc}</loc>
+        <lastmod>{lastmod}</lastmod>
+        <changefreq>weekly</changefreq>
+        <priority>{priority}</priority>
+    </url>""")
         sitemap_content = f"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-    <url>
-        <loc>{site.url}</loc>
-        <lastmod>{datetime.utcnow().strftime('%Y-%m-%d')}</lastmod>
-        <changefreq>weekly</changefreq>
-        <priority>1.0</priority>
-    </url>
+{chr(10).join(urls)}
 </urlset>"""
         
-        (build_dir / "sitemap.xml").write_text(sitemap_content, encoding='utf-8')
+        build_dir.write("sitemap.xml", sitemap_content)
         
         # Generate robots.txt
         robots_content = f"""User-agent: *
@@ -472,7 +647,7 @@ Allow: /
 
 Sitemap: {site.url}/sitemap.xml"""
         
-        (build_dir / "robots.txt").write_text(robots_content, encoding='utf-8')
+        build_dir.write("robots.txt", robots_content)
         
         # Generate manifest.json for PWA
         manifest_content = {
@@ -485,66 +660,165 @@ Sitemap: {site.url}/sitemap.xml"""
             "theme_color": "#000000"
         }
         
-        (build_dir / "manifest.json").write_text(
-            json.dumps(manifest_content, indent=2), 
-            encoding='utf-8'
-        )
-    
-    async def _calculate_build_hash(self, build_dir: Path) -> str:
-        """Calculate SHA256 hash of build artifacts."""
-        hasher = hashlib.sha256()
-        
-        for file_path in sorted(build_dir.rglob("*")):
-            if file_path.is_file():
-                hasher.update(file_path.read_bytes())
-        
-        return hasher.hexdigest()
-    
-    async def _calculate_build_size(self, build_dir: Path) -> int:
-        """Calculate total size of build artifacts in bytes."""
-        total_size = 0
-        
-        for file_path in build_dir.rglob("*"):
-            if file_path.is_file():
-                total_size += file_path.stat().st_size
-        
-        return total_size
+        build_dir.write("manifest.json", json.dumps(manifest_content, indent=2))
     
-    async def _upload_to_cdn(self, build_dir: Path, site: Site) -> Optional[str]:
-        """Upload build artifacts to S3/CDN."""
+    async def _upload_to_cdn(
+        self,
+        build_dir: Path,
+        site: Site,
+        manifest: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Upload build artifacts to S3/CDN.
+        
+        The build manifest is diffed against the manifest stored with the
+        previous deployment: only new or changed files are uploaded (in a
+        bounded thread pool, multipart above ``CDN_MULTIPART_THRESHOLD``) and
+        keys that are no longer part of the build are deleted in batches.
+        Superseded content-hashed assets are kept, and recorded as retired in
+        the deployed manifest, until ``RETIRED_ASSET_RETENTION_SECONDS`` have
+        passed.
+        """
         if not self.s3_client:
             return None
         
+        if manifest is None:
+            manifest = BuildDirectory(build_dir).previous
+        
         try:
-            # Upload all files to S3
-            for file_path in build_dir.rglob("*"):
-                if file_path.is_file():
-                    relative_path = file_path.relative_to(build_dir)
-                    s3_key = f"sites/{site.id}/{relative_path}"
-                    
-                    # Determine content type
-                    content_type = self._get_content_type(file_path.suffix)
-                    
-                    self.s3_client.upload_file(
-                        str(file_path),
-                        settings.s3_bucket_name,
-                        s3_key,
-                        ExtraArgs={
-                            'ContentType': content_type,
-                            'CacheControl': 'max-age=31536000' if file_path.suffix in ['.css', '.js', '.png', '.jpg', '.jpeg', '.gif'] else 'max-age=3600'
-                        }
-                    )
+            prefix = f"sites/{site.id}/"
+            bucket = settings.s3_bucket_name
+            loop = asyncio.get_running_loop()
+            
+            deployed = await loop.run_in_executor(
+                self._upload_executor, self._load_deployed_manifest, bucket, prefix
+            )
+            if deployed is None:
+                # No manifest from a previous deploy: upload everything and
+                # treat whatever is under the prefix as the old deployment
+                existing_keys = await loop.run_in_executor(
+                    self._upload_executor, self._list_keys, bucket, prefix
+                )
+                deployed = {key[len(prefix):]: None for key in existing_keys}
+            
+            changed = [
+                relative_path for relative_path, entry in manifest.items()
+                if (deployed.get(relative_path) or {}).get("sha256") != entry["sha256"]
+            ]
+            retained, orphaned = self._retire_assets(deployed, manifest, time.time())
+            orphaned = sorted(prefix + relative_path for relative_path in orphaned)
+            
+            await asyncio.gather(*[
+                loop.run_in_executor(
+                    self._upload_executor, self._upload_file, build_dir, bucket, prefix, relative_path
+                )
+                for relative_path in changed
+            ])
+            
+            # Record the deployed state only once every upload has succeeded
+            await loop.run_in_executor(
+                self._upload_executor,
+                functools.partial(
+                    self.s3_client.put_object,
+                    Bucket=bucket,
+                    Key=prefix + MANIFEST_FILENAME,
+                    Body=json.dumps({**manifest, **retained}, sort_keys=True).encode('utf-8'),
+                    ContentType='application/json',
+                    CacheControl='no-cache'
+                )
+            )
+            
+            if orphaned:
+                await loop.run_in_executor(self._upload_executor, self._delete_keys, bucket, orphaned)
             
             # Return CDN URL
             if settings.cloudfront_distribution_id:
-                return f"https://{settings.cloudfront_distribution_id}.cloudfront.net/sites/{site.id}"
+                cdn_url = f"https://{settings.cloudfront_distribution_id}.cloudfront.net/sites/{site.id}"
             else:
-                return f"https://{settings.s3_bucket_name}.s3.{settings.aws_region}.amazonaws.com/sites/{site.id}"
+                cdn_url = f"https://{settings.s3_bucket_name}.s3.{settings.aws_region}.amazonaws.com/sites/{site.id}"
+            
+            return {
+                "cdn_url": cdn_url,
+                "uploaded": len(changed),
+                "unchanged": len(manifest) - len(changed),
+                "retained": len(retained),
+                "deleted": len(orphaned)
+            }
                 
         except Exception as e:
             print(f"CDN upload error: {e}")
             return None
     
+    def _retire_assets(
+        self,
+        deployed: Dict[str, Optional[Dict[str, Any]]],
+        manifest: Dict[str, Dict[str, Any]],
+        now: float
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Split deployed paths missing from ``manifest`` into retained hashed assets and orphans."""
+        retained: Dict[str, Dict[str, Any]] = {}
+        orphaned: List[str] = []
+        for relative_path, entry in deployed.items():
+            if relative_path in manifest or relative_path == MANIFEST_FILENAME:
+                continue
+            if HASHED_FILENAME_PATTERN.search(relative_path):
+                retired_at = (entry or {}).get("retired_at", now)
+                if now - retired_at < RETIRED_ASSET_RETENTION_SECONDS:
+                    retained[relative_path] = {**(entry or {}), "retired_at": retired_at}
+                    continue
+            orphaned.append(relative_path)
+        return retained, orphaned
+    
+    def _load_deployed_manifest(self, bucket: str, prefix: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Manifest stored by the previous deployment, if any."""
+        try:
+            response = self.s3_client.get_object(Bucket=bucket, Key=prefix + MANIFEST_FILENAME)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return None
+            raise
+        return json.loads(response['Body'].read())
+    
+    def _list_keys(self, bucket: str, prefix: str) -> List[str]:
+        keys = []
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            keys.extend(item['Key'] for item in page.get('Contents', []))
+        return keys
+    
+    def _upload_file(self, build_dir: Path, bucket: str, prefix: str, relative_path: str) -> None:
+        file_path = build_dir / relative_path
+        self.s3_client.upload_file(
+            str(file_path),
+            bucket,
+            prefix + relative_path,
+            ExtraArgs={
+                'ContentType': self._get_content_type(file_path.suffix),
+                'CacheControl': self._get_cache_control(file_path)
+            },
+            Config=self._transfer_config
+        )
+    
+    def _delete_keys(self, bucket: str, keys: List[str]) -> None:
+        """Delete keys in batches of the S3 DeleteObjects limit."""
+        for start in range(0, len(keys), CDN_DELETE_BATCH_SIZE):
+            batch = keys[start:start + CDN_DELETE_BATCH_SIZE]
+            self.s3_client.delete_objects(
+                Bucket=bucket,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+    
+    def _get_cache_control(self, file_path: Path) -> str:
+        """Cache policy: content-hashed filenames never change, so they are cached as immutable.
+
+        Unhashed CSS/JS are bundle stubs and expire with the HTML that links them.
+        """
+        if HASHED_FILENAME_PATTERN.search(file_path.name):
+            return 'public, max-age=31536000, immutable'
+        if file_path.suffix in ['.png', '.jpg', '.jpeg', '.gif']:
+            return 'max-age=31536000'
+        return f'max-age={HTML_MAX_AGE_SECONDS}'
+    
     def _get_content_type(self, file_extension: str) -> str:
         """Get appropriate content type for file extension."""
         content_types = {
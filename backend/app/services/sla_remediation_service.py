@@ -18,6 +18,7 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics.pairwise import cosine_similarity
 
 from app.models.workflow import SLAViolation
+from app.services.root_cause_model import FEATURE_NAMES, build_classifier, load_root_cause_model, training_matrix
 
 logger = logging.getLogger(__name__)
 
@@ -161,19 +162,10 @@ class MLRootCauseAnalyzer:
     Uses historical violation patterns to identify likely causes.
     """
     
-    def __init__(self):
-        self.classification_model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42
-        )
-        self.is_trained = False
-        self.feature_names = [
-            'violation_duration', 'time_of_day', 'day_of_week',
-            'recent_deployments', 'system_load', 'error_rate',
-            'response_time_trend', 'concurrent_violations',
-            'external_service_status', 'resource_utilization'
-        ]
+    def __init__(self, model: Optional[RandomForestClassifier] = None):
+        self.classification_model = model if model is not None else build_classifier()
+        self.is_trained = model is not None
+        self.feature_names = list(FEATURE_NAMES)
         self.historical_incidents = []
         
     def extract_features(self, violation: SLAViolation) -> np.ndarray:
@@ -254,30 +246,7 @@ class MLRootCauseAnalyzer:
                 logger.warning("Insufficient training data for ML model")
                 return False
             
-            # Prepare training features and labels
-            features = []
-            labels = []
-            
-            for incident in training_data:
-                # Extract features from historical incident
-                feature_vector = [
-                    incident.get('duration', 0),
-                    incident.get('time_of_day', 12),
-                    incident.get('day_of_week', 1),
-                    incident.get('recent_deployments', 0),
-                    incident.get('system_load', 50),
-                    incident.get('error_rate', 1),
-                    incident.get('response_time_trend', 0),
-                    incident.get('concurrent_violations', 0),
-                    incident.get('external_service_status', 100),
-                    incident.get('resource_utilization', 70)
-                ]
-                
-                features.append(feature_vector)
-                labels.append(incident.get('root_cause_category', 'infrastructure'))
-            
-            X = np.array(features)
-            y = np.array(labels)
+            X, y = training_matrix(training_data)
             
             # Train the model
             self.classification_model.fit(X, y)
@@ -781,65 +750,11 @@ class SLARemediationService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.root_cause_analyzer = MLRootCauseAnalyzer()
+        # Trained offline (train_root_cause_model_task); loaded once per process
+        artifact = load_root_cause_model()
+        self.root_cause_analyzer = MLRootCauseAnalyzer(artifact.model if artifact else None)
         self.remediation_strategies = self._load_remediation_strategies()
         self.active_remediations: Dict[str, RemediationExecution] = {}
-        
-        # Initialize ML model with mock training data
-        asyncio.create_task(self._initialize_ml_models())
-    
-    async def _initialize_ml_models(self):
-        """Initialize ML models with training data."""
-        try:
-            # Mock training data
-            training_data = self._generate_mock_training_data(100)
-            self.root_cause_analyzer.train_model(training_data)
-            logger.info("ML models initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize ML models: {e}")
-    
-    def _generate_mock_training_data(self, num_samples: int) -> List[Dict[str, Any]]:
-        """Generate mock training data for ML model."""
-        training_data = []
-        categories = ['infrastructure', 'code', 'external_dependency', 'configuration']
-        
-        for i in range(num_samples):
-            # Generate realistic training samples
-            category = np.random.choice(categories)
-            
-            # Generate features based on category
-            if category == 'infrastructure':
-                system_load = np.random.beta(4, 2) * 100  # Higher load
-                error_rate = np.random.exponential(3)
-                recent_deployments = np.random.poisson(0.5)
-            elif category == 'code':
-                system_load = np.random.beta(2, 4) * 100  # Lower load
-                error_rate = np.random.exponential(8)  # Higher error rate
-                recent_deployments = np.random.poisson(2)  # More deployments
-            elif category == 'external_dependency':
-                system_load = np.random.beta(3, 3) * 100  # Normal load
-                error_rate = np.random.exponential(5)
-                recent_deployments = np.random.poisson(0.8)
-            else:  # configuration
-                system_load = np.random.beta(2, 3) * 100
-                error_rate = np.random.exponential(4)
-                recent_deployments = np.random.poisson(1.2)
-            
-            training_data.append({
-                'duration': np.random.exponential(1800),  # Duration in seconds
-                'time_of_day': np.random.randint(0, 24),
-                'day_of_week': np.random.randint(0, 7),
-                'recent_deployments': recent_deployments,
-                'system_load': system_load,
-                'error_rate': error_rate,
-                'response_time_trend': np.random.normal(0, 15),
-                'concurrent_violations': np.random.poisson(1),
-                'external_service_status': np.random.beta(6, 2) * 100,
-                'resource_utilization': np.random.beta(3, 4) * 100,
-                'root_cause_category': category
-            })
-        
-        return training_data
     
     def _load_remediation_strategies(self) -> List[RemediationStrategy]:
         """Load available remediation strategies."""
@@ -0,0 +1,179 @@
+"""
+Streaming exports.
+Rows are read through a server-side cursor a chunk at a time and encoded
+incrementally as CSV, NDJSON or a JSON document, optionally gzip
+compressed, so an export's memory use does not grow with its size.
+"""
+
+import csv
+import enum
+import io
+import json
+import operator
+import uuid
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.sql import Select
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EXPORT_CHUNK_ROWS = 1000  # Rows fetched from the cursor per round trip
+WRITE_BUFFER_BYTES = 64 * 1024  # Encoded bytes collected before yielding a chunk
+
+EXPORT_FORMATS = ("csv", "ndjson", "json")
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize one record; uses orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+
+# Written by the csv module as-is (None as an empty field)
+_CSV_PLAIN_TYPES = frozenset((str, int, float, bool, Decimal, uuid.UUID, type(None)))
+
+
+def _csv_value(value: Any) -> Any:
+    if type(value) in _CSV_PLAIN_TYPES:
+        return value
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    return value
+
+
+async def stream_rows(
+    statement: Select,
+    session_factory: Optional[async_sessionmaker] = None,
+    chunk_size: int = EXPORT_CHUNK_ROWS
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield the rows of ``statement`` as mappings, ``chunk_size`` at a time
+    from a server-side cursor. Uses its own session, since a streamed
+    response outlives the request's.
+    """
+    if session_factory is None:
+        from app.db.session import AsyncSessionLocal
+        session_factory = AsyncSessionLocal
+
+    async with session_factory() as session:
+        result = await session.stream(statement.execution_options(yield_per=chunk_size))
+        async for partition in result.mappings().partitions():
+            for row in partition:
+                yield row
+
+
+async def encode_csv(
+    columns: Sequence[str],
+    rows: AsyncIterator[Dict[str, Any]],
+    header: Optional[Sequence[str]] = None
+) -> AsyncIterator[bytes]:
+    """CSV of the ``columns`` keys of each row, under ``header`` (default: the column names)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header or columns)
+    pick = operator.itemgetter(*columns)
+    async for row in rows:
+        writer.writerow([_csv_value(value) for value in pick(row)])
+        if buffer.tell() >= WRITE_BUFFER_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """One JSON object per line."""
+    pending: List[bytes] = []
+    size = 0
+    async for record in records:
+        line = dumps(dict(record)) + b"\n"
+        pending.append(line)
+        size += len(line)
+        if size >= WRITE_BUFFER_BYTES:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+async def encode_json_document(
+    header: Dict[str, Any],
+    key: str,
+    records: AsyncIterator[Dict[str, Any]]
+) -> AsyncIterator[bytes]:
+    """A JSON object with the ``header`` fields and ``records`` streamed as the array under ``key``."""
+    prefix = dumps(header)
+    yield prefix[:-1] + (b"," if header else b"") + dumps(key) + b":["
+    separator = b""
+    async for chunk in encode_ndjson(records):
+        lines = chunk.rstrip(b"\n").split(b"\n")
+        yield separator + b",".join(lines)
+        separator = b","
+    yield b"]}"
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Gzip-compress a byte stream chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """True if an ``Accept-Encoding`` header allows gzip."""
+    qualities: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def streaming_export_response(
+    chunks: AsyncIterator[bytes],
+    format_type: str,
+    filename: str,
+    gzip: bool = False
+) -> StreamingResponse:
+    """``StreamingResponse`` for an export, gzip content-encoded if requested."""
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format_type], headers=headers)
@@ -1,13 +1,17 @@
 """Celery tasks for background processing of site publishing operations."""
 
 import asyncio
-from typing import Dict, Any, Optional
+import json
+import time
+from typing import Dict, Any, List, Optional
 from celery import Celery
 from datetime import datetime, timedelta
 
 from ..core.config import settings
 from .publishing_service import PublishingService
 from .domain_manager import DomainManager
+from .workflow_dag import WorkflowDAG, DAGExecutor, DEFAULT_MAX_CONCURRENCY, get_node_type
+from .workflow_http import get_workflow_http_client, MAX_RESPONSE_CHARS
 
 # Initialize Celery app
 celery_app = Celery(
@@ -39,6 +43,8 @@ celery_app.conf.task_routes = {
     "src.services.tasks.verify_domain_task": {"queue": "domains"},
     "src.services.tasks.execute_workflow_task": {"queue": "workflows"},
     "src.services.tasks.execute_workflow_node_task": {"queue": "workflows"},
+    "src.services.tasks.resume_workflow_task": {"queue": "workflows"},
+    "src.services.tasks.resume_waiting_workflows": {"queue": "workflows"},
 }
 
 # Periodic tasks
@@ -55,6 +61,26 @@ celery_app.conf.beat_schedule = {
         "task": "src.services.tasks.cleanup_failed_builds",
         "schedule": timedelta(hours=12),  # Cleanup twice daily
     },
+    "resume-waiting-workflows": {
+        "task": "src.services.tasks.resume_waiting_workflows",
+        "schedule": timedelta(minutes=1),  # Safety net for lost delay continuations
+    },
+    "train-root-cause-model": {
+        "task": "src.services.tasks.train_root_cause_model_task",
+        "schedule": timedelta(hours=24),  # Retrain daily; serving processes only load
+    },
+    "compact-analytics-rollups": {
+        "task": "src.services.tasks.compact_analytics_rollups_task",
+        "schedule": timedelta(minutes=5),  # Idempotent; each run resumes from the watermarks
+    },
+    "create-analytics-event-partitions": {
+        "task": "src.services.tasks.create_analytics_event_partitions_task",
+        "schedule": timedelta(hours=24),  # Partitions exist months ahead, so a missed run is harmless
+    },
+    "apply-analytics-event-retention": {
+        "task": "src.services.tasks.apply_analytics_event_retention_task",
+        "schedule": timedelta(hours=24),
+    },
 }
 
 
@@ -563,6 +589,21 @@ def generate_analytics_report(site_id: str, period: str = "30d") -> Dict[str, An
 
 # Workflow Execution Tasks
 
+# Per-process event loop for workflow execution, see _get_workflow_loop
+_workflow_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# A claimed continuation is re-dispatched only after the hard time limit has
+# certainly ended the worker running it
+CONTINUATION_LEASE_SECONDS = settings.build_timeout + 60
+
+# Multipliers for delay node units
+DELAY_UNITS = {
+    "seconds": 1,
+    "minutes": 60,
+    "hours": 3600,
+    "days": 86400,
+}
+
 @celery_app.task(bind=True, name="src.services.tasks.execute_workflow_task")
 def execute_workflow_task(self, execution_id: int) -> Dict[str, Any]:
     """
@@ -594,114 +635,393 @@ def execute_workflow_task(self, execution_id: int) -> Dict[str, Any]:
                     "error": "Workflow not found"
                 }
 
+            nodes = workflow.nodes or []
+            connections = workflow.connections or []
+            workflow_settings = workflow.settings
+            trigger_data = execution.trigger_data
+
             # Update execution status to running
             execution.status = WorkflowExecutionStatus.RUNNING
             execution.started_at = datetime.utcnow()
             session.commit()
 
-        # Execute workflow nodes
-        execution_data = {}
-        node_results = []
+        return _advance_workflow(execution_id, nodes, connections, workflow_settings, trigger_data)
 
-        try:
-            # Sort nodes by execution order (trigger first, then actions)
-            nodes = workflow.nodes or []
-            trigger_nodes = [n for n in nodes if n.get('node_type') == 'trigger' or n.get('type') == 'trigger']
-            action_nodes = [n for n in nodes if n.get('node_type') != 'trigger' and n.get('type') != 'trigger']
-
-            # Execute trigger nodes first
-            for node in trigger_nodes:
-                node_result = execute_workflow_node_task.delay(execution_id, node).get()
-                node_results.append(node_result)
-                if node_result.get('status') == 'error':
-                    raise Exception(f"Trigger node failed: {node_result.get('error')}")
-
-            # Execute action nodes
-            for node in action_nodes:
-                node_result = execute_workflow_node_task.delay(execution_id, node).get()
-                node_results.append(node_result)
-                if node_result.get('status') == 'error':
-                    # Log error but continue with other nodes
-                    print(f"Action node failed: {node_result.get('error')}")
-
-            execution_data = {
-                "nodes_executed": len(node_results),
-                "node_results": node_results,
-                "trigger_data": execution.trigger_data
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
+@celery_app.task(name="src.services.tasks.resume_workflow_task")
+def resume_workflow_task(execution_id: int, generation: int) -> Dict[str, Any]:
+    """
+    Continue a workflow execution that was suspended at a delay node.
+
+    Args:
+        execution_id: Workflow execution ID
+        generation: Suspension generation the continuation was scheduled for;
+            stale or duplicate continuations are ignored
+
+    Returns:
+        Execution result
+    """
+    try:
+        from ..models.workflow import WorkflowExecution, WorkflowExecutionStatus
+        from ..core.database import get_sync_session
+
+        with get_sync_session() as session:
+            # Lock the row so only one delivery can claim this generation
+            execution = session.get(WorkflowExecution, execution_id, with_for_update=True)
+            if not execution or not execution.workflow:
+                return {
+                    "status": "error",
+                    "error": "Workflow execution not found"
+                }
+
+            dag_state = (execution.execution_data or {}).get("dag_state")
+            if execution.status != WorkflowExecutionStatus.RUNNING or not dag_state:
+                return {"status": "ignored", "execution_id": execution_id}
+            if dag_state.get("generation") != generation:
+                return {"status": "ignored", "execution_id": execution_id}
+
+            # Claim the continuation: duplicate deliveries of this generation no
+            # longer match, and the beat task only re-dispatches it once the
+            # lease has run out (the worker was killed mid-run)
+            dag_state = {
+                **dag_state,
+                "generation": generation + 1,
+                "resume_at": time.time() + CONTINUATION_LEASE_SECONDS
             }
+            execution.execution_data = {**execution.execution_data, "dag_state": dag_state}
 
-            # Update execution as successful
-            with get_sync_session() as session:
-                execution = session.get(WorkflowExecution, execution_id)
-                if execution:
-                    execution.status = WorkflowExecutionStatus.SUCCESS
-                    execution.finished_at = datetime.utcnow()
-                    execution.execution_data = execution_data
+            workflow = execution.workflow
+            nodes = workflow.nodes or []
+            connections = workflow.connections or []
+            workflow_settings = workflow.settings
+            trigger_data = execution.trigger_data
+            session.commit()
+
+        return _advance_workflow(execution_id, nodes, connections, workflow_settings, trigger_data, dag_state)
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
 
-                    if execution.started_at:
-                        execution.execution_time = int((execution.finished_at - execution.started_at).total_seconds() * 1000)
 
-                    # Update workflow success count
-                    workflow = execution.workflow
-                    if workflow:
-                        workflow.success_count += 1
+@celery_app.task(name="src.services.tasks.resume_waiting_workflows")
+def resume_waiting_workflows() -> Dict[str, Any]:
+    """
+    Periodic task re-dispatching due continuations.
 
-                    session.commit()
+    Countdown/ETA messages can be lost when a worker or broker restarts before
+    they fire; the persisted cursor makes it safe to reschedule from the database.
+
+    Returns:
+        Number of continuations dispatched
+    """
+    try:
+        from ..models.workflow import WorkflowExecution, WorkflowExecutionStatus
+        from ..core.database import get_sync_session
+        from sqlalchemy import select
+
+        resumed = 0
+        now = time.time()
+
+        with get_sync_session() as session:
+            stmt = select(WorkflowExecution).where(
+                WorkflowExecution.status == WorkflowExecutionStatus.RUNNING
+            )
+            for execution in session.execute(stmt).scalars():
+                dag_state = (execution.execution_data or {}).get("dag_state")
+                if dag_state and dag_state.get("resume_at", now + 1) <= now:
+                    resume_workflow_task.delay(execution.id, dag_state["generation"])
+                    resumed += 1
+
+        return {
+            "status": "success",
+            "resumed": resumed
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
+@celery_app.task(name="src.services.tasks.train_root_cause_model_task")
+def train_root_cause_model_task() -> Dict[str, Any]:
+    """
+    Train the SLA root cause classifier and publish it to the model registry.
+
+    Running processes pick up the new version on their next registry refresh.
 
+    Returns:
+        Registered version and its metrics
+    """
+    try:
+        from .root_cause_model import train_root_cause_model
+
+        metadata = train_root_cause_model()
+        if metadata is None:
             return {
-                "status": "success",
-                "execution_id": execution_id,
-                "execution_data": execution_data
+                "status": "skipped",
+                "reason": "insufficient training data"
             }
 
-        except Exception as node_error:
-            # Update execution as failed
-            with get_sync_session() as session:
-                execution = session.get(WorkflowExecution, execution_id)
-                if execution:
-                    execution.status = WorkflowExecutionStatus.FAILED
-                    execution.finished_at = datetime.utcnow()
-                    execution.error_message = str(node_error)
+        return {
+            "status": "success",
+            "version": metadata["version"],
+            "metrics": metadata["metrics"]
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
 
-                    if execution.started_at:
-                        execution.execution_time = int((execution.finished_at - execution.started_at).total_seconds() * 1000)
+@celery_app.task(name="src.services.tasks.compact_analytics_rollups_task")
+def compact_analytics_rollups_task() -> Dict[str, Any]:
+    """
+    Roll up complete hours and days of analytics events.
+
+    Safe to run concurrently or after a crash: buckets are replaced in the
+    transaction that advances their watermark.
+
+    Returns:
+        Number of hourly and daily buckets compacted
+    """
+    try:
+        from .analytics_rollups import compact_rollups
+
+        compacted = asyncio.run(compact_rollups())
+        return {
+            "status": "success",
+            "compacted": compacted
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
+@celery_app.task(name="src.services.tasks.create_analytics_event_partitions_task")
+def create_analytics_event_partitions_task() -> Dict[str, Any]:
+    """
+    Create upcoming monthly partitions of the analytics events table.
+
+    Returns:
+        Partition DDL executed (none unless the table is partitioned)
+    """
+    try:
+        from .analytics_retention import maintain_partitions
+
+        statements = asyncio.run(maintain_partitions())
+        return {
+            "status": "success",
+            "statements": statements
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
+@celery_app.task(name="src.services.tasks.apply_analytics_event_retention_task")
+def apply_analytics_event_retention_task() -> Dict[str, Any]:
+    """
+    Archive and remove analytics events past the retention period.
+
+    Returns:
+        Partitions dropped or rows deleted, and the archives written
+    """
+    try:
+        from .analytics_retention import apply_retention
+
+        summary = asyncio.run(apply_retention())
+        return {
+            "status": "success",
+            **summary
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
+def _advance_workflow(
+    execution_id: int,
+    nodes: List[Dict[str, Any]],
+    connections: List[Dict[str, Any]],
+    workflow_settings: Optional[Dict[str, Any]],
+    trigger_data: Optional[Dict[str, Any]],
+    dag_state: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Run every runnable node of an execution, then either finalize it or persist
+    the DAG cursor and schedule a continuation for the earliest delay node.
+    """
+    from ..models.workflow import WorkflowExecution, WorkflowExecutionStatus
+    from ..core.database import get_sync_session
+
+    # Execute workflow nodes as a DAG, dispatching independent branches concurrently
+    execution_data = {}
+
+    try:
+        dag = WorkflowDAG(nodes, connections)
+        max_concurrency = (workflow_settings or {}).get('max_concurrency', DEFAULT_MAX_CONCURRENCY)
+
+        async def run_node(node: Dict[str, Any], inputs: Dict[str, Any]) -> Dict[str, Any]:
+            return await _run_workflow_node(execution_id, node, inputs)
+
+        executor = DAGExecutor(dag, run_node, max_concurrency=max_concurrency, state=dag_state)
+        node_results = _get_workflow_loop().run_until_complete(executor.run())
+
+        for node_id, node_result in node_results.items():
+            if node_result.get('status') != 'error':
+                continue
+            if get_node_type(dag.nodes[node_id]) == 'trigger':
+                raise Exception(f"Trigger node failed: {node_result.get('error')}")
+            # Log error; independent branches have still been executed
+            print(f"Action node failed: {node_result.get('error')}")
 
-                    # Update workflow error count
-                    workflow = execution.workflow
-                    if workflow:
-                        workflow.error_count += 1
+        resume_at = executor.next_resume_at()
+        if resume_at is not None:
+            # Persist the cursor and hand the wait to the broker instead of sleeping
+            generation = (dag_state or {}).get("generation", 0) + 1
+            state = {**executor.snapshot(), "generation": generation, "resume_at": resume_at}
 
+            with get_sync_session() as session:
+                execution = session.get(WorkflowExecution, execution_id)
+                if execution:
+                    execution.execution_data = {**(execution.execution_data or {}), "dag_state": state}
                     session.commit()
 
+            resume_workflow_task.apply_async(
+                args=[execution_id, generation],
+                eta=datetime.utcfromtimestamp(resume_at)
+            )
+
             return {
-                "status": "error",
+                "status": "waiting",
                 "execution_id": execution_id,
-                "error": str(node_error)
+                "resume_at": datetime.utcfromtimestamp(resume_at).isoformat()
             }
 
-    except Exception as e:
+        execution_data = {
+            "nodes_executed": sum(1 for r in node_results.values() if r.get('status') != 'skipped'),
+            "nodes_skipped": sum(1 for r in node_results.values() if r.get('status') == 'skipped'),
+            "node_results": list(node_results.values()),
+            "trigger_data": trigger_data
+        }
+
+        # Update execution as successful
+        with get_sync_session() as session:
+            execution = session.get(WorkflowExecution, execution_id)
+            if execution:
+                execution.status = WorkflowExecutionStatus.SUCCESS
+                execution.finished_at = datetime.utcnow()
+                execution.execution_data = execution_data
+
+                if execution.started_at:
+                    execution.execution_time = int((execution.finished_at - execution.started_at).total_seconds() * 1000)
+
+                # Update workflow success count
+                workflow = execution.workflow
+                if workflow:
+                    workflow.success_count += 1
+
+                session.commit()
+
+        return {
+            "status": "success",
+            "execution_id": execution_id,
+            "execution_data": execution_data
+        }
+
+    except Exception as node_error:
+        # Update execution as failed
+        with get_sync_session() as session:
+            execution = session.get(WorkflowExecution, execution_id)
+            if execution:
+                execution.status = WorkflowExecutionStatus.FAILED
+                execution.finished_at = datetime.utcnow()
+                execution.error_message = str(node_error)
+
+                if execution.started_at:
+                    execution.execution_time = int((execution.finished_at - execution.started_at).total_seconds() * 1000)
+
+                # Update workflow error count
+                workflow = execution.workflow
+                if workflow:
+                    workflow.error_count += 1
+
+                session.commit()
+
         return {
             "status": "error",
-            "error": str(e)
+            "execution_id": execution_id,
+            "error": str(node_error)
         }
 
 
 @celery_app.task(name="src.services.tasks.execute_workflow_node_task")
-def execute_workflow_node_task(execution_id: int, node: Dict[str, Any]) -> Dict[str, Any]:
+def execute_workflow_node_task(
+    execution_id: int,
+    node: Dict[str, Any],
+    inputs: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Execute a single workflow node.
 
     Args:
         execution_id: Workflow execution ID
         node: Node configuration
+        inputs: Outputs of upstream nodes keyed by node ID
 
     Returns:
         Node execution result
     """
+    return _get_workflow_loop().run_until_complete(_run_workflow_node(execution_id, node, inputs))
+
+
+def _get_workflow_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the worker's long-lived workflow event loop.
+
+    Keeping one loop per process lets the pooled workflow HTTP client reuse
+    keep-alive connections across executions.
+    """
+    global _workflow_loop
+    if _workflow_loop is None or _workflow_loop.is_closed():
+        _workflow_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_workflow_loop)
+    return _workflow_loop
+
+
+async def _run_workflow_node(
+    execution_id: int,
+    node: Dict[str, Any],
+    inputs: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Run a workflow node on the workflow loop; shared by the node task and the DAG executor."""
     try:
         node_type = node.get('node_type') or node.get('type')
         node_id = node.get('node_id') or node.get('id')
-        parameters = node.get('parameters', {})
+        parameters = dict(node.get('parameters', {}))
+        parameters.setdefault('inputs', inputs or {})
 
         result = {
             "node_id": node_id,
@@ -724,7 +1044,7 @@ def execute_workflow_node_task(execution_id: int, node: Dict[str, Any]) -> Dict[
 
         elif node_type == 'webhook':
             # Webhook action node
-            result["output"] = _execute_webhook_node(parameters)
+            result["output"] = await _execute_webhook_node(parameters)
 
         elif node_type == 'crm_update':
             # CRM update action node
@@ -732,11 +1052,14 @@ def execute_workflow_node_task(execution_id: int, node: Dict[str, Any]) -> Dict[
 
         elif node_type == 'http_request':
             # HTTP request action node
-            result["output"] = _execute_http_request_node(parameters)
+            result["output"] = await _execute_http_request_node(parameters)
 
         elif node_type == 'delay':
-            # Delay action node
+            # Delay action node; suspends the branch instead of pinning the worker
             result["output"] = _execute_delay_node(parameters)
+            if result["output"]["delay_seconds"] > 0:
+                result["status"] = "waiting"
+                result["delay_seconds"] = result["output"]["delay_seconds"]
 
         elif node_type == 'condition':
             # Condition node
@@ -769,22 +1092,20 @@ def _execute_email_node(parameters: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _execute_webhook_node(parameters: Dict[str, Any]) -> Dict[str, Any]:
+async def _execute_webhook_node(parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Execute webhook node."""
-    import requests
-
     try:
         url = parameters.get('url')
         method = parameters.get('method', 'POST')
         headers = parameters.get('headers', {})
         data = parameters.get('data', {})
 
-        response = requests.request(method, url, json=data, headers=headers, timeout=30)
+        response = await get_workflow_http_client().request(method, url, json=data, headers=headers)
 
         return {
             "webhook_called": True,
-            "status_code": response.status_code,
-            "response": response.text[:1000]  # Limit response size
+            "status_code": response["status_code"],
+            "response": response["body"][:MAX_RESPONSE_CHARS]  # Limit response size
         }
     except Exception as e:
         return {
@@ -803,22 +1124,20 @@ def _execute_crm_update_node(parameters: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _execute_http_request_node(parameters: Dict[str, Any]) -> Dict[str, Any]:
+async def _execute_http_request_node(parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Execute HTTP request node."""
-    import requests
-
     try:
         url = parameters.get('url')
         method = parameters.get('method', 'GET')
         headers = parameters.get('headers', {})
         data = parameters.get('data')
 
-        response = requests.request(method, url, json=data, headers=headers, timeout=30)
+        response = await get_workflow_http_client().request(method, url, json=data, headers=headers)
 
         return {
             "request_sent": True,
-            "status_code": response.status_code,
-            "response_data": response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text[:1000]
+            "status_code": response["status_code"],
+            "response_data": json.loads(response["body"]) if response["content_type"].startswith('application/json') else response["body"][:MAX_RESPONSE_CHARS]
         }
     except Exception as e:
         return {
@@ -828,12 +1147,13 @@ def _execute_http_request_node(parameters: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _execute_delay_node(parameters: Dict[str, Any]) -> Dict[str, Any]:
-    """Execute delay node."""
-    import time
+    """
+    Execute delay node.
 
-    delay_seconds = parameters.get('delay', 0)
-    if delay_seconds > 0:
-        time.sleep(min(delay_seconds, 300))  # Max 5 minutes delay
+    The node does not sleep: it reports the delay and the DAG executor
+    suspends the branch until a scheduled continuation resumes it.
+    """
+    delay_seconds = float(parameters.get('delay', 0)) * DELAY_UNITS.get(parameters.get('unit', 'seconds'), 1)
 
     return {
         "delayed": True,
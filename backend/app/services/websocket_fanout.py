@@ -0,0 +1,152 @@
+"""
+Fan-out helpers for WebSocket broadcasts.
+Frames are serialized once per broadcast and handed to a bounded per-socket
+send queue drained by its own writer task, so a slow client only delays
+itself: its stale coalescible frames (e.g. cursor moves) are dropped, and
+it is disconnected when its queue overflows or a send times out.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+SEND_QUEUE_SIZE = 64
+SEND_TIMEOUT_SECONDS = 5.0
+SLOW_CONSUMER_CLOSE_CODE = 1013  # "Try Again Later"
+
+
+def dumps(message: Any) -> str:
+    """Serialize a frame once for every recipient; uses orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(message, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(message, default=str)
+
+
+class WebSocketSender:
+    """
+    Bounded send queue plus writer task for one WebSocket.
+
+    ``send`` never blocks. A frame with a ``coalesce_key`` replaces any
+    queued frame with the same key; when the queue is full the oldest
+    coalescible frame is dropped, and if there is none the socket is
+    closed and ``on_close`` is awaited so the owner can clean up.
+    """
+
+    def __init__(
+        self,
+        websocket: Any,
+        on_close: Optional[Callable[[], Awaitable[None]]] = None,
+        max_queue: int = SEND_QUEUE_SIZE,
+        send_timeout: float = SEND_TIMEOUT_SECONDS
+    ):
+        self.websocket = websocket
+        self.on_close = on_close
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.queue: Deque[Tuple[Optional[str], str]] = deque()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._writer: Optional[asyncio.Task] = None
+        self._abort_task: Optional[asyncio.Task] = None
+
+    def send(self, frame: str, coalesce_key: Optional[str] = None) -> bool:
+        """Queue a serialized frame; return False if the socket is (now) closed."""
+        if self.closed:
+            return False
+
+        if coalesce_key is not None:
+            for index, (key, _) in enumerate(self.queue):
+                if key == coalesce_key:
+                    del self.queue[index]
+                    self.dropped += 1
+                    break
+
+        if len(self.queue) >= self.max_queue:
+            for index, (key, _) in enumerate(self.queue):
+                if key is not None:
+                    del self.queue[index]
+                    self.dropped += 1
+                    break
+            else:
+                self._abort(f"send queue full ({self.max_queue} frames)")
+                return False
+
+        self.queue.append((coalesce_key, frame))
+        self._idle.clear()
+        self._wakeup.set()
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+        return True
+
+    async def _run(self) -> None:
+        while not self.closed:
+            if not self.queue:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            _, frame = self.queue.popleft()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(frame), self.send_timeout)
+            except asyncio.TimeoutError:
+                self._abort(f"send timed out after {self.send_timeout}s")
+                return
+            except Exception as e:
+                self._abort(f"send failed: {e}")
+                return
+            self.sent += 1
+
+    def _abort(self, reason: str) -> None:
+        if self.closed:
+            return
+        logger.warning(f"Disconnecting WebSocket consumer: {reason}")
+        self._stop()
+        self._abort_task = asyncio.create_task(self._close_socket())
+
+    async def _close_socket(self) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE), self.send_timeout)
+        except Exception:
+            pass
+        if self.on_close is not None:
+            try:
+                await self.on_close()
+            except Exception as e:
+                logger.error(f"Error cleaning up closed WebSocket: {e}")
+
+    def _stop(self) -> None:
+        self.closed = True
+        self.queue.clear()
+        self._idle.set()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    async def drain(self) -> None:
+        """Wait until every queued frame has been sent (or the socket closed)."""
+        await self._idle.wait()
+
+    def close(self) -> None:
+        """Stop the writer without closing the socket; used when the owner disconnects it."""
+        self._stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "closed": self.closed,
+        }
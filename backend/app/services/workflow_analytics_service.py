@@ -3,16 +3,12 @@ Workflow Analytics Service for Story 3.3
 Comprehensive analytics data collection, processing, and insights generation.
 """
 
-import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, desc, asc
-from sqlalchemy.orm import selectinload
 import logging
-import numpy as np
-from statistics import median
 import json
 
 from app.models.analytics import (
@@ -24,6 +20,17 @@ from app.schemas.analytics import (
     AnalyticsFilter, DetailedWorkflowMetrics, ConversionFunnelAnalysis,
     ROIAnalysis, ABTestResult, AnomalyDetection, RealTimeMetrics
 )
+from app.services.analytics_ingestion import get_analytics_event_buffer, get_metrics_debouncer
+from app.services.analytics_rollups import EventStats, aggregate_event_stats, combine_stats
+from app.services.conversion_funnel import (
+    DEFAULT_CONVERSION_WINDOW,
+    DEFAULT_FUNNEL_STEPS,
+    compute_funnel_counts,
+    funnel_step_rates,
+)
+from app.services.latency_sketches import load_window_sketch
+from app.services.performance_overview import DEFAULT_TREND_BUCKET, get_performance_overview
+from app.services.workflow_metrics_refresh import refresh_workflow_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -48,75 +55,55 @@ class WorkflowAnalyticsService:
         component_id: Optional[str] = None,
         user_id: Optional[str] = None
     ) -> None:
-        """Track analytics event for workflow performance."""
+        """
+        Track analytics event for workflow performance.
+
+        Events are queued on the shared ingestion buffer and written in bulk;
+        metrics refreshes for the workflow are debounced.
+        """
         try:
-            event = WorkflowAnalyticsEvent(
-                workflow_id=workflow_id,
-                execution_id=execution_id,
-                user_id=user_id,
-                event_type=event_type,
-                event_data=event_data,
-                execution_time_ms=execution_time_ms,
-                conversion_value=conversion_value,
-                revenue_impact=revenue_impact,
-                component_id=component_id
-            )
-            
-            self.db.add(event)
-            await self.db.commit()
-            
-            # Trigger async metrics aggregation
-            await self._trigger_metrics_update(workflow_id)
+            await get_analytics_event_buffer().add({
+                "workflow_id": workflow_id,
+                "execution_id": execution_id,
+                "user_id": user_id,
+                "event_type": event_type,
+                "event_data": event_data,
+                "execution_time_ms": execution_time_ms,
+                "resource_usage": None,
+                "conversion_value": conversion_value,
+                "revenue_impact": revenue_impact,
+                "component_id": component_id,
+                "source_ip": None,
+                "user_agent": None
+            })
             
         except Exception as e:
             logger.error(f"Failed to track analytics event: {e}")
-            await self.db.rollback()
             raise
     
     async def get_workflow_performance_overview(
         self,
         workflow_ids: List[str],
-        filters: AnalyticsFilter
+        filters: AnalyticsFilter,
+        bucket: str = DEFAULT_TREND_BUCKET,
+        after_workflow_id: Optional[str] = None,
+        limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Get performance overview for multiple workflows."""
-        
-        # Build base query
-        query = select(WorkflowPerformanceMetrics).where(
-            and_(
-                WorkflowPerformanceMetrics.workflow_id.in_(workflow_ids),
-                WorkflowPerformanceMetrics.period_start >= filters.date_range.start_date,
-                WorkflowPerformanceMetrics.period_end <= filters.date_range.end_date
-            )
-        ).options(selectinload(WorkflowPerformanceMetrics.workflow))
-        
-        result = await self.db.execute(query)
-        metrics = result.scalars().all()
-        
-        overview = []
-        for metric in metrics:
-            workflow_data = {
-                "workflow_id": metric.workflow_id,
-                "workflow_name": metric.workflow.name if metric.workflow else "Unknown",
-                "total_executions": metric.total_executions,
-                "success_rate": metric.success_rate,
-                "avg_execution_time_ms": metric.avg_execution_time_ms,
-                "conversion_rate": metric.conversion_rate,
-                "total_revenue": float(metric.total_revenue),
-                "roi_percentage": metric.roi_percentage,
-                "unique_users": metric.unique_users_engaged,
-                "engagement_score": metric.engagement_score,
-                
-                # Get trend data
-                "execution_trend": await self._get_execution_trend(
-                    metric.workflow_id, filters.date_range
-                ),
-                "performance_trend": await self._get_performance_trend(
-                    metric.workflow_id, filters.date_range
-                )
-            }
-            overview.append(workflow_data)
-        
-        return overview
+        """
+        Get performance overview for multiple workflows.
+
+        Trends for all workflows come from one grouped query; pages are
+        keyed on ``workflow_id`` (see ``performance_overview``).
+        """
+        return await get_performance_overview(
+            self.db,
+            workflow_ids,
+            filters.date_range.start_date,
+            filters.date_range.end_date,
+            bucket=bucket,
+            after_workflow_id=after_workflow_id,
+            limit=limit
+        )
     
     async def get_detailed_workflow_metrics(
         self,
@@ -197,53 +184,28 @@ class WorkflowAnalyticsService:
     async def analyze_conversion_funnel(
         self,
         workflow_id: str,
-        filters: AnalyticsFilter
+        filters: AnalyticsFilter,
+        conversion_window: timedelta = DEFAULT_CONVERSION_WINDOW
     ) -> ConversionFunnelAnalysis:
-        """Analyze conversion funnel for workflow."""
+        """
+        Analyze conversion funnel for workflow.
+        Counts the users who reached each step in order, within
+        ``conversion_window`` of their first step, in a single query.
+        """
         
         # Define funnel steps based on event types
-        funnel_steps = [
-            {"step": "workflow_triggered", "event_type": AnalyticsEventType.WORKFLOW_EXECUTION},
-            {"step": "workflow_completed", "event_type": AnalyticsEventType.WORKFLOW_SUCCESS},
-            {"step": "email_sent", "event_type": AnalyticsEventType.EMAIL_SENT},
-            {"step": "email_opened", "event_type": AnalyticsEventType.EMAIL_OPENED},
-            {"step": "email_clicked", "event_type": AnalyticsEventType.EMAIL_CLICKED},
-            {"step": "conversion", "event_type": AnalyticsEventType.CONVERSION}
-        ]
-        
-        funnel_data = []
-        conversion_rates = []
-        
-        previous_count = None
-        
-        for step in funnel_steps:
-            # Count events for this step
-            count_query = select(func.count(WorkflowAnalyticsEvent.id)).where(
-                and_(
-                    WorkflowAnalyticsEvent.workflow_id == workflow_id,
-                    WorkflowAnalyticsEvent.event_type == step["event_type"],
-                    WorkflowAnalyticsEvent.created_at >= filters.date_range.start_date,
-                    WorkflowAnalyticsEvent.created_at <= filters.date_range.end_date
-                )
-            )
-            
-            result = await self.db.execute(count_query)
-            count = result.scalar() or 0
-            
-            # Calculate conversion rate from previous step
-            if previous_count is not None and previous_count > 0:
-                conversion_rate = (count / previous_count) * 100
-            else:
-                conversion_rate = 100.0 if count > 0 else 0.0
-            
-            funnel_data.append({
-                "step": step["step"],
-                "count": count,
-                "conversion_rate": conversion_rate
-            })
-            
-            conversion_rates.append(conversion_rate)
-            previous_count = count
+        funnel_steps = DEFAULT_FUNNEL_STEPS
+        
+        counts = await compute_funnel_counts(
+            self.db,
+            workflow_id,
+            filters.date_range.start_date,
+            filters.date_range.end_date,
+            funnel_steps,
+            conversion_window
+        )
+        funnel_data = funnel_step_rates(funnel_steps, counts)
+        conversion_rates = [step["conversion_rate"] for step in funnel_data]
         
         # Identify drop-off points
         drop_off_points = []
@@ -351,151 +313,47 @@ class WorkflowAnalyticsService:
     # === Private Helper Methods ===
     
     async def _trigger_metrics_update(self, workflow_id: str) -> None:
-        """Trigger asynchronous metrics aggregation."""
-        # This would typically be sent to a background job queue
-        # For now, we'll update metrics directly with a short delay
-        asyncio.create_task(self._delayed_metrics_update(workflow_id))
-    
-    async def _delayed_metrics_update(self, workflow_id: str) -> None:
-        """Update metrics with a delay to batch updates."""
-        await asyncio.sleep(5)  # Wait 5 seconds to batch updates
-        await self._update_workflow_metrics(workflow_id)
+        """Schedule a debounced metrics aggregation for the workflow."""
+        get_metrics_debouncer().mark_dirty(workflow_id)
     
     async def _update_workflow_metrics(self, workflow_id: str) -> None:
-        """Update aggregated metrics for a workflow."""
+        """Update aggregated metrics for a workflow over the last 30 days."""
         try:
-            # Calculate metrics for the last 30 days
-            end_date = datetime.utcnow()
-            start_date = end_date - timedelta(days=30)
-            
-            # Get execution stats
-            execution_stats = await self._calculate_execution_stats(
-                workflow_id, start_date, end_date
-            )
-            
-            # Get business metrics
-            business_stats = await self._calculate_business_stats(
-                workflow_id, start_date, end_date
-            )
-            
-            # Get cost metrics
-            cost_stats = await self._calculate_cost_stats(
-                workflow_id, start_date, end_date
-            )
-            
-            # Update or create metrics record
-            existing_query = select(WorkflowPerformanceMetrics).where(
-                WorkflowPerformanceMetrics.workflow_id == workflow_id
-            )
-            result = await self.db.execute(existing_query)
-            existing_metrics = result.scalar_one_or_none()
-            
-            if existing_metrics:
-                # Update existing record
-                existing_metrics.period_start = start_date
-                existing_metrics.period_end = end_date
-                existing_metrics.total_executions = execution_stats["total"]
-                existing_metrics.successful_executions = execution_stats["successful"]
-                existing_metrics.failed_executions = execution_stats["failed"]
-                existing_metrics.success_rate = execution_stats["success_rate"]
-                existing_metrics.avg_execution_time_ms = execution_stats["avg_time"]
-                existing_metrics.median_execution_time_ms = execution_stats["median_time"]
-                existing_metrics.p95_execution_time_ms = execution_stats["p95_time"]
-                
-                # Business metrics
-                existing_metrics.total_conversions = business_stats["conversions"]
-                existing_metrics.conversion_rate = business_stats["conversion_rate"]
-                existing_metrics.total_revenue = business_stats["revenue"]
-                existing_metrics.avg_revenue_per_execution = business_stats["avg_revenue"]
-                existing_metrics.unique_users_engaged = business_stats["unique_users"]
-                existing_metrics.total_interactions = business_stats["interactions"]
-                existing_metrics.engagement_score = business_stats["engagement_score"]
-                
-                # Cost metrics
-                existing_metrics.total_execution_cost = cost_stats["total_cost"]
-                existing_metrics.cost_per_execution = cost_stats["cost_per_execution"]
-                existing_metrics.roi_percentage = cost_stats["roi"]
-                
-            else:
-                # Create new record
-                new_metrics = WorkflowPerformanceMetrics(
-                    workflow_id=workflow_id,
-                    user_id="system",  # TODO: Get from workflow
-                    period_start=start_date,
-                    period_end=end_date,
-                    **execution_stats,
-                    **business_stats,
-                    **cost_stats
-                )
-                self.db.add(new_metrics)
-            
+            # Slides the stored window counters forward instead of rescanning 30 days
+            await refresh_workflow_metrics(self.db, workflow_id)
             await self.db.commit()
             
         except Exception as e:
             logger.error(f"Failed to update workflow metrics: {e}")
             await self.db.rollback()
     
+    async def _event_stats(
+        self, workflow_id: str, start_date: datetime, end_date: datetime
+    ) -> Dict[AnalyticsEventType, EventStats]:
+        """Per event type aggregates, read from the hourly/daily rollups where complete."""
+        return await aggregate_event_stats(self.db, workflow_id, start_date, end_date)
+    
     async def _calculate_execution_stats(
         self, workflow_id: str, start_date: datetime, end_date: datetime
     ) -> Dict[str, Any]:
         """Calculate execution statistics."""
         
-        # Get execution counts
-        execution_query = select(
-            func.count(WorkflowAnalyticsEvent.id).label("total"),
-            func.sum(
-                func.case(
-                    (WorkflowAnalyticsEvent.event_type == AnalyticsEventType.WORKFLOW_SUCCESS, 1),
-                    else_=0
-                )
-            ).label("successful"),
-            func.sum(
-                func.case(
-                    (WorkflowAnalyticsEvent.event_type == AnalyticsEventType.WORKFLOW_FAILURE, 1),
-                    else_=0
-                )
-            ).label("failed"),
-            func.avg(WorkflowAnalyticsEvent.execution_time_ms).label("avg_time")
-        ).where(
-            and_(
-                WorkflowAnalyticsEvent.workflow_id == workflow_id,
-                WorkflowAnalyticsEvent.event_type.in_([
-                    AnalyticsEventType.WORKFLOW_EXECUTION,
-                    AnalyticsEventType.WORKFLOW_SUCCESS,
-                    AnalyticsEventType.WORKFLOW_FAILURE
-                ]),
-                WorkflowAnalyticsEvent.created_at >= start_date,
-                WorkflowAnalyticsEvent.created_at <= end_date
-            )
-        )
-        
-        result = await self.db.execute(execution_query)
-        stats = result.first()
+        stats = await self._event_stats(workflow_id, start_date, end_date)
+        execution = combine_stats(stats, [
+            AnalyticsEventType.WORKFLOW_EXECUTION,
+            AnalyticsEventType.WORKFLOW_SUCCESS,
+            AnalyticsEventType.WORKFLOW_FAILURE
+        ])
         
-        total = stats.total or 0
-        successful = stats.successful or 0
-        failed = stats.failed or 0
-        avg_time = stats.avg_time or 0.0
+        total = execution.event_count
+        successful = stats.get(AnalyticsEventType.WORKFLOW_SUCCESS, EventStats()).event_count
+        failed = stats.get(AnalyticsEventType.WORKFLOW_FAILURE, EventStats()).event_count
+        avg_time = execution.avg_execution_time_ms
         
-        # Calculate percentiles for execution time
-        time_query = select(WorkflowAnalyticsEvent.execution_time_ms).where(
-            and_(
-                WorkflowAnalyticsEvent.workflow_id == workflow_id,
-                WorkflowAnalyticsEvent.execution_time_ms.isnot(None),
-                WorkflowAnalyticsEvent.created_at >= start_date,
-                WorkflowAnalyticsEvent.created_at <= end_date
-            )
-        )
-        
-        time_result = await self.db.execute(time_query)
-        execution_times = [row[0] for row in time_result.fetchall() if row[0] is not None]
-        
-        if execution_times:
-            median_time = median(execution_times)
-            p95_time = np.percentile(execution_times, 95)
-        else:
-            median_time = 0.0
-            p95_time = 0.0
+        # Percentiles come from the merged hourly sketches rather than raw rows
+        latency_sketch = await load_window_sketch(self.db, workflow_id, start_date, end_date)
+        median_time = latency_sketch.quantile(0.5)
+        p95_time = latency_sketch.quantile(0.95)
         
         return {
             "total_executions": total,
@@ -512,17 +370,16 @@ class WorkflowAnalyticsService:
     ) -> Dict[str, Any]:
         """Calculate business metrics."""
         
-        # Get conversion and revenue stats
-        business_query = select(
-            func.count(
-                func.case(
-                    (WorkflowAnalyticsEvent.event_type == AnalyticsEventType.CONVERSION, 1),
-                    else_=None
-                )
-            ).label("conversions"),
-            func.sum(WorkflowAnalyticsEvent.revenue_impact).label("revenue"),
-            func.count(func.distinct(WorkflowAnalyticsEvent.user_id)).label("unique_users"),
-            func.count(WorkflowAnalyticsEvent.id).label("total_interactions")
+        stats = await self._event_stats(workflow_id, start_date, end_date)
+        all_events = combine_stats(stats, stats.keys())
+        
+        conversions = stats.get(AnalyticsEventType.CONVERSION, EventStats()).event_count
+        revenue = all_events.revenue_sum
+        interactions = all_events.event_count
+        
+        # Distinct users cannot be summed across buckets, so this stays a raw query
+        unique_users_query = select(
+            func.count(func.distinct(WorkflowAnalyticsEvent.user_id))
         ).where(
             and_(
                 WorkflowAnalyticsEvent.workflow_id == workflow_id,
@@ -530,17 +387,10 @@ class WorkflowAnalyticsService:
                 WorkflowAnalyticsEvent.created_at <= end_date
             )
         )
-        
-        result = await self.db.execute(business_query)
-        stats = result.first()
-        
-        conversions = stats.conversions or 0
-        revenue = stats.revenue or Decimal('0.00')
-        unique_users = stats.unique_users or 0
-        interactions = stats.total_interactions or 0
+        unique_users = (await self.db.execute(unique_users_query)).scalar() or 0
         
         # Calculate derived metrics
-        total_executions = await self._get_total_executions(workflow_id, start_date, end_date)
+        total_executions = stats.get(AnalyticsEventType.WORKFLOW_EXECUTION, EventStats()).event_count
         conversion_rate = conversions / total_executions if total_executions > 0 else 0.0
         avg_revenue = revenue / total_executions if total_executions > 0 else Decimal('0.00')
         engagement_score = min((interactions / unique_users) * 10, 100) if unique_users > 0 else 0.0
@@ -578,22 +428,10 @@ class WorkflowAnalyticsService:
         cost_result = await self.db.execute(cost_query)
         total_cost = cost_result.scalar() or Decimal('0.00')
         
-        # Get revenue for ROI calculation
-        revenue_query = select(
-            func.sum(WorkflowAnalyticsEvent.revenue_impact)
-        ).where(
-            and_(
-                WorkflowAnalyticsEvent.workflow_id == workflow_id,
-                WorkflowAnalyticsEvent.created_at >= start_date,
-                WorkflowAnalyticsEvent.created_at <= end_date
-            )
-        )
-        
-        revenue_result = await self.db.execute(revenue_query)
-        total_revenue = revenue_result.scalar() or Decimal('0.00')
-        
-        # Calculate metrics
-        total_executions = await self._get_total_executions(workflow_id, start_date, end_date)
+        # Revenue and executions for ROI come from the rollups
+        stats = await self._event_stats(workflow_id, start_date, end_date)
+        total_revenue = combine_stats(stats, stats.keys()).revenue_sum
+        total_executions = stats.get(AnalyticsEventType.WORKFLOW_EXECUTION, EventStats()).event_count
         cost_per_execution = total_cost / total_executions if total_executions > 0 else Decimal('0.00')
         
         if total_cost > 0:
@@ -611,17 +449,10 @@ class WorkflowAnalyticsService:
         self, workflow_id: str, start_date: datetime, end_date: datetime
     ) -> int:
         """Get total executions count."""
-        query = select(func.count(WorkflowAnalyticsEvent.id)).where(
-            and_(
-                WorkflowAnalyticsEvent.workflow_id == workflow_id,
-                WorkflowAnalyticsEvent.event_type == AnalyticsEventType.WORKFLOW_EXECUTION,
-                WorkflowAnalyticsEvent.created_at >= start_date,
-                WorkflowAnalyticsEvent.created_at <= end_date
-            )
+        stats = await aggregate_event_stats(
+            self.db, workflow_id, start_date, end_date, [AnalyticsEventType.WORKFLOW_EXECUTION]
         )
-        
-        result = await self.db.execute(query)
-        return result.scalar() or 0
+        return stats.get(AnalyticsEventType.WORKFLOW_EXECUTION, EventStats()).event_count
     
     # Additional helper methods would be implemented here...
     # _get_execution_trend, _get_performance_trend, _get_time_series_data, etc.
\ No newline at end of file
@@ -7,7 +7,7 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Optional, Any
 from enum import Enum
 from dataclasses import dataclass, asdict
 from sqlalchemy.orm import Session
@@ -17,6 +17,8 @@ from app.core.database import get_session
 from app.models.workflow import Workflow, WorkflowExecution, WorkflowTrigger, WorkflowExecutionStatus, NodeType
 from app.services.ai_service import AIService
 from app.services.github_integration import GitHubService
+from app.services.workflow_conditions import WorkflowCondition  # noqa: F401  (re-exported; moved to workflow_conditions)
+from app.services.workflow_triggers import TriggerIndex
 
 # Import debugging service for real-time monitoring
 try:
@@ -54,38 +56,6 @@ class ActionType(Enum):
     CREATE_BRANCH = "create_branch"
     UPDATE_STATUS = "update_status"
 
-@dataclass
-class WorkflowCondition:
-    """Represents a condition in workflow automation"""
-    field: str
-    operator: str  # eq, ne, gt, lt, gte, lte, in, not_in, contains
-    value: Union[str, int, float, bool, List[Any]]
-    
-    def evaluate(self, context: Dict[str, Any]) -> bool:
-        """Evaluate the condition against the provided context"""
-        field_value = context.get(self.field)
-        
-        if self.operator == "eq":
-            return field_value == self.value
-        elif self.operator == "ne":
-            return field_value != self.value
-        elif self.operator == "gt":
-            return field_value > self.value
-        elif self.operator == "lt":
-            return field_value < self.value
-        elif self.operator == "gte":
-            return field_value >= self.value
-        elif self.operator == "lte":
-            return field_value <= self.value
-        elif self.operator == "in":
-            return field_value in self.value
-        elif self.operator == "not_in":
-            return field_value not in self.value
-        elif self.operator == "contains":
-            return self.value in str(field_value)
-        else:
-            raise ValueError(f"Unknown operator: {self.operator}")
-
 @dataclass
 class WorkflowAction:
     """Represents an action in workflow automation"""
@@ -104,6 +74,7 @@ class WorkflowEngine:
         self.ai_service = ai_service or AIService()
         self.github_service = github_service or GitHubService()
         self.active_workflows: Dict[int, Workflow] = {}
+        self.trigger_index = TriggerIndex()
         self.execution_queue = asyncio.Queue()
         self.debug_service = None  # Will be initialized when needed
         
@@ -126,40 +97,41 @@ class WorkflowEngine:
         with get_session() as session:
             workflows = session.query(Workflow).filter(Workflow.is_active == True).all()
             
+            self.active_workflows.clear()
             for workflow in workflows:
                 self.active_workflows[workflow.id] = workflow
                 logger.info(f"📋 Loaded workflow: {workflow.name} ({workflow.trigger_type})")
+            self.trigger_index.rebuild(self.active_workflows.values())
+            
+    def update_workflow(self, workflow: Workflow):
+        """Re-index a created or updated workflow; inactive workflows are dropped"""
+        if workflow.is_active:
+            self.active_workflows[workflow.id] = workflow
+            self.trigger_index.add(workflow)
+        else:
+            self.remove_workflow(workflow.id)
+            
+    def remove_workflow(self, workflow_id: int):
+        """Stop dispatching triggers to a deleted or deactivated workflow"""
+        self.active_workflows.pop(workflow_id, None)
+        self.trigger_index.remove(workflow_id)
                 
     async def register_trigger(self, trigger_type: TriggerType, payload: Dict[str, Any]):
         """Register a trigger event that may activate workflows"""
         logger.info(f"🔔 Trigger received: {trigger_type.value}")
         
-        # Find workflows that match this trigger
-        matching_workflows = []
-        for workflow in self.active_workflows.values():
-            if workflow.trigger_type == trigger_type.value:
-                matching_workflows.append(workflow)
-                
-        # Process each matching workflow
-        for workflow in matching_workflows:
-            await self.evaluate_workflow(workflow, payload)
+        # Only workflows indexed under this trigger and the payload's key attributes can match
+        for compiled in self.trigger_index.candidates(trigger_type, payload):
+            await self.evaluate_workflow(compiled.workflow, payload)
             
     async def evaluate_workflow(self, workflow: Workflow, context: Dict[str, Any]):
         """Evaluate workflow conditions and execute if they match"""
         try:
-            # Parse workflow configuration
-            config = json.loads(workflow.configuration) if workflow.configuration else {}
-            conditions = config.get('conditions', [])
-            
-            # Check if all conditions are met
-            conditions_met = True
-            for condition_data in conditions:
-                condition = WorkflowCondition(**condition_data)
-                if not condition.evaluate(context):
-                    conditions_met = False
-                    break
+            compiled = self.trigger_index.get(workflow)
+            if compiled is None:
+                return
                     
-            if conditions_met:
+            if compiled.matches(context):
                 logger.info(f"✅ Workflow conditions met for: {workflow.name}")
                 await self.execute_workflow(workflow, context)
             else:
@@ -201,9 +173,9 @@ class WorkflowEngine:
                     except Exception as e:
                         logger.warning(f"Failed to send debug notification: {e}")
                 
-            # Parse actions from configuration
-            config = json.loads(workflow.configuration) if workflow.configuration else {}
-            actions = config.get('actions', [])
+            # Actions from the cached configuration
+            compiled = self.trigger_index.get(workflow)
+            actions = compiled.actions if compiled else []
             
             # Execute each action with debugging support
             success_count = 0
@@ -0,0 +1,249 @@
+"""
+Workflow condition trees and their compiler.
+Conditions are comparisons on payload fields combined with all/any/not.
+``parse_condition_tree`` turns the stored JSON into a small AST whose nodes
+can interpret themselves (``evaluate``); ``compile_condition`` turns the
+same AST into nested closures with operators, regexes, membership sets and
+field paths resolved up front, which is what dispatch runs.
+"""
+
+import operator
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+COMPARISON_OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "gte": operator.ge,
+    "lte": operator.le,
+}
+OPERATORS = tuple(COMPARISON_OPERATORS) + ("in", "not_in", "contains", "regex", "between")
+
+_MISSING = object()
+
+
+def resolve_field(context: Dict[str, Any], field: str) -> Any:
+    """
+    Value of ``field`` in ``context``: the key itself if present, otherwise
+    a dotted path into nested mappings (``"form.email"``); None if absent.
+    """
+    value = context.get(field, _MISSING)
+    if value is not _MISSING:
+        return value
+    if "." not in field:
+        return None
+    value = context
+    for key in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+@dataclass
+class WorkflowCondition:
+    """Represents a condition in workflow automation"""
+    field: str
+    operator: str  # eq, ne, gt, lt, gte, lte, in, not_in, contains, regex, between
+    value: Union[str, int, float, bool, List[Any]]
+
+    def evaluate(self, context: Dict[str, Any]) -> bool:
+        """Evaluate the condition against the provided context"""
+        field_value = resolve_field(context, self.field)
+
+        if self.operator == "eq":
+            return field_value == self.value
+        elif self.operator == "ne":
+            return field_value != self.value
+        elif self.operator == "gt":
+            return field_value > self.value
+        elif self.operator == "lt":
+            return field_value < self.value
+        elif self.operator == "gte":
+            return field_value >= self.value
+        elif self.operator == "lte":
+            return field_value <= self.value
+        elif self.operator == "in":
+            return field_value in self.value
+        elif self.operator == "not_in":
+            return field_value not in self.value
+        elif self.operator == "contains":
+            return self.value in str(field_value)
+        elif self.operator == "regex":
+            return field_value is not None and re.search(self.value, str(field_value)) is not None
+        elif self.operator == "between":
+            low, high = self.value
+            return low <= field_value <= high
+        else:
+            raise ValueError(f"Unknown operator: {self.operator}")
+
+
+@dataclass
+class AllOf:
+    """True if every child holds (true when empty)."""
+    children: List[Any]
+
+    def evaluate(self, context: Dict[str, Any]) -> bool:
+        return all(child.evaluate(context) for child in self.children)
+
+
+@dataclass
+class AnyOf:
+    """True if some child holds (false when empty)."""
+    children: List[Any]
+
+    def evaluate(self, context: Dict[str, Any]) -> bool:
+        return any(child.evaluate(context) for child in self.children)
+
+
+@dataclass
+class Not:
+    child: Any
+
+    def evaluate(self, context: Dict[str, Any]) -> bool:
+        return not self.child.evaluate(context)
+
+
+ConditionNode = Union[WorkflowCondition, AllOf, AnyOf, Not]
+
+
+def parse_condition_tree(data: Any) -> ConditionNode:
+    """
+    Build the AST for stored conditions.
+
+    A list is an implicit ``all`` (the original flat format); a mapping is
+    ``{"all": [...]}`` / ``{"and": [...]}``, ``{"any": [...]}`` /
+    ``{"or": [...]}``, ``{"not": node}`` or a ``field``/``operator``/``value``
+    comparison.
+    """
+    if isinstance(data, list):
+        return AllOf([parse_condition_tree(child) for child in data])
+    if not isinstance(data, dict):
+        raise ValueError(f"Invalid condition: {data!r}")
+
+    for key, node_type in (("all", AllOf), ("and", AllOf), ("any", AnyOf), ("or", AnyOf)):
+        if key in data:
+            return node_type([parse_condition_tree(child) for child in data[key]])
+    if "not" in data:
+        return Not(parse_condition_tree(data["not"]))
+
+    condition = WorkflowCondition(**data)
+    if condition.operator not in OPERATORS:
+        raise ValueError(f"Unknown operator: {condition.operator}")
+    if condition.operator == "between" and (
+        not isinstance(condition.value, (list, tuple)) or len(condition.value) != 2
+    ):
+        raise ValueError(f"between needs [low, high], got {condition.value!r}")
+    return condition
+
+
+def _field_getter(field: str) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """None for plain keys (callers inline ``context.get``), else ``resolve_field`` with the path pre-split."""
+    if "." not in field:
+        return None
+    path = tuple(field.split("."))
+
+    def get(context: Dict[str, Any]) -> Any:
+        value = context.get(field, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = context
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    return get
+
+
+def _compile_comparison(condition: WorkflowCondition) -> Predicate:
+    field, value = condition.field, condition.value
+    getter = _field_getter(field)
+    op = condition.operator
+
+    if op in COMPARISON_OPERATORS:
+        compare = COMPARISON_OPERATORS[op]
+        if getter is None:
+            return lambda context: compare(context.get(field), value)
+        return lambda context: compare(getter(context), value)
+
+    if op in ("in", "not_in"):
+        negate = op == "not_in"
+        members = None
+        if isinstance(value, (list, tuple)):  # Strings keep substring semantics
+            try:
+                members = frozenset(value)
+            except TypeError:
+                pass
+
+        def membership(context: Dict[str, Any]) -> bool:
+            field_value = context.get(field) if getter is None else getter(context)
+            if members is not None:
+                try:
+                    return (field_value in members) != negate
+                except TypeError:
+                    pass  # Unhashable field value: fall back to the list's ==
+            return (field_value in value) != negate
+        return membership
+
+    if op == "contains":
+        if getter is None:
+            return lambda context: value in str(context.get(field))
+        return lambda context: value in str(getter(context))
+
+    if op == "regex":
+        search = re.compile(value).search
+
+        def matches(context: Dict[str, Any]) -> bool:
+            field_value = context.get(field) if getter is None else getter(context)
+            return field_value is not None and search(str(field_value)) is not None
+        return matches
+
+    low, high = value
+    if getter is None:
+        return lambda context: low <= context.get(field) <= high
+    return lambda context: low <= getter(context) <= high
+
+
+def compile_condition(node: ConditionNode) -> Predicate:
+    """Compile an AST into a predicate equivalent to ``node.evaluate``."""
+    if isinstance(node, WorkflowCondition):
+        return _compile_comparison(node)
+
+    if isinstance(node, Not):
+        child = compile_condition(node.child)
+        return lambda context: not child(context)
+
+    children = [compile_condition(child) for child in node.children]
+    if isinstance(node, AllOf):
+        if not children:
+            return lambda context: True
+        if len(children) == 1:
+            return children[0]
+        if len(children) == 2:
+            first, second = children
+            return lambda context: bool(first(context) and second(context))
+
+        def all_of(context: Dict[str, Any]) -> bool:
+            for child in children:
+                if not child(context):
+                    return False
+            return True
+        return all_of
+
+    if not children:
+        return lambda context: False
+    if len(children) == 1:
+        return children[0]
+
+    def any_of(context: Dict[str, Any]) -> bool:
+        for child in children:
+            if child(context):
+                return True
+        return False
+    return any_of
@@ -0,0 +1,231 @@
+"""
+DAG scheduler for workflow execution.
+Builds a dependency graph from ``Workflow.nodes``/``connections`` and runs every
+ready node concurrently, propagating outputs along edges.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+# Node run states tracked by the scheduler
+NODE_PENDING = "pending"
+NODE_SUCCESS = "success"
+NODE_ERROR = "error"
+NODE_SKIPPED = "skipped"
+NODE_WAITING = "waiting"
+
+NodeRunner = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class WorkflowGraphError(ValueError):
+    """Raised when workflow nodes/connections do not form a valid DAG."""
+
+
+def get_node_id(node: Dict[str, Any]) -> Optional[str]:
+    """Return the identifier of a workflow node definition."""
+    return node.get('node_id') or node.get('id')
+
+
+def get_node_type(node: Dict[str, Any]) -> Optional[str]:
+    """Return the type of a workflow node definition."""
+    return node.get('node_type') or node.get('type')
+
+
+class WorkflowDAG:
+    """Directed acyclic graph of workflow nodes."""
+
+    def __init__(self, nodes: List[Dict[str, Any]], connections: List[Dict[str, Any]]):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.predecessors: Dict[str, Set[str]] = {}
+        self.successors: Dict[str, Set[str]] = {}
+
+        for node in nodes or []:
+            node_id = get_node_id(node)
+            if not node_id:
+                raise WorkflowGraphError("Node must have an ID")
+            if node_id in self.nodes:
+                raise WorkflowGraphError(f"Duplicate node ID: {node_id}")
+            self.nodes[node_id] = node
+            self.predecessors[node_id] = set()
+            self.successors[node_id] = set()
+
+        for connection in connections or []:
+            source = connection.get('source') or connection.get('sourceId')
+            target = connection.get('target') or connection.get('targetId')
+            if source not in self.nodes or target not in self.nodes:
+                raise WorkflowGraphError("Connection references non-existent node")
+            self.successors[source].add(target)
+            self.predecessors[target].add(source)
+
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm; trigger nodes are preferred among ready nodes."""
+        in_degree = {node_id: len(preds) for node_id, preds in self.predecessors.items()}
+        ready = deque(sorted(
+            (node_id for node_id, degree in in_degree.items() if degree == 0),
+            key=lambda node_id: get_node_type(self.nodes[node_id]) != 'trigger'
+        ))
+        order = []
+
+        while ready:
+            node_id = ready.popleft()
+            order.append(node_id)
+            for successor in self.successors[node_id]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    ready.append(successor)
+
+        if len(order) != len(self.nodes):
+            raise WorkflowGraphError("Workflow connections contain a cycle")
+        return order
+
+    def descendants(self, node_id: str) -> Set[str]:
+        """Return every node reachable from ``node_id``."""
+        seen: Set[str] = set()
+        stack = list(self.successors[node_id])
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(self.successors[current])
+        return seen
+
+
+class DAGExecutor:
+    """
+    Asyncio executor that dispatches every ready node concurrently.
+
+    Each node receives the outputs of its direct predecessors keyed by node id.
+    When a node fails, all of its descendants are marked skipped while
+    independent branches keep running.
+
+    A node may return status ``waiting`` with ``delay_seconds`` to suspend its
+    branch. The run then ends once nothing else is runnable; callers persist
+    ``snapshot()`` and construct a new executor with ``state=`` after
+    ``next_resume_at()`` to continue from the stored cursor.
+    """
+
+    def __init__(
+        self,
+        dag: WorkflowDAG,
+        run_node: NodeRunner,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        state: Optional[Dict[str, Any]] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.dag = dag
+        self.run_node = run_node
+        self.max_concurrency = max(1, max_concurrency)
+        self.clock = clock
+        self.statuses: Dict[str, str] = {node_id: NODE_PENDING for node_id in dag.nodes}
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+        if state:
+            self.statuses.update({
+                node_id: status for node_id, status in state.get('statuses', {}).items()
+                if node_id in self.statuses
+            })
+            self.results.update({
+                node_id: result for node_id, result in state.get('results', {}).items()
+                if node_id in self.statuses
+            })
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable cursor for resuming this run later."""
+        return {"statuses": dict(self.statuses), "results": dict(self.results)}
+
+    def next_resume_at(self) -> Optional[float]:
+        """Earliest timestamp at which a waiting node becomes due, if any."""
+        due = [
+            self.results[node_id]['resume_at']
+            for node_id, status in self.statuses.items() if status == NODE_WAITING
+        ]
+        return min(due) if due else None
+
+    def release_due(self) -> List[str]:
+        """Mark waiting nodes whose delay has elapsed as succeeded."""
+        now = self.clock()
+        released = []
+        for node_id, status in self.statuses.items():
+            if status == NODE_WAITING and self.results[node_id]['resume_at'] <= now:
+                self.statuses[node_id] = NODE_SUCCESS
+                self.results[node_id] = {**self.results[node_id], "status": NODE_SUCCESS}
+                released.append(node_id)
+        return released
+
+    def _inputs_for(self, node_id: str) -> Dict[str, Any]:
+        return {
+            pred: self.results[pred].get('output', {})
+            for pred in self.dag.predecessors[node_id]
+        }
+
+    def _is_ready(self, node_id: str) -> bool:
+        return self.statuses[node_id] == NODE_PENDING and all(
+            self.statuses[pred] == NODE_SUCCESS for pred in self.dag.predecessors[node_id]
+        )
+
+    def _skip_descendants(self, node_id: str) -> None:
+        for descendant in self.dag.descendants(node_id):
+            if self.statuses[descendant] == NODE_PENDING:
+                self.statuses[descendant] = NODE_SKIPPED
+                self.results[descendant] = {
+                    "node_id": descendant,
+                    "node_type": get_node_type(self.dag.nodes[descendant]),
+                    "status": NODE_SKIPPED,
+                    "skipped_because": node_id
+                }
+
+    async def _execute(self, node_id: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        node = self.dag.nodes[node_id]
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await self.run_node(node, self._inputs_for(node_id))
+            except Exception as e:
+                logger.error(f"Workflow node {node_id} raised: {e}")
+                result = {
+                    "node_id": node_id,
+                    "node_type": get_node_type(node),
+                    "status": NODE_ERROR,
+                    "error": str(e)
+                }
+            result.setdefault("duration_ms", int((time.perf_counter() - started) * 1000))
+            return result
+
+    async def run(self) -> Dict[str, Dict[str, Any]]:
+        """Run every runnable node and return per-node results in topological order."""
+        self.release_due()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        running: Dict[asyncio.Task, str] = {}
+
+        def dispatch_ready() -> None:
+            for node_id in self.dag.order:
+                if self._is_ready(node_id) and node_id not in running.values():
+                    running[asyncio.ensure_future(self._execute(node_id, semaphore))] = node_id
+
+        dispatch_ready()
+        while running:
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node_id = running.pop(task)
+                result = task.result()
+                self.results[node_id] = result
+                if result.get('status') == NODE_SUCCESS:
+                    self.statuses[node_id] = NODE_SUCCESS
+                elif result.get('status') == NODE_WAITING:
+                    result.setdefault('resume_at', self.clock() + float(result.get('delay_seconds', 0)))
+                    self.statuses[node_id] = NODE_WAITING
+                else:
+                    self.statuses[node_id] = NODE_ERROR
+                    self._skip_descendants(node_id)
+            dispatch_ready()
+
+        return {node_id: self.results[node_id] for node_id in self.dag.order if node_id in self.results}
@@ -7,8 +7,8 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select, and_, or_, func, desc
 from sqlalchemy.orm import selectinload
 
@@ -19,11 +19,67 @@ from app.models.workflow import (
 )
 from app.models.user import User
 from app.services.base_service import BaseService
+from app.services.streaming_export import encode_csv, encode_json_document, encode_ndjson, stream_rows
 from app.api.v1.endpoints.workflow_websocket import connection_manager
 
 logger = logging.getLogger(__name__)
 
 
+# Execution log export columns (row keys) and their CSV header
+EXECUTION_EXPORT_COLUMNS = (
+    'execution_id', 'status', 'started_at', 'finished_at', 'execution_time',
+    'node_id', 'node_name', 'node_type', 'step_status', 'execution_time_ms',
+    'step_error_message', 'memory_usage_mb', 'cpu_usage_percent'
+)
+EXECUTION_EXPORT_HEADER = (
+    'Execution ID', 'Status', 'Started At', 'Finished At', 'Duration (ms)',
+    'Node ID', 'Node Name', 'Node Type', 'Node Status', 'Node Duration (ms)',
+    'Error Message', 'Memory Usage (MB)', 'CPU Usage (%)'
+)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+async def _group_execution_steps(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """Fold consecutive execution/step join rows into one record per execution."""
+    current: Optional[Dict[str, Any]] = None
+    async for row in rows:
+        if current is None or current['execution_id'] != row['execution_id']:
+            if current is not None:
+                yield current
+            current = {
+                'execution_id': row['execution_id'],
+                'status': row['status'].value,
+                'started_at': _isoformat(row['started_at']),
+                'finished_at': _isoformat(row['finished_at']),
+                'execution_time': row['execution_time'],
+                'trigger_data': row['trigger_data'],
+                'error_message': row['error_message'],
+                'steps': []
+            }
+        
+        if row['node_id'] is not None:
+            current['steps'].append({
+                'node_id': row['node_id'],
+                'node_name': row['node_name'],
+                'node_type': row['node_type'].value,
+                'status': row['step_status'].value,
+                'execution_time_ms': row['execution_time_ms'],
+                'input_data': row['input_data'],
+                'output_data': row['output_data'],
+                'error_message': row['step_error_message'],
+                'performance_metrics': {
+                    'memory_usage_mb': row['memory_usage_mb'],
+                    'cpu_usage_percent': row['cpu_usage_percent']
+                }
+            })
+    
+    if current is not None:
+        yield current
+
+
 class WorkflowDebugService:
     """Service for workflow debugging and real-time monitoring."""
     
@@ -353,61 +409,63 @@ class WorkflowDebugService:
             'node_performance': node_performance
         }
 
-    async def export_execution_logs(self, workflow_id: int, 
-                                  format_type: str = 'json',
-                                  execution_ids: Optional[List[int]] = None) -> Dict[str, Any]:
-        """Export execution logs and performance data."""
-        
-        # Build query for executions
-        query = select(WorkflowExecution).options(
-            selectinload(WorkflowExecution.execution_steps)
-        ).where(WorkflowExecution.workflow_id == workflow_id)
+    def export_execution_logs(self, workflow_id: int, 
+                              format_type: str = 'json',
+                              execution_ids: Optional[List[int]] = None,
+                              session_factory: Optional[async_sessionmaker] = None) -> AsyncIterator[bytes]:
+        """
+        Stream execution logs and performance data as JSON, NDJSON or CSV.
+        Executions and their steps are read in one outer-joined query from a
+        server-side cursor; JSON and NDJSON group each execution's steps,
+        CSV writes one row per step.
+        """
+        executions = WorkflowExecution.__table__
+        steps = WorkflowExecutionStep.__table__
+        query = (
+            select(
+                executions.c.id.label('execution_id'),
+                executions.c.status,
+                executions.c.started_at,
+                executions.c.finished_at,
+                executions.c.execution_time,
+                executions.c.trigger_data,
+                executions.c.error_message,
+                steps.c.node_id,
+                steps.c.node_name,
+                steps.c.node_type,
+                steps.c.status.label('step_status'),
+                steps.c.execution_time_ms,
+                steps.c.input_data,
+                steps.c.output_data,
+                steps.c.error_message.label('step_error_message'),
+                steps.c.memory_usage_mb,
+                steps.c.cpu_usage_percent,
+            )
+            .select_from(executions.outerjoin(steps, steps.c.execution_id == executions.c.id))
+            .where(executions.c.workflow_id == workflow_id)
+            .order_by(executions.c.created_at, executions.c.id, steps.c.created_at)
+        )
         
         if execution_ids:
-            query = query.where(WorkflowExecution.id.in_(execution_ids))
+            query = query.where(executions.c.id.in_(execution_ids))
         
-        result = await self.db.execute(query)
-        executions = result.scalars().all()
-        
-        export_data = {
-            'workflow_id': workflow_id,
-            'export_timestamp': datetime.utcnow().isoformat(),
-            'format': format_type,
-            'executions': []
-        }
+        rows = stream_rows(query, session_factory)
+        if format_type == 'csv':
+            return encode_csv(EXECUTION_EXPORT_COLUMNS, rows, header=EXECUTION_EXPORT_HEADER)
         
-        for execution in executions:
-            exec_data = {
-                'execution_id': execution.id,
-                'status': execution.status.value,
-                'started_at': execution.started_at.isoformat() if execution.started_at else None,
-                'finished_at': execution.finished_at.isoformat() if execution.finished_at else None,
-                'execution_time': execution.execution_time,
-                'trigger_data': execution.trigger_data,
-                'error_message': execution.error_message,
-                'steps': []
-            }
-            
-            for step in execution.execution_steps:
-                step_data = {
-                    'node_id': step.node_id,
-                    'node_name': step.node_name,
-                    'node_type': step.node_type.value,
-                    'status': step.status.value,
-                    'execution_time_ms': step.execution_time_ms,
-                    'input_data': step.input_data,
-                    'output_data': step.output_data,
-                    'error_message': step.error_message,
-                    'performance_metrics': {
-                        'memory_usage_mb': step.memory_usage_mb,
-                        'cpu_usage_percent': step.cpu_usage_percent
-                    }
-                }
-                exec_data['steps'].append(step_data)
-            
-            export_data['executions'].append(exec_data)
+        grouped = _group_execution_steps(rows)
+        if format_type == 'ndjson':
+            return encode_ndjson(grouped)
         
-        return export_data
+        return encode_json_document(
+            {
+                'workflow_id': workflow_id,
+                'export_timestamp': datetime.utcnow().isoformat(),
+                'format': format_type,
+            },
+            'executions',
+            grouped
+        )
 
     async def _end_existing_sessions(self, workflow_id: int, user_id: int) -> None:
         """End any existing active debug sessions."""
@@ -0,0 +1,230 @@
+"""
+Shared HTTP client for webhook and HTTP-request workflow nodes.
+Connection-pooled aiohttp session with per-host keep-alive limits, jittered
+exponential backoff retries and a per-host circuit breaker.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Pool limits
+MAX_CONNECTIONS = 200
+MAX_CONNECTIONS_PER_HOST = 20
+KEEPALIVE_TIMEOUT_SECONDS = 30
+REQUEST_TIMEOUT_SECONDS = 30
+
+# Retry policy
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.2
+BACKOFF_MAX_SECONDS = 5.0
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+# Requests that may reach the server more than once. Anything else (e.g. a
+# webhook POST) is only retried when the connection was never established,
+# unless the caller sends an idempotency key the receiver can dedupe on.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+IDEMPOTENCY_KEY_HEADER = "idempotency-key"
+CONNECT_ERRORS = (aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError)
+
+# Circuit breaker policy
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+MAX_RESPONSE_CHARS = 1000
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the host's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for a single host.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls
+    are refused until ``reset_seconds`` have passed; one trial call is then let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Let another trial call through after one ended without a recorded outcome."""
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class WorkflowHTTPClient:
+    """Pooled async HTTP client shared by all workflow nodes of a worker process."""
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        timeout_seconds: float = REQUEST_TIMEOUT_SECONDS,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE_SECONDS,
+        breaker_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        breaker_reset_seconds: float = BREAKER_RESET_SECONDS
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, recreating it if bound to another event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=KEEPALIVE_TIMEOUT_SECONDS,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._loop = loop
+        return self._session
+
+    def _breaker_for(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset_seconds)
+        return self.breakers[host]
+
+    @staticmethod
+    def _is_replayable(method: str, headers: Optional[Dict[str, str]]) -> bool:
+        """Whether a request may be sent again after it possibly reached the server."""
+        if method.upper() in IDEMPOTENT_METHODS:
+            return True
+        return any(name.lower() == IDEMPOTENCY_KEY_HEADER for name in (headers or {}))
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, self.backoff_base * (2 ** attempt)))
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a request and return ``status_code``, ``content_type`` and ``body``.
+
+        Idempotent methods and requests carrying an ``Idempotency-Key`` header
+        are retried with backoff on connection errors, timeouts and retryable
+        status codes; other requests are only retried when the connection could
+        not be established. The final outcome is recorded on the host's circuit
+        breaker.
+        """
+        breaker = self._breaker_for(url)
+        is_trial = breaker.state == "half_open"
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}")
+
+        try:
+            return await self._send(breaker, method, url, json, headers)
+        finally:
+            # A cancelled or unexpectedly failing trial must not hold the circuit half-open forever
+            if is_trial:
+                breaker.release_trial()
+
+    async def _send(
+        self,
+        breaker: CircuitBreaker,
+        method: str,
+        url: str,
+        json: Any,
+        headers: Optional[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        session = self._get_session()
+        replayable = self._is_replayable(method, headers)
+        attempt = 0
+        while True:
+            try:
+                async with session.request(method, url, json=json, headers=headers) as response:
+                    body = await response.text()
+                    if replayable and response.status in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status
+                        )
+                    if response.status >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    return {
+                        "status_code": response.status,
+                        "content_type": response.headers.get('content-type', ''),
+                        "body": body
+                    }
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries or not (replayable or isinstance(e, CONNECT_ERRORS)):
+                    breaker.record_failure()
+                    raise
+                logger.debug(f"Retrying {method} {url} after error: {e}")
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+_client: Optional[WorkflowHTTPClient] = None
+
+
+def get_workflow_http_client() -> WorkflowHTTPClient:
+    """Return the process-wide workflow HTTP client."""
+    global _client
+    if _client is None:
+        _client = WorkflowHTTPClient()
+    return _client
@@ -0,0 +1,244 @@
+"""
+Incremental recomputation of the aggregated workflow metrics row.
+Per event type counters for the trailing window are stored with the row up to
+a watermark; a refresh adds the events since the previous watermark and
+subtracts the ones that slid out of the window, rather than re-aggregating
+the whole window.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import (
+    AnalyticsEventType, WorkflowAnalyticsEvent, WorkflowCostAnalysis, WorkflowPerformanceMetrics
+)
+from app.models.workflow import Workflow
+from app.services.analytics_rollups import ROLLUP_LATENESS, EventStats, aggregate_event_stats, combine_stats
+from app.services.latency_sketches import load_window_sketch
+
+logger = logging.getLogger(__name__)
+
+METRICS_WINDOW = timedelta(days=30)
+
+# Buffered events can be committed shortly after their created_at, so only
+# ranges older than this are folded into the stored counters; the newer tail
+# is read again on every refresh.
+METRICS_LATENESS = ROLLUP_LATENESS
+
+_events = WorkflowAnalyticsEvent.__table__
+_metrics = WorkflowPerformanceMetrics.__table__
+_costs = WorkflowCostAnalysis.__table__
+_workflows = Workflow.__table__
+
+_EXECUTION_EVENT_TYPES = (
+    AnalyticsEventType.WORKFLOW_EXECUTION,
+    AnalyticsEventType.WORKFLOW_SUCCESS,
+    AnalyticsEventType.WORKFLOW_FAILURE,
+)
+
+
+def stats_to_state(stats: Dict[AnalyticsEventType, EventStats]) -> Dict[str, Dict[str, Any]]:
+    """JSON-serializable additive counters of ``stats``."""
+    return {
+        event_type.value: {
+            "event_count": entry.event_count,
+            "execution_time_count": entry.execution_time_count,
+            "execution_time_sum": entry.execution_time_sum,
+            "conversion_value_sum": str(entry.conversion_value_sum),
+            "revenue_sum": str(entry.revenue_sum),
+        }
+        for event_type, entry in stats.items()
+        if entry.event_count > 0
+    }
+
+
+def state_to_stats(state: Dict[str, Dict[str, Any]]) -> Dict[AnalyticsEventType, EventStats]:
+    """Inverse of ``stats_to_state``; min/max and sketches are not kept."""
+    return {
+        AnalyticsEventType(event_type): EventStats(
+            event_count=entry["event_count"],
+            execution_time_count=entry["execution_time_count"],
+            execution_time_sum=entry["execution_time_sum"],
+            conversion_value_sum=Decimal(entry["conversion_value_sum"]),
+            revenue_sum=Decimal(entry["revenue_sum"]),
+        )
+        for event_type, entry in state.items()
+    }
+
+
+def apply_delta(
+    stats: Dict[AnalyticsEventType, EventStats],
+    added: Dict[AnalyticsEventType, EventStats],
+    expired: Dict[AnalyticsEventType, EventStats]
+) -> Dict[AnalyticsEventType, EventStats]:
+    """``stats + added - expired`` over the additive counters."""
+    result = state_to_stats(stats_to_state(stats))
+    for event_type, entry in added.items():
+        result.setdefault(event_type, EventStats()).add_row(entry)
+    for event_type, entry in expired.items():
+        current = result.setdefault(event_type, EventStats())
+        current.event_count -= entry.event_count
+        current.execution_time_count -= entry.execution_time_count
+        current.execution_time_sum -= entry.execution_time_sum
+        current.conversion_value_sum -= entry.conversion_value_sum
+        current.revenue_sum -= entry.revenue_sum
+    return {event_type: entry for event_type, entry in result.items() if entry.event_count > 0}
+
+
+async def slide_window(
+    session: AsyncSession,
+    workflow_id: str,
+    stats: Dict[AnalyticsEventType, EventStats],
+    old_end: datetime,
+    new_end: datetime,
+    window: timedelta = METRICS_WINDOW
+) -> Dict[AnalyticsEventType, EventStats]:
+    """
+    Move the counters of ``[old_end - window, old_end)`` to
+    ``[new_end - window, new_end)`` by reading only the two edges.
+    """
+    if new_end <= old_end:
+        return stats
+    added = await aggregate_event_stats(session, workflow_id, old_end, new_end)
+    expired = await aggregate_event_stats(session, workflow_id, old_end - window, new_end - window)
+    return apply_delta(stats, added, expired)
+
+
+def _previous_watermark(window_stats: Optional[Dict[str, Any]]) -> Optional[datetime]:
+    if not window_stats or "watermark" not in window_stats:
+        return None
+    return datetime.fromisoformat(window_stats["watermark"])
+
+
+async def _unique_users(session: AsyncSession, workflow_id: str, start: datetime, end: datetime) -> int:
+    # Distinct users cannot be maintained by adding and subtracting counters
+    query = select(func.count(func.distinct(_events.c.user_id))).where(
+        and_(_events.c.workflow_id == workflow_id, _events.c.created_at >= start, _events.c.created_at < end)
+    )
+    return (await session.execute(query)).scalar() or 0
+
+
+async def _total_cost(session: AsyncSession, workflow_id: str, start: datetime, end: datetime) -> Decimal:
+    query = select(
+        func.sum(
+            _costs.c.compute_cost + _costs.c.storage_cost + _costs.c.network_cost
+            + _costs.c.email_cost + _costs.c.external_api_cost
+        )
+    ).where(
+        and_(_costs.c.workflow_id == workflow_id, _costs.c.created_at >= start, _costs.c.created_at < end)
+    )
+    total = (await session.execute(query)).scalar()
+    return Decimal(str(total)) if total is not None else Decimal("0.00")
+
+
+def metrics_values(
+    stats: Dict[AnalyticsEventType, EventStats],
+    unique_users: int,
+    total_cost: Decimal,
+    median_time: float,
+    p95_time: float
+) -> Dict[str, Any]:
+    """Column values of ``workflow_analytics_metrics`` derived from the window counters."""
+    execution = combine_stats(stats, _EXECUTION_EVENT_TYPES)
+    all_events = combine_stats(stats, stats.keys())
+
+    total = execution.event_count
+    successful = stats.get(AnalyticsEventType.WORKFLOW_SUCCESS, EventStats()).event_count
+    failed = stats.get(AnalyticsEventType.WORKFLOW_FAILURE, EventStats()).event_count
+    executions = stats.get(AnalyticsEventType.WORKFLOW_EXECUTION, EventStats()).event_count
+    conversions = stats.get(AnalyticsEventType.CONVERSION, EventStats()).event_count
+    revenue = all_events.revenue_sum
+    interactions = all_events.event_count
+
+    if total_cost > 0:
+        roi_percentage = float(((revenue - total_cost) / total_cost) * 100)
+    else:
+        roi_percentage = float("inf") if revenue > 0 else 0.0
+
+    return {
+        "total_executions": total,
+        "successful_executions": successful,
+        "failed_executions": failed,
+        "success_rate": successful / total if total > 0 else 0.0,
+        "avg_execution_time_ms": execution.avg_execution_time_ms,
+        "median_execution_time_ms": median_time,
+        "p95_execution_time_ms": p95_time,
+        "total_conversions": conversions,
+        "conversion_rate": conversions / executions if executions > 0 else 0.0,
+        "total_revenue": revenue,
+        "avg_revenue_per_execution": revenue / executions if executions > 0 else Decimal("0.00"),
+        "unique_users_engaged": unique_users,
+        "total_interactions": interactions,
+        "engagement_score": min((interactions / unique_users) * 10, 100) if unique_users > 0 else 0.0,
+        "total_execution_cost": total_cost,
+        "cost_per_execution": total_cost / executions if executions > 0 else Decimal("0.00"),
+        "roi_percentage": roi_percentage,
+    }
+
+
+async def refresh_workflow_metrics(
+    session: AsyncSession,
+    workflow_id: str,
+    now: Optional[datetime] = None,
+    window: timedelta = METRICS_WINDOW
+) -> Dict[str, Any]:
+    """
+    Recompute ``workflow_id``'s metrics row for ``[now - window, now)``.
+
+    The stored counters are slid from their previous watermark to
+    ``now - METRICS_LATENESS``; they are rebuilt from the rollups when there
+    are none yet or the previous watermark is outside the window. The caller
+    commits. Returns the written column values.
+    """
+    now = now or datetime.utcnow()
+    watermark = now - METRICS_LATENESS
+
+    existing = (await session.execute(
+        select(_metrics.c.id, _metrics.c.window_stats).where(_metrics.c.workflow_id == workflow_id)
+    )).one_or_none()
+    window_stats = existing.window_stats if existing is not None else None
+    previous = _previous_watermark(window_stats)
+
+    if previous is not None and previous <= watermark < previous + window:
+        stats = await slide_window(
+            session, workflow_id, state_to_stats(window_stats["event_types"]), previous, watermark, window
+        )
+    else:
+        stats = await aggregate_event_stats(session, workflow_id, watermark - window, watermark)
+        logger.debug(f"Rebuilt metrics window for workflow {workflow_id}")
+
+    # The tail after the watermark is counted but not stored
+    current = await slide_window(session, workflow_id, stats, watermark, now, window)
+
+    start = now - window
+    latency_sketch = await load_window_sketch(session, workflow_id, start, now)
+    values = metrics_values(
+        current,
+        unique_users=await _unique_users(session, workflow_id, start, now),
+        total_cost=await _total_cost(session, workflow_id, start, now),
+        median_time=latency_sketch.quantile(0.5),
+        p95_time=latency_sketch.quantile(0.95),
+    )
+    row = {
+        **values,
+        "period_start": start,
+        "period_end": now,
+        "window_stats": {"watermark": watermark.isoformat(), "event_types": stats_to_state(stats)},
+        "updated_at": now,
+    }
+
+    if existing is not None:
+        await session.execute(update(_metrics).where(_metrics.c.id == existing.id).values(**row))
+    else:
+        owner_id = (await session.execute(
+            select(_workflows.c.owner_id).where(_workflows.c.id == workflow_id)
+        )).scalar()
+        if owner_id is None:
+            raise ValueError(f"Workflow {workflow_id} not found")
+        await session.execute(insert(_metrics).values(workflow_id=workflow_id, user_id=owner_id, **row))
+    return values
@@ -14,6 +14,16 @@ from app.models.workflow import (
 )
 from app.schemas.workflow import WorkflowCreate, WorkflowUpdate, WorkflowExecutionCreate, WorkflowNodeCreate, WorkflowNodeUpdate
 from app.services.base_service import BaseService
+from app.services.execution_log import (
+    DEFAULT_PAGE_SIZE,
+    ENTRY_LOG,
+    MAX_PAGE_SIZE,
+    ExecutionLogWriter,
+    latest_node_statuses,
+    log_entry,
+    read_entries,
+    status_entry,
+)
 
 
 class WorkflowService(BaseService[Workflow, WorkflowCreate, WorkflowUpdate]):
@@ -250,6 +260,8 @@ class WorkflowExecutionService(BaseService[WorkflowExecution, WorkflowExecutionC
 
     def __init__(self, db: AsyncSession):
         super().__init__(WorkflowExecution, db)
+        self._execution_log: Optional[ExecutionLogWriter] = None
+        self._workflow_ids: Dict[int, int] = {}
 
     async def create_execution(
         self,
@@ -358,6 +370,26 @@ class WorkflowExecutionService(BaseService[WorkflowExecution, WorkflowExecutionC
         }
 
     # Story 3.1: Real-time debugging enhancements
+    @property
+    def execution_log(self) -> ExecutionLogWriter:
+        """Batched writer for this session's node statuses and log lines."""
+        if self._execution_log is None:
+            self._execution_log = ExecutionLogWriter(self.db)
+        return self._execution_log
+
+    async def _execution_workflow_id(self, execution_id: int) -> Optional[int]:
+        """Workflow id of an execution (None if it does not exist), cached per service."""
+        if execution_id not in self._workflow_ids:
+            executions = WorkflowExecution.__table__
+            result = await self.db.execute(
+                select(executions.c.workflow_id).where(executions.c.id == execution_id)
+            )
+            workflow_id = result.scalar_one_or_none()
+            if workflow_id is None:
+                return None
+            self._workflow_ids[execution_id] = workflow_id
+        return self._workflow_ids[execution_id]
+
     async def update_node_execution_status(
         self,
         execution_id: int, 
@@ -368,33 +400,23 @@ class WorkflowExecutionService(BaseService[WorkflowExecution, WorkflowExecutionC
     ) -> bool:
         """
         Update node execution status for real-time debugging.
-        Integrates with WebSocket system for live updates.
+        Appends a status entry to the execution log (flushing buffered log
+        lines with it) and integrates with WebSocket system for live updates.
         """
         from app.api.v1.endpoints.workflow_websocket import connection_manager
         
-        execution = await self.get(execution_id)
-        if not execution:
+        workflow_id = await self._execution_workflow_id(execution_id)
+        if workflow_id is None:
             return False
 
-        # Update execution data with node status
-        if not execution.execution_data:
-            execution.execution_data = {}
-        
-        if 'node_statuses' not in execution.execution_data:
-            execution.execution_data['node_statuses'] = {}
-        
-        execution.execution_data['node_statuses'][node_id] = {
-            'status': status,
-            'timestamp': datetime.utcnow().isoformat(),
-            'execution_time_ms': execution_time_ms,
-            'error_details': error_details
-        }
-        
-        await self.db.commit()
+        await self.execution_log.append(
+            status_entry(execution_id, node_id, status, execution_time_ms, error_details)
+        )
+        await self.execution_log.flush()
         
         # Send real-time update via WebSocket
         await connection_manager.send_execution_update(
-            workflow_id=execution.workflow_id,
+            workflow_id=workflow_id,
             execution_id=execution_id,
             node_id=node_id,
             status=status,
@@ -407,15 +429,16 @@ class WorkflowExecutionService(BaseService[WorkflowExecution, WorkflowExecutionC
     async def get_node_execution_logs(
         self, 
         execution_id: int, 
-        node_id: str
+        node_id: str,
+        after_sequence: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE
     ) -> List[Dict[str, Any]]:
-        """Get execution logs for a specific node."""
-        execution = await self.get(execution_id)
-        if not execution or not execution.execution_data:
-            return []
-        
-        node_logs = execution.execution_data.get('node_logs', {}).get(node_id, [])
-        return node_logs
+        """Get one page of execution logs for a specific node."""
+        await self.execution_log.flush()
+        return await read_entries(
+            self.db, execution_id, node_id=node_id, entry_type=ENTRY_LOG,
+            after_sequence=after_sequence, limit=limit
+        )
 
     async def add_node_execution_log(
         self,
@@ -425,54 +448,77 @@ class WorkflowExecutionService(BaseService[WorkflowExecution, WorkflowExecutionC
         message: str,
         context: Optional[Dict[str, Any]] = None
     ) -> bool:
-        """Add a log entry for a specific node execution."""
-        execution = await self.get(execution_id)
-        if not execution:
+        """
+        Add a log entry for a specific node execution.
+        The entry is committed before returning; use
+        ``add_node_execution_logs`` to write many lines in batches.
+        """
+        if await self._execution_workflow_id(execution_id) is None:
             return False
 
-        if not execution.execution_data:
-            execution.execution_data = {}
-        
-        if 'node_logs' not in execution.execution_data:
-            execution.execution_data['node_logs'] = {}
-        
-        if node_id not in execution.execution_data['node_logs']:
-            execution.execution_data['node_logs'][node_id] = []
-        
-        log_entry = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'level': level,
-            'message': message,
-            'context': context or {}
-        }
-        
-        execution.execution_data['node_logs'][node_id].append(log_entry)
-        
-        await self.db.commit()
+        await self.execution_log.append(log_entry(execution_id, node_id, level, message, context))
+        await self.execution_log.flush()
         return True
 
-    async def get_execution_timeline_data(self, execution_id: int) -> Dict[str, Any]:
-        """Get comprehensive timeline data for an execution."""
-        execution = await self.get(execution_id)
+    async def add_node_execution_logs(self, execution_id: int, entries: List[Dict[str, Any]]) -> int:
+        """
+        Add many log entries for an execution in batched inserts.
+        Each entry has ``node_id``, ``level``, ``message`` and optionally
+        ``context``; all are committed before returning. Returns the number
+        written, 0 if the execution does not exist.
+        """
+        if await self._execution_workflow_id(execution_id) is None:
+            return 0
+
+        for entry in entries:
+            await self.execution_log.append(log_entry(
+                execution_id, entry['node_id'], entry['level'], entry['message'], entry.get('context')
+            ))
+        await self.execution_log.flush()
+        return len(entries)
+
+    async def flush_execution_log(self) -> int:
+        """Write any log entries still buffered; return the number written."""
+        return await self.execution_log.flush()
+
+    async def get_execution_timeline_data(
+        self,
+        execution_id: int,
+        after_sequence: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Get comprehensive timeline data for an execution.
+        Steps carry each node's latest status; ``entries`` is one page of
+        the execution log after ``after_sequence``, and ``next_sequence`` is
+        the cursor for the following page (None on the last one).
+        """
+        await self.execution_log.flush()
+
+        executions = WorkflowExecution.__table__
+        result = await self.db.execute(select(executions).where(executions.c.id == execution_id))
+        execution = result.one_or_none()
         if not execution:
             return {}
 
         # Get workflow details
-        workflow = await self.db.execute(
-            select(Workflow).where(Workflow.id == execution.workflow_id)
+        workflows = Workflow.__table__
+        result = await self.db.execute(
+            select(workflows.c.name, workflows.c.nodes).where(workflows.c.id == execution.workflow_id)
         )
-        workflow = workflow.scalar_one_or_none()
+        workflow = result.one_or_none()
 
         if not workflow:
             return {}
 
         # Process node statuses and create timeline steps
-        node_statuses = execution.execution_data.get('node_statuses', {}) if execution.execution_data else {}
+        node_statuses = await latest_node_statuses(self.db, execution_id)
+        nodes = workflow.nodes or []
         steps = []
         completed_steps = 0
         failed_steps = 0
 
-        for node in workflow.nodes:
+        for node in nodes:
             node_id = node.get('id') or node.get('node_id')
             if not node_id:
                 continue
@@ -493,12 +539,15 @@ class WorkflowExecutionService(BaseService[WorkflowExecution, WorkflowExecutionC
                 'status': status,
                 'execution_time_ms': status_info.get('execution_time_ms'),
                 'error_message': status_info.get('error_details'),
-                'started_at': status_info.get('timestamp') if status != 'pending' else None,
+                'started_at': status_info.get('started_at') if status != 'pending' else None,
                 'finished_at': status_info.get('timestamp') if status in ['success', 'failed', 'completed'] else None
             }
             steps.append(step)
 
-        total_steps = len(workflow.nodes)
+        entries = await read_entries(self.db, execution_id, after_sequence=after_sequence, limit=limit)
+        next_sequence = entries[-1]['sequence'] if len(entries) == min(limit, MAX_PAGE_SIZE) else None
+
+        total_steps = len(nodes)
         success_rate = (completed_steps / total_steps * 100) if total_steps > 0 else 0
 
         return {
@@ -513,7 +562,9 @@ class WorkflowExecutionService(BaseService[WorkflowExecution, WorkflowExecutionC
             'completed_steps': completed_steps,
             'failed_steps': failed_steps,
             'success_rate': success_rate,
-            'steps': steps
+            'steps': steps,
+            'entries': entries,
+            'next_sequence': next_sequence
         }
 
 
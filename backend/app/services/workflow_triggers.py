@@ -0,0 +1,195 @@
+"""
+Trigger dispatch index for the workflow automation engine.
+Workflow configurations are parsed and their conditions compiled once, when a
+workflow is loaded or updated, and each workflow is filed under its trigger
+type and, where its conditions pin one, the value of a key attribute (event
+name, form id, component id). A trigger event then looks up the few
+workflows that can match instead of scanning every active workflow.
+"""
+
+import json
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from app.services.workflow_conditions import (
+    AllOf,
+    ConditionNode,
+    Predicate,
+    WorkflowCondition,
+    compile_condition,
+    parse_condition_tree,
+)
+
+logger = logging.getLogger(__name__)
+
+# Payload attributes workflows are indexed by, most selective first
+KEY_ATTRIBUTES = ("event_name", "form_id", "component_id")
+
+
+def _trigger_value(trigger_type: Any) -> str:
+    return getattr(trigger_type, "value", trigger_type)
+
+
+def _hashable(value: Any) -> bool:
+    return isinstance(value, Hashable)
+
+
+@dataclass
+class CompiledWorkflow:
+    """A workflow with its configuration parsed and its conditions built."""
+    workflow: Any
+    trigger_type: str
+    raw_configuration: Optional[str]
+    config: Dict[str, Any]
+    condition: ConditionNode
+    predicate: Predicate
+    index_key: Optional[Tuple[str, Tuple[Any, ...]]]
+
+    @property
+    def actions(self) -> List[Dict[str, Any]]:
+        return self.config.get('actions', [])
+
+    def matches(self, context: Dict[str, Any]) -> bool:
+        """True if the workflow's conditions hold for ``context``."""
+        return bool(self.predicate(context))
+
+
+def compile_workflow(workflow: Any) -> CompiledWorkflow:
+    """Parse ``workflow.configuration`` and compile its conditions."""
+    raw = workflow.configuration
+    config = json.loads(raw) if raw else {}
+    condition = parse_condition_tree(config.get('conditions', []))
+    return CompiledWorkflow(
+        workflow=workflow,
+        trigger_type=_trigger_value(workflow.trigger_type),
+        raw_configuration=raw,
+        config=config,
+        condition=condition,
+        predicate=compile_condition(condition),
+        index_key=_index_key(condition),
+    )
+
+
+def _index_key(condition: ConditionNode) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+    """
+    The key attribute and values a matching payload must carry, if any.
+
+    Only top-level ``eq`` and ``in`` comparisons (children of the root
+    ``all``) pin an attribute; a workflow whose conditions pin none is
+    filed under its trigger type alone.
+    """
+    if isinstance(condition, WorkflowCondition):
+        conditions = [condition]
+    elif isinstance(condition, AllOf):
+        conditions = [child for child in condition.children if isinstance(child, WorkflowCondition)]
+    else:
+        return None
+
+    for attribute in KEY_ATTRIBUTES:
+        for condition in conditions:
+            if condition.field != attribute:
+                continue
+            if condition.operator == "eq" and _hashable(condition.value):
+                return attribute, (condition.value,)
+            if (
+                condition.operator == "in"
+                and isinstance(condition.value, (list, tuple, set, frozenset))
+                and all(_hashable(value) for value in condition.value)
+            ):
+                return attribute, tuple(condition.value)
+    return None
+
+
+class TriggerIndex:
+    """
+    Inverted index from (trigger type, key attribute value) to workflows.
+
+    ``candidates`` returns every workflow that could match a payload, in
+    load order; the caller still evaluates each one's conditions.
+    """
+
+    def __init__(self):
+        self.compiled: Dict[Any, CompiledWorkflow] = {}
+        self._unkeyed: Dict[str, Set[Any]] = defaultdict(set)
+        self._keyed: Dict[Tuple[str, str, Any], Set[Any]] = defaultdict(set)
+        self._order: Dict[Any, int] = {}
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self.compiled)
+
+    def add(self, workflow: Any) -> Optional[CompiledWorkflow]:
+        """Index ``workflow``, replacing any previous version of it."""
+        self.remove(workflow.id)
+        try:
+            compiled = compile_workflow(workflow)
+        except Exception as e:
+            logger.error(f"❌ Invalid configuration for workflow {workflow.name}: {e}")
+            return None
+
+        trigger_type = compiled.trigger_type
+        self.compiled[workflow.id] = compiled
+        self._order[workflow.id] = self._sequence
+        self._sequence += 1
+        if compiled.index_key is None:
+            self._unkeyed[trigger_type].add(workflow.id)
+        else:
+            attribute, values = compiled.index_key
+            for value in values:
+                self._keyed[(trigger_type, attribute, value)].add(workflow.id)
+        return compiled
+
+    def remove(self, workflow_id: Any) -> None:
+        compiled = self.compiled.pop(workflow_id, None)
+        self._order.pop(workflow_id, None)
+        if compiled is None:
+            return
+
+        trigger_type = compiled.trigger_type
+        if compiled.index_key is None:
+            self._discard(self._unkeyed, trigger_type, workflow_id)
+        else:
+            attribute, values = compiled.index_key
+            for value in values:
+                self._discard(self._keyed, (trigger_type, attribute, value), workflow_id)
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[Any]], key: Any, workflow_id: Any) -> None:
+        workflow_ids = index.get(key)
+        if workflow_ids is not None:
+            workflow_ids.discard(workflow_id)
+            if not workflow_ids:
+                del index[key]
+
+    def rebuild(self, workflows: Iterable[Any]) -> None:
+        self.__init__()
+        for workflow in workflows:
+            self.add(workflow)
+
+    def get(self, workflow: Any) -> Optional[CompiledWorkflow]:
+        """
+        The compiled form of ``workflow``, recompiling (and re-indexing) it
+        if its configuration changed since it was indexed.
+        """
+        compiled = self.compiled.get(workflow.id)
+        if compiled is not None and compiled.workflow is workflow and (
+            compiled.raw_configuration is workflow.configuration
+            or compiled.raw_configuration == workflow.configuration
+        ):
+            return compiled
+        return self.add(workflow)
+
+    def candidates(self, trigger_type: Any, payload: Dict[str, Any]) -> List[CompiledWorkflow]:
+        """Workflows for ``trigger_type`` whose key attributes agree with ``payload``."""
+        trigger_type = _trigger_value(trigger_type)
+        workflow_ids = list(self._unkeyed.get(trigger_type, ()))
+        for attribute in KEY_ATTRIBUTES:
+            value = payload.get(attribute)
+            if _hashable(value):
+                workflow_ids.extend(self._keyed.get((trigger_type, attribute, value), ()))
+
+        # A workflow is filed under one attribute, so the lists are disjoint
+        compiled, order = self.compiled, self._order
+        return [compiled[workflow_id] for workflow_id in sorted(workflow_ids, key=order.__getitem__)]
@@ -0,0 +1,98 @@
+"""
+Tests for the GCRA rate limiter used for AI provider calls.
+Covers burst allowance, steady-state spacing, FIFO waiting, the shared
+fakeredis backend and an acquire microbenchmark.
+"""
+
+import asyncio
+import time
+
+import fakeredis.aioredis
+import pytest
+
+from app.services.ai_rate_limiter import RateLimiter, RedisRateLimitBackend
+
+BENCHMARK_ACQUIRES = 100_000
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 500.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter:
+    """Test bucket behaviour with a controlled clock."""
+
+    def test_burst_then_spacing(self):
+        clock = FakeClock()
+        limiter = RateLimiter(max_calls=5, time_window=1, clock=clock)
+
+        assert [limiter.reserve() for _ in range(5)] == [0.0] * 5
+        assert limiter.reserve() == pytest.approx(0.2)
+        assert limiter.reserve() == pytest.approx(0.4)
+
+    def test_tokens_refill_over_time(self):
+        clock = FakeClock()
+        limiter = RateLimiter(max_calls=5, time_window=1, clock=clock)
+
+        assert all(limiter.try_acquire() for _ in range(5))
+        assert not limiter.try_acquire()
+
+        clock.now += 0.2
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+
+        # An idle bucket refills to the full burst but no further
+        clock.now += 60
+        assert sum(limiter.try_acquire() for _ in range(10)) == 5
+
+    def test_explicit_burst_smaller_than_rate(self):
+        clock = FakeClock()
+        limiter = RateLimiter(max_calls=60, time_window=60, burst=2, clock=clock)
+
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_served_in_fifo_order(self):
+        limiter = RateLimiter(max_calls=200, time_window=1, burst=1)
+        order = []
+
+        async def caller(index):
+            await limiter.acquire()
+            order.append(index)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[caller(i) for i in range(10)])
+        elapsed = time.perf_counter() - started
+
+        assert order == list(range(10))
+        assert limiter.delayed == 9
+        assert elapsed >= 9 * 0.005 * 0.9
+
+    @pytest.mark.asyncio
+    async def test_redis_backend_shares_bucket_between_limiters(self):
+        backend = RedisRateLimitBackend(fakeredis.aioredis.FakeRedis())
+        first = RateLimiter(max_calls=3, time_window=60, key="model:test", backend=backend)
+        second = RateLimiter(max_calls=3, time_window=60, key="model:test", backend=backend)
+
+        delays = [await first._reserve(), await second._reserve(), await first._reserve(), await second._reserve()]
+
+        assert delays[:3] == [0.0, 0.0, 0.0]
+        assert delays[3] == pytest.approx(20.0, abs=0.1)
+
+    def test_acquire_microbenchmark(self):
+        limiter = RateLimiter(max_calls=1_000_000, time_window=1)
+
+        started = time.perf_counter()
+        for _ in range(BENCHMARK_ACQUIRES):
+            limiter.try_acquire()
+        elapsed = time.perf_counter() - started
+
+        print(f"{BENCHMARK_ACQUIRES} acquires in {elapsed * 1000:.1f}ms ({elapsed / BENCHMARK_ACQUIRES * 1e9:.0f}ns each)")
+        assert limiter.acquired == BENCHMARK_ACQUIRES
+        assert elapsed < 2.0
@@ -0,0 +1,140 @@
+"""
+Tests for the shared AI response cache.
+Covers LRU eviction, TTL expiry, single-flight de-duplication, the
+fakeredis-backed shared tier and AIService integration.
+"""
+
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from app.services.ai_response_cache import AIResponseCache, RedisCacheBackend
+from app.services.ai_service import AIService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAIResponseCache:
+    """Test the cache in isolation."""
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        cache = AIResponseCache(max_entries=2)
+        await cache.set("a:1", 1, 60)
+        await cache.set("a:2", 2, 60)
+        assert (await cache.get("a:1")) == (True, 1)
+
+        await cache.set("a:3", 3, 60)
+
+        assert (await cache.get("a:2")) == (False, None)
+        assert (await cache.get("a:1")) == (True, 1)
+        assert cache.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = AIResponseCache(clock=clock)
+        await cache.set("a:1", "value", 30)
+
+        clock.now += 29
+        assert (await cache.get("a:1")) == (True, "value")
+        clock.now += 2
+        assert (await cache.get("a:1")) == (False, None)
+        assert cache.expirations == 1
+        assert cache.size() == 0
+
+    @pytest.mark.asyncio
+    async def test_single_flight_shares_one_upstream_call(self):
+        cache = AIResponseCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"answer": 42}
+
+        results = await asyncio.gather(*[cache.get_or_compute("a:1", 60, compute) for _ in range(50)])
+
+        assert calls == 1
+        assert all(result == {"answer": 42} for result in results)
+        assert cache.coalesced == 49
+        assert (await cache.get_or_compute("a:1", 60, compute)) == {"answer": 42}
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_single_flight_failure_is_not_cached(self):
+        cache = AIResponseCache()
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise asyncio.TimeoutError()
+
+        results = await asyncio.gather(
+            *[cache.get_or_compute("a:1", 60, failing) for _ in range(5)], return_exceptions=True
+        )
+
+        assert calls == 1
+        assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+        assert cache.size() == 0
+
+    @pytest.mark.asyncio
+    async def test_redis_backend_shared_between_processes(self):
+        client = fakeredis.aioredis.FakeRedis()
+        first = AIResponseCache(backend=RedisCacheBackend(client))
+        second = AIResponseCache(backend=RedisCacheBackend(client))
+
+        await first.set("template_generation:abc", {"name": "landing"}, 60)
+
+        assert (await second.get("template_generation:abc")) == (True, {"name": "landing"})
+        assert second.backend_hits == 1
+        assert 0 < await client.pttl("ai-cache:template_generation:abc") <= 60_000
+
+        await second.clear("template_generation")
+        assert await client.exists("ai-cache:template_generation:abc") == 0
+
+
+class TestAIServiceCaching:
+    """Test AIService uses the shared cache."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_prompts_call_upstream_once(self):
+        cache = AIResponseCache()
+        calls = 0
+
+        async def fake_generate(prompt, model, max_tokens=4000):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return [{"component_type": "hero"}]
+
+        services = [AIService() for _ in range(3)]
+        for service in services:
+            service.response_cache = cache
+            service.generate_json_response_with_model = fake_generate
+
+        context = {"business_type": "saas"}
+        results = await asyncio.gather(*[
+            service.generate_component_suggestions(context) for service in services for _ in range(10)
+        ])
+
+        assert calls == 1
+        assert all(result == [{"component_type": "hero"}] for result in results)
+
+        stats = services[0].get_performance_metrics()["cache_stats"]
+        assert stats["component_suggestions_cached"] == 1
+        assert stats["misses"] == 30
+        assert stats["coalesced_requests"] == 29
+
+        await services[1].generate_component_suggestions(context)
+        assert services[2].get_performance_metrics()["cache_stats"]["hits"] == 1
@@ -0,0 +1,258 @@
+"""
+Tests for buffered analytics event ingestion.
+Covers size/time based flushing, shutdown flush, isolation of rows that
+keep failing, debounced metrics refreshes and an ingestion throughput
+benchmark against SQLite.
+"""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, select, func
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.analytics import WorkflowAnalyticsEvent, WorkflowLatencySketch, WorkflowPredictionFeatures, AnalyticsEventType
+from app.services.analytics_ingestion import AnalyticsEventBuffer, MetricsRefreshDebouncer
+
+BENCHMARK_EVENTS = 100_000
+WORKFLOW_IDS = [str(uuid.uuid4()) for _ in range(50)]
+USER_ID = str(uuid.uuid4())
+
+
+def _event(workflow_id=WORKFLOW_IDS[0], execution_time_ms=100):
+    return {
+        "workflow_id": workflow_id,
+        "execution_id": None,
+        "user_id": USER_ID,
+        "event_type": AnalyticsEventType.WORKFLOW_EXECUTION,
+        "event_data": {},
+        "execution_time_ms": execution_time_ms,
+        "resource_usage": None,
+        "conversion_value": None,
+        "revenue_impact": None,
+        "component_id": None,
+        "source_ip": None,
+        "user_agent": None,
+    }
+
+
+def _events_metadata():
+    """Ingestion tables plus minimal FK targets, independent of the full model registry."""
+    metadata = MetaData()
+    Table("workflows", metadata, Column("id", String(36), primary_key=True))
+    Table("users", metadata, Column("id", String(36), primary_key=True))
+    WorkflowAnalyticsEvent.__table__.to_metadata(metadata)
+    WorkflowLatencySketch.__table__.to_metadata(metadata)
+    WorkflowPredictionFeatures.__table__.to_metadata(metadata)
+    return metadata
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'events.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(_events_metadata().create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _count(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(WorkflowAnalyticsEvent.__table__))).scalar()
+
+
+class TestAnalyticsEventBuffer:
+    """Test flush triggers."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_is_full(self, session_factory):
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=10, flush_interval=60)
+
+        for _ in range(25):
+            await buffer.add(_event())
+
+        assert await _count(session_factory) == 20
+        assert buffer.flush_count == 2
+
+        await buffer.close()
+        assert await _count(session_factory) == 25
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_interval(self, session_factory):
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=500, flush_interval=0.05)
+
+        await buffer.add(_event())
+        assert await _count(session_factory) == 0
+
+        await asyncio.sleep(0.15)
+        assert await _count(session_factory) == 1
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_flush_reports_touched_workflows(self, session_factory):
+        touched = []
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=4, on_flush=touched.append)
+
+        a, b, c = WORKFLOW_IDS[:3]
+        for workflow_id in [a, b, a, c]:
+            await buffer.add(_event(workflow_id))
+
+        assert touched == [{a: 2, b: 1, c: 1}]
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_bad_row_is_dead_lettered_after_repeated_failures(self, session_factory):
+        # An event id that is already stored makes every insert of its batch fail
+        duplicate = {**_event(), "id": uuid.uuid4()}
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=8, flush_interval=60)
+        await buffer.add(dict(duplicate))
+        await buffer.flush()
+
+        dead = []
+        buffer.on_dead_letter = lambda row, error: dead.append((row["id"], type(error)))
+        for _ in range(3):
+            await buffer.add(_event())
+        await buffer.add(dict(duplicate))
+        for _ in range(3):
+            await buffer.add(_event())
+        # The add that fills the batch fails quietly, the next flush fails too; both requeue it
+        await buffer.add(_event())
+        assert buffer.get_stats()["failed_flushes"] == 1
+        with pytest.raises(IntegrityError):
+            await buffer.flush()
+        assert len(buffer.pending) == 8
+
+        assert await buffer.flush() == 7
+        assert dead == [(duplicate["id"], IntegrityError)]
+        assert buffer.get_stats()["dead_lettered"] == 1
+        assert len(buffer.pending) == 0
+        assert await _count(session_factory) == 8
+
+        # Later batches are unaffected
+        for _ in range(8):
+            await buffer.add(_event())
+        assert await _count(session_factory) == 16
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_keep_rows_queued(self, session_factory, monkeypatch):
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=4, flush_interval=60, max_attempts=2)
+        for _ in range(3):
+            await buffer.add(_event())
+
+        async def unavailable(batch):
+            raise OperationalError("INSERT", {}, ConnectionRefusedError())
+
+        monkeypatch.setattr(buffer, "_write", unavailable)
+        for _ in range(5):
+            with pytest.raises(OperationalError):
+                await buffer.flush()
+        assert len(buffer.pending) == 3 and buffer.dead_lettered == 0
+
+        monkeypatch.undo()
+        assert await buffer.flush() == 3
+        assert await _count(session_factory) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_timer_flush_is_retried_with_backoff(self, session_factory, monkeypatch):
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=500, flush_interval=0.01)
+        write = buffer._write
+        failures = []
+
+        async def flaky(batch):
+            if len(failures) < 3:
+                failures.append(asyncio.get_running_loop().time())
+                raise OperationalError("INSERT", {}, ConnectionRefusedError())
+            await write(batch)
+
+        monkeypatch.setattr(buffer, "_write", flaky)
+        await buffer.add(_event())
+        await asyncio.sleep(0.3)
+
+        assert await _count(session_factory) == 1
+        assert buffer.get_stats()["failed_flushes"] == 3
+        assert failures[2] - failures[1] > failures[1] - failures[0]
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_add_raises_only_under_backpressure(self, session_factory, monkeypatch):
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=2, flush_interval=60, max_pending=4)
+
+        async def unavailable(batch):
+            raise OperationalError("INSERT", {}, ConnectionRefusedError())
+
+        monkeypatch.setattr(buffer, "_write", unavailable)
+        for _ in range(4):
+            await buffer.add(_event())
+        assert buffer.get_stats()["failed_flushes"] == 1
+
+        with pytest.raises(OperationalError):
+            await buffer.add(_event())
+        assert len(buffer.pending) == 4
+
+        monkeypatch.undo()
+        await buffer.close()
+        assert await _count(session_factory) == 4
+
+    @pytest.mark.asyncio
+    async def test_ingestion_benchmark(self, session_factory):
+        """Ingest 100k events into SQLite and report events per second."""
+        buffer = AnalyticsEventBuffer(session_factory)
+
+        started = time.perf_counter()
+        for i in range(BENCHMARK_EVENTS):
+            await buffer.add(_event(WORKFLOW_IDS[i % 50], i % 1000))
+        await buffer.close()
+        elapsed = time.perf_counter() - started
+
+        print(f"ingested {BENCHMARK_EVENTS} events in {elapsed:.2f}s ({BENCHMARK_EVENTS / elapsed:.0f} events/s)")
+        assert await _count(session_factory) == BENCHMARK_EVENTS
+        assert buffer.flush_count == BENCHMARK_EVENTS // buffer.batch_size
+
+
+class TestMetricsRefreshDebouncer:
+    """Test per-workflow refresh coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_burst_refreshes_each_workflow_once(self):
+        refreshed = []
+
+        async def refresh(workflow_id):
+            refreshed.append(workflow_id)
+
+        debouncer = MetricsRefreshDebouncer(refresh, interval_seconds=0.05)
+        for _ in range(1000):
+            debouncer.mark_dirty("wf-1")
+        debouncer.mark_dirty("wf-2")
+
+        await asyncio.sleep(0.15)
+        await debouncer.close()
+
+        assert sorted(refreshed) == ["wf-1", "wf-2"]
+
+    @pytest.mark.asyncio
+    async def test_batched_events_count_as_coalesced_requests(self, session_factory):
+        async def refresh(workflow_id):
+            pass
+
+        debouncer = MetricsRefreshDebouncer(refresh, interval_seconds=60)
+
+        def mark(event_counts):
+            for workflow_id, events in event_counts.items():
+                debouncer.mark_dirty(workflow_id, events)
+
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=500, flush_interval=60, on_flush=mark)
+        for _ in range(999):
+            await buffer.add(_event(WORKFLOW_IDS[0]))
+        await buffer.add(_event(WORKFLOW_IDS[1]))
+        await buffer.close()
+
+        stats = debouncer.get_stats()
+        assert stats["requested"] == 1000
+        assert stats["coalesced"] == 998
+        assert stats["pending"] == 2
+        await debouncer.close()
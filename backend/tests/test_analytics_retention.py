@@ -0,0 +1,237 @@
+"""
+Tests for analytics event partitioning and retention.
+Runs the SQLite batched-delete path end to end and checks the generated
+PostgreSQL partition DDL as strings.
+"""
+
+import gzip
+import importlib.util
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, create_engine, event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.analytics import AnalyticsEventType, WorkflowAnalyticsEvent
+from app.services import analytics_retention
+from app.services.analytics_retention import (
+    add_months,
+    apply_retention,
+    create_partition_ddl,
+    detach_partition_ddl,
+    drop_partition_ddl,
+    ensure_partitions,
+    partition_ddl_ahead,
+    partition_upper_bound,
+    retention_cutoff,
+)
+
+NOW = datetime(2026, 10, 16, 12, 30)
+WORKFLOW_ID = uuid.uuid4()
+USER_ID = uuid.uuid4()
+
+_events = WorkflowAnalyticsEvent.__table__
+
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "012_partition_analytics_events.py"
+
+
+def _event(created_at, n=0):
+    return {
+        "id": uuid.uuid4(),
+        "created_at": created_at,
+        "updated_at": created_at,
+        "workflow_id": WORKFLOW_ID,
+        "user_id": USER_ID,
+        "event_type": AnalyticsEventType.WORKFLOW_EXECUTION,
+        "event_data": {"n": n},
+        "execution_time_ms": n,
+        "revenue_impact": Decimal("1.25") if n % 2 else None,
+    }
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    path = tmp_path / "retention.db"
+    metadata = MetaData()
+    Table("workflows", metadata, Column("id", String(36), primary_key=True))
+    Table("users", metadata, Column("id", String(36), primary_key=True))
+    _events.to_metadata(metadata)
+    sync_engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(sync_engine)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    deletes = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statement.startswith("DELETE") and deletes.append(statement)
+    )
+    yield sync_engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), deletes
+    await engine.dispose()
+    sync_engine.dispose()
+
+
+def _read_archive(path):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet
+        return pyarrow.parquet.read_table(path).to_pylist()
+    with gzip.open(path) as archive:
+        return [json.loads(line) for line in archive]
+
+
+class TestPartitionDDL:
+    """Test the PostgreSQL partition DDL."""
+
+    def test_create_partition(self):
+        assert create_partition_ddl(datetime(2026, 12, 9, 15)) == (
+            "CREATE TABLE IF NOT EXISTS workflow_analytics_events_y2026m12 PARTITION OF workflow_analytics_events "
+            "FOR VALUES FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')"
+        )
+
+    def test_partitions_ahead(self):
+        statements = partition_ddl_ahead(NOW, months_ahead=2)
+
+        assert [statement.split()[5] for statement in statements] == [
+            "workflow_analytics_events_y2026m10",
+            "workflow_analytics_events_y2026m11",
+            "workflow_analytics_events_y2026m12",
+        ]
+
+    def test_detach_and_drop(self):
+        name = "workflow_analytics_events_y2025m09"
+
+        assert detach_partition_ddl(name) == f"ALTER TABLE workflow_analytics_events DETACH PARTITION {name}"
+        assert drop_partition_ddl(name) == f"DROP TABLE IF EXISTS {name}"
+
+    @pytest.mark.parametrize("bound, expected", [
+        ("FOR VALUES FROM ('2026-10-01 00:00:00+00') TO ('2026-11-01 00:00:00+00')", datetime(2026, 11, 1)),
+        ("FOR VALUES FROM (MINVALUE) TO ('2026-10-01 02:00:00+02')", datetime(2026, 10, 1)),
+        ("DEFAULT", None),
+    ])
+    def test_upper_bound(self, bound, expected):
+        assert partition_upper_bound(bound) == expected
+
+    def test_partitions_ahead_skip_covered_months(self):
+        statements = partition_ddl_ahead(NOW, months_ahead=2, covered_until=datetime(2026, 11, 1))
+
+        assert [statement.split()[5] for statement in statements] == [
+            "workflow_analytics_events_y2026m11",
+            "workflow_analytics_events_y2026m12",
+        ]
+
+    def test_months(self):
+        assert add_months(datetime(2026, 11, 1), 3) == datetime(2027, 2, 1)
+        assert add_months(datetime(2026, 1, 1), -1) == datetime(2025, 12, 1)
+        assert retention_cutoff(NOW, 395) == datetime(2025, 9, 1)
+
+
+class TestPartitionMigration:
+    """Test that the legacy table's partition bound covers its rows."""
+
+    @pytest.fixture
+    def migration(self):
+        spec = importlib.util.spec_from_file_location("partition_migration", MIGRATION)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        return migration
+
+    def test_legacy_bound_covers_current_month_rows(self, migration, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        metadata = MetaData()
+        Table("workflows", metadata, Column("id", String(36), primary_key=True))
+        Table("users", metadata, Column("id", String(36), primary_key=True))
+        legacy = _events.to_metadata(metadata, name=migration.LEGACY)
+        metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(legacy), [_event(datetime(2025, 3, 4)), _event(NOW)])
+            bound = migration.legacy_upper_bound(migration.legacy_max_created_at(conn), NOW)
+
+        assert bound == datetime(2026, 11, 1)
+        statements = migration.partition_statements(bound)
+        attach = next(statement for statement in statements if "ATTACH PARTITION" in statement)
+        assert attach.endswith("FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')")
+        # New partitions start where the legacy one ends, so nothing overlaps
+        partitions = [statement for statement in statements if "PARTITION OF" in statement]
+        assert partitions[0].split()[2] == "workflow_analytics_events_y2026m11"
+        assert "FROM ('2026-11-01 00:00:00+00')" in partitions[0]
+        assert len(partitions) == migration.PARTITION_MONTHS_AHEAD + 1
+
+    @pytest.mark.parametrize("max_created_at, expected", [
+        (None, datetime(2026, 10, 1)),
+        (datetime(2025, 6, 30, 23, 59), datetime(2026, 10, 1)),
+        (datetime(2026, 12, 2), datetime(2027, 1, 1)),
+        (datetime(2026, 10, 31, 23, 30, tzinfo=timezone(timedelta(hours=-2))), datetime(2026, 12, 1)),
+    ])
+    def test_legacy_bound(self, migration, max_created_at, expected):
+        assert migration.legacy_upper_bound(max_created_at, NOW) == expected
+
+
+class TestSQLiteRetention:
+    """Test the batched-delete fallback."""
+
+    @pytest.mark.asyncio
+    async def test_expired_months_are_archived_then_deleted_in_batches(self, database, tmp_path):
+        sync_engine, session_factory, deletes = database
+        expired = [_event(datetime(2025, 7, 1) + timedelta(hours=5 * n), n) for n in range(250)]
+        kept = [_event(datetime(2025, 9, 1) + timedelta(hours=n), n) for n in range(30)]
+        with sync_engine.begin() as conn:
+            conn.execute(insert(_events), expired + kept)
+
+        summary = await apply_retention(
+            session_factory, now=NOW, retention_days=395, archive_dir=str(tmp_path / "archive"),
+            archive=True, batch_size=40
+        )
+
+        with sync_engine.connect() as conn:
+            remaining = conn.execute(select(func.count(), func.min(_events.c.created_at)).select_from(_events)).one()
+        assert remaining == (30, datetime(2025, 9, 1))
+        assert summary["rows_deleted"] == 250
+        # July and August, each deleted in batches of at most 40 rows
+        july = sum(1 for event in expired if event["created_at"].month == 7)
+        assert summary["delete_batches"] == -(-july // 40) + -(-(250 - july) // 40)
+        assert len(deletes) == summary["delete_batches"] + 2
+
+        assert [path.rsplit("/", 1)[1].split("_")[3] for path in summary["archives"]] == ["y2025m07", "y2025m08"]
+        archived = [row for path in summary["archives"] for row in _read_archive(path)]
+        # JSON columns are archived as JSON text
+        assert sorted(json.loads(row["event_data"])["n"] for row in archived) == list(range(250))
+        assert {row["workflow_id"] for row in archived} == {str(WORKFLOW_ID)}
+
+    @pytest.mark.asyncio
+    async def test_without_archiving_and_nothing_expired(self, database, tmp_path):
+        sync_engine, session_factory, _ = database
+        with sync_engine.begin() as conn:
+            conn.execute(insert(_events), [_event(datetime(2024, 1, 5)), _event(NOW)])
+
+        summary = await apply_retention(session_factory, now=NOW, retention_days=395, archive=False)
+        again = await apply_retention(
+            session_factory, now=NOW, retention_days=395, archive_dir=str(tmp_path / "archive"), archive=True
+        )
+
+        assert summary["rows_deleted"] == 1 and summary["archives"] == []
+        assert again["rows_deleted"] == 0 and again["archives"] == []
+        assert not (tmp_path / "archive").exists() or not any((tmp_path / "archive").iterdir())
+
+    @pytest.mark.asyncio
+    async def test_archive_chunks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(analytics_retention, "ARCHIVE_CHUNK_ROWS", 7)
+
+        async def rows():
+            for n in range(50):
+                yield _event(NOW, n)
+
+        path, count = await analytics_retention.archive_rows(rows(), str(tmp_path / "events"))
+
+        assert count == 50
+        assert [row["execution_time_ms"] for row in _read_archive(path)] == list(range(50))
+        assert not list(tmp_path.glob("*.tmp"))
+
+    @pytest.mark.asyncio
+    async def test_ensure_partitions_is_a_noop(self, database):
+        _, session_factory, _ = database
+        async with session_factory() as session:
+            assert await ensure_partitions(session, NOW) == []
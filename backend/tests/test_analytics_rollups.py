@@ -0,0 +1,307 @@
+"""
+Tests for hourly/daily analytics rollups.
+Covers the segment planner, compaction watermarks and idempotency, and that
+stats read through the rollups equal the same aggregates over raw events.
+"""
+
+import random
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, DateTime, MetaData, String, Table, create_engine, delete, insert, select
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.analytics import (
+    AnalyticsEventType, AnalyticsRollupWatermark, WorkflowAnalyticsDailyRollup,
+    WorkflowAnalyticsEvent, WorkflowAnalyticsHourlyRollup
+)
+from app.services.analytics_rollups import (
+    DAILY, HOURLY, RAW, RollupSegment, aggregate_event_stats, combine_stats, compact_daily_rollups,
+    compact_hourly_rollups, compact_rollups, get_watermarks, plan_segments, rewind_rollup_watermarks
+)
+from app.services.quantile_sketch import DDSketch
+
+START = datetime(2026, 10, 1)
+WORKFLOW_ID = uuid.uuid4()
+OTHER_WORKFLOW_ID = uuid.uuid4()
+USER_ID = uuid.uuid4()
+EVENT_TYPES = [
+    AnalyticsEventType.WORKFLOW_EXECUTION,
+    AnalyticsEventType.WORKFLOW_SUCCESS,
+    AnalyticsEventType.CONVERSION,
+]
+
+_events = WorkflowAnalyticsEvent.__table__
+_hourly = WorkflowAnalyticsHourlyRollup.__table__
+_daily = WorkflowAnalyticsDailyRollup.__table__
+
+
+def _random_events(count, span, seed=23):
+    rng = random.Random(seed)
+    events = []
+    for _ in range(count):
+        created_at = START + timedelta(seconds=rng.randrange(int(span.total_seconds())))
+        events.append({
+            "id": uuid.uuid4(),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "workflow_id": rng.choice([WORKFLOW_ID, WORKFLOW_ID, OTHER_WORKFLOW_ID]),
+            "user_id": USER_ID,
+            "event_type": rng.choice(EVENT_TYPES),
+            "event_data": {},
+            "execution_time_ms": rng.choice([None, rng.randrange(1, 20_000)]),
+            "conversion_value": rng.choice([None, Decimal(rng.randrange(0, 10_000)) / 100]),
+            "revenue_impact": rng.choice([None, Decimal(rng.randrange(0, 50_000)) / 100]),
+        })
+    return events
+
+
+def _reference_stats(events, start, end):
+    """Per event type aggregates of WORKFLOW_ID's events in [start, end), computed in Python."""
+    stats = defaultdict(lambda: {"count": 0, "times": [], "conversion": Decimal("0.00"), "revenue": Decimal("0.00")})
+    for event in events:
+        if event["workflow_id"] != WORKFLOW_ID or not start <= event["created_at"] < end:
+            continue
+        entry = stats[event["event_type"]]
+        entry["count"] += 1
+        if event["execution_time_ms"] is not None:
+            entry["times"].append(event["execution_time_ms"])
+        entry["conversion"] += event["conversion_value"] or 0
+        entry["revenue"] += event["revenue_impact"] or 0
+    return stats
+
+
+def _assert_matches_reference(stats, reference):
+    assert set(stats) == set(reference)
+    for event_type, expected in reference.items():
+        actual = stats[event_type]
+        times = expected["times"]
+        assert actual.event_count == expected["count"]
+        assert actual.execution_time_count == len(times)
+        assert actual.execution_time_sum == pytest.approx(sum(times))
+        assert actual.execution_time_min == (min(times) if times else None)
+        assert actual.execution_time_max == (max(times) if times else None)
+        assert actual.conversion_value_sum == expected["conversion"]
+        assert actual.revenue_sum == expected["revenue"]
+
+        sketch = DDSketch()
+        sketch.add_many(times)
+        assert actual.sketch.bins == sketch.bins and actual.sketch.count == len(times)
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    path = tmp_path / "rollups.db"
+    metadata = MetaData()
+    Table("workflows", metadata, Column("id", String(36), primary_key=True))
+    Table("users", metadata, Column("id", String(36), primary_key=True))
+    for model in (
+        WorkflowAnalyticsEvent, WorkflowAnalyticsHourlyRollup, WorkflowAnalyticsDailyRollup, AnalyticsRollupWatermark
+    ):
+        model.__table__.to_metadata(metadata)
+    sync_engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(sync_engine)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield sync_engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+    sync_engine.dispose()
+
+
+class AwareDateTime(TypeDecorator):
+    """Returns timezone-aware UTC datetimes, as asyncpg does for timestamptz columns."""
+    impl = DateTime
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        return value.replace(tzinfo=timezone.utc) if value is not None else None
+
+
+@pytest.fixture
+def timestamptz(monkeypatch):
+    """Read the columns migrated as timestamptz back timezone-aware."""
+    watermarks = AnalyticsRollupWatermark.__table__
+    for column in (watermarks.c.watermark, _hourly.c.bucket_start, _daily.c.bucket_start, _events.c.created_at):
+        monkeypatch.setattr(column, "type", AwareDateTime())
+
+
+async def _compact_all(session_factory, now):
+    """Run compaction until it has caught up, as repeated beat runs would."""
+    totals = {HOURLY: 0, DAILY: 0}
+    while True:
+        compacted = await compact_rollups(session_factory, now=now)
+        if not any(compacted.values()):
+            return totals
+        for rollup, count in compacted.items():
+            totals[rollup] += count
+
+
+def _seed(sync_engine, events):
+    with sync_engine.begin() as conn:
+        conn.execute(insert(_events), events)
+
+
+class TestPlanSegments:
+    """Test how a range is split between rollups and raw events."""
+
+    def test_without_watermarks_everything_is_raw(self):
+        end = START + timedelta(days=3)
+
+        assert plan_segments(START, end, None, None) == [RollupSegment(RAW, START, end)]
+
+    def test_days_hours_and_open_edges(self):
+        start = START + timedelta(hours=20, minutes=30)
+        end = START + timedelta(days=4, hours=5, minutes=10)
+        hourly_watermark = START + timedelta(days=4, hours=3)
+        daily_watermark = START + timedelta(days=3)
+
+        assert plan_segments(start, end, hourly_watermark, daily_watermark) == [
+            RollupSegment(RAW, start, START + timedelta(hours=21)),
+            RollupSegment(HOURLY, START + timedelta(hours=21), START + timedelta(days=1)),
+            RollupSegment(DAILY, START + timedelta(days=1), START + timedelta(days=3)),
+            RollupSegment(HOURLY, START + timedelta(days=3), hourly_watermark),
+            RollupSegment(RAW, hourly_watermark, end),
+        ]
+
+    def test_range_inside_one_hour_is_raw(self):
+        start, end = START + timedelta(minutes=5), START + timedelta(minutes=50)
+
+        assert plan_segments(start, end, START + timedelta(days=1), START + timedelta(days=1)) == [
+            RollupSegment(RAW, start, end)
+        ]
+
+    def test_range_before_the_watermark_uses_only_rollups(self):
+        end = START + timedelta(days=2)
+
+        assert plan_segments(START, end, START + timedelta(days=5), START + timedelta(days=5)) == [
+            RollupSegment(DAILY, START, end)
+        ]
+
+
+class TestCompaction:
+    """Test the compaction jobs and their watermarks."""
+
+    @pytest.mark.asyncio
+    async def test_watermarks_and_lateness(self, database):
+        sync_engine, session_factory = database
+        _seed(sync_engine, _random_events(500, timedelta(days=2, hours=6)))
+        now = START + timedelta(days=2, hours=5, minutes=3)
+
+        first_run = await compact_rollups(session_factory, now=now)
+        compacted = await _compact_all(session_factory, now)
+
+        async with session_factory() as session:
+            watermarks = await get_watermarks(session)
+        # 04:00-05:00 closed only three minutes ago, inside the lateness grace period
+        assert watermarks == {HOURLY: START + timedelta(days=2, hours=4), DAILY: START + timedelta(days=2)}
+        # Each run is capped; later runs resume from the watermarks
+        assert first_run == {HOURLY: 48, DAILY: 2}
+        assert compacted == {HOURLY: 4, DAILY: 0}
+
+    @pytest.mark.asyncio
+    async def test_compaction_is_idempotent_and_resumable(self, database):
+        sync_engine, session_factory = database
+        _seed(sync_engine, _random_events(800, timedelta(days=3)))
+        now = START + timedelta(days=4)
+
+        async with session_factory() as session:
+            assert await compact_hourly_rollups(session, now, max_buckets=10) == 10
+            assert (await get_watermarks(session))[HOURLY] == START + timedelta(hours=10)
+            while await compact_hourly_rollups(session, now, max_buckets=10):
+                pass
+            await compact_daily_rollups(session)
+
+        def snapshot():
+            with sync_engine.connect() as conn:
+                return [
+                    sorted(
+                        (str(row.workflow_id), row.event_type, row.bucket_start, row.event_count,
+                         row.execution_time_sum, str(row.revenue_sum), row.sketch and row.sketch["count"])
+                        for row in conn.execute(select(table))
+                    )
+                    for table in (_hourly, _daily)
+                ]
+
+        before = snapshot()
+        assert len(before[1]) == 3 * 2 * len(EVENT_TYPES)
+
+        async with session_factory() as session:
+            await rewind_rollup_watermarks(session, START + timedelta(days=1, hours=7))
+            assert await get_watermarks(session) == {
+                HOURLY: START + timedelta(days=1, hours=7), DAILY: START + timedelta(days=1)
+            }
+        await _compact_all(session_factory, now)
+        await _compact_all(session_factory, now)
+
+        assert snapshot() == before
+
+
+class TestRollupReads:
+    """Stats read through rollups equal the raw aggregates."""
+
+    @pytest.mark.asyncio
+    async def test_equivalent_to_raw_aggregates(self, database):
+        sync_engine, session_factory = database
+        events = _random_events(3000, timedelta(days=6))
+        _seed(sync_engine, events)
+        # Rollups cover the first four and a half days; the rest is read raw
+        await _compact_all(session_factory, START + timedelta(days=4, hours=12, minutes=10))
+
+        rng = random.Random(5)
+        windows = [(START, START + timedelta(days=6)), (START + timedelta(days=1), START + timedelta(days=3))]
+        for _ in range(25):
+            start = START + timedelta(minutes=rng.randrange(6 * 24 * 60))
+            windows.append((start, start + timedelta(minutes=rng.randrange(1, 4 * 24 * 60))))
+
+        async with session_factory() as session:
+            for start, end in windows:
+                stats = await aggregate_event_stats(session, WORKFLOW_ID, start, end, include_sketch=True)
+                _assert_matches_reference(stats, _reference_stats(events, start, end))
+
+            subset = await aggregate_event_stats(
+                session, WORKFLOW_ID, START, START + timedelta(days=6), [AnalyticsEventType.CONVERSION]
+            )
+        assert list(subset) == [AnalyticsEventType.CONVERSION]
+
+    @pytest.mark.asyncio
+    async def test_complete_buckets_are_not_read_from_raw_events(self, database):
+        sync_engine, session_factory = database
+        events = _random_events(1000, timedelta(days=3))
+        _seed(sync_engine, events)
+        await _compact_all(session_factory, START + timedelta(days=5))
+        with sync_engine.begin() as conn:
+            conn.execute(delete(_events))
+
+        async with session_factory() as session:
+            stats = await aggregate_event_stats(session, WORKFLOW_ID, START, START + timedelta(days=3))
+
+        reference = _reference_stats(events, START, START + timedelta(days=3))
+        combined = combine_stats(stats, EVENT_TYPES)
+        assert combined.event_count == sum(entry["count"] for entry in reference.values())
+        assert combined.revenue_sum == sum(entry["revenue"] for entry in reference.values())
+
+    @pytest.mark.asyncio
+    async def test_timezone_aware_columns(self, database, timestamptz):
+        sync_engine, session_factory = database
+        events = _random_events(1000, timedelta(days=3))
+        _seed(sync_engine, events)
+        await _compact_all(session_factory, START + timedelta(days=2, hours=12, minutes=10))
+        # A second pass compares the stored watermarks with the naive horizon
+        await _compact_all(session_factory, START + timedelta(days=2, hours=12, minutes=10))
+
+        start, end = START + timedelta(hours=5, minutes=17), START + timedelta(days=2, hours=20)
+        async with session_factory() as session:
+            assert await get_watermarks(session) == {
+                HOURLY: START + timedelta(days=2, hours=12), DAILY: START + timedelta(days=2)
+            }
+            stats = await aggregate_event_stats(session, WORKFLOW_ID, start, end, include_sketch=True)
+            aware = await aggregate_event_stats(
+                session, WORKFLOW_ID, start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc)
+            )
+
+        _assert_matches_reference(stats, _reference_stats(events, start, end))
+        assert combine_stats(aware, EVENT_TYPES).event_count == combine_stats(stats, EVENT_TYPES).event_count
@@ -0,0 +1,264 @@
+"""
+Tests for collaboration cursor and lock persistence.
+Checks that cursor moves are coalesced into write-behind flushes, that lock
+acquire/release are single conditional upserts, and load-tests 200 simulated
+websocket clients (message latency and database writes per second).
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import MetaData, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.collaboration import (
+    ChatMessage,
+    CollaborationRoom,
+    ComponentLock,
+    EventType,
+    LockType,
+    UserSession,
+)
+from app.services.collaboration_manager import ConnectionManager, locks_table, sessions_table
+
+LOAD_CLIENTS = 200
+LOAD_ROOMS = 10
+CURSOR_HZ = 30
+LOAD_SECONDS = 1.0
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def _collaboration_metadata():
+    metadata = MetaData()
+    for model in (CollaborationRoom, UserSession, ComponentLock, ChatMessage):
+        model.__table__.to_metadata(metadata)
+    return metadata
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'collaboration.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(_collaboration_metadata().create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def manager(engine):
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    connection_manager = ConnectionManager(session_factory, cursor_flush_interval=0.05)
+    yield connection_manager
+    await connection_manager.close()
+
+
+async def _connect(manager, room_id, user_id):
+    websocket = FakeWebSocket()
+    connection_id = await manager.connect(
+        websocket, room_id, user_id, f"User {user_id}", f"{user_id}@example.com", "#ff0000"
+    )
+    return connection_id, websocket
+
+
+def _cursor_message(x, y):
+    return {
+        "type": "collaboration_event",
+        "payload": {"type": EventType.USER_CURSOR_UPDATE, "cursor": {"position": {"x": x, "y": y}, "visible": True}},
+    }
+
+
+def _count_writes(engine):
+    """Count UPDATE statements and rows against user_sessions."""
+    counts = {"statements": 0, "rows": 0}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE user_sessions"):
+            counts["statements"] += 1
+            counts["rows"] += len(parameters) if executemany else 1
+
+    return counts
+
+
+class TestCursorWriteBehind:
+    """Test coalesced cursor persistence."""
+
+    @pytest.mark.asyncio
+    async def test_cursor_moves_coalesce_to_latest_value(self, manager, engine):
+        alice, _ = await _connect(manager, "room-1", "alice")
+        _, bob_socket = await _connect(manager, "room-1", "bob")
+        writes = _count_writes(engine)
+
+        for x in range(100):
+            await manager.handle_message(alice, _cursor_message(x, x * 2))
+        await manager.senders[bob_socket].drain()
+
+        # Bob receives the live cursor; moves still queued behind it were superseded
+        assert json.loads(bob_socket.sent[-1])["payload"]["cursor"]["position"] == {"x": 99, "y": 198}
+        assert manager.room_cursors["room-1"]["alice"]["position"] == {"x": 99, "y": 198}
+
+        await manager.cursor_writer.flush()
+        assert writes == {"statements": 1, "rows": 1}
+        async with engine.connect() as conn:
+            row = (await conn.execute(
+                select(sessions_table.c.cursor_position).where(sessions_table.c.user_id == "alice")
+            )).one()
+        assert row.cursor_position == {"x": 99, "y": 198}
+
+    @pytest.mark.asyncio
+    async def test_timer_flushes_without_explicit_call(self, manager):
+        alice, _ = await _connect(manager, "room-1", "alice")
+        await manager.handle_message(alice, _cursor_message(1, 1))
+
+        await asyncio.sleep(0.15)
+
+        assert manager.cursor_writer.get_stats()["pending"] == 0
+        assert manager.cursor_writer.rows_written == 1
+
+
+class TestComponentLocks:
+    """Test single-upsert lock acquire and release."""
+
+    @pytest.mark.asyncio
+    async def test_conflicting_lock_is_rejected(self, manager, engine):
+        assert await manager.acquire_lock("room-1", "hero", "alice") is not None
+        assert await manager.acquire_lock("room-1", "hero", "bob") is None
+        assert await manager.acquire_lock("room-1", "hero", "alice", LockType.MOVING) is not None
+        assert manager.is_component_locked("room-1", "hero", "bob")
+
+        assert not await manager.release_lock("room-1", "hero", "bob")
+        assert await manager.release_lock("room-1", "hero", "alice")
+        assert await manager.acquire_lock("room-1", "hero", "bob") is not None
+
+        async with engine.connect() as conn:
+            rows = (await conn.execute(select(locks_table))).all()
+        assert [(row.component_id, row.user_id) for row in rows] == [("hero", "bob")]
+
+    @pytest.mark.asyncio
+    async def test_expired_lock_can_be_taken_over(self, manager, engine):
+        await manager.acquire_lock("room-1", "hero", "alice")
+        async with engine.begin() as conn:
+            await conn.execute(update(locks_table).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+
+        lock = await manager.acquire_lock("room-1", "hero", "bob")
+
+        assert lock is not None and lock.user_id == "bob"
+
+    @pytest.mark.asyncio
+    async def test_lock_event_broadcast_only_when_acquired(self, manager):
+        alice, _ = await _connect(manager, "room-1", "alice")
+        bob, _ = await _connect(manager, "room-1", "bob")
+        _, carol_socket = await _connect(manager, "room-1", "carol")
+        lock_event = {"type": EventType.COMPONENT_LOCKED, "lock": {"component_id": "hero"}}
+
+        await manager.senders[carol_socket].drain()
+        before = len(carol_socket.sent)
+        await manager.handle_message(alice, {"type": "collaboration_event", "payload": lock_event})
+        await manager.handle_message(bob, {"type": "collaboration_event", "payload": lock_event})
+        await manager.senders[carol_socket].drain()
+
+        assert len(carol_socket.sent) == before + 1
+        await manager.disconnect(alice)
+        assert not manager.is_component_locked("room-1", "hero", "bob")
+
+
+class TestCollaborationLoad:
+    """Load test with simulated websocket clients."""
+
+    @pytest.mark.asyncio
+    async def test_200_clients_cursor_load(self, manager, engine):
+        connections = [
+            await _connect(manager, f"room-{client % LOAD_ROOMS}", f"user-{client}")
+            for client in range(LOAD_CLIENTS)
+        ]
+        writes = _count_writes(engine)
+        latencies = []
+
+        async def client(connection_id, offset):
+            for tick in range(int(CURSOR_HZ * LOAD_SECONDS)):
+                started = time.perf_counter()
+                await manager.handle_message(connection_id, _cursor_message(tick, offset))
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(1 / CURSOR_HZ)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(connection_id, n) for n, (connection_id, _) in enumerate(connections)))
+        await manager.cursor_writer.flush()
+        elapsed = time.perf_counter() - started
+
+        events = len(latencies)
+        latencies.sort()
+        p50 = latencies[events // 2] * 1000
+        p99 = latencies[int(events * 0.99)] * 1000
+        print(
+            f"{LOAD_CLIENTS} clients: {events / elapsed:.0f} cursor events/s, latency p50 {p50:.2f}ms "
+            f"p99 {p99:.2f}ms, DB {writes['statements'] / elapsed:.1f} writes/s "
+            f"({writes['rows'] / elapsed:.0f} rows/s) vs {events / elapsed:.0f}/s unbuffered"
+        )
+
+        assert events == LOAD_CLIENTS * int(CURSOR_HZ * LOAD_SECONDS)
+        assert writes["rows"] <= LOAD_CLIENTS * manager.cursor_writer.flush_count
+        assert writes["statements"] == manager.cursor_writer.flush_count
+        assert writes["statements"] < events / 50
+
+        async with engine.connect() as conn:
+            positions = dict((await conn.execute(
+                select(sessions_table.c.user_id, sessions_table.c.cursor_position)
+            )).all())
+        last_tick = int(CURSOR_HZ * LOAD_SECONDS) - 1
+        assert all(positions[f"user-{n}"] == {"x": last_tick, "y": n} for n in range(LOAD_CLIENTS))
+
+
+class TestOperations:
+    """Test operation handling through the room document."""
+
+    @pytest.mark.asyncio
+    async def test_operation_acked_broadcast_and_synced_to_late_joiner(self, manager):
+        alice, alice_socket = await _connect(manager, "room-1", "alice")
+        _, bob_socket = await _connect(manager, "room-1", "bob")
+
+        await manager.handle_message(alice, {"type": "operation", "payload": {
+            "id": "op-1", "type": "insert", "component_id": "hero", "position": 0,
+            "data": {"text": "Hello"}, "base_version": 0, "client_seq": 1,
+        }})
+        await manager.handle_message(alice, {"type": "operation", "payload": {
+            "id": "op-2", "type": "modify", "component_id": "hero", "property": "text",
+            "data": "Hi", "base_version": 1, "client_seq": 2,
+        }})
+        await manager.senders[alice_socket].drain()
+        await manager.senders[bob_socket].drain()
+
+        ack = json.loads(alice_socket.sent[-1])["payload"]
+        assert ack["applied"] and ack["version"] == 2 and ack["client_seq"] == 2
+        delta = json.loads(bob_socket.sent[-1])["payload"]["transformed_ops"][0]
+        assert delta == {
+            "id": "op-2", "type": "modify", "user_id": "alice", "timestamp": delta["timestamp"],
+            "component_id": "hero", "property": "text", "data": "Hi",
+        }
+
+        _, carol_socket = await _connect(manager, "room-1", "carol")
+        await manager.senders[carol_socket].drain()
+        sync = json.loads(carol_socket.sent[-1])
+        assert sync["type"] == "document_state"
+        assert sync["payload"]["version"] == 2
+        assert sync["payload"]["version_vector"] == {"alice": 2}
+        assert [op["id"] for op in sync["payload"]["ops"]] == ["op-1", "op-2"]
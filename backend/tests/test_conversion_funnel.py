@@ -0,0 +1,228 @@
+"""
+Tests for the single-query conversion funnel.
+Checks step ordering and the conversion window against a per-user reference
+on SQLite, the PostgreSQL ``FILTER`` form, and benchmarks the query against
+one ``COUNT`` per step on 5M seeded events.
+"""
+
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, and_, create_engine, func, insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.analytics import AnalyticsEventType, WorkflowAnalyticsEvent
+from app.services.conversion_funnel import (
+    DEFAULT_FUNNEL_STEPS,
+    compute_funnel_counts,
+    funnel_statement,
+    funnel_step_rates,
+)
+
+BENCHMARK_EVENTS = 5_000_000
+START = datetime(2026, 10, 1)
+END = START + timedelta(days=30)
+WORKFLOW_ID = uuid.uuid4()
+STEP_TYPES = [step["event_type"] for step in DEFAULT_FUNNEL_STEPS]
+
+_events = WorkflowAnalyticsEvent.__table__
+
+
+def _event(user_id, event_type, created_at, workflow_id=WORKFLOW_ID):
+    return {
+        "id": uuid.uuid4(),
+        "created_at": created_at,
+        "updated_at": created_at,
+        "workflow_id": workflow_id,
+        "user_id": user_id,
+        "event_type": event_type,
+        "event_data": {},
+    }
+
+
+def _reference_counts(events, event_types, window):
+    """Per-user funnel computed in Python, the semantics the query must match."""
+    first_seen = {}
+    for event in events:
+        if event["workflow_id"] != WORKFLOW_ID or not START <= event["created_at"] <= END:
+            continue
+        per_user = first_seen.setdefault(event["user_id"], {})
+        at = per_user.get(event["event_type"])
+        if at is None or event["created_at"] < at:
+            per_user[event["event_type"]] = event["created_at"]
+
+    counts = [0] * len(event_types)
+    for per_user in first_seen.values():
+        times = [per_user.get(event_type) for event_type in event_types]
+        if times[0] is None:
+            continue
+        counts[0] += 1
+        for index in range(1, len(times)):
+            at = times[index]
+            if at is None or at < times[index - 1] or at > times[0] + window:
+                break
+            counts[index] += 1
+    return counts
+
+
+async def _legacy_counts(session, steps):
+    """The previous implementation: one COUNT of events per step."""
+    counts = []
+    for step in steps:
+        result = await session.execute(
+            select(func.count(_events.c.id)).where(and_(
+                _events.c.workflow_id == WORKFLOW_ID,
+                _events.c.event_type == step["event_type"],
+                _events.c.created_at >= START,
+                _events.c.created_at <= END,
+            ))
+        )
+        counts.append(result.scalar())
+    return counts
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    path = tmp_path / "funnel.db"
+    metadata = MetaData()
+    Table("workflows", metadata, Column("id", String(36), primary_key=True))
+    Table("users", metadata, Column("id", String(36), primary_key=True))
+    _events.to_metadata(metadata)
+    sync_engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(sync_engine)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield sync_engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+    sync_engine.dispose()
+
+
+class TestFunnelSemantics:
+    """Test ordering and the conversion window."""
+
+    @pytest.mark.asyncio
+    async def test_ordering_and_window(self, database):
+        sync_engine, session_factory = database
+        complete, out_of_order, late, other = (uuid.uuid4() for _ in range(4))
+        events = [
+            *(_event(complete, event_type, START + timedelta(hours=n)) for n, event_type in enumerate(STEP_TYPES)),
+            # Completed before triggering: stops at step 0
+            _event(out_of_order, STEP_TYPES[1], START),
+            _event(out_of_order, STEP_TYPES[0], START + timedelta(hours=1)),
+            # Completed, then sent an email after the window closed
+            _event(late, STEP_TYPES[0], START),
+            _event(late, STEP_TYPES[1], START + timedelta(days=1)),
+            _event(late, STEP_TYPES[2], START + timedelta(days=8)),
+            # Outside the date range or for another workflow
+            _event(other, STEP_TYPES[0], START - timedelta(days=1)),
+            _event(other, STEP_TYPES[0], START, workflow_id=uuid.uuid4()),
+        ]
+        with sync_engine.begin() as conn:
+            conn.execute(insert(_events), events)
+
+        async with session_factory() as session:
+            counts = await compute_funnel_counts(session, WORKFLOW_ID, START, END)
+            wide = await compute_funnel_counts(
+                session, WORKFLOW_ID, START, END, conversion_window=timedelta(days=30)
+            )
+
+        assert counts == [3, 2, 1, 1, 1, 1]
+        assert wide == [3, 2, 2, 1, 1, 1]
+
+    @pytest.mark.asyncio
+    async def test_matches_reference_on_random_events(self, database):
+        sync_engine, session_factory = database
+        rng = random.Random(21)
+        users = [uuid.uuid4() for _ in range(300)]
+        events = [
+            _event(
+                rng.choice(users),
+                rng.choice(STEP_TYPES + [AnalyticsEventType.COMPONENT_INTERACTION]),
+                START + timedelta(minutes=rng.randrange(-600, 60 * 24 * 31)),
+            )
+            for _ in range(5000)
+        ]
+        with sync_engine.begin() as conn:
+            conn.execute(insert(_events), events)
+
+        async with session_factory() as session:
+            for window in (timedelta(hours=6), timedelta(days=2), timedelta(days=7)):
+                counts = await compute_funnel_counts(
+                    session, WORKFLOW_ID, START, END, conversion_window=window
+                )
+                assert counts == _reference_counts(events, STEP_TYPES, window)
+
+    @pytest.mark.asyncio
+    async def test_empty_range(self, database):
+        _, session_factory = database
+        async with session_factory() as session:
+            counts = await compute_funnel_counts(session, WORKFLOW_ID, START, END)
+
+        assert counts == [0] * len(DEFAULT_FUNNEL_STEPS)
+        assert [step["conversion_rate"] for step in funnel_step_rates(DEFAULT_FUNNEL_STEPS, counts)] == [0.0] * 6
+
+    def test_postgresql_uses_filter_and_intervals(self):
+        statement = funnel_statement(WORKFLOW_ID, STEP_TYPES, START, END)
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+
+        assert sql.count("FILTER (WHERE") == len(STEP_TYPES)
+        assert "julianday" not in sql
+        assert sql.count("GROUP BY") == 1
+
+    def test_step_rates(self):
+        rates = funnel_step_rates(DEFAULT_FUNNEL_STEPS[:3], [200, 50, 0])
+
+        assert [rate["conversion_rate"] for rate in rates] == [100.0, 25.0, 0.0]
+        assert [rate["step"] for rate in rates] == ["workflow_triggered", "workflow_completed", "email_sent"]
+
+
+class TestFunnelBenchmark:
+    """One funnel query against one COUNT per step."""
+
+    @pytest.mark.asyncio
+    async def test_benchmark_against_per_step_counts(self, database):
+        sync_engine, session_factory = database
+        users = BENCHMARK_EVENTS // 10
+        with sync_engine.begin() as conn:
+            # Each user gets ten events an hour apart: the six funnel steps with
+            # a per-user drop-off, and interactions outside the funnel.
+            conn.execute(text("""
+                WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < :count - 1)
+                INSERT INTO workflow_analytics_events
+                    (id, created_at, updated_at, workflow_id, user_id, event_type, event_data)
+                SELECT 'e' || n, ts, ts, :workflow_id, 'u' || (n % :users),
+                       CASE WHEN n / :users < 6 AND ((n % :users) * 7919) % 100 < 100 - 15 * (n / :users)
+                            THEN CASE n / :users WHEN 0 THEN 'WORKFLOW_EXECUTION' WHEN 1 THEN 'WORKFLOW_SUCCESS'
+                                 WHEN 2 THEN 'EMAIL_SENT' WHEN 3 THEN 'EMAIL_OPENED'
+                                 WHEN 4 THEN 'EMAIL_CLICKED' ELSE 'CONVERSION' END
+                            ELSE 'COMPONENT_INTERACTION' END,
+                       '{}'
+                FROM (
+                    SELECT n, datetime(:start, '+' || (n / :users) || ' hours', '+' || (n % 3600) || ' seconds')
+                              || '.000000' AS ts
+                    FROM seq
+                )
+            """), {"count": BENCHMARK_EVENTS, "users": users, "workflow_id": str(WORKFLOW_ID), "start": str(START)})
+
+        async with session_factory() as session:
+            started = time.perf_counter()
+            legacy = await _legacy_counts(session, DEFAULT_FUNNEL_STEPS)
+            legacy_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            counts = await compute_funnel_counts(session, WORKFLOW_ID, START, END)
+            single_elapsed = time.perf_counter() - started
+
+        print(
+            f"{BENCHMARK_EVENTS} events: {len(DEFAULT_FUNNEL_STEPS)} COUNT queries {legacy_elapsed:.2f}s, "
+            f"single funnel query {single_elapsed:.2f}s"
+        )
+        expected = [users * (100 - 15 * step) // 100 for step in range(6)]
+        # Every step here happens in order within the window, so per-user and
+        # per-event counts agree; the single query must not be slower.
+        assert legacy == counts == expected
+        assert single_elapsed < legacy_elapsed
@@ -0,0 +1,360 @@
+"""
+Tests for the append-only workflow execution log.
+Covers batched log writes, sequence ordering, concurrent status updates,
+keyset-paginated timeline reads, the execution_data backfill migration and
+a benchmark against rewriting the execution_data blob per log line.
+"""
+
+import asyncio
+import importlib.util
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, create_engine, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.api.v1.endpoints.workflow_websocket import connection_manager
+from app.models.workflow import Workflow, WorkflowExecution, WorkflowExecutionLog, WorkflowExecutionStatus
+from app.services.workflow_service import WorkflowExecutionService
+
+BENCHMARK_LOG_LINES = 1_000
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "010_workflow_execution_log.py"
+EXECUTIONS_MIGRATION = MIGRATION.with_name("004_workflow_debugging_models.py")
+
+NODES = [
+    {"id": "trigger", "name": "Form submitted", "type": "trigger"},
+    {"id": "email", "name": "Send email", "type": "email"},
+    {"id": "crm", "name": "Update CRM", "type": "crm_update"},
+]
+
+
+def _metadata():
+    """Execution tables plus a minimal users table, independent of the full model registry."""
+    metadata = MetaData()
+    Table("users", metadata, Column("id", String(36), primary_key=True))
+    Workflow.__table__.to_metadata(metadata)
+    WorkflowExecution.__table__.to_metadata(metadata)
+    WorkflowExecutionLog.__table__.to_metadata(metadata)
+    return metadata
+
+
+def _workflow_row(workflow_id):
+    now = datetime.utcnow()
+    return {
+        "id": workflow_id, "created_at": now, "updated_at": now, "name": "Lead follow-up",
+        "nodes": NODES, "connections": [], "settings": {}, "owner_id": uuid.uuid4(),
+    }
+
+
+def _execution_row(execution_id, workflow_id, execution_data=None):
+    now = datetime.utcnow()
+    return {
+        "id": execution_id, "created_at": now, "updated_at": now, "workflow_id": workflow_id,
+        "status": WorkflowExecutionStatus.RUNNING, "started_at": now,
+        "trigger_data": {}, "execution_data": execution_data or {},
+    }
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'executions.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(_metadata().create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def execution_id(session_factory):
+    workflow_id, execution_id = uuid.uuid4(), uuid.uuid4()
+    async with session_factory() as session:
+        await session.execute(insert(Workflow.__table__), [_workflow_row(workflow_id)])
+        await session.execute(insert(WorkflowExecution.__table__), [_execution_row(execution_id, workflow_id)])
+        await session.commit()
+    return execution_id
+
+
+@pytest.fixture(autouse=True)
+def websocket_updates():
+    with patch.object(connection_manager, "send_execution_update", new=AsyncMock()) as send:
+        yield send
+
+
+async def _log_rows(session_factory):
+    async with session_factory() as session:
+        result = await session.execute(select(WorkflowExecutionLog.__table__).order_by("sequence"))
+        return result.fetchall()
+
+
+class TestExecutionLogWrites:
+    """Test batching and ordering of appended entries."""
+
+    @pytest.mark.asyncio
+    async def test_bulk_log_lines_are_batched(self, session_factory, execution_id):
+        async with session_factory() as session:
+            service = WorkflowExecutionService(session)
+            service.execution_log.batch_size = 10
+
+            lines = [{"node_id": "email", "level": "info", "message": f"line {n}"} for n in range(25)]
+            assert await service.add_node_execution_logs(execution_id, lines) == 25
+            assert service.execution_log.flush_count == 3
+            assert await service.add_node_execution_logs(uuid.uuid4(), lines) == 0
+
+        rows = await _log_rows(session_factory)
+        assert [row.message for row in rows] == [f"line {n}" for n in range(25)]
+        assert all(a.sequence < b.sequence for a, b in zip(rows, rows[1:]))
+
+    @pytest.mark.asyncio
+    async def test_single_log_line_is_durable(self, session_factory, execution_id):
+        async with session_factory() as session:
+            service = WorkflowExecutionService(session)
+            assert await service.add_node_execution_log(execution_id, "email", "info", "sending")
+            # Visible to other sessions without a status update or explicit flush
+            assert [row.message for row in await _log_rows(session_factory)] == ["sending"]
+
+    @pytest.mark.asyncio
+    async def test_status_update_follows_log_lines(self, session_factory, execution_id, websocket_updates):
+        async with session_factory() as session:
+            service = WorkflowExecutionService(session)
+            await service.add_node_execution_log(execution_id, "email", "info", "sending", {"to": "a@example.com"})
+
+            assert await service.update_node_execution_status(execution_id, "email", "success", execution_time_ms=42)
+
+        rows = await _log_rows(session_factory)
+        assert [(row.entry_type, row.message, row.status) for row in rows] == [
+            ("log", "sending", None),
+            ("status", None, "success"),
+        ]
+        assert rows[0].context == {"to": "a@example.com"}
+        websocket_updates.assert_awaited_once()
+        assert websocket_updates.await_args.kwargs["execution_time_ms"] == 42
+
+    @pytest.mark.asyncio
+    async def test_unknown_execution_is_rejected(self, session_factory, execution_id, websocket_updates):
+        async with session_factory() as session:
+            service = WorkflowExecutionService(session)
+
+            assert not await service.add_node_execution_log(uuid.uuid4(), "email", "info", "lost")
+            assert not await service.update_node_execution_status(uuid.uuid4(), "email", "success")
+
+        assert await _log_rows(session_factory) == []
+        websocket_updates.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_nodes_keep_every_update(self, session_factory, execution_id):
+        async def run_node(node_id):
+            async with session_factory() as session:
+                service = WorkflowExecutionService(session)
+                for status in ("running", "success"):
+                    await service.add_node_execution_log(execution_id, node_id, "info", status)
+                    await service.update_node_execution_status(execution_id, node_id, status)
+                    await asyncio.sleep(0)
+
+        await asyncio.gather(*(run_node(node["id"]) for node in NODES))
+
+        async with session_factory() as session:
+            timeline = await WorkflowExecutionService(session).get_execution_timeline_data(execution_id)
+        assert [step["status"] for step in timeline["steps"]] == ["success"] * len(NODES)
+        assert timeline["completed_steps"] == len(NODES)
+        assert len(await _log_rows(session_factory)) == 4 * len(NODES)
+
+
+class TestExecutionLogReads:
+    """Test node log and timeline reads."""
+
+    @pytest.mark.asyncio
+    async def test_node_logs_page_by_sequence(self, session_factory, execution_id):
+        async with session_factory() as session:
+            service = WorkflowExecutionService(session)
+            for n in range(7):
+                await service.add_node_execution_log(execution_id, "email", "info", f"email {n}")
+                await service.add_node_execution_log(execution_id, "crm", "debug", f"crm {n}")
+
+            pages, cursor = [], None
+            while True:
+                page = await service.get_node_execution_logs(execution_id, "email", after_sequence=cursor, limit=3)
+                if not page:
+                    break
+                pages.append([entry["message"] for entry in page])
+                cursor = page[-1]["sequence"]
+
+        assert pages == [["email 0", "email 1", "email 2"], ["email 3", "email 4", "email 5"], ["email 6"]]
+
+    @pytest.mark.asyncio
+    async def test_timeline_steps_and_keyset_pages(self, session_factory, execution_id):
+        async with session_factory() as session:
+            service = WorkflowExecutionService(session)
+            await service.update_node_execution_status(execution_id, "trigger", "running")
+            await service.update_node_execution_status(execution_id, "trigger", "success", execution_time_ms=5)
+            await service.update_node_execution_status(execution_id, "email", "running")
+            for n in range(4):
+                await service.add_node_execution_log(execution_id, "email", "warning", f"retry {n}")
+            await service.update_node_execution_status(execution_id, "email", "failed", error_details="SMTP 550")
+
+            timeline = await service.get_execution_timeline_data(execution_id, limit=3)
+            entries, cursor = list(timeline["entries"]), timeline["next_sequence"]
+            while cursor is not None:
+                page = await service.get_execution_timeline_data(execution_id, after_sequence=cursor, limit=3)
+                entries.extend(page["entries"])
+                cursor = page["next_sequence"]
+
+        steps = {step["node_id"]: step for step in timeline["steps"]}
+        assert steps["trigger"]["status"] == "success" and steps["trigger"]["execution_time_ms"] == 5
+        assert steps["trigger"]["started_at"] <= steps["trigger"]["finished_at"]
+        assert steps["email"]["status"] == "failed" and steps["email"]["error_message"] == "SMTP 550"
+        assert steps["crm"]["status"] == "pending" and steps["crm"]["started_at"] is None
+        assert (timeline["completed_steps"], timeline["failed_steps"], timeline["total_steps"]) == (1, 1, 3)
+
+        assert [entry["sequence"] for entry in entries] == sorted({entry["sequence"] for entry in entries})
+        assert len(entries) == 8
+        assert [entry.get("message") for entry in entries if entry["type"] == "log"] == [f"retry {n}" for n in range(4)]
+
+    @pytest.mark.asyncio
+    async def test_missing_execution_has_no_timeline(self, session_factory, execution_id):
+        async with session_factory() as session:
+            assert await WorkflowExecutionService(session).get_execution_timeline_data(uuid.uuid4()) == {}
+
+
+def _load_migration(path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    return migration
+
+
+class _RecordingOps:
+    """Stand-in for ``alembic.op`` that records created tables and ignores everything else."""
+
+    def __init__(self):
+        self.tables = {}
+
+    def create_table(self, name, *columns, **kwargs):
+        self.tables[name] = {column.name: column for column in columns if hasattr(column, "name")}
+
+    def get_bind(self):
+        return None
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class TestBackfillMigration:
+    """Test copying execution_data node statuses and logs into the log table."""
+
+    def test_execution_id_matches_executions_primary_key(self, monkeypatch):
+        # SQLite ignores column types, so compare against the migration that created the parent table
+        ops = _RecordingOps()
+        executions_migration = _load_migration(EXECUTIONS_MIGRATION)
+        monkeypatch.setattr(executions_migration, "op", ops)
+        executions_migration.upgrade()
+        migration = _load_migration(MIGRATION)
+        monkeypatch.setattr(migration, "op", ops)
+        monkeypatch.setattr(migration, "backfill", lambda bind: 0)
+        migration.upgrade()
+
+        parent = type(ops.tables["workflow_executions"]["id"].type)
+        assert type(ops.tables["workflow_execution_log"]["execution_id"].type) is parent
+        assert type(migration.executions.c.id.type) is parent
+        assert type(migration.execution_log.c.execution_id.type) is parent
+
+    def test_backfill_preserves_order_and_latest_status(self, tmp_path):
+        migration = _load_migration(MIGRATION)
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'backfill.db'}")
+        _metadata().create_all(engine)
+        workflow_id = uuid.uuid4()
+        started = datetime(2026, 10, 1, 12, 0, 0)
+        ts = lambda seconds: (started + timedelta(seconds=seconds)).isoformat()
+        executions = [
+            _execution_row(uuid.uuid4(), workflow_id, {
+                "node_statuses": {
+                    "email": {"status": "success", "timestamp": ts(5), "execution_time_ms": 900, "error_details": None},
+                    "trigger": {"status": "success", "timestamp": ts(1), "execution_time_ms": 3, "error_details": None},
+                },
+                "node_logs": {
+                    "email": [
+                        {"timestamp": ts(2), "level": "info", "message": "sending", "context": {}},
+                        {"timestamp": ts(5), "level": "info", "message": "sent", "context": {"id": 7}},
+                    ],
+                },
+            })
+            for _ in range(3)
+        ] + [_execution_row(uuid.uuid4(), workflow_id)]
+
+        with engine.begin() as conn:
+            conn.execute(insert(Workflow.__table__), [_workflow_row(workflow_id)])
+            conn.execute(insert(WorkflowExecution.__table__), executions)
+            migration.BACKFILL_CHUNK_SIZE = 2
+            written = migration.backfill(conn)
+
+        log = WorkflowExecutionLog.__table__
+        with engine.connect() as conn:
+            rows = conn.execute(select(log).order_by(log.c.sequence)).fetchall()
+        assert written == len(rows) == 12
+
+        first = str(executions[0]["id"])
+        first_rows = [row for row in rows if str(row.execution_id) == first]
+        assert [(row.node_id, row.entry_type, row.message) for row in first_rows] == [
+            ("trigger", "status", None),
+            ("email", "log", "sending"),
+            ("email", "log", "sent"),
+            ("email", "status", None),
+        ]
+        assert first_rows[2].context == {"id": 7}
+        assert first_rows[3].execution_time_ms == 900
+
+
+class TestExecutionLogBenchmark:
+    """Append-only log vs rewriting execution_data for every log line."""
+
+    @pytest.mark.asyncio
+    async def test_append_is_faster_than_blob_rewrite(self, session_factory, execution_id):
+        executions = WorkflowExecution.__table__
+
+        async def legacy_add_log(session, n):
+            # The previous add_node_execution_log: load the blob, append, write it back, commit
+            result = await session.execute(select(executions.c.execution_data).where(executions.c.id == execution_id))
+            execution_data = result.scalar_one() or {}
+            execution_data.setdefault("node_logs", {}).setdefault("email", []).append({
+                "timestamp": datetime.utcnow().isoformat(), "level": "info", "message": f"line {n}", "context": {},
+            })
+            await session.execute(
+                update(executions).where(executions.c.id == execution_id).values(execution_data=execution_data)
+            )
+            await session.commit()
+
+        async with session_factory() as session:
+            started = time.perf_counter()
+            for n in range(BENCHMARK_LOG_LINES):
+                await legacy_add_log(session, n)
+            legacy = time.perf_counter() - started
+
+        async with session_factory() as session:
+            service = WorkflowExecutionService(session)
+            started = time.perf_counter()
+            for n in range(BENCHMARK_LOG_LINES):
+                await service.add_node_execution_log(execution_id, "email", "info", f"line {n}")
+            appended = time.perf_counter() - started
+
+            lines = [{"node_id": "email", "level": "info", "message": f"line {n}"} for n in range(BENCHMARK_LOG_LINES)]
+            started = time.perf_counter()
+            await service.add_node_execution_logs(execution_id, lines)
+            batched = time.perf_counter() - started
+
+        async with session_factory() as session:
+            count = await session.execute(select(func.count()).select_from(WorkflowExecutionLog.__table__))
+            assert count.scalar() == 2 * BENCHMARK_LOG_LINES
+
+        print(
+            f"{BENCHMARK_LOG_LINES} log lines: execution_data rewrite {legacy * 1000:.0f}ms, "
+            f"append-only log {appended * 1000:.0f}ms per line ({legacy / appended:.1f}x), "
+            f"{batched * 1000:.0f}ms batched ({legacy / batched:.1f}x)"
+        )
+        # Both commit every line; the append no longer rewrites a growing blob
+        assert appended < legacy
+        assert batched * 5 < legacy
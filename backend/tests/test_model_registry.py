@@ -0,0 +1,191 @@
+"""
+Tests for the versioned model registry.
+Covers lazy once-per-process loading under concurrency, hot-swapping to a
+newly activated version, artifact integrity checks, the root cause training
+job, and that constructing SLARemediationService trains nothing.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.model_registry import ModelRegistry
+from app.services.root_cause_model import (
+    FEATURE_NAMES,
+    ROOT_CAUSE_MODEL,
+    generate_mock_training_data,
+    load_root_cause_model,
+    train_root_cause_model,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _model(seed: int) -> RandomForestClassifier:
+    rng = np.random.default_rng(seed)
+    X = rng.random((60, 3))
+    return RandomForestClassifier(n_estimators=5, random_state=seed).fit(X, X[:, 0] > 0.5)
+
+
+class TestModelRegistry:
+    """Test registration, lazy loading and hot-swapping."""
+
+    def test_register_stores_metadata(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+
+        metadata = registry.register("demo", _model(1), feature_schema=["a", "b", "c"], metrics={"accuracy": 0.9})
+
+        assert registry.active_version("demo") == metadata["version"]
+        assert registry.versions("demo") == [metadata]
+        assert metadata["feature_schema"] == ["a", "b", "c"]
+        assert metadata["metrics"] == {"accuracy": 0.9}
+        assert len(metadata["sha256"]) == 64
+
+    def test_concurrent_first_gets_load_once(self, tmp_path):
+        ModelRegistry(str(tmp_path)).register("demo", _model(1), feature_schema=["a", "b", "c"])
+        registry = ModelRegistry(str(tmp_path))
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            artifacts = list(pool.map(lambda _: registry.get("demo"), range(200)))
+
+        assert registry.loads == 1
+        assert all(artifact is artifacts[0] for artifact in artifacts)
+
+    def test_get_during_first_load_waits_for_artifact(self, tmp_path):
+        ModelRegistry(str(tmp_path)).register("demo", _model(1), feature_schema=["a", "b", "c"])
+        registry = ModelRegistry(str(tmp_path))
+        loading, release = threading.Event(), threading.Event()
+        load = registry._load
+
+        def blocking_load(name, version):
+            loading.set()
+            assert release.wait(5)
+            return load(name, version)
+
+        results = {}
+        with patch.object(registry, "_load", side_effect=blocking_load):
+            first = threading.Thread(target=lambda: results.setdefault("first", registry.get("demo")))
+            first.start()
+            assert loading.wait(5)
+            second = threading.Thread(target=lambda: results.setdefault("second", registry.get("demo")))
+            second.start()
+            # The second caller must queue behind the load, not return early
+            second.join(0.2)
+            assert second.is_alive()
+            release.set()
+            first.join(5)
+            second.join(5)
+
+        assert results["first"] is not None
+        assert results["second"] is results["first"]
+        assert registry.loads == 1
+
+    def test_failed_first_load_is_retried(self, tmp_path):
+        trainer = ModelRegistry(str(tmp_path))
+        metadata = trainer.register("demo", _model(1), feature_schema=["a", "b", "c"])
+        artifact_path = tmp_path / "demo" / f"{metadata['version']}.joblib"
+        data = artifact_path.read_bytes()
+        artifact_path.write_bytes(b"truncated")
+        registry = ModelRegistry(str(tmp_path), refresh_interval=60, clock=FakeClock())
+
+        assert registry.get("demo") is None
+        artifact_path.write_bytes(data)
+        assert registry.get("demo").version == metadata["version"]
+
+    def test_other_process_picks_up_new_version_after_refresh(self, tmp_path):
+        trainer = ModelRegistry(str(tmp_path))
+        first = trainer.register("demo", _model(1), feature_schema=["a", "b", "c"])
+        clock = FakeClock()
+        server = ModelRegistry(str(tmp_path), refresh_interval=60, clock=clock)
+        assert server.get("demo").version == first["version"]
+
+        second = trainer.register("demo", _model(2), feature_schema=["a", "b", "c"])
+        clock.now = 30
+        assert server.get("demo").version == first["version"]
+        clock.now = 61
+        assert server.get("demo").version == second["version"]
+        assert server.loads == 2
+
+    def test_activate_rolls_back_in_process(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        first = registry.register("demo", _model(1), feature_schema=["a", "b", "c"])
+        registry.register("demo", _model(2), feature_schema=["a", "b", "c"])
+
+        registry.activate("demo", first["version"])
+
+        assert registry.get("demo").version == first["version"]
+        assert registry.active_version("demo") == first["version"]
+
+    def test_corrupted_artifact_is_not_served(self, tmp_path):
+        trainer = ModelRegistry(str(tmp_path))
+        first = trainer.register("demo", _model(1), feature_schema=["a", "b", "c"])
+        clock = FakeClock()
+        server = ModelRegistry(str(tmp_path), refresh_interval=60, clock=clock)
+        server.get("demo")
+
+        second = trainer.register("demo", _model(2), feature_schema=["a", "b", "c"])
+        (tmp_path / "demo" / f"{second['version']}.joblib").write_bytes(b"truncated")
+        clock.now = 61
+
+        assert server.get("demo").version == first["version"]
+
+    def test_unknown_model_is_none(self, tmp_path):
+        assert ModelRegistry(str(tmp_path)).get("missing") is None
+
+
+class TestRootCauseModel:
+    """Test the background training job."""
+
+    def test_training_job_registers_usable_model(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+
+        metadata = train_root_cause_model(generate_mock_training_data(100), registry=registry)
+        artifact = load_root_cause_model(registry)
+
+        assert artifact.version == metadata["version"]
+        assert metadata["feature_schema"] == FEATURE_NAMES
+        assert metadata["metrics"]["training_samples"] == 100
+        probabilities = artifact.model.predict_proba(np.zeros((1, len(FEATURE_NAMES))))
+        assert probabilities.shape == (1, len(metadata["metrics"]["classes"]))
+
+    def test_insufficient_data_registers_nothing(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+
+        assert train_root_cause_model(generate_mock_training_data(10), registry=registry) is None
+        assert registry.versions(ROOT_CAUSE_MODEL) == []
+
+    def test_schema_mismatch_is_not_loaded(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path))
+        registry.register(ROOT_CAUSE_MODEL, _model(1), feature_schema=["a", "b", "c"])
+
+        assert load_root_cause_model(registry) is None
+
+
+class TestRemediationServiceConstruction:
+    """Per-request service construction must not train."""
+
+    def test_constructing_service_trains_nothing(self, tmp_path):
+        # The service module imports app.models.workflow.SLAViolation, which
+        # this tree does not define yet.
+        remediation = pytest.importorskip("app.services.sla_remediation_service", exc_type=ImportError)
+        registry = ModelRegistry(str(tmp_path))
+        train_root_cause_model(generate_mock_training_data(100), registry=registry)
+        loading = ModelRegistry(str(tmp_path))
+
+        with patch("app.services.root_cause_model.get_model_registry", return_value=loading), \
+             patch.object(RandomForestClassifier, "fit") as fit:
+            services = [remediation.SLARemediationService(Mock()) for _ in range(1000)]
+
+        fit.assert_not_called()
+        assert loading.loads == 1
+        assert all(service.root_cause_analyzer.is_trained for service in services)
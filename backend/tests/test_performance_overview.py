@@ -0,0 +1,190 @@
+"""
+Tests for the batched workflow performance overview.
+Covers trend bucketing and pivoting, keyset pagination over workflows, and
+that the number of statements executed does not depend on the number of
+workflows.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, create_engine, event, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.analytics import AnalyticsEventType, WorkflowAnalyticsEvent, WorkflowPerformanceMetrics
+from app.services.performance_overview import get_performance_overview, trend_statement
+
+START = datetime(2026, 10, 5)  # A Monday
+END = START + timedelta(days=30)
+USER_ID = uuid.uuid4()
+
+
+def _metrics_row(workflow_id, total_executions=10):
+    return {
+        "id": uuid.uuid4(),
+        "created_at": START,
+        "updated_at": START,
+        "workflow_id": workflow_id,
+        "user_id": USER_ID,
+        "period_start": START,
+        "period_end": END,
+        "total_executions": total_executions,
+        "successful_executions": 8,
+        "failed_executions": 2,
+        "success_rate": 0.8,
+        "avg_execution_time_ms": 120.0,
+        "median_execution_time_ms": 100.0,
+        "p95_execution_time_ms": 300.0,
+        "total_conversions": 1,
+        "conversion_rate": 0.1,
+        "total_revenue": 25,
+        "avg_revenue_per_execution": 2.5,
+        "total_execution_cost": 1,
+        "cost_per_execution": 0.1,
+        "roi_percentage": 2400.0,
+        "unique_users_engaged": 4,
+        "total_interactions": 12,
+        "engagement_score": 30.0,
+    }
+
+
+def _event(workflow_id, event_type, created_at, execution_time_ms=None):
+    return {
+        "id": uuid.uuid4(),
+        "created_at": created_at,
+        "updated_at": created_at,
+        "workflow_id": workflow_id,
+        "user_id": USER_ID,
+        "event_type": event_type,
+        "event_data": {},
+        "execution_time_ms": execution_time_ms,
+    }
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    path = tmp_path / "overview.db"
+    metadata = MetaData()
+    Table("workflows", metadata, Column("id", String(36), primary_key=True), Column("name", String(255)))
+    Table("users", metadata, Column("id", String(36), primary_key=True))
+    WorkflowAnalyticsEvent.__table__.to_metadata(metadata)
+    WorkflowPerformanceMetrics.__table__.to_metadata(metadata)
+    sync_engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(sync_engine)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    yield sync_engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), statements
+    await engine.dispose()
+    sync_engine.dispose()
+
+
+def _seed(sync_engine, workflow_count):
+    workflow_ids = sorted(str(uuid.uuid4()) for _ in range(workflow_count))
+    events = []
+    for n, workflow_id in enumerate(workflow_ids):
+        for day in range(3):
+            at = START + timedelta(days=day, hours=n % 24)
+            events.append(_event(workflow_id, AnalyticsEventType.WORKFLOW_EXECUTION, at))
+            events.append(_event(workflow_id, AnalyticsEventType.WORKFLOW_SUCCESS, at, 100 * (day + 1)))
+        events.append(_event(workflow_id, AnalyticsEventType.WORKFLOW_FAILURE, START, 400))
+        events.append(_event(workflow_id, AnalyticsEventType.EMAIL_SENT, START))
+    with sync_engine.begin() as conn:
+        conn.execute(
+            insert(Table("workflows", MetaData(), Column("id", String(36)), Column("name", String(255)))),
+            [{"id": workflow_id, "name": f"Workflow {n}"} for n, workflow_id in enumerate(workflow_ids[1:], 1)]
+        )
+        conn.execute(insert(WorkflowPerformanceMetrics.__table__), [_metrics_row(w) for w in workflow_ids])
+        conn.execute(insert(WorkflowAnalyticsEvent.__table__), events)
+    return workflow_ids
+
+
+class TestPerformanceOverview:
+    """Test the overview rows and their trends."""
+
+    @pytest.mark.asyncio
+    async def test_trends_are_pivoted_per_workflow(self, database):
+        sync_engine, session_factory, _ = database
+        workflow_ids = _seed(sync_engine, 3)
+
+        async with session_factory() as session:
+            overview = await get_performance_overview(session, workflow_ids, START, END)
+            weekly = await get_performance_overview(session, workflow_ids[:1], START, END, bucket="week")
+
+        assert [row["workflow_id"] for row in overview] == workflow_ids
+        assert [row["workflow_name"] for row in overview] == ["Unknown", "Workflow 1", "Workflow 2"]
+        assert overview[0]["total_revenue"] == 25.0 and overview[0]["unique_users"] == 4
+
+        first = overview[0]
+        assert [point["date"] for point in first["execution_trend"]] == [
+            (START + timedelta(days=day)).isoformat() for day in range(3)
+        ]
+        assert first["execution_trend"][0] == {
+            "date": START.isoformat(), "executions": 1, "successful": 1, "failed": 1
+        }
+        assert first["performance_trend"][0] == {
+            "date": START.isoformat(), "avg_execution_time_ms": 250.0, "success_rate": 0.5
+        }
+        assert first["performance_trend"][2]["avg_execution_time_ms"] == 300.0
+
+        assert weekly[0]["execution_trend"] == [
+            {"date": START.isoformat(), "executions": 3, "successful": 3, "failed": 1}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination(self, database):
+        sync_engine, session_factory, _ = database
+        workflow_ids = _seed(sync_engine, 7)
+
+        pages = []
+        after = None
+        async with session_factory() as session:
+            while True:
+                page = await get_performance_overview(
+                    session, workflow_ids, START, END, after_workflow_id=after, limit=3
+                )
+                if not page:
+                    break
+                pages.append([row["workflow_id"] for row in page])
+                after = page[-1]["workflow_id"]
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [workflow_id for page in pages for workflow_id in page] == workflow_ids
+
+    @pytest.mark.asyncio
+    async def test_statement_count_does_not_grow_with_workflows(self, database):
+        sync_engine, session_factory, statements = database
+        workflow_ids = _seed(sync_engine, 40)
+
+        counts = []
+        for subset in (workflow_ids[:1], workflow_ids[:10], workflow_ids):
+            statements.clear()
+            async with session_factory() as session:
+                overview = await get_performance_overview(session, subset, START, END)
+            assert len(overview) == len(subset)
+            counts.append(len([s for s in statements if s.lstrip().upper().startswith("SELECT")]))
+
+        assert counts == [2, 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_no_workflows(self, database):
+        _, session_factory, statements = database
+        async with session_factory() as session:
+            assert await get_performance_overview(session, [], START, END) == []
+        assert statements == []
+
+    def test_postgresql_buckets_with_date_trunc(self):
+        sql = str(trend_statement(["w"], START, END, "week").compile(dialect=postgresql.dialect()))
+
+        assert "date_trunc" in sql and "GROUP BY" in sql
+
+    def test_unknown_bucket(self):
+        with pytest.raises(ValueError):
+            trend_statement(["w"], START, END, "month", "sqlite")
@@ -0,0 +1,235 @@
+"""
+Tests for the rolling SLA prediction feature store.
+Checks the incremental weighted statistics against numpy, batch-order
+independence of ingestion, the rolling violation window, process-stable
+violation type encodings, and benchmarks a feature read against scanning
+30 days of raw events.
+"""
+
+import os
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.analytics import (
+    AnalyticsEventType,
+    WorkflowAnalyticsEvent,
+    WorkflowLatencySketch,
+    WorkflowPredictionFeatures,
+)
+from app.services.analytics_ingestion import AnalyticsEventBuffer
+from app.services.prediction_features import (
+    add_sample,
+    empty_sums,
+    fold_rows,
+    load_prediction_features,
+    merge_prediction_features,
+    prediction_features_from_row,
+    window_statistics,
+)
+from app.services.sla_batch_inference import violation_type_encoding
+
+WORKFLOW_ID = str(uuid.uuid4())
+USER_ID = str(uuid.uuid4())
+BENCHMARK_EVENTS = 20_000
+
+
+def _event(created_at, execution_time_ms=100, event_type=AnalyticsEventType.WORKFLOW_EXECUTION, workflow_id=WORKFLOW_ID):
+    return {
+        "workflow_id": workflow_id,
+        "execution_id": None,
+        "user_id": USER_ID,
+        "event_type": event_type,
+        "event_data": {},
+        "execution_time_ms": execution_time_ms,
+        "resource_usage": None,
+        "conversion_value": None,
+        "revenue_impact": None,
+        "component_id": None,
+        "source_ip": None,
+        "user_agent": None,
+        "created_at": created_at,
+    }
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    metadata = MetaData()
+    Table("workflows", metadata, Column("id", String(36), primary_key=True))
+    Table("users", metadata, Column("id", String(36), primary_key=True))
+    for model in (WorkflowAnalyticsEvent, WorkflowLatencySketch, WorkflowPredictionFeatures):
+        model.__table__.to_metadata(metadata)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'features.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestWindowStatistics:
+    """Test the incremental weighted least squares."""
+
+    def test_undecayed_sums_match_numpy(self):
+        values = np.random.default_rng(1).normal(5000, 800, 30)
+        sums = empty_sums()
+        for value in values:
+            add_sample(sums, value, decay=1.0)
+
+        mean, std, slope = window_statistics(sums)
+
+        assert mean == pytest.approx(np.mean(values))
+        assert std == pytest.approx(np.std(values))
+        assert slope == pytest.approx(np.polyfit(range(30), values, 1)[0])
+
+    def test_decayed_sums_match_weighted_fit(self):
+        decay = 0.9
+        values = np.random.default_rng(2).normal(5000, 800, 200)
+        sums = empty_sums()
+        for value in values:
+            add_sample(sums, value, decay=decay)
+
+        weights = decay ** np.arange(len(values))[::-1]
+        mean, std, slope = window_statistics(sums)
+
+        assert mean == pytest.approx(np.average(values, weights=weights))
+        assert std == pytest.approx(np.sqrt(np.average((values - mean) ** 2, weights=weights)))
+        assert slope == pytest.approx(np.polyfit(range(len(values)), values, 1, w=np.sqrt(weights))[0])
+
+    def test_rising_latency_has_positive_trend(self):
+        start = datetime(2026, 1, 1)
+        rows = [_event(start + timedelta(minutes=n), 1000 + 10 * n) for n in range(100)]
+
+        features = prediction_features_from_row(fold_rows({}, rows), now=start)
+
+        assert features["perf_trend"] == pytest.approx(10.0)
+        assert features["sample_count"] == 100
+
+
+class TestRollingWindow:
+    """Test violation counting and pruning."""
+
+    def test_violations_outside_window_are_not_counted(self):
+        now = datetime(2026, 3, 1)
+        rows = [
+            _event(now - timedelta(days=40), None, AnalyticsEventType.SLA_VIOLATION),
+            _event(now - timedelta(days=5), None, AnalyticsEventType.SLA_VIOLATION),
+            _event(now - timedelta(days=1), None, AnalyticsEventType.SLA_VIOLATION),
+            _event(now - timedelta(days=1), 250),
+        ]
+
+        state = fold_rows({}, rows)
+        features = prediction_features_from_row(state, now=now)
+
+        assert features["recent_violations"] == 2
+        assert features["recent_events"] == 3
+        assert min(state["daily_counts"]) >= (now - timedelta(days=31)).date().isoformat()
+
+    def test_stored_aware_last_event_at_is_compared_in_utc(self):
+        # PostgreSQL returns the timestamptz column aware; events are naive UTC
+        stored = fold_rows({}, [_event(datetime(2026, 3, 1, 12), 100)])
+        stored["last_event_at"] = datetime(2026, 3, 1, 14, tzinfo=timezone(timedelta(hours=2)))
+
+        state = fold_rows(stored, [_event(datetime(2026, 3, 1, 12, 30), 200)])
+
+        assert state["last_event_at"] == datetime(2026, 3, 1, 12, 30)
+        assert state["sample_count"] == 2
+
+
+class TestFeatureStoreIngestion:
+    """Test features maintained through the analytics event buffer."""
+
+    @pytest.mark.asyncio
+    async def test_incremental_batches_match_single_merge(self, session_factory):
+        start = datetime.utcnow() - timedelta(hours=2)
+        rows = [_event(start + timedelta(seconds=n), 1000 + (n * 37) % 400) for n in range(120)]
+        rows[7]["event_type"] = AnalyticsEventType.SLA_VIOLATION
+
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=25, flush_interval=60)
+        for row in rows:
+            await buffer.add(dict(row))
+        await buffer.close()
+
+        async with session_factory() as session:
+            stored = await load_prediction_features(session, [WORKFLOW_ID])
+
+        expected = prediction_features_from_row(fold_rows({}, rows))
+        assert stored[WORKFLOW_ID] == pytest.approx(expected)
+        assert stored[WORKFLOW_ID]["recent_violations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_load_returns_only_known_workflows(self, session_factory):
+        other = str(uuid.uuid4())
+        async with session_factory() as session:
+            await merge_prediction_features(session, [_event(datetime.utcnow(), 500, workflow_id=other)])
+            await session.commit()
+            stored = await load_prediction_features(session, [WORKFLOW_ID, other])
+
+        assert list(stored) == [other]
+        assert stored[other]["perf_mean"] == 500
+
+
+class TestViolationTypeEncoding:
+    """Test encodings are stable across processes."""
+
+    def test_encoding_ignores_hash_seed(self):
+        types = ["pr_review_time", "build_time", "test_execution"]
+        script = (
+            "from app.services.sla_batch_inference import violation_type_encoding as e; "
+            f"print([e(t) for t in {types!r}])"
+        )
+        outputs = set()
+        for seed in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            outputs.add(subprocess.run(
+                [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+            ).stdout.strip())
+
+        assert outputs == {str([violation_type_encoding(t) for t in types])}
+        assert all(0 <= violation_type_encoding(t) < 1 for t in types)
+
+
+class TestFeatureReadBenchmark:
+    """One workflow with 30 days of events: raw scan vs feature store read."""
+
+    @pytest.mark.asyncio
+    async def test_feature_read_benchmark(self, session_factory):
+        now = datetime.utcnow()
+        step = timedelta(days=30) / BENCHMARK_EVENTS
+        rows = [_event(now - step * n, 1000 + n % 500) for n in range(BENCHMARK_EVENTS)]
+
+        buffer = AnalyticsEventBuffer(session_factory, batch_size=5000, flush_interval=60)
+        for row in rows:
+            await buffer.add(row)
+        await buffer.close()
+
+        events = WorkflowAnalyticsEvent.__table__
+        async with session_factory() as session:
+            started = time.perf_counter()
+            result = await session.execute(
+                select(events.c.execution_time_ms, events.c.event_type).where(
+                    and_(events.c.workflow_id == WORKFLOW_ID, events.c.created_at >= now - timedelta(days=30))
+                ).order_by(events.c.created_at)
+            )
+            history = [row.execution_time_ms for row in result.all() if row.execution_time_ms]
+            np.polyfit(range(len(history[-30:])), history[-30:], 1)
+            scan_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            stored = await load_prediction_features(session, [WORKFLOW_ID])
+            store_seconds = time.perf_counter() - started
+
+        print(
+            f"{BENCHMARK_EVENTS} events: raw scan {scan_seconds * 1000:.1f}ms, "
+            f"feature store {store_seconds * 1000:.2f}ms ({scan_seconds / store_seconds:.0f}x)"
+        )
+        assert stored[WORKFLOW_ID]["sample_count"] == BENCHMARK_EVENTS
+        assert store_seconds * 5 < scan_seconds
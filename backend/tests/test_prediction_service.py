@@ -32,9 +32,10 @@ class TestSLAPredictionService:
         service = SLAPredictionService(mock_db)
         # Mock model initialization
         service.model = Mock()
-        service.model.predict_proba = Mock(return_value=[[0.2, 0.8]])  # 80% violation probability
+        service.model.predict_proba = Mock(side_effect=lambda X: [[0.2, 0.8]] * len(X))  # 80% violation probability
         service.feature_pipeline = Mock()
-        return service
+        with patch('app.services.prediction_service.load_prediction_features', AsyncMock(return_value={})):
+            yield service
     
     @pytest.mark.asyncio
     async def test_prediction_accuracy_threshold(self, prediction_service):
@@ -65,7 +66,7 @@ class TestSLAPredictionService:
     async def test_prediction_confidence_filtering(self, prediction_service):
         """Test that low-confidence predictions are filtered out."""
         # Mock low confidence predictions
-        prediction_service.model.predict_proba = Mock(return_value=[[0.8, 0.2]])  # Low probability
+        prediction_service.model.predict_proba = Mock(side_effect=lambda X: [[0.8, 0.2]] * len(X))  # Low probability
         
         with patch.object(prediction_service, '_extract_prediction_features') as mock_extract:
             mock_extract.return_value = {'workflow_id': 1, 'historical_performance': []}
@@ -0,0 +1,141 @@
+"""
+Tests for execution-time quantile sketches.
+Validates DDSketch accuracy against exact percentiles, lossless merging of
+hourly buckets and the incremental sketch store.
+"""
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, select, func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.analytics import WorkflowLatencySketch
+from app.services.latency_sketches import merge_bucket_sketches, load_window_sketch
+from app.services.quantile_sketch import DDSketch
+
+SAMPLES = 1_000_000
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _relative_error(estimate, exact):
+    return abs(estimate - exact) / exact
+
+
+@pytest.fixture(scope="module")
+def execution_times():
+    """Long-tailed synthetic execution times in milliseconds."""
+    rng = np.random.default_rng(42)
+    return rng.lognormal(mean=6.0, sigma=1.2, size=SAMPLES)
+
+
+class TestDDSketch:
+    """Test sketch accuracy and merge semantics."""
+
+    def test_quantiles_within_one_percent_on_1m_samples(self, execution_times):
+        sketch = DDSketch()
+        sketch.add_many(execution_times)
+
+        for q in QUANTILES:
+            exact = np.quantile(execution_times, q, method="lower")
+            assert _relative_error(sketch.quantile(q), exact) < 0.01, q
+
+    def test_merged_hourly_buckets_match_single_sketch(self, execution_times):
+        whole = DDSketch()
+        whole.add_many(execution_times)
+
+        merged = DDSketch()
+        for hour in np.array_split(execution_times, 24 * 30):
+            bucket = DDSketch()
+            bucket.add_many(hour)
+            merged.merge(DDSketch.from_dict(json.loads(json.dumps(bucket.to_dict()))))
+
+        assert merged.count == SAMPLES
+        for q in QUANTILES:
+            assert merged.quantile(q) == whole.quantile(q)
+            exact = np.quantile(execution_times, q, method="lower")
+            assert _relative_error(merged.quantile(q), exact) < 0.01
+
+    def test_zero_values_and_empty_sketch(self):
+        sketch = DDSketch()
+        assert sketch.quantile(0.5) == 0.0
+
+        sketch.add_many([0, 0, 0, 100])
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == pytest.approx(100, rel=0.01)
+
+    def test_merge_rejects_different_accuracy(self):
+        with pytest.raises(ValueError):
+            DDSketch(0.01).merge(DDSketch(0.02))
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    metadata = MetaData()
+    Table("workflows", metadata, Column("id", String(36), primary_key=True))
+    WorkflowLatencySketch.__table__.to_metadata(metadata)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sketches.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestLatencySketchStore:
+    """Test incremental per-hour sketch persistence."""
+
+    @pytest.mark.asyncio
+    async def test_incremental_merge_and_window_query(self, session_factory):
+        workflow_id = str(uuid.uuid4())
+        start = datetime(2026, 1, 1)
+        rng = np.random.default_rng(7)
+        values = rng.lognormal(5.0, 1.0, size=6000)
+        rows = [
+            {"workflow_id": workflow_id, "created_at": start + timedelta(minutes=i % 360), "execution_time_ms": float(v)}
+            for i, v in enumerate(values)
+        ]
+        rows.append({"workflow_id": workflow_id, "created_at": start, "execution_time_ms": None})
+
+        # Ingest in three flushes so existing buckets are merged, not replaced
+        for chunk in (rows[:2000], rows[2000:4000], rows[4000:]):
+            async with session_factory() as session:
+                await merge_bucket_sketches(session, chunk)
+                await session.commit()
+
+        async with session_factory() as session:
+            buckets = (await session.execute(
+                select(func.count()).select_from(WorkflowLatencySketch.__table__)
+            )).scalar()
+            sketch = await load_window_sketch(session, workflow_id, start, start + timedelta(hours=6))
+
+        assert buckets == 6
+        assert sketch.count == len(values)
+        for q in QUANTILES:
+            assert _relative_error(sketch.quantile(q), np.quantile(values, q, method="lower")) < 0.01
+
+    @pytest.mark.asyncio
+    async def test_aware_timestamps_merge_into_naive_buckets(self, session_factory):
+        workflow_id = str(uuid.uuid4())
+        plus_two = timezone(timedelta(hours=2))
+        # 14:xx at UTC+2 is the 12:00 UTC bucket
+        rows = [
+            {"workflow_id": workflow_id, "created_at": datetime(2026, 1, 1, 14, m, tzinfo=plus_two), "execution_time_ms": 10.0 * m}
+            for m in range(1, 5)
+        ]
+
+        for chunk in (rows[:2], rows[2:]):
+            async with session_factory() as session:
+                await merge_bucket_sketches(session, chunk)
+                await session.commit()
+
+        async with session_factory() as session:
+            buckets = (await session.execute(
+                select(WorkflowLatencySketch.__table__.c.bucket_start, WorkflowLatencySketch.__table__.c.sample_count)
+            )).all()
+
+        assert [tuple(bucket) for bucket in buckets] == [(datetime(2026, 1, 1, 12), 4)]
@@ -0,0 +1,166 @@
+"""
+Tests for the website scraper crawl frontier.
+Crawls a local aiohttp fixture site to check URL de-duplication, depth and
+page bounds, and benchmarks a 2,000-page crawl with inline and process-pool
+parsing (pages/s, peak RSS and event-loop stalls).
+"""
+
+import asyncio
+import resource
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.services.migration.scraping_service import WebsiteScraper, normalize_url
+
+SITE_PAGES = 2000
+LINKS_PER_PAGE = 10
+STALL_THRESHOLD_SECONDS = 0.025
+
+
+def _page_html(index: int) -> str:
+    children = "".join(
+        f'<li><a href="/page/{child}/">Page {child}</a></li>'
+        for child in range(index * LINKS_PER_PAGE + 1, min((index + 1) * LINKS_PER_PAGE + 1, SITE_PAGES))
+    )
+    parent = "/" if index <= LINKS_PER_PAGE else f"/page/{(index - 1) // LINKS_PER_PAGE}/"
+    paragraphs = "".join(
+        f"<p class='copy'>Paragraph {n} of page {index} with <strong>marketing</strong> copy.</p>"
+        for n in range(40)
+    )
+    return f"""<!DOCTYPE html>
+<html><head>
+<title>Page {index}</title>
+<meta name="description" content="Fixture page {index}">
+<link rel="stylesheet" href="/static/site.css">
+<script type="application/ld+json">{{"@type": "WebPage", "name": "Page {index}"}}</script>
+<script>window.page = {index};</script>
+</head><body>
+<nav><a href="/">Home</a><a href="#top">Top</a><a href="{parent}#main">Up</a><a href="mailto:hi@example.com">Mail</a></nav>
+<main><h1>Page {index}</h1><img src="/img/{index % 5}.png" alt="Image"><ul>{children}</ul>{paragraphs}</main>
+</body></html>"""
+
+
+@pytest_asyncio.fixture
+async def fixture_site():
+    """Local site of SITE_PAGES pages; page i links to pages 10i+1..10i+10."""
+    hits = {"pages": 0, "css": 0}
+
+    async def page(request):
+        index = int(request.match_info.get("index", 0))
+        if index >= SITE_PAGES:
+            raise web.HTTPNotFound()
+        hits["pages"] += 1
+        return web.Response(text=_page_html(index), content_type="text/html")
+
+    async def css(request):
+        hits["css"] += 1
+        return web.Response(text="body { color: #333; font-family: Arial; }", content_type="text/css")
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    app.router.add_get("/page/{index}", page)
+    app.router.add_get("/page/{index}/", page)
+    app.router.add_get("/static/site.css", css)
+
+    server = TestServer(app)
+    await server.start_server()
+    server.hits = hits
+    yield server
+    await server.close()
+
+
+async def _crawl(base_url: str, depth: int, **options):
+    """Crawl and return (result, seconds, event loop stalls longer than the threshold)."""
+    stalls = []
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        while not stop.is_set():
+            expected = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            lag = time.perf_counter() - expected
+            if lag > STALL_THRESHOLD_SECONDS:
+                stalls.append(lag)
+
+    ticker = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    async with WebsiteScraper(**options) as scraper:
+        result = await scraper.scrape_website(base_url, depth=depth)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    return result, elapsed, stalls
+
+
+class TestNormalizeUrl:
+    """Test URL canonicalization used for de-duplication."""
+
+    def test_equivalent_urls_normalize_identically(self):
+        variants = [
+            "https://Example.com/page/1/",
+            "https://example.com:443/page/1",
+            "https://example.com/page/1#section",
+        ]
+        assert {normalize_url(url) for url in variants} == {"https://example.com/page/1"}
+
+    def test_query_order_and_scheme(self):
+        assert normalize_url("example.com/a?b=2&a=1") == "https://example.com/a?a=1&b=2"
+        assert normalize_url("http://example.com:8080/") == "http://example.com:8080"
+
+
+class TestWebsiteScraper:
+    """Test crawling the fixture site."""
+
+    @pytest.mark.asyncio
+    async def test_crawl_deduplicates_and_respects_depth(self, fixture_site):
+        result, _, _ = await _crawl(str(fixture_site.make_url("/")), depth=2, parse_workers=0)
+
+        assert len(result["pages"]) == 1 + LINKS_PER_PAGE
+        assert fixture_site.hits["pages"] == 1 + LINKS_PER_PAGE
+        assert fixture_site.hits["css"] == 1
+        assert not result["metadata"]["errors"]
+
+    @pytest.mark.asyncio
+    async def test_max_pages_bounds_frontier(self, fixture_site):
+        result, _, _ = await _crawl(str(fixture_site.make_url("/")), depth=5, parse_workers=0, max_pages=50)
+
+        assert len(result["pages"]) == 50
+        assert fixture_site.hits["pages"] == 50
+
+    @pytest.mark.asyncio
+    async def test_process_pool_extraction(self, fixture_site):
+        result, _, _ = await _crawl(str(fixture_site.make_url("/")), depth=1, parse_workers=1)
+
+        page = next(iter(result["pages"].values()))
+        assert page["title"] == "Page 0"
+        assert page["structure"]["h1"] == ["Page 0"]
+        assert page["seo"]["schema_markup"] == [{"@type": "WebPage", "name": "Page 0"}]
+        assert "window.page" not in page["content"]["text"]
+        assert any(script["type"] == "inline" for script in result["scripts"].values())
+        assert "#333" in result["themes"]["colors"]
+
+    @pytest.mark.asyncio
+    async def test_crawl_benchmark_inline_vs_process_pool(self, fixture_site):
+        """2,000-page crawl: parsing on the event loop vs in the process pool."""
+        base_url = str(fixture_site.make_url("/"))
+        report = {}
+        for label, workers in (("inline", 0), ("process_pool", 2)):
+            result, elapsed, stalls = await _crawl(
+                base_url, depth=5, parse_workers=workers, max_pages=SITE_PAGES, max_concurrent=10
+            )
+            assert len(result["pages"]) == SITE_PAGES
+            report[label] = (SITE_PAGES / elapsed, stalls)
+
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        children_rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        for label, (pages_per_second, stalls) in report.items():
+            print(
+                f"{label}: {pages_per_second:.0f} pages/s, {len(stalls)} loop stalls over "
+                f"{STALL_THRESHOLD_SECONDS * 1000:.0f}ms (max {max(stalls, default=0) * 1000:.0f}ms)"
+            )
+        print(f"peak RSS: main {peak_rss_mb:.0f}MB, parse workers {children_rss_mb:.0f}MB")
+        assert len(report["process_pool"][1]) < len(report["inline"][1])
@@ -0,0 +1,312 @@
+"""
+Tests for incremental static site builds and CDN deployment.
+Builds a 200-page site twice to check that unchanged fragments, pages and
+assets are reused and only changed outputs are rewritten, then deploys
+against moto's in-process S3 to check diff-aware uploads.
+"""
+
+import json
+import os
+from types import SimpleNamespace
+
+import boto3
+import pytest
+from jinja2 import Environment, FileSystemLoader
+from moto import mock_aws
+
+from app.core.config import settings
+from app.models.sites import BuildStatus, ComponentType
+from app.services.build_cache import MANIFEST_FILENAME
+from app.services import site_generator
+from app.services.site_generator import (
+    SiteGenerator, CDN_MULTIPART_THRESHOLD, HASHED_FILENAME_PATTERN, RETIRED_ASSET_RETENTION_SECONDS
+)
+
+BUCKET = "published-sites"
+
+PAGES = 200
+
+
+def _component(page: int, kind: str, order: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        component_id=f"{kind}-{page}",
+        name=f"{kind.title()} {page}",
+        type=ComponentType.HERO if kind == "hero" else ComponentType.TEXT_BLOCK,
+        config={"title": f"{kind} on page {page}", "class": "bg-blue-500 text-center"},
+        styles={},
+        position={"page": "index" if page == 0 else f"page-{page}"},
+        order_index=order
+    )
+
+
+def _site(site_id: str = "site-1") -> SimpleNamespace:
+    components = []
+    for page in range(PAGES):
+        components.append(_component(page, "hero", 0))
+        components.append(_component(page, "text", 1))
+    return SimpleNamespace(
+        id=site_id,
+        name="Fixture Site",
+        description="Incremental build fixture",
+        meta_title=None,
+        meta_description=None,
+        favicon_url=None,
+        settings={},
+        theme_config={},
+        url="https://fixture.aiwebbuilder.com",
+        components=components
+    )
+
+
+@pytest.fixture
+def generator(tmp_path):
+    templates = tmp_path / "templates"
+    (templates / "components").mkdir(parents=True)
+    (templates / "base.html").write_text(
+        "<html><head><title>{{ meta_title }}</title>"
+        "<link rel='stylesheet' href='/assets/css/main.css'></head>"
+        "<body>{{ components_html }}<script src='/assets/js/main.js'></script></body></html>"
+    )
+    (templates / "components" / "hero.html").write_text("<section class='hero'>{{ config.title }}</section>")
+    (templates / "components" / "generic.html").write_text("<div>{{ component.config.title }}</div>")
+
+    site_generator = SiteGenerator(build_root=tmp_path / "builds", cache_dir=tmp_path / "cache")
+    site_generator.jinja_env = Environment(loader=FileSystemLoader(str(templates)))
+    site_generator.s3_client = None
+    return site_generator
+
+
+class TestIncrementalBuild:
+    """Test content-hash incremental builds."""
+
+    @pytest.mark.asyncio
+    async def test_first_build_renders_everything(self, generator, tmp_path):
+        result = await generator.generate_site(_site())
+
+        assert result["status"] == BuildStatus.SUCCESS
+        assert result["build_stats"]["fragments_rendered"] == 2 * PAGES
+        assert result["build_stats"]["pages_rendered"] == PAGES
+        assert len([path for path in result["manifest"] if path.endswith(".html")]) == PAGES
+        assert (tmp_path / "builds" / "site-1" / MANIFEST_FILENAME).exists()
+        assert "on page 7" in (tmp_path / "builds" / "site-1" / "page-7.html").read_text()
+
+    @pytest.mark.asyncio
+    async def test_unchanged_rebuild_writes_nothing(self, generator):
+        site = _site()
+        first = await generator.generate_site(site)
+        second = await generator.generate_site(site)
+
+        assert second["build_stats"]["fragments_rendered"] == 0
+        assert second["build_stats"]["pages_rendered"] == 0
+        assert second["changed_files"] == []
+        assert second["build_hash"] == first["build_hash"]
+        assert second["build_size"] == first["build_size"]
+
+    @pytest.mark.asyncio
+    async def test_changing_one_component_rerenders_only_its_page(self, generator, tmp_path):
+        site = _site()
+        await generator.generate_site(site)
+        page_path = tmp_path / "builds" / "site-1" / "page-42.html"
+        untouched_mtime = (tmp_path / "builds" / "site-1" / "page-41.html").stat().st_mtime_ns
+
+        site.components[2 * 42 + 1].config = {"title": "edited copy", "class": "bg-blue-500 text-center"}
+        result = await generator.generate_site(site)
+
+        stats = result["build_stats"]
+        assert stats["fragments_rendered"] == 1
+        assert stats["fragments_reused"] == 2 * PAGES - 1
+        assert stats["pages_rendered"] == 1
+        assert stats["pages_reused"] == PAGES - 1
+        assert result["changed_files"] == ["page-42.html"]
+        assert "edited copy" in page_path.read_text()
+        assert (tmp_path / "builds" / "site-1" / "page-41.html").stat().st_mtime_ns == untouched_mtime
+
+    @pytest.mark.asyncio
+    async def test_template_change_invalidates_fragments(self, generator, tmp_path):
+        site = _site()
+        await generator.generate_site(site)
+
+        (tmp_path / "templates" / "components" / "hero.html").write_text("<header>{{ config.title }}</header>")
+        result = await generator.generate_site(site)
+
+        assert result["build_stats"]["fragments_rendered"] == PAGES
+        assert result["build_stats"]["pages_rendered"] == PAGES
+
+    @pytest.mark.asyncio
+    async def test_removed_page_is_deleted(self, generator, tmp_path):
+        site = _site()
+        await generator.generate_site(site)
+
+        site.components = [c for c in site.components if c.position["page"] != "page-199"]
+        result = await generator.generate_site(site)
+
+        assert result["removed_files"] == ["page-199.html"]
+        assert not (tmp_path / "builds" / "site-1" / "page-199.html").exists()
+        assert "sitemap.xml" in result["changed_files"]
+
+    @pytest.mark.asyncio
+    async def test_cache_shared_across_sites(self, generator):
+        await generator.generate_site(_site("site-1"))
+        result = await generator.generate_site(_site("site-2"))
+
+        # Same inputs on another site: nothing re-rendered, but all files written
+        assert result["build_stats"]["fragments_rendered"] == 0
+        assert result["build_stats"]["files_written"] == len(result["manifest"])
+
+
+@pytest.fixture
+def s3(generator, monkeypatch):
+    """moto S3 bucket wired into the generator."""
+    monkeypatch.setattr(settings, "s3_bucket_name", BUCKET)
+    monkeypatch.setattr(settings, "cloudfront_distribution_id", None)
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        generator.s3_client = client
+        yield client
+
+
+def _keys(client, prefix="sites/site-1/"):
+    response = client.list_objects_v2(Bucket=BUCKET, Prefix=prefix)
+    return {item["Key"] for item in response.get("Contents", [])}
+
+
+class TestCDNUpload:
+    """Test diff-aware uploads to S3."""
+
+    @pytest.mark.asyncio
+    async def test_first_deploy_uploads_every_file(self, generator, s3):
+        result = await generator.generate_site(_site())
+
+        assert result["upload_stats"]["uploaded"] == len(result["manifest"])
+        assert result["cdn_url"].endswith("/sites/site-1")
+        assert _keys(s3) == {f"sites/site-1/{path}" for path in result["manifest"]} | {
+            f"sites/site-1/{MANIFEST_FILENAME}"
+        }
+        deployed = json.loads(s3.get_object(Bucket=BUCKET, Key=f"sites/site-1/{MANIFEST_FILENAME}")["Body"].read())
+        assert deployed == result["manifest"]
+
+        page = s3.head_object(Bucket=BUCKET, Key="sites/site-1/page-3.html")
+        assert page["ContentType"] == "text/html"
+        assert page["CacheControl"] == "max-age=3600"
+
+    @pytest.mark.asyncio
+    async def test_redeploy_uploads_only_changed_files(self, generator, s3):
+        site = _site()
+        await generator.generate_site(site)
+        uploads = []
+        original_upload = s3.upload_file
+
+        def counting_upload(filename, bucket, key, **kwargs):
+            uploads.append(key)
+            return original_upload(filename, bucket, key, **kwargs)
+
+        s3.upload_file = counting_upload
+        site.components[2 * 42].config = {"title": "new hero", "class": "bg-blue-500 text-center"}
+        result = await generator.generate_site(site)
+
+        assert uploads == ["sites/site-1/page-42.html"]
+        assert result["upload_stats"] == {
+            "cdn_url": result["cdn_url"],
+            "uploaded": 1,
+            "unchanged": len(result["manifest"]) - 1,
+            "retained": 0,
+            "deleted": 0
+        }
+        body = s3.get_object(Bucket=BUCKET, Key="sites/site-1/page-42.html")["Body"].read().decode()
+        assert "new hero" in body
+
+    @pytest.mark.asyncio
+    async def test_orphaned_keys_are_deleted(self, generator, s3):
+        site = _site()
+        s3.put_object(Bucket=BUCKET, Key="sites/site-1/old-page.html", Body=b"stale")
+        await generator.generate_site(site)
+        assert "sites/site-1/old-page.html" not in _keys(s3)
+
+        site.components = [c for c in site.components if c.position["page"] not in ("page-198", "page-199")]
+        result = await generator.generate_site(site)
+
+        assert result["upload_stats"]["deleted"] == 2
+        assert "sites/site-1/page-199.html" not in _keys(s3)
+        assert "sites/site-1/page-197.html" in _keys(s3)
+
+    @pytest.mark.asyncio
+    async def test_hashed_assets_are_immutable_and_large_files_multipart(self, generator, s3, tmp_path):
+        build_dir = tmp_path / "manual-build"
+        asset = build_dir / "assets" / "images" / "hero.3f2a9c1b.png"
+        asset.parent.mkdir(parents=True)
+        asset.write_bytes(os.urandom(CDN_MULTIPART_THRESHOLD + 1024))
+        manifest = {"assets/images/hero.3f2a9c1b.png": {"sha256": "a" * 64, "size": asset.stat().st_size}}
+
+        result = await generator._upload_to_cdn(build_dir, SimpleNamespace(id="site-9"), manifest)
+
+        assert result["uploaded"] == 1
+        head = s3.head_object(Bucket=BUCKET, Key="sites/site-9/assets/images/hero.3f2a9c1b.png")
+        assert head["CacheControl"] == "public, max-age=31536000, immutable"
+        assert head["ContentType"] == "image/png"
+        assert "-" in head["ETag"]  # multipart ETags carry a part count
+
+    def test_generators_share_one_upload_pool(self, generator, tmp_path):
+        other = SiteGenerator(build_root=tmp_path / "other", cache_dir=tmp_path / "other-cache")
+        assert other._upload_executor is generator._upload_executor
+
+    @pytest.mark.asyncio
+    async def test_generated_assets_are_hashed_and_immutable(self, generator, s3):
+        result = await generator.generate_site(_site())
+
+        bundles = [path for path in result["manifest"] if path.startswith("assets/css/main.")]
+        bundle = next(path for path in bundles if HASHED_FILENAME_PATTERN.search(path))
+        assert sorted(bundles) == sorted([bundle, "assets/css/main.css"])
+
+        page = s3.get_object(Bucket=BUCKET, Key="sites/site-1/page-3.html")["Body"].read().decode()
+        assert "/assets/css/main.css'" in page
+        stub = s3.get_object(Bucket=BUCKET, Key="sites/site-1/assets/css/main.css")
+        assert os.path.basename(bundle) in stub["Body"].read().decode()
+        assert stub["CacheControl"] == "max-age=3600"
+        head = s3.head_object(Bucket=BUCKET, Key=f"sites/site-1/{bundle}")
+        assert head["CacheControl"] == "public, max-age=31536000, immutable"
+
+    @pytest.mark.asyncio
+    async def test_style_change_does_not_rewrite_other_pages(self, generator, s3):
+        site = _site()
+        await generator.generate_site(site)
+
+        site.components[2 * 42].styles = {"background_color": "#123456"}
+        result = await generator.generate_site(site)
+
+        bundle = next(
+            path for path in result["changed_files"] if path.startswith("assets/css/main.") and path != "assets/css/main.css"
+        )
+        # The fixture templates ignore styles, so the re-rendered page is byte-identical
+        assert result["build_stats"]["pages_rendered"] == 1
+        assert sorted(result["changed_files"]) == sorted(["assets/css/main.css", bundle])
+        assert result["upload_stats"]["uploaded"] == 2
+
+    @pytest.mark.asyncio
+    async def test_superseded_bundle_is_kept_until_retention_passes(self, generator, s3, monkeypatch):
+        clock = [1_000_000.0]
+        monkeypatch.setattr(site_generator, "time", SimpleNamespace(time=lambda: clock[0]))
+        site = _site()
+        first = await generator.generate_site(site)
+        old_bundle = next(
+            path for path in first["manifest"] if path.startswith("assets/css/main.") and path != "assets/css/main.css"
+        )
+
+        site.components[0].styles = {"background_color": "#123456"}
+        second = await generator.generate_site(site)
+        assert second["upload_stats"]["retained"] == 1
+        assert second["upload_stats"]["deleted"] == 0
+        assert f"sites/site-1/{old_bundle}" in _keys(s3)
+
+        clock[0] += RETIRED_ASSET_RETENTION_SECONDS - 1
+        site.components[1].config = {"title": "edited copy", "class": "bg-blue-500 text-center"}
+        third = await generator.generate_site(site)
+        assert third["upload_stats"]["retained"] == 1
+        assert f"sites/site-1/{old_bundle}" in _keys(s3)
+
+        clock[0] += 1
+        site.components[1].config = {"title": "edited again", "class": "bg-blue-500 text-center"}
+        fourth = await generator.generate_site(site)
+        assert fourth["upload_stats"]["retained"] == 0
+        assert fourth["upload_stats"]["deleted"] == 1
+        assert f"sites/site-1/{old_bundle}" not in _keys(s3)
@@ -0,0 +1,179 @@
+"""
+Tests for batched SLA violation inference.
+Checks that the batched feature matrix scores identically to the per-row
+path, that each batch makes one model call, that results are cached by
+feature hash for the TTL, and benchmarks 1,000 workflows before and after
+against the service's RandomForest configuration.
+"""
+
+import gc
+import time
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.ai_response_cache import AIResponseCache
+from app.services.sla_batch_inference import BatchViolationPredictor, base_feature_vector, build_feature_matrix
+
+VIOLATION_TYPES = [
+    "pr_review_time", "build_time", "test_execution",
+    "deployment_time", "agent_response", "task_completion"
+]
+TYPE_ENCODINGS = [(index + 1) / 10 for index in range(len(VIOLATION_TYPES))]
+BENCHMARK_WORKFLOWS = 1000
+LEGACY_SAMPLE_WORKFLOWS = 25
+
+
+@pytest.fixture(scope="module")
+def model():
+    """RandomForest trained the way SLAPredictionService._train_initial_model does."""
+    rng = np.random.default_rng(42)
+    X = np.column_stack([
+        rng.random(1000), rng.integers(0, 24, 1000), rng.integers(0, 7, 1000), rng.poisson(2, 1000),
+        rng.normal(5000, 1000, 1000), rng.normal(500, 100, 1000), rng.normal(0, 50, 1000),
+        rng.random(1000), rng.random(1000), rng.random(1000), rng.random(1000),
+    ])
+    y = ((X[:, 0] * 0.3 + X[:, 3] / 10 * 0.2 + X[:, 7] * 0.2 + X[:, 8] * 0.2) > 0.6).astype(int)
+    classifier = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42, class_weight='balanced')
+    classifier.fit(X, y)
+    return classifier
+
+
+def _workflow_features(seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    return {
+        'workflow_id': seed,
+        'historical_performance': list(rng.normal(5000, 800, 30)),
+        'current_load': 0.4,
+        'time_of_day': int(rng.integers(0, 24)),
+        'day_of_week': int(rng.integers(0, 7)),
+        'recent_violations': int(rng.poisson(2)),
+        'system_resources': {'cpu_usage': float(rng.random()), 'memory_usage': float(rng.random()), 'db_connections': 0.3},
+    }
+
+
+def _legacy_scores(model, features: dict):
+    """The previous path: per violation type, two single-row predict_proba calls."""
+    scores = []
+    for encoding in TYPE_ENCODINGS:
+        feature_vector = base_feature_vector(features) + [encoding]
+        probability = model.predict_proba([feature_vector])[0][1]
+        confidence = max(model.predict_proba([feature_vector])[0])
+        scores.append((probability, confidence))
+    return scores
+
+
+class CountingModel:
+    def __init__(self, model):
+        self.model = model
+        self.calls = []
+
+    def predict_proba(self, X):
+        self.calls.append(len(X))
+        return self.model.predict_proba(X)
+
+
+class TestFeatureMatrix:
+    """Test matrix layout."""
+
+    def test_rows_are_workflow_major(self):
+        base = [[float(w)] * 10 for w in range(3)]
+        matrix = build_feature_matrix(base, TYPE_ENCODINGS)
+
+        assert matrix.shape == (18, 11)
+        assert matrix[7, 0] == 1.0 and matrix[7, 10] == TYPE_ENCODINGS[1]
+        assert list(matrix[12:, 10]) == TYPE_ENCODINGS
+
+
+class TestBatchViolationPredictor:
+    """Test batched scoring and caching."""
+
+    def test_batch_matches_per_row_predictions(self, model):
+        features = [_workflow_features(seed) for seed in range(20)]
+        matrix = build_feature_matrix([base_feature_vector(f) for f in features], TYPE_ENCODINGS)
+
+        scores = BatchViolationPredictor(model, AIResponseCache()).predict(matrix)
+
+        expected = [score for f in features for score in _legacy_scores(model, f)]
+        np.testing.assert_allclose(scores, np.array(expected))
+
+    def test_one_model_call_per_batch_and_cache_hits(self, model):
+        counting = CountingModel(model)
+        predictor = BatchViolationPredictor(counting, AIResponseCache())
+        features = [_workflow_features(seed) for seed in range(50)]
+        matrix = build_feature_matrix([base_feature_vector(f) for f in features], TYPE_ENCODINGS)
+
+        first = predictor.predict(matrix)
+        second = predictor.predict(matrix)
+        extra = build_feature_matrix([base_feature_vector(_workflow_features(999))], TYPE_ENCODINGS)
+        predictor.predict(np.vstack([matrix[:6], extra]))
+
+        assert counting.calls == [300, 6]
+        np.testing.assert_array_equal(first, second)
+        assert predictor.get_stats() == {"model_calls": 2, "rows_scored": 306, "cache_hits": 306}
+
+    def test_cached_scores_expire_after_ttl(self, model):
+        now = [0.0]
+        counting = CountingModel(model)
+        predictor = BatchViolationPredictor(counting, AIResponseCache(clock=lambda: now[0]), ttl_seconds=60)
+        matrix = build_feature_matrix([base_feature_vector(_workflow_features(1))], TYPE_ENCODINGS)
+
+        predictor.predict(matrix)
+        now[0] = 59.0
+        predictor.predict(matrix)
+        now[0] = 61.0
+        predictor.predict(matrix)
+
+        assert counting.calls == [6, 6]
+
+    def test_another_model_does_not_reuse_scores(self, model):
+        cache = AIResponseCache()
+        matrix = build_feature_matrix([base_feature_vector(_workflow_features(1))], TYPE_ENCODINGS)
+        BatchViolationPredictor(model, cache).predict(matrix)
+
+        other = CountingModel(model)
+        BatchViolationPredictor(other, cache).predict(matrix)
+
+        assert other.calls == [6]
+
+    def test_replacement_model_does_not_reuse_freed_models_scores(self, model):
+        cache = AIResponseCache()
+        matrix = build_feature_matrix([base_feature_vector(_workflow_features(1))], TYPE_ENCODINGS)
+        for _ in range(20):
+            # CPython typically hands a freed model's id() to the next allocation
+            replacement = CountingModel(model)
+            BatchViolationPredictor(replacement, cache).predict(matrix)
+            assert replacement.calls == [6]
+            del replacement
+            gc.collect()
+
+
+class TestInferenceBenchmark:
+    """1,000 workflows x 6 violation types, per-row vs batched."""
+
+    def test_benchmark_1000_workflows(self, model):
+        features = [_workflow_features(seed) for seed in range(BENCHMARK_WORKFLOWS)]
+
+        started = time.perf_counter()
+        for f in features[:LEGACY_SAMPLE_WORKFLOWS]:
+            _legacy_scores(model, f)
+        legacy_seconds = (time.perf_counter() - started) * BENCHMARK_WORKFLOWS / LEGACY_SAMPLE_WORKFLOWS
+
+        predictor = BatchViolationPredictor(model, AIResponseCache(max_entries=10_000))
+        started = time.perf_counter()
+        matrix = build_feature_matrix([base_feature_vector(f) for f in features], TYPE_ENCODINGS)
+        predictor.predict(matrix)
+        batch_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        predictor.predict(matrix)
+        cached_seconds = time.perf_counter() - started
+
+        print(
+            f"{BENCHMARK_WORKFLOWS} workflows: per-row {legacy_seconds:.2f}s "
+            f"(extrapolated from {LEGACY_SAMPLE_WORKFLOWS}), batched {batch_seconds * 1000:.0f}ms, "
+            f"cached {cached_seconds * 1000:.0f}ms ({legacy_seconds / batch_seconds:.0f}x)"
+        )
+        assert predictor.model_calls == 1
+        assert batch_seconds * 10 < legacy_seconds
@@ -0,0 +1,288 @@
+"""
+Tests for streaming CSV/NDJSON/JSON exports.
+Covers the encoders and gzip negotiation, analytics report filtering, the
+execution log export's per-execution grouping, and a 1M-row export whose
+peak memory must stay under a fixed bound.
+"""
+
+import csv
+import gzip
+import io
+import json
+import time
+import tracemalloc
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, create_engine, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.analytics import AnalyticsEventType, WorkflowAnalyticsEvent
+from app.models.workflow import (
+    NodeType, WorkflowExecution, WorkflowExecutionStatus, WorkflowExecutionStep
+)
+from app.services.analytics_export import ANALYTICS_EXPORT_COLUMNS, export_analytics_events
+from app.services.streaming_export import (
+    accepts_gzip,
+    encode_csv,
+    encode_json_document,
+    encode_ndjson,
+    streaming_export_response,
+)
+from app.services.workflow_debug_service import WorkflowDebugService
+
+MEMORY_TEST_ROWS = 1_000_000
+PEAK_MEMORY_BOUND_BYTES = 16 * 1024 * 1024
+START = datetime(2026, 10, 1)
+WORKFLOW_ID = uuid.uuid4()
+USER_ID = uuid.uuid4()
+
+
+def _metadata():
+    """Export source tables plus minimal FK targets, independent of the full model registry."""
+    metadata = MetaData()
+    Table("workflows", metadata, Column("id", String(36), primary_key=True))
+    Table("users", metadata, Column("id", String(36), primary_key=True))
+    WorkflowAnalyticsEvent.__table__.to_metadata(metadata)
+    WorkflowExecution.__table__.to_metadata(metadata)
+    WorkflowExecutionStep.__table__.to_metadata(metadata)
+    return metadata
+
+
+def _event(n, workflow_id=WORKFLOW_ID, user_id=USER_ID):
+    created_at = START + timedelta(seconds=n)
+    return {
+        "id": uuid.uuid4(),
+        "created_at": created_at,
+        "updated_at": created_at,
+        "workflow_id": workflow_id,
+        "execution_id": f"exec-{n}",
+        "user_id": user_id,
+        "event_type": AnalyticsEventType.WORKFLOW_EXECUTION,
+        "event_data": {},
+        "execution_time_ms": n % 5000,
+        "conversion_value": Decimal("1.50"),
+        "component_id": "hero" if n % 2 else None,
+    }
+
+
+def _filters(**overrides):
+    values = {
+        "workflow_ids": None,
+        "user_ids": None,
+        "event_types": None,
+        "component_ids": None,
+        "date_range": SimpleNamespace(start_date=START, end_date=START + timedelta(days=365)),
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    path = tmp_path / "export.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    _metadata().create_all(sync_engine)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield sync_engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+    sync_engine.dispose()
+
+
+class TestEncoders:
+    """Test the incremental encoders."""
+
+    @pytest.mark.asyncio
+    async def test_csv_round_trips(self):
+        rows = [{"a": n, "b": f"text, with \"quotes\" {n}", "c": None, "d": {"k": n}} for n in range(5000)]
+
+        body = await _collect(encode_csv(["a", "b", "c", "d"], _aiter(rows), header=["A", "B", "C", "D"]))
+        parsed = list(csv.reader(io.StringIO(body.decode())))
+
+        assert parsed[0] == ["A", "B", "C", "D"]
+        assert parsed[1:] == [[str(n), f"text, with \"quotes\" {n}", "", f'{{"k":{n}}}'] for n in range(5000)]
+
+    @pytest.mark.asyncio
+    async def test_ndjson_and_json_document(self):
+        records = [{"n": n, "at": START, "value": Decimal("2.5"), "type": NodeType.EMAIL} for n in range(3000)]
+
+        lines = (await _collect(encode_ndjson(_aiter(records)))).splitlines()
+        document = json.loads(await _collect(encode_json_document({"workflow_id": 7}, "items", _aiter(records))))
+
+        assert [json.loads(line)["n"] for line in lines] == list(range(3000))
+        assert json.loads(lines[0]) == {"n": 0, "at": START.isoformat(), "value": 2.5, "type": "email"}
+        assert document["workflow_id"] == 7 and len(document["items"]) == 3000
+        assert json.loads(await _collect(encode_json_document({}, "items", _aiter([])))) == {"items": []}
+
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.5", True),
+        ("*", True),
+        ("gzip;q=0", False),
+        ("*;q=0, gzip", True),
+        ("deflate", False),
+        (None, False),
+    ])
+    def test_accepts_gzip(self, header, expected):
+        assert accepts_gzip(header) is expected
+
+    @pytest.mark.asyncio
+    async def test_gzip_response(self):
+        records = [{"n": n} for n in range(10_000)]
+        response = streaming_export_response(encode_ndjson(_aiter(records)), "ndjson", "out.ndjson", gzip=True)
+
+        body = gzip.decompress(await _collect(response.body_iterator))
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.media_type == "application/x-ndjson"
+        assert len(body.splitlines()) == 10_000
+
+
+class TestAnalyticsExport:
+    """Test the analytics report export query."""
+
+    @pytest.mark.asyncio
+    async def test_filters_and_formats(self, database):
+        sync_engine, session_factory = database
+        other_workflow, other_user = uuid.uuid4(), uuid.uuid4()
+        with sync_engine.begin() as conn:
+            conn.execute(insert(WorkflowAnalyticsEvent.__table__), [
+                *(_event(n) for n in range(10)),
+                _event(20, workflow_id=other_workflow),
+                _event(21, user_id=other_user),
+                _event(-5),
+            ])
+
+        csv_body = await _collect(export_analytics_events(
+            _filters(workflow_ids=[WORKFLOW_ID], component_ids=["hero"]), "csv",
+            user_id=USER_ID, session_factory=session_factory
+        ))
+        ndjson_body = await _collect(export_analytics_events(
+            _filters(), "ndjson", user_id=USER_ID, session_factory=session_factory
+        ))
+
+        rows = list(csv.DictReader(io.StringIO(csv_body.decode())))
+        assert tuple(rows[0]) == ANALYTICS_EXPORT_COLUMNS
+        assert [row["execution_id"] for row in rows] == [f"exec-{n}" for n in range(1, 10, 2)]
+        assert rows[0]["event_type"] == "workflow_execution" and rows[0]["conversion_value"] == "1.50"
+
+        records = [json.loads(line) for line in ndjson_body.splitlines()]
+        assert [record["execution_id"] for record in records] == [f"exec-{n}" for n in [*range(10), 20]]
+
+
+class TestExecutionLogExport:
+    """Test the streamed execution log export."""
+
+    @pytest.mark.asyncio
+    async def test_steps_are_grouped_per_execution(self, database):
+        sync_engine, session_factory = database
+        executions = [uuid.uuid4() for _ in range(3)]
+        with sync_engine.begin() as conn:
+            conn.execute(insert(WorkflowExecution.__table__), [
+                {
+                    "id": execution_id, "created_at": START + timedelta(minutes=n), "updated_at": START,
+                    "workflow_id": WORKFLOW_ID, "status": WorkflowExecutionStatus.SUCCESS,
+                    "trigger_data": {"n": n}, "execution_data": {}, "execution_time": 100 * n,
+                }
+                for n, execution_id in enumerate(executions)
+            ])
+            conn.execute(insert(WorkflowExecutionStep.__table__), [
+                {
+                    "id": uuid.uuid4(), "created_at": START + timedelta(seconds=step), "updated_at": START,
+                    "execution_id": execution_id, "node_id": f"node-{step}", "node_name": f"Node {step}",
+                    "node_type": NodeType.ACTION, "status": WorkflowExecutionStatus.SUCCESS,
+                    "execution_time_ms": step, "input_data": {}, "output_data": {"ok": True},
+                    "debug_logs": [], "retry_count": 0, "memory_usage_mb": 12.5,
+                }
+                for execution_id, steps in zip(executions, (3, 0, 2))
+                for step in range(steps)
+            ])
+
+        service = WorkflowDebugService(None)
+        document = json.loads(await _collect(
+            service.export_execution_logs(WORKFLOW_ID, "json", session_factory=session_factory)
+        ))
+        ndjson_body = await _collect(
+            service.export_execution_logs(WORKFLOW_ID, "ndjson", [executions[2]], session_factory=session_factory)
+        )
+        csv_rows = list(csv.reader(io.StringIO((await _collect(
+            service.export_execution_logs(WORKFLOW_ID, "csv", session_factory=session_factory)
+        )).decode())))
+
+        assert document["workflow_id"] == str(WORKFLOW_ID)
+        assert [e["execution_id"] for e in document["executions"]] == [str(e) for e in executions]
+        assert [len(e["steps"]) for e in document["executions"]] == [3, 0, 2]
+        first_step = document["executions"][0]["steps"][0]
+        assert first_step["node_type"] == "action" and first_step["performance_metrics"]["memory_usage_mb"] == 12.5
+
+        records = [json.loads(line) for line in ndjson_body.splitlines()]
+        assert [record["execution_id"] for record in records] == [str(executions[2])]
+        assert [step["node_id"] for step in records[0]["steps"]] == ["node-0", "node-1"]
+
+        assert csv_rows[0][0] == "Execution ID" and len(csv_rows) == 1 + 3 + 1 + 2
+        assert csv_rows[4][1:6] == ["success", "", "", "100", ""]
+
+
+class TestExportMemory:
+    """A 1M-row export keeps memory flat."""
+
+    @pytest.mark.asyncio
+    async def test_million_row_export_has_bounded_peak_memory(self, database):
+        sync_engine, session_factory = database
+        with sync_engine.begin() as conn:
+            # Generated inside SQLite so that setup does not allocate 1M rows in Python
+            conn.execute(text("""
+                WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < :count - 1)
+                INSERT INTO workflow_analytics_events
+                    (id, created_at, updated_at, workflow_id, execution_id, user_id, event_type,
+                     event_data, execution_time_ms, conversion_value, component_id)
+                SELECT lower(hex(randomblob(16))), datetime(:start, '+' || n || ' seconds') || '.000000',
+                       datetime(:start, '+' || n || ' seconds') || '.000000', :workflow_id, 'exec-' || n, :user_id,
+                       'WORKFLOW_EXECUTION', '{}', n % 5000, 1.5, CASE WHEN n % 2 THEN 'hero' END
+                FROM seq
+            """), {
+                "count": MEMORY_TEST_ROWS,
+                "start": START.isoformat(" "),
+                "workflow_id": str(WORKFLOW_ID),
+                "user_id": str(USER_ID),
+            })
+
+        response = streaming_export_response(
+            export_analytics_events(_filters(), "csv", user_id=USER_ID, session_factory=session_factory),
+            "csv", "report.csv", gzip=True
+        )
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        lines = compressed = 0
+        started = time.perf_counter()
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            async for chunk in response.body_iterator:
+                compressed += len(chunk)
+                lines += decompressor.decompress(chunk).count(b"\n")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"{MEMORY_TEST_ROWS} rows exported as gzip CSV: {compressed / 1e6:.1f}MB compressed "
+            f"in {elapsed:.1f}s, traced peak {peak / 1e6:.1f}MB"
+        )
+        assert lines == MEMORY_TEST_ROWS + 1
+        assert peak < PEAK_MEMORY_BOUND_BYTES
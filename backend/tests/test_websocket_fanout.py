@@ -0,0 +1,214 @@
+"""
+Tests for WebSocket fan-out broadcasting.
+Covers per-socket queue coalescing, slow-consumer disconnects and a
+broadcast latency benchmark for 500 connections with one slowed client,
+against the previous sequential send loop.
+"""
+
+import asyncio
+import gc
+import json
+import time
+
+import pytest
+
+from app.api.v1.endpoints.workflow_websocket import WorkflowConnectionManager
+from app.services.websocket_fanout import SLOW_CONSUMER_CLOSE_CODE, WebSocketSender, dumps
+
+BENCHMARK_CONNECTIONS = 500
+BENCHMARK_MESSAGES = 100
+SLOW_SEND_SECONDS = 0.1
+
+
+class FakeWebSocket:
+    """WebSocket stand-in recording receive times; ``delay`` slows every send."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = []
+        self.close_code = None
+        self.gate = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append((time.perf_counter(), text))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+class TestWebSocketSender:
+    """Test the bounded per-socket send queue."""
+
+    @pytest.mark.asyncio
+    async def test_stale_coalescible_frames_are_replaced(self):
+        websocket = FakeWebSocket()
+        websocket.gate = asyncio.Event()
+        sender = WebSocketSender(websocket)
+
+        sender.send("first")
+        await asyncio.sleep(0)  # Writer takes "first" and blocks on the gate
+        for x in range(10):
+            sender.send(f"cursor-{x}", coalesce_key="cursor:alice")
+        sender.send("chat")
+        websocket.gate.set()
+        await sender.drain()
+
+        assert [text for _, text in websocket.received] == ["first", "cursor-9", "chat"]
+        assert sender.get_stats()["dropped"] == 9
+        sender.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_cursor_frames_before_disconnecting(self):
+        websocket = FakeWebSocket()
+        websocket.gate = asyncio.Event()
+        sender = WebSocketSender(websocket, max_queue=3)
+
+        sender.send("first")
+        await asyncio.sleep(0)
+        assert sender.send("cursor", coalesce_key="cursor:bob")
+        assert sender.send("update-1")
+        assert sender.send("update-2")
+        assert sender.send("update-3")  # Evicts the queued cursor frame
+
+        assert not sender.closed
+        assert sender.dropped == 1
+        sender.close()
+
+    @pytest.mark.asyncio
+    async def test_overflowing_consumer_is_disconnected(self):
+        websocket = FakeWebSocket()
+        websocket.gate = asyncio.Event()
+        closed = asyncio.Event()
+
+        async def on_close():
+            closed.set()
+
+        sender = WebSocketSender(websocket, on_close=on_close, max_queue=2)
+        results = [sender.send(f"update-{n}") for n in range(4)]
+        await asyncio.wait_for(closed.wait(), 1)
+
+        assert results == [True, True, False, False]
+        assert websocket.close_code == SLOW_CONSUMER_CLOSE_CODE
+
+    @pytest.mark.asyncio
+    async def test_send_timeout_disconnects(self):
+        websocket = FakeWebSocket(delay=1.0)
+        closed = asyncio.Event()
+
+        async def on_close():
+            closed.set()
+
+        sender = WebSocketSender(websocket, on_close=on_close, send_timeout=0.05)
+        sender.send("update")
+        await asyncio.wait_for(closed.wait(), 1)
+
+        assert sender.closed
+        assert websocket.received == []
+
+    def test_dumps_handles_datetimes(self):
+        from datetime import datetime
+
+        frame = dumps({"type": "heartbeat", "at": datetime(2024, 1, 2, 3, 4, 5)})
+        assert json.loads(frame)["at"].startswith("2024-01-02T03:04:05")
+
+
+async def _legacy_broadcast(websockets, message):
+    """The previous send loop: serialize, then await each client in turn."""
+    message_str = json.dumps(message)
+    for websocket in websockets:
+        await websocket.send_text(message_str)
+
+
+def _latencies(websockets, sent_at):
+    """Per message, the time until the last fast client received it."""
+    delivered = {}
+    for websocket in websockets:
+        if websocket.delay:
+            continue
+        for received_at, text in websocket.received:
+            seq = json.loads(text)["seq"]
+            delivered[seq] = max(delivered.get(seq, 0), received_at - sent_at[seq])
+    return sorted(delivered.values())
+
+
+class TestBroadcastBenchmark:
+    """Broadcast latency for 500 connections with one slow client."""
+
+    @pytest.fixture(autouse=True)
+    def frozen_heap(self):
+        # Full collections over the imported app's heap stall the loop for
+        # ~90ms regardless of the broadcast path; keep them out of the timing.
+        gc.collect()
+        gc.freeze()
+        yield
+        gc.unfreeze()
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_delay_others(self):
+        manager = WorkflowConnectionManager()
+        websockets = [FakeWebSocket() for _ in range(BENCHMARK_CONNECTIONS - 1)]
+        slow = FakeWebSocket(delay=SLOW_SEND_SECONDS)
+        websockets.insert(0, slow)
+        for websocket in websockets:
+            await manager.connect(websocket, 1, 1)
+
+        sent_at = {}
+        for seq in range(BENCHMARK_MESSAGES):
+            sent_at[seq] = time.perf_counter()
+            await manager.send_workflow_status(1, {"type": "execution_update", "seq": seq})
+            await asyncio.sleep(0.005)
+        await asyncio.gather(*(sender.drain() for sender in list(manager.senders.values())))
+        fanout = _latencies(websockets, sent_at)
+
+        legacy_sockets = [FakeWebSocket(delay=SLOW_SEND_SECONDS)] + [
+            FakeWebSocket() for _ in range(BENCHMARK_CONNECTIONS - 1)
+        ]
+        legacy_sent_at = {}
+        for seq in range(10):
+            legacy_sent_at[seq] = time.perf_counter()
+            await _legacy_broadcast(legacy_sockets, {"type": "execution_update", "seq": seq})
+        legacy = _latencies(legacy_sockets, legacy_sent_at)
+
+        def summary(latencies):
+            return (
+                f"p50 {latencies[len(latencies) // 2] * 1000:.1f}ms "
+                f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms"
+            )
+
+        print(f"{BENCHMARK_CONNECTIONS} connections, one client {SLOW_SEND_SECONDS * 1000:.0f}ms/send")
+        print(f"sequential send loop: {summary(legacy)}")
+        print(f"queued fan-out: {summary(fanout)}; slow client closed={slow.close_code is not None}")
+
+        assert len(fanout) == BENCHMARK_MESSAGES
+        assert all(len(websocket.received) == BENCHMARK_MESSAGES for websocket in websockets[1:])
+        assert fanout[-1] < SLOW_SEND_SECONDS
+        assert legacy[0] >= SLOW_SEND_SECONDS
+        assert slow not in manager.senders
+        assert slow.close_code == SLOW_CONSUMER_CLOSE_CODE
+
+    @pytest.mark.asyncio
+    async def test_failed_send_disconnects_client(self):
+        manager = WorkflowConnectionManager()
+        healthy, broken = FakeWebSocket(), FakeWebSocket()
+
+        async def fail(text):
+            raise ConnectionResetError("client went away")
+
+        broken.send_text = fail
+        await manager.connect(healthy, 7, 1)
+        await manager.connect(broken, 7, 2)
+
+        await manager.send_workflow_status(7, {"type": "execution_started"})
+        await manager.senders[healthy].drain()
+        await asyncio.sleep(0.01)
+
+        assert len(healthy.received) == 1
+        assert manager.active_connections[7] == {healthy}
+        assert broken not in manager.websocket_users
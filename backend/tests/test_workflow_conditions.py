@@ -0,0 +1,186 @@
+"""
+Tests for the workflow condition compiler.
+Property-based checks that compiled predicates agree with the interpreter
+(results and raised errors alike) on arbitrary condition trees and payloads,
+plus parsing edge cases and an evaluation microbenchmark.
+"""
+
+import time
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.services.workflow_conditions import WorkflowCondition, compile_condition, parse_condition_tree
+
+FIELDS = ["amount", "email", "tags", "form_id", "profile.plan", "profile.seats"]
+PATTERNS = [r"^a", r"@example\.com$", r"\d{2,}", r"(?i)PRO", r"x|y", r"(?i)^n"]
+BENCHMARK_EVALUATIONS = 50_000
+
+scalars = st.one_of(
+    st.none(),
+    st.booleans(),
+    st.integers(-5, 5),
+    st.floats(-5, 5, allow_nan=False),
+    st.sampled_from(["a", "b", "pro", "ab12", "x@example.com"]),
+)
+values = st.one_of(scalars, st.lists(scalars, max_size=3))
+
+
+@st.composite
+def comparisons(draw):
+    operator = draw(st.sampled_from(
+        ["eq", "ne", "gt", "lt", "gte", "lte", "in", "not_in", "contains", "regex", "between"]
+    ))
+    if operator in ("in", "not_in"):
+        value = draw(st.one_of(st.lists(values, max_size=4), st.sampled_from(["abc", "pro"])))
+    elif operator == "regex":
+        value = draw(st.sampled_from(PATTERNS))
+    elif operator == "between":
+        value = sorted(draw(st.lists(st.integers(-5, 5), min_size=2, max_size=2)))
+    else:
+        value = draw(values)
+    return {"field": draw(st.sampled_from(FIELDS)), "operator": operator, "value": value}
+
+
+condition_trees = st.recursive(
+    comparisons(),
+    lambda children: st.one_of(
+        st.lists(children, max_size=4),
+        st.builds(lambda c: {"all": c}, st.lists(children, max_size=4)),
+        st.builds(lambda c: {"any": c}, st.lists(children, max_size=4)),
+        st.builds(lambda c: {"not": c}, children),
+    ),
+    max_leaves=12,
+)
+
+contexts = st.fixed_dictionaries(
+    {},
+    optional={
+        "amount": values,
+        "email": values,
+        "tags": values,
+        "form_id": values,
+        "profile": st.one_of(
+            st.fixed_dictionaries({}, optional={"plan": values, "seats": values}),
+            scalars,
+        ),
+        "profile.plan": values,
+    },
+)
+
+
+def _outcome(predicate, context):
+    try:
+        return "ok", bool(predicate(context))
+    except Exception as e:
+        return "error", type(e)
+
+
+class TestCompilerEquivalence:
+    """Compiled predicates agree with the interpreter."""
+
+    @settings(max_examples=1000, deadline=None)
+    @given(condition_trees, st.lists(contexts, min_size=1, max_size=5))
+    def test_compiled_matches_interpreter(self, tree, payloads):
+        node = parse_condition_tree(tree)
+        predicate = compile_condition(node)
+
+        for context in payloads:
+            assert _outcome(predicate, context) == _outcome(node.evaluate, context)
+
+    @settings(max_examples=500, deadline=None)
+    @given(st.lists(comparisons(), max_size=6), contexts)
+    def test_flat_lists_match_original_semantics(self, conditions, context):
+        predicate = compile_condition(parse_condition_tree(conditions))
+
+        def original(ctx):
+            return all(WorkflowCondition(**data).evaluate(ctx) for data in conditions)
+
+        assert _outcome(predicate, context) == _outcome(original, context)
+
+
+class TestParsing:
+    """Test tree parsing."""
+
+    def test_nested_tree(self):
+        node = parse_condition_tree({
+            "any": [
+                {"field": "profile.plan", "operator": "regex", "value": "(?i)^pro"},
+                {"all": [
+                    {"field": "amount", "operator": "between", "value": [10, 20]},
+                    {"not": {"field": "email", "operator": "contains", "value": "@test."}},
+                ]},
+            ]
+        })
+        predicate = compile_condition(node)
+
+        assert predicate({"profile": {"plan": "Professional"}})
+        assert predicate({"amount": 15, "email": "a@example.com"})
+        assert not predicate({"amount": 15, "email": "a@test.com"})
+        assert not predicate({"amount": 25})
+
+    def test_literal_dotted_key_wins_over_path(self):
+        predicate = compile_condition(parse_condition_tree([{"field": "a.b", "operator": "eq", "value": 1}]))
+
+        assert predicate({"a.b": 1, "a": {"b": 2}})
+        assert predicate({"a": {"b": 1}})
+
+    def test_string_membership_keeps_substring_semantics(self):
+        predicate = compile_condition(parse_condition_tree([{"field": "code", "operator": "in", "value": "abc"}]))
+
+        assert predicate({"code": "bc"})
+
+    @pytest.mark.parametrize("data", [
+        {"field": "amount", "operator": "approx", "value": 1},
+        {"field": "amount", "operator": "between", "value": 5},
+        {"field": "amount", "operator": "regex", "value": "("},
+        "amount > 5",
+    ])
+    def test_invalid_conditions_are_rejected_at_compile_time(self, data):
+        with pytest.raises(Exception):
+            compile_condition(parse_condition_tree([data]))
+
+
+class TestEvaluationBenchmark:
+    """Interpreted vs compiled evaluation of a typical condition tree."""
+
+    def test_compiled_evaluation_is_faster(self):
+        conditions = [
+            {"field": "event_name", "operator": "eq", "value": "form_submitted"},
+            {"field": "amount", "operator": "gte", "value": 10},
+            {"field": "country", "operator": "in", "value": ["US", "CA", "GB", "DE", "FR", "AU"]},
+            {"field": "email", "operator": "regex", "value": r"@(example|corp)\.com$"},
+            {"field": "utm_source", "operator": "not_in", "value": ["spam", "test"]},
+            {"field": "page", "operator": "contains", "value": "/pricing"},
+        ]
+        contexts = [
+            {
+                "event_name": "form_submitted",
+                "amount": n % 40,
+                "country": ["US", "CA", "BR"][n % 3],
+                "email": f"user{n}@example.com",
+                "utm_source": "ads",
+                "page": "/pricing/enterprise",
+            }
+            for n in range(1000)
+        ]
+        node = parse_condition_tree(conditions)
+        predicate = compile_condition(node)
+
+        def run(evaluate):
+            started = time.perf_counter()
+            for n in range(BENCHMARK_EVALUATIONS):
+                evaluate(contexts[n % 1000])
+            return (time.perf_counter() - started) / BENCHMARK_EVALUATIONS
+
+        legacy = run(lambda ctx: all(WorkflowCondition(**data).evaluate(ctx) for data in conditions))
+        interpreted = run(node.evaluate)
+        compiled = run(predicate)
+
+        print(
+            f"per evaluation: rebuilt conditions {legacy * 1e9:.0f}ns, "
+            f"interpreted {interpreted * 1e9:.0f}ns, compiled {compiled * 1e9:.0f}ns "
+            f"({interpreted / compiled:.1f}x)"
+        )
+        assert compiled * 1.5 < interpreted
+        assert compiled * 3 < legacy
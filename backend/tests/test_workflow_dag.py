@@ -0,0 +1,318 @@
+"""
+Tests for the workflow DAG scheduler.
+Validates topological ordering, output propagation, failure skipping,
+concurrent dispatch of independent branches, delay-node resumption and
+exactly-once claiming of Celery continuations.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.services.workflow_dag import (
+    WorkflowDAG, DAGExecutor, WorkflowGraphError,
+    NODE_SUCCESS, NODE_ERROR, NODE_SKIPPED, NODE_WAITING
+)
+
+
+def _node(node_id, node_type="action", **parameters):
+    return {"node_id": node_id, "node_type": node_type, "parameters": parameters}
+
+
+def _diamond(width):
+    """Trigger fanning out to ``width`` parallel nodes which join into one sink."""
+    nodes = [_node("trigger", "trigger")] + [_node(f"n{i}") for i in range(width)] + [_node("sink")]
+    connections = []
+    for i in range(width):
+        connections.append({"source": "trigger", "target": f"n{i}"})
+        connections.append({"source": f"n{i}", "target": "sink"})
+    return nodes, connections
+
+
+def _sleeping_runner(delay, fail=()):
+    async def run_node(node, inputs):
+        await asyncio.sleep(delay)
+        node_id = node["node_id"]
+        if node_id in fail:
+            return {"node_id": node_id, "status": "error", "error": "boom"}
+        return {"node_id": node_id, "status": "success", "output": {"value": node_id, "inputs": sorted(inputs)}}
+    return run_node
+
+
+class TestWorkflowDAG:
+    """Test graph construction."""
+
+    def test_topological_order_respects_edges(self):
+        nodes = [_node("c"), _node("b"), _node("a", "trigger")]
+        connections = [{"source": "a", "target": "b"}, {"sourceId": "b", "targetId": "c"}]
+
+        dag = WorkflowDAG(nodes, connections)
+
+        assert dag.order == ["a", "b", "c"]
+
+    def test_cycle_is_rejected(self):
+        nodes = [_node("a"), _node("b")]
+        connections = [{"source": "a", "target": "b"}, {"source": "b", "target": "a"}]
+
+        with pytest.raises(WorkflowGraphError):
+            WorkflowDAG(nodes, connections)
+
+    def test_unknown_connection_target_is_rejected(self):
+        with pytest.raises(WorkflowGraphError):
+            WorkflowDAG([_node("a")], [{"source": "a", "target": "missing"}])
+
+
+class TestDAGExecutor:
+    """Test concurrent execution semantics."""
+
+    @pytest.mark.asyncio
+    async def test_outputs_propagate_along_edges(self):
+        nodes, connections = _diamond(3)
+        results = await DAGExecutor(WorkflowDAG(nodes, connections), _sleeping_runner(0)).run()
+
+        assert results["sink"]["output"]["inputs"] == ["n0", "n1", "n2"]
+        assert results["n1"]["output"]["inputs"] == ["trigger"]
+
+    @pytest.mark.asyncio
+    async def test_failed_branch_skips_descendants_only(self):
+        nodes = [_node("t", "trigger"), _node("a"), _node("a2"), _node("b"), _node("b2")]
+        connections = [
+            {"source": "t", "target": "a"}, {"source": "a", "target": "a2"},
+            {"source": "t", "target": "b"}, {"source": "b", "target": "b2"},
+        ]
+        executor = DAGExecutor(WorkflowDAG(nodes, connections), _sleeping_runner(0, fail={"a"}))
+
+        results = await executor.run()
+
+        assert executor.statuses["a"] == NODE_ERROR
+        assert executor.statuses["a2"] == NODE_SKIPPED
+        assert results["a2"]["skipped_because"] == "a"
+        assert executor.statuses["b2"] == NODE_SUCCESS
+
+    @pytest.mark.asyncio
+    async def test_diamond_50_nodes_runs_in_critical_path_time(self):
+        """48 independent nodes between a trigger and a sink finish in ~3 node latencies."""
+        delay = 0.05
+        nodes, connections = _diamond(48)
+        executor = DAGExecutor(WorkflowDAG(nodes, connections), _sleeping_runner(delay), max_concurrency=64)
+
+        started = time.perf_counter()
+        results = await executor.run()
+        elapsed = time.perf_counter() - started
+
+        assert len(results) == 50
+        assert all(status == NODE_SUCCESS for status in executor.statuses.values())
+        critical_path = 3 * delay
+        assert elapsed < critical_path * 2.5, f"took {elapsed:.3f}s, serial would be {50 * delay:.2f}s"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap_is_enforced(self):
+        in_flight = 0
+        peak = 0
+
+        async def run_node(node, inputs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"node_id": node["node_id"], "status": "success", "output": {}}
+
+        nodes, connections = _diamond(20)
+        await DAGExecutor(WorkflowDAG(nodes, connections), run_node, max_concurrency=4).run()
+
+        assert peak == 4
+
+
+class FakeClock:
+    """Manually advanced clock for delay tests."""
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _delay_aware_runner(executed):
+    async def run_node(node, inputs):
+        executed.append(node["node_id"])
+        if node["node_type"] == "delay":
+            delay = node["parameters"]["delay"]
+            return {"node_id": node["node_id"], "status": "waiting", "delay_seconds": delay, "output": {"delay_seconds": delay}}
+        return {"node_id": node["node_id"], "status": "success", "output": {}}
+    return run_node
+
+
+class TestDelayResumption:
+    """Test suspension at delay nodes and resumption from a persisted cursor."""
+
+    def _workflow(self, delay):
+        nodes = [_node("t", "trigger"), _node("wait", "delay", delay=delay), _node("after"), _node("other")]
+        connections = [
+            {"source": "t", "target": "wait"}, {"source": "wait", "target": "after"},
+            {"source": "t", "target": "other"},
+        ]
+        return WorkflowDAG(nodes, connections)
+
+    @pytest.mark.asyncio
+    async def test_delay_suspends_branch_without_sleeping(self):
+        clock, executed = FakeClock(), []
+        executor = DAGExecutor(self._workflow(3 * 86400), _delay_aware_runner(executed), clock=clock)
+
+        started = time.perf_counter()
+        await executor.run()
+
+        assert time.perf_counter() - started < 1
+        assert executor.statuses["wait"] == NODE_WAITING
+        assert executor.statuses["after"] == "pending"
+        assert executor.statuses["other"] == NODE_SUCCESS
+        assert executor.next_resume_at() == clock.now + 3 * 86400
+
+    @pytest.mark.asyncio
+    async def test_resume_from_serialized_cursor(self):
+        clock, executed = FakeClock(), []
+        dag = self._workflow(2 * 3600)
+        first = DAGExecutor(dag, _delay_aware_runner(executed), clock=clock)
+        await first.run()
+        stored = json.loads(json.dumps(first.snapshot()))
+
+        # Not yet due: nothing new runs
+        clock.now += 3600
+        early = DAGExecutor(dag, _delay_aware_runner(executed), state=stored, clock=clock)
+        await early.run()
+        assert early.statuses["after"] == "pending"
+
+        clock.now += 3600
+        resumed = DAGExecutor(dag, _delay_aware_runner(executed), state=stored, clock=clock)
+        results = await resumed.run()
+
+        assert resumed.next_resume_at() is None
+        assert results["after"]["status"] == NODE_SUCCESS
+        assert executed.count("t") == 1 and executed.count("wait") == 1
+
+
+class TestCeleryContinuation:
+    """Run suspend/resume through the Celery tasks in eager mode against SQLite."""
+
+    @pytest.fixture
+    def harness(self, tmp_path, monkeypatch):
+        import functools
+        import uuid
+        from datetime import datetime
+        from types import SimpleNamespace
+
+        from sqlalchemy import Column, MetaData, String, Table, create_engine, insert
+        from sqlalchemy.exc import InvalidRequestError
+        from sqlalchemy.orm import configure_mappers, sessionmaker
+
+        from app.core import database
+        from app.models.workflow import Workflow, WorkflowExecution, WorkflowExecutionStatus
+        from app.services import tasks
+
+        # The tasks load executions through the ORM, which needs every model
+        # referenced by a relationship to be defined
+        try:
+            configure_mappers()
+        except InvalidRequestError as e:
+            pytest.skip(f"ORM models do not configure in this tree: {e}")
+
+        metadata = MetaData()
+        Table("users", metadata, Column("id", String(36), primary_key=True))
+        Workflow.__table__.to_metadata(metadata)
+        WorkflowExecution.__table__.to_metadata(metadata)
+        engine = create_engine(f"sqlite:///{tmp_path / 'continuations.db'}")
+        metadata.create_all(engine)
+        monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=engine, expire_on_commit=False))
+
+        clock = FakeClock()
+        monkeypatch.setattr(tasks, "time", SimpleNamespace(time=clock))
+        monkeypatch.setattr(tasks, "DAGExecutor", functools.partial(DAGExecutor, clock=clock))
+        monkeypatch.setitem(tasks.celery_app.conf, "task_always_eager", True)
+
+        # The broker holds ETA continuations until the test delivers them
+        scheduled = []
+        monkeypatch.setattr(
+            tasks.resume_workflow_task, "apply_async",
+            lambda args, eta=None: scheduled.append(tuple(args))
+        )
+        emails, before_email = [], []
+
+        def send_email(parameters):
+            for hook in before_email:
+                hook()
+            emails.append(parameters)
+            return {"email_sent": True}
+
+        monkeypatch.setattr(tasks, "_execute_email_node", send_email)
+
+        workflow_id, execution_id = uuid.uuid4(), uuid.uuid4()
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            conn.execute(insert(Workflow.__table__), [{
+                "id": workflow_id, "created_at": now, "updated_at": now, "name": "Follow-up",
+                "owner_id": uuid.uuid4(), "settings": {},
+                "nodes": [_node("t", "trigger"), _node("wait", "delay", delay=1, unit="hours"), _node("mail", "email")],
+                "connections": [{"source": "t", "target": "wait"}, {"source": "wait", "target": "mail"}],
+            }])
+            conn.execute(insert(WorkflowExecution.__table__), [{
+                "id": execution_id, "created_at": now, "updated_at": now, "workflow_id": workflow_id,
+                "status": WorkflowExecutionStatus.PENDING, "trigger_data": {}, "execution_data": {},
+            }])
+
+        def load():
+            with database.SessionLocal() as session:
+                return session.get(WorkflowExecution, execution_id)
+
+        yield SimpleNamespace(
+            tasks=tasks, clock=clock, scheduled=scheduled, emails=emails, before_email=before_email,
+            execution_id=execution_id, load=load, status=WorkflowExecutionStatus
+        )
+        engine.dispose()
+
+    def test_suspend_then_resume(self, harness):
+        tasks = harness.tasks
+
+        started = tasks.execute_workflow_task.apply(args=[harness.execution_id]).get()
+
+        assert started["status"] == "waiting"
+        assert harness.scheduled == [(harness.execution_id, 1)]
+        assert harness.emails == []
+        assert harness.load().execution_data["dag_state"]["generation"] == 1
+
+        # Not due yet: the beat task dispatches nothing
+        assert tasks.resume_waiting_workflows.apply().get()["resumed"] == 0
+
+        harness.clock.now += 3600
+        resumed = tasks.resume_workflow_task.apply(args=harness.scheduled[0]).get()
+
+        assert resumed["status"] == "success"
+        assert len(harness.emails) == 1
+        assert harness.load().status == harness.status.SUCCESS
+
+    def test_duplicate_delivery_runs_nodes_once(self, harness):
+        tasks = harness.tasks
+        tasks.execute_workflow_task.apply(args=[harness.execution_id]).get()
+        harness.clock.now += 3600
+
+        # While the ETA continuation is running the email node, the same
+        # generation is delivered again and the beat safety net fires
+        duplicates = []
+        harness.before_email.append(lambda: duplicates.extend([
+            tasks.resume_workflow_task.apply(args=harness.scheduled[0]).get(),
+            tasks.resume_waiting_workflows.apply().get(),
+        ]))
+
+        resumed = tasks.resume_workflow_task.apply(args=harness.scheduled[0]).get()
+
+        assert resumed["status"] == "success"
+        assert duplicates == [
+            {"status": "ignored", "execution_id": harness.execution_id},
+            {"status": "success", "resumed": 0},
+        ]
+        # A late redelivery after completion is ignored as well
+        assert tasks.resume_workflow_task.apply(args=harness.scheduled[0]).get()["status"] == "ignored"
+        assert len(harness.emails) == 1
+        assert harness.load().status == harness.status.SUCCESS
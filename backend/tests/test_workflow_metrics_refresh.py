@@ -0,0 +1,237 @@
+"""
+Tests for incremental workflow metrics refreshes.
+Checks that sliding the stored window counters matches aggregating the
+whole window, and that a refresh does not read the interior of the window.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, create_engine, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.models.analytics import (
+    AnalyticsEventType, AnalyticsRollupWatermark, WorkflowAnalyticsDailyRollup, WorkflowAnalyticsEvent,
+    WorkflowAnalyticsHourlyRollup, WorkflowCostAnalysis, WorkflowLatencySketch, WorkflowPerformanceMetrics
+)
+from app.services.analytics_ingestion import MetricsRefreshDebouncer
+from app.services.analytics_rollups import compact_rollups
+from app.services.workflow_metrics_refresh import (
+    METRICS_LATENESS, METRICS_WINDOW, refresh_workflow_metrics, state_to_stats, stats_to_state
+)
+
+START = datetime(2026, 8, 1)
+WORKFLOW_ID = uuid.uuid4()
+OWNER_ID = uuid.uuid4()
+USER_IDS = [uuid.uuid4() for _ in range(5)]
+EVENT_TYPES = [
+    AnalyticsEventType.WORKFLOW_EXECUTION,
+    AnalyticsEventType.WORKFLOW_SUCCESS,
+    AnalyticsEventType.WORKFLOW_FAILURE,
+    AnalyticsEventType.CONVERSION,
+]
+
+_events = WorkflowAnalyticsEvent.__table__
+_metrics = WorkflowPerformanceMetrics.__table__
+
+
+def _random_events(count, start, span, rng):
+    events = []
+    for _ in range(count):
+        created_at = start + timedelta(seconds=rng.randrange(int(span.total_seconds())))
+        events.append({
+            "id": uuid.uuid4(),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "workflow_id": WORKFLOW_ID,
+            "user_id": rng.choice(USER_IDS),
+            "event_type": rng.choice(EVENT_TYPES),
+            "event_data": {},
+            "execution_time_ms": rng.choice([None, rng.randrange(1, 20_000)]),
+            "conversion_value": rng.choice([None, Decimal(rng.randrange(0, 10_000)) / 100]),
+            "revenue_impact": rng.choice([None, Decimal(rng.randrange(0, 50_000)) / 100]),
+        })
+    return events
+
+
+def _reference(events, now):
+    """The refreshed columns for ``[now - window, now)``, computed in Python."""
+    window = [event for event in events if now - METRICS_WINDOW <= event["created_at"] < now]
+    counts = {event_type: 0 for event_type in EVENT_TYPES}
+    for event in window:
+        counts[event["event_type"]] += 1
+    total = sum(counts[event_type] for event_type in EVENT_TYPES[:3])
+    times = [
+        event["execution_time_ms"] for event in window
+        if event["event_type"] in EVENT_TYPES[:3] and event["execution_time_ms"] is not None
+    ]
+    return {
+        "total_executions": total,
+        "successful_executions": counts[AnalyticsEventType.WORKFLOW_SUCCESS],
+        "failed_executions": counts[AnalyticsEventType.WORKFLOW_FAILURE],
+        "avg_execution_time_ms": pytest.approx(sum(times) / len(times) if times else 0.0),
+        "total_conversions": counts[AnalyticsEventType.CONVERSION],
+        "total_revenue": sum((event["revenue_impact"] or Decimal("0.00") for event in window), Decimal("0.00")),
+        "total_interactions": len(window),
+        "unique_users_engaged": len({event["user_id"] for event in window}),
+    }
+
+
+def _selected(values):
+    return {key: values[key] for key in (
+        "total_executions", "successful_executions", "failed_executions", "avg_execution_time_ms",
+        "total_conversions", "total_revenue", "total_interactions", "unique_users_engaged",
+    )}
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    path = tmp_path / "metrics.db"
+    metadata = MetaData()
+    Table("workflows", metadata, Column("id", String(36), primary_key=True), Column("owner_id", String(36)))
+    Table("users", metadata, Column("id", String(36), primary_key=True))
+    for model in (
+        WorkflowAnalyticsEvent, WorkflowPerformanceMetrics, WorkflowCostAnalysis, WorkflowLatencySketch,
+        WorkflowAnalyticsHourlyRollup, WorkflowAnalyticsDailyRollup, AnalyticsRollupWatermark
+    ):
+        model.__table__.to_metadata(metadata)
+    sync_engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(metadata.tables["workflows"].insert(), {"id": str(WORKFLOW_ID), "owner_id": str(OWNER_ID)})
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield sync_engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+    sync_engine.dispose()
+
+
+def _seed(sync_engine, events):
+    with sync_engine.begin() as conn:
+        conn.execute(insert(_events), events)
+
+
+async def _refresh(session_factory, now, workflow_id=WORKFLOW_ID):
+    async with session_factory() as session:
+        values = await refresh_workflow_metrics(session, workflow_id, now=now)
+        await session.commit()
+    return values
+
+
+def _stored(sync_engine):
+    with sync_engine.connect() as conn:
+        return conn.execute(select(_metrics)).one()
+
+
+class TestWindowState:
+    """Test the stored counters."""
+
+    def test_state_round_trip(self):
+        state = {
+            "workflow_execution": {
+                "event_count": 3, "execution_time_count": 2, "execution_time_sum": 250.0,
+                "conversion_value_sum": "0.00", "revenue_sum": "12.50",
+            }
+        }
+
+        stats = state_to_stats(state)
+
+        assert stats[AnalyticsEventType.WORKFLOW_EXECUTION].revenue_sum == Decimal("12.50")
+        assert stats_to_state(stats) == state
+
+
+class TestIncrementalRefresh:
+    """Sliding the window matches aggregating it from scratch."""
+
+    @pytest.mark.asyncio
+    async def test_matches_full_aggregation_as_time_advances(self, database):
+        sync_engine, session_factory = database
+        rng = random.Random(25)
+        events = _random_events(3000, START, timedelta(days=40), rng)
+        _seed(sync_engine, events)
+        now = START + timedelta(days=40)
+        await compact_rollups(session_factory, now=now)
+
+        first = await _refresh(session_factory, now)
+        assert _selected(first) == _reference(events, now)
+        row = _stored(sync_engine)
+        assert row.user_id == OWNER_ID
+        assert row.window_stats["watermark"] == (now - METRICS_LATENESS).isoformat()
+
+        for step in [timedelta(seconds=5), timedelta(minutes=3), timedelta(hours=2), timedelta(days=1)] * 3:
+            late = _random_events(40, now - METRICS_LATENESS, METRICS_LATENESS, rng)
+            fresh = _random_events(60, now, step, rng)
+            _seed(sync_engine, late + fresh)
+            events.extend(late + fresh)
+            now += step
+
+            assert _selected(await _refresh(session_factory, now)) == _reference(events, now)
+
+        assert _stored(sync_engine).period_end == now
+
+    @pytest.mark.asyncio
+    async def test_refresh_does_not_read_the_interior_of_the_window(self, database):
+        sync_engine, session_factory = database
+        rng = random.Random(3)
+        events = _random_events(2000, START, timedelta(days=35), rng)
+        _seed(sync_engine, events)
+        now = START + timedelta(days=35)
+        await _refresh(session_factory, now)
+
+        # Rows well inside both the old and new window are only in the stored counters
+        interior_start, interior_end = now - timedelta(days=20), now - timedelta(days=10)
+        with sync_engine.begin() as conn:
+            conn.execute(delete(_events).where(
+                _events.c.created_at >= interior_start, _events.c.created_at < interior_end
+            ))
+
+        after = _selected(await _refresh(session_factory, now + timedelta(minutes=1)))
+        expected = _reference(events, now + timedelta(minutes=1))
+
+        # Distinct users are still counted over the raw rows
+        del after["unique_users_engaged"], expected["unique_users_engaged"]
+        assert after == expected
+
+    @pytest.mark.asyncio
+    async def test_stale_watermark_rebuilds_the_window(self, database):
+        sync_engine, session_factory = database
+        rng = random.Random(7)
+        events = _random_events(500, START, timedelta(days=80), rng)
+        _seed(sync_engine, events)
+
+        await _refresh(session_factory, START + timedelta(days=35))
+        later = START + timedelta(days=80)
+
+        assert _selected(await _refresh(session_factory, later)) == _reference(events, later)
+
+    @pytest.mark.asyncio
+    async def test_unknown_workflow(self, database):
+        _, session_factory = database
+
+        with pytest.raises(ValueError):
+            await _refresh(session_factory, START, workflow_id=uuid.uuid4())
+
+
+class TestDebouncedRefresh:
+    """A burst of events on one workflow triggers one recomputation."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_coalesced(self, database):
+        sync_engine, session_factory = database
+        events = _random_events(1000, START, timedelta(hours=1), random.Random(11))
+        _seed(sync_engine, events)
+        now = START + timedelta(hours=2)
+
+        debouncer = MetricsRefreshDebouncer(lambda workflow_id: _refresh(session_factory, now, workflow_id))
+        for _ in events:
+            debouncer.mark_dirty(WORKFLOW_ID)
+        await debouncer.refresh_dirty()
+        await debouncer.close()
+
+        assert debouncer.get_stats() == {
+            "requested": 1000, "coalesced": 999, "executed": 1, "failed": 0, "pending": 0
+        }
+        assert _stored(sync_engine).total_interactions == 1000
@@ -0,0 +1,187 @@
+"""
+Tests for the workflow trigger dispatch index.
+Checks that indexed dispatch selects exactly the workflows the previous
+full scan matched, that updates re-index workflows, and benchmarks trigger
+dispatch across 50,000 active workflows.
+"""
+
+import gc
+import json
+import random
+import time
+from types import SimpleNamespace
+
+from app.services.workflow_conditions import WorkflowCondition
+from app.services.workflow_triggers import TriggerIndex
+
+TRIGGER_TYPES = ["event", "webhook", "pr_created", "sla_violation"]
+BENCHMARK_WORKFLOWS = 50_000
+BENCHMARK_TRIGGERS = 2_000
+
+
+def _workflow(workflow_id, trigger_type, conditions, actions=None):
+    return SimpleNamespace(
+        id=workflow_id,
+        name=f"workflow-{workflow_id}",
+        trigger_type=trigger_type,
+        is_active=True,
+        configuration=json.dumps({"conditions": conditions, "actions": actions or []}),
+    )
+
+
+def _random_conditions(rng, events, forms, unkeyed_share):
+    conditions = []
+    kind = rng.random()
+    if kind < unkeyed_share:
+        if rng.random() < 0.5:
+            conditions.append({"field": "component_id", "operator": "ne", "value": "hero"})
+    elif kind < unkeyed_share + (1 - unkeyed_share) * 0.7:
+        conditions.append({"field": "event_name", "operator": "eq", "value": rng.choice(events)})
+    else:
+        conditions.append({"field": "form_id", "operator": "in", "value": rng.sample(forms, 2)})
+    if rng.random() < 0.5:
+        conditions.append({"field": "amount", "operator": "gte", "value": rng.randint(0, 100)})
+    return conditions
+
+
+def _random_payload(rng, events, forms):
+    return {
+        "event_name": rng.choice(events),
+        "form_id": rng.choice(forms),
+        "component_id": rng.choice(["hero", "footer", None]),
+        "amount": rng.randint(0, 100),
+    }
+
+
+def _legacy_match(workflows, trigger_type, payload):
+    """The previous dispatch: scan every workflow, parse its configuration, evaluate."""
+    matched = []
+    for workflow in workflows:
+        if workflow.trigger_type != trigger_type:
+            continue
+        config = json.loads(workflow.configuration) if workflow.configuration else {}
+        if all(WorkflowCondition(**data).evaluate(payload) for data in config.get("conditions", [])):
+            matched.append(workflow.id)
+    return matched
+
+
+def _indexed_match(index, trigger_type, payload):
+    return [c.workflow.id for c in index.candidates(trigger_type, payload) if c.matches(payload)]
+
+
+def _population(count, unkeyed_share, seed=3):
+    rng = random.Random(seed)
+    events = [f"event-{n}" for n in range(max(count // 10, 5))]
+    forms = [f"form-{n}" for n in range(max(count // 20, 5))]
+    workflows = [
+        _workflow(n, rng.choice(TRIGGER_TYPES), _random_conditions(rng, events, forms, unkeyed_share))
+        for n in range(count)
+    ]
+    return rng, events, forms, workflows
+
+
+class TestTriggerIndex:
+    """Test indexed dispatch against the full scan."""
+
+    def test_matches_full_scan(self):
+        rng, events, forms, workflows = _population(600, unkeyed_share=0.3)
+        index = TriggerIndex()
+        index.rebuild(workflows)
+
+        for _ in range(500):
+            trigger_type = rng.choice(TRIGGER_TYPES)
+            payload = _random_payload(rng, events, forms)
+            assert _indexed_match(index, trigger_type, payload) == _legacy_match(workflows, trigger_type, payload)
+
+    def test_unkeyed_workflows_see_every_event(self):
+        index = TriggerIndex()
+        index.add(_workflow(1, "event", [{"field": "amount", "operator": "gt", "value": 10}]))
+        index.add(_workflow(2, "event", [{"field": "event_name", "operator": "eq", "value": "signup"}]))
+
+        assert [c.workflow.id for c in index.candidates("event", {"event_name": "other"})] == [1]
+        assert [c.workflow.id for c in index.candidates("event", {"event_name": "signup"})] == [1, 2]
+        assert index.candidates("webhook", {"event_name": "signup"}) == []
+
+    def test_only_top_level_conjuncts_pin_a_key(self):
+        index = TriggerIndex()
+        index.add(_workflow(1, "event", {"all": [
+            {"field": "form_id", "operator": "eq", "value": "contact"},
+            {"any": [{"field": "vip", "operator": "eq", "value": True}, {"field": "amount", "operator": "gt", "value": 5}]},
+        ]}))
+        index.add(_workflow(2, "event", {"any": [
+            {"field": "form_id", "operator": "eq", "value": "contact"},
+            {"field": "form_id", "operator": "eq", "value": "signup"},
+        ]}))
+
+        assert [c.workflow.id for c in index.candidates("event", {"form_id": "newsletter"})] == [2]
+        assert [c.workflow.id for c in index.candidates("event", {"form_id": "contact"})] == [1, 2]
+        assert index.get(index.compiled[1].workflow).matches({"form_id": "contact", "vip": True})
+
+    def test_configuration_change_reindexes(self):
+        index = TriggerIndex()
+        workflow = _workflow(1, "event", [{"field": "event_name", "operator": "eq", "value": "signup"}])
+        index.add(workflow)
+        first = index.get(workflow)
+        assert index.get(workflow) is first
+
+        workflow.configuration = json.dumps({"conditions": [{"field": "event_name", "operator": "eq", "value": "purchase"}]})
+        assert index.get(workflow) is not first
+
+        assert index.candidates("event", {"event_name": "signup"}) == []
+        assert [c.workflow.id for c in index.candidates("event", {"event_name": "purchase"})] == [1]
+
+    def test_remove_and_trigger_type_change(self):
+        index = TriggerIndex()
+        workflow = _workflow(1, "event", [])
+        index.add(workflow)
+
+        workflow.trigger_type = "webhook"
+        index.add(workflow)
+        assert index.candidates("event", {}) == []
+        assert len(index.candidates("webhook", {})) == 1
+
+        index.remove(1)
+        assert index.candidates("webhook", {}) == [] and len(index) == 0
+
+    def test_invalid_configuration_is_not_indexed(self):
+        index = TriggerIndex()
+        broken = SimpleNamespace(id=1, name="broken", trigger_type="event", configuration="{not json")
+
+        assert index.add(broken) is None
+        assert index.candidates("event", {}) == []
+
+
+class TestDispatchBenchmark:
+    """Trigger dispatch over 50,000 active workflows."""
+
+    def test_dispatch_latency(self):
+        # Most workflows listen for a specific event, form or component; the
+        # ones that pin none are candidates for every trigger of their type.
+        rng, events, forms, workflows = _population(BENCHMARK_WORKFLOWS, unkeyed_share=0.01)
+        index = TriggerIndex()
+        started = time.perf_counter()
+        index.rebuild(workflows)
+        build_seconds = time.perf_counter() - started
+
+        gc.collect()
+        triggers = [(rng.choice(TRIGGER_TYPES), _random_payload(rng, events, forms)) for _ in range(BENCHMARK_TRIGGERS)]
+        latencies = []
+        for trigger_type, payload in triggers:
+            started = time.perf_counter()
+            _indexed_match(index, trigger_type, payload)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+
+        started = time.perf_counter()
+        for trigger_type, payload in triggers[:5]:
+            _legacy_match(workflows, trigger_type, payload)
+        legacy = (time.perf_counter() - started) / 5
+
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(
+            f"{BENCHMARK_WORKFLOWS} workflows: index built in {build_seconds:.2f}s, "
+            f"dispatch p50 {p50 * 1e6:.0f}us p99 {p99 * 1e6:.0f}us, full scan {legacy * 1000:.0f}ms"
+        )
+        assert p99 < 0.001
+        assert p50 * 100 < legacy